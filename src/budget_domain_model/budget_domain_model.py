@@ -69,8 +69,10 @@
 # python standard library modules and packages
 from abc import ABCMeta
 import logging, os, getpass, time, copy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-from typing import List, Type, Generator, Dict, Tuple, Any, TYPE_CHECKING
+from typing import List, Type, Generator, Dict, Tuple, Set, Any, TYPE_CHECKING
 # third-party modules and packages
 import p3_utils as p3u, pyjson5, p3logging as p3l
 from openpyxl import Workbook, load_workbook
@@ -82,7 +84,14 @@ from budget_storage_model import (
     bsm_get_workbook_names,
     bsm_get_workbook_names2,
     bsm_WORKBOOK_file_load,
+    bsm_WORKBOOKS_file_load_values,
     bsm_WORKBOOK_file_save,
+    bsm_WORKBOOKS_file_save,
+    BSM_BULK_SAVE_MAX_WORKERS,
+    bsm_WORKBOOK_file_save_async,
+    bsm_RAW_STORE_ingest,
+    BSM_RAW_STORE_FOLDER,
+    bsm_WB_FOLDER_manifest,
     )                              
 from p3_mvvm.model_base_ABC import Model_Base
 from budman_namespace.bdm_workbook_class import BDMWorkbook
@@ -137,6 +146,7 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
         setattr(self, BDM_LAST_MODIFIED_BY, getpass.getuser())
         setattr(self, BDM_WORKING_DATA, {})  
         setattr(self, BDM_DATA_CONTEXT, {})  
+        self._wb_save_futures = []  # queued background workbook saves.
         logger.debug("Complete:")
     #endregion BudgetDomainModel class constructor __init__()
     # ------------------------------------------------------------------------ +
@@ -687,6 +697,15 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
         """Return the WF_PREFIX_OUT value for wf_key."""
         return self.bdm_WF_OBJECT(wf_key)[WF_PREFIX_OUT]    
     
+    def bdm_WF_WORKING_FORMAT(self, wf_key:str) -> str:
+        """Return the WF_WORKING_FORMAT value for wf_key, default WF_FORMAT_XLSX."""
+        wf_format = self.bdm_WF_OBJECT(wf_key).get(WF_WORKING_FORMAT) or WF_FORMAT_XLSX
+        if wf_format not in VALID_WF_FORMATS:
+            m = f"Invalid WF_WORKING_FORMAT '{wf_format}' for workflow '{wf_key}'."
+            logger.error(m)
+            raise ValueError(m)
+        return wf_format
+
     def bdm_WF_PURPOSE_FOLDER_MAP(self, wf_key:str, wf_purpose:str=None) -> str|dict:
         """Return the WF_PURPOSE_FOLDER_MAP or specific mapped value for wb_type."""
         if wf_purpose is None:
@@ -1055,6 +1074,9 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
         fi_ap = self.bsm_FI_FOLDER_abs_path(fi_key)
         logger.debug(f"FI_KEY('{fi_key}') Checking FI_FOLDER('{fi_ap}')")
         bsm_verify_folder(fi_ap, create_missing_folders, raise_errors)
+    def bsm_FI_RAW_STORE_abs_path(self, fi_key: str) -> Path:
+        """Path of the BSM raw store folder in the FI_FOLDER, see raw_store.py."""
+        return self.bsm_FI_FOLDER_abs_path(fi_key) / BSM_RAW_STORE_FOLDER
     #endregion FI_DATA FI_FOLDER Path methods
     # ------------------------------------------------------------------------ +   
     #region bsm_WORKBOOKS_discover() method
@@ -1097,6 +1119,8 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
             # In progress refactoring in favor of the FI_WORKBOOK_DATA_COLLECTION 
             # to eliminate the FI_WORKFLOW_DATA_COLLECTION.
             wb_collection = {}
+            # Resolve the FI_FOLDER once, each WF_FOLDER is a name under it.
+            fi_abs_path = self.bsm_FI_FOLDER_abs_path(fi_key)
             for wf_key, wb_data_collection in self.bdm_FI_WORKFLOW_DATA_COLLECTION(fi_key).items():
                 for wf_purpose, wb_data_list in wb_data_collection.items():
                     folder_id = self.bdm_WF_PURPOSE_FOLDER_MAP(wf_key, wf_purpose)
@@ -1111,22 +1135,30 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
                         continue
                     wb_paths = []
                     id = f"('{fi_key}', '{wf_key}', '{wf_purpose}', '{folder_id}')"
-                    folder_abs_path = self.bsm_WF_FOLDER_abs_path(fi_key, wf_key, folder_id)
-                    if folder_abs_path is None: 
-                        m = f"'{id}' wf_folder path  is None.",
-                        logger.debug(m)
-                        continue
-                    if not folder_abs_path.exists():
-                        m = f"'{id}' path does not exist: {folder_abs_path}"
-                        logger.debug(m)
-                        continue
+                    folder_abs_path = fi_abs_path / wf_folder
                     # This is where the bsm scans a folder for actual workbook files.
+                    # A missing folder has no workbooks.
                     wb_paths = bsm_get_workbook_names2(folder_abs_path)
                     if len(wb_paths) == 0:
                         m = f"'{id}' path has no workbooks: {folder_abs_path}"
                         logger.debug(m)
                         continue
                     logger.debug(f"'{id}' found {len(wb_paths)} workbooks: {folder_abs_path}")
+                    try:
+                        # Summarize the new and changed files for the manifest.
+                        bsm_WB_FOLDER_manifest(folder_abs_path)
+                    except Exception as e:
+                        logger.warning(f"'{id}' manifest refresh failed: "
+                                       f"{p3u.exc_err_msg(e)}")
+                    if wf_purpose == WF_INPUT:
+                        # Keep the input files in the raw store, to recognize
+                        # the same content under another name.
+                        try:
+                            bsm_RAW_STORE_ingest(
+                                self.bsm_FI_RAW_STORE_abs_path(fi_key), wb_paths)
+                        except Exception as e:
+                            logger.warning(f"'{id}' raw store ingest failed: "
+                                           f"{p3u.exc_err_msg(e)}")
                     for wb_path in wb_paths:
                         # Create a BDMWorkbook object for each workbook.
                         wb_filename = wb_path.stem
@@ -1384,16 +1416,24 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
     # ------------------------------------------------------------------------ +   
     #region bsm_WORKBOOKS_LIST_load Methods
     def bsm_WORKBOOKS_LIST_load(self,
-                        wbl : WORKBOOK_DATA_LIST = None) -> LOADED_WORKBOOK_COLLECTION: 
+                        wbl : WORKBOOK_DATA_LIST = None,
+                        read_only : bool = False,
+                        max_workers : int = None) -> LOADED_WORKBOOK_COLLECTION: 
         """Load WORKBOOK_DATA_LIST returning a LOADED_WORKBOOK_COLLECTION
         
         A WORKBOOK_DATA_LIST has tuples of wb_name and wb_abs_path. Iterate the
         list and load each one. This is BSM-scope only, loads from the 
         filesystem, no side effects to the BDM or BDMWD.
 
+        With read_only, the workbooks are parsed in parallel worker
+        processes to WorkbookValues, see bsm_WORKBOOKS_file_load_values(),
+        e.g., the monthly workbooks of a year view.
+
         Args:
             wbl (WORKBOOK_DATA_LIST): A list of tuples containing the workbook name
             and the absolute path to the workbook file.
+            read_only (bool): Load values-only WorkbookValues, in parallel.
+            max_workers (int): The process pool size limit for read_only.
         
         Returns:
             LOADED_WORKBOOK_COLLECTION: new Dict[filename,Workbook] loaded workbooks.
@@ -1407,9 +1447,15 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
                 return None
             logger.debug(f"Loading {len(wbl)} workbooks.")
             returned_wbs = {}
-            for wb_name, wb_path in wbl:
-                wb = load_workbook(filename=wb_path)
-                returned_wbs[wb_name] = wb
+            if read_only:
+                wb_values_list = bsm_WORKBOOKS_file_load_values(
+                    [Path(wb_path) for _, wb_path in wbl], max_workers)
+                for (wb_name, _), wb_values in zip(wbl, wb_values_list):
+                    returned_wbs[wb_name] = wb_values
+            else:
+                for wb_name, wb_path in wbl:
+                    wb = bsm_WORKBOOK_file_load(Path(wb_path))
+                    returned_wbs[wb_name] = wb
             logger.debug(f"Complete: Loaded {len(returned_wbs)} workbooks. "
                          f"{p3u.stop_timer(st)}")
             return returned_wbs
@@ -1420,36 +1466,39 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
 
     def bsm_LOADED_WORKBOOKS_save(self,
                                   lwbl : LOADED_WORKBOOK_COLLECTION,
-                                  wbl : WORKBOOK_DATA_LIST) -> None: 
+                                  wbl : WORKBOOK_DATA_LIST,
+                                  max_workers : int = BSM_BULK_SAVE_MAX_WORKERS
+                                  ) -> Dict[str, Dict[str, Any]]: 
         """Save LOADED_WORKBOOK_COLLECTION to the filesystem.
         
-        A LOADED_WORKBOOK_COLLECTION has tuples of wb_name and a loaded Workbook
-        object. Iterate the list, obtain the abs_path_str for each wb_name from 
-        the provided WORKBOOK_DATA_LIST, and save the workbook. This is BSM-scope 
+        A LOADED_WORKBOOK_COLLECTION maps wb_name to a loaded Workbook
+        object. The abs_path_str of each wb_name is looked up in an index of
+        the provided WORKBOOK_DATA_LIST, and the workbooks are saved 
+        concurrently, see bsm_WORKBOOKS_file_save(). This is BSM-scope 
         only, saves to the filesystem, no side effects to the BDM or BDMWD.
 
         Args:
-            lwbl (LOADED_WORKBOOK_COLLECTION): A list of tuples containing the 
-            workbook name and associated loaded Workbook object.
+            lwbl (LOADED_WORKBOOK_COLLECTION): The loaded Workbook objects,
+            by workbook name.
+            wbl (WORKBOOK_DATA_LIST): A list of tuples containing the workbook
+            name and the absolute path to the workbook file.
+            max_workers (int): The save thread pool size limit.
         
         Returns:
-            None.
+            Dict[str, Dict[str, Any]]: The save result of each workbook, by
+            wb_name. A wb_name not in wbl is not saved.
 
         Raises: exceptions from any errors.
         """
         try:
             if lwbl is None:
                 logger.warning("No loaded workbooks to save, lwbl arg was None.")
-                return
+                return {}
             if wbl is None:
                 logger.warning("No workbooks abs_path_str, wbl arg was None.")
-                return None
-            for wb_name, wb in lwbl:
-                # Find the corresponding workbook path in the WORKBOOK_DATA_LIST.
-                for wbn, wb_path in wbl:
-                    if wbn == wb_name:
-                        break
-                wb.save(wb_path)
+                return {}
+            wb_paths = {wb_name: Path(wb_path) for wb_name, wb_path in wbl}
+            return bsm_WORKBOOKS_file_save(dict(lwbl), wb_paths, max_workers)
         except Exception as e:
             m = p3u.exc_err_msg(e)
             logger.error(m)
@@ -1472,7 +1521,7 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
             if wbl is None:
                 return
             for wb_name, wb_path in wbl:
-                wb = load_workbook(filename=wb_path)
+                wb = bsm_WORKBOOK_file_load(Path(wb_path))
                 self.bdmwd_LOADED_WORKBOOKS_add(wb_name, wb)
                 yield (wb_name, wb)
         except Exception as e:
@@ -1480,6 +1529,136 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
             logger.error(m)
             raise
 
+    def bsm_FI_WF_WORKBOOKS_prefetch(self,
+                fi_key : str, 
+                wf_key : str, 
+                wb_type : str,
+                prefetch : int = BSM_WORKBOOK_PREFETCH,
+                filetypes : Tuple[str, ...] = None,
+                exclude : Set[str] = None,
+                errors : Dict[str, str] = None) -> Generator[Tuple[str, Workbook], None, None]: 
+        """Generate a list of loaded workbooks, loading ahead in the background.
+        
+        For fi_key,wf_key,wb_type, yield (wb_name, loaded_Workbook), the same
+        as bsm_FI_WF_WORKBOOKS_generate(). A bounded thread pool keeps up to
+        prefetch workbooks loading while the caller works on the current one,
+        so storage latency overlaps with the caller's processing.
+
+        Args:
+            prefetch (int): The number of workbooks to load ahead, min 1.
+            filetypes (Tuple[str, ...]): Only the workbooks with these 
+                filetypes, e.g., (WB_FILETYPE_XLSX,), all when None.
+            exclude (Set[str]): The wb_names of workbooks not to load.
+            errors (Dict[str, str]): When given, a workbook that fails to 
+                load is skipped and its error message added by wb_name. 
+                When None, a failed load raises.
+
+        Yields:
+            Tuple[str, Workbook]: a tuple containing the file name the 
+            loaded workbook object.
+        """
+        try:
+            wbl = self.bdm_WORKBOOK_DATA_LIST(fi_key, wf_key, wb_type)
+            if wbl is None or len(wbl) == 0:
+                return
+            prefetch = max(1, prefetch)
+            if filetypes is not None:
+                wbl = [(wb_name, wb_path) for wb_name, wb_path in wbl
+                       if Path(wb_path).suffix.lower() in filetypes]
+            if exclude:
+                wbl = [(wb_name, wb_path) for wb_name, wb_path in wbl
+                       if wb_name not in exclude]
+            wbl_iter = iter(wbl)
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=prefetch,
+                                    thread_name_prefix="bsm_prefetch") as pool:
+                try:
+                    def submit_next() -> None:
+                        for wb_name, wb_path in wbl_iter:
+                            f = pool.submit(bsm_WORKBOOK_file_load, Path(wb_path))
+                            pending.append((wb_name, f))
+                            return
+                    for _ in range(prefetch):
+                        submit_next()
+                    while pending:
+                        wb_name, f = pending.popleft()
+                        # Keep prefetch loads in flight while the caller works.
+                        submit_next()
+                        try:
+                            wb = f.result()
+                        except Exception as e:
+                            if errors is None:
+                                raise
+                            errors[wb_name] = p3u.exc_err_msg(e)
+                            logger.error(f"Error loading workbook: {wb_name}: "
+                                         f"{errors[wb_name]}")
+                            continue
+                        self.bdmwd_LOADED_WORKBOOKS_add(wb_name, wb)
+                        yield (wb_name, wb)
+                finally:
+                    # Caller stopped early or a load failed, drop the rest.
+                    for _, f in pending:
+                        f.cancel()
+        except Exception as e:
+            m = p3u.exc_err_msg(e)
+            logger.error(m)
+            raise
+
+    def bsm_FI_WF_WORKBOOK_save_submit(self, wb : Workbook, wb_name: str, 
+                               fi_key:str, wf_key:str, wb_type : str) -> Future:
+        """Queue a bsm_FI_WF_WORKBOOK_save() on the BSM save queue.
+        
+        The caller must not modify wb after handing it to the save queue. 
+        Saves run one at a time in submit order. Use 
+        bsm_FI_WF_WORKBOOK_save_wait() to wait for the queued saves.
+
+        Returns:
+            Future: The future for the save, result() raises any save error.
+        """
+        try:
+            wb_path = self.bsm_FI_WF_WORKBOOK_path(wb_name, fi_key, wf_key, wb_type)
+            f = bsm_WORKBOOK_file_save_async(wb, wb_path)
+            self._wb_save_futures.append((wb_name, f))
+            return f
+        except Exception as e:
+            m = p3u.exc_err_msg(e)
+            logger.error(m)
+            raise
+
+    def bsm_FI_WF_WORKBOOK_save_wait(self, 
+                futures : Dict[str, Future] = None) -> Dict[str, str]:
+        """Wait for queued background workbook saves to complete.
+        
+        Args:
+            futures (Dict[str, Future]): The saves to wait for, by wb_name, 
+                as returned by bsm_FI_WF_WORKBOOK_save_submit(). When None, 
+                wait for all queued saves.
+
+        Returns:
+            Dict[str, str]: The error messages of the failed saves, keyed
+            by wb_name, empty when all saves succeeded.
+        """
+        try:
+            if futures is None:
+                waits = self._wb_save_futures
+                self._wb_save_futures = []
+            else:
+                waits = list(futures.items())
+                fs = set(futures.values())
+                self._wb_save_futures = [(n, f) for n, f in 
+                                         self._wb_save_futures if f not in fs]
+            errors = {}
+            for wb_name, f in waits:
+                try:
+                    f.result()
+                except Exception as e:
+                    errors[wb_name] = p3u.exc_err_msg(e)
+            return errors
+        except Exception as e:
+            m = p3u.exc_err_msg(e)
+            logger.error(m)
+            raise
+
     def bsm_FI_WF_WORKBOOK_save(self, wb : Workbook, wb_name: str, 
                                fi_key:str, wf_key:str, wb_type : str):
         """Save workbook output to storage associated (fi_key,wf_key,wb_type).
@@ -1487,6 +1666,54 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
         Map the fi_key and wf_key to the appropriate WF_OUTPUT_FOLDER folder in 
         the filesystem.
         """
+        try:
+            wb_path = self.bsm_FI_WF_WORKBOOK_path(wb_name, fi_key, wf_key, wb_type)
+            bsm_WORKBOOK_file_save(wb, wb_path)
+            logger.info(f"BizEVENT: Saved workbook '{wb_path.name}' to "
+                        f"'{str(wb_path.parent)}'")
+        except Exception as e:
+            m = p3u.exc_err_msg(e)
+            logger.error(m)
+            raise
+
+    def bsm_FI_WF_WORKBOOKS_save(self, lwbc : LOADED_WORKBOOK_COLLECTION,
+                                fi_key:str, wf_key:str, wb_type : str,
+                                max_workers : int = BSM_BULK_SAVE_MAX_WORKERS
+                                ) -> Dict[str, Dict[str, Any]]:
+        """Save loaded workbooks to storage associated (fi_key,wf_key,wb_type).
+        
+        The bulk form of bsm_FI_WF_WORKBOOK_save(), the workbooks are saved
+        concurrently, see bsm_WORKBOOKS_file_save().
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The save result of each workbook, by
+            wb_name.
+        """
+        try:
+            wb_paths = {wb_name: self.bsm_FI_WF_WORKBOOK_path(wb_name, fi_key,
+                                                              wf_key, wb_type)
+                        for wb_name in lwbc}
+            results = bsm_WORKBOOKS_file_save(dict(lwbc), wb_paths, max_workers)
+            for r in results.values():
+                if r["success"]:
+                    wb_path = Path(r["wb_path"])
+                    logger.info(f"BizEVENT: Saved workbook '{wb_path.name}' to "
+                                f"'{str(wb_path.parent)}' {r['elapsed']}")
+            return results
+        except Exception as e:
+            m = p3u.exc_err_msg(e)
+            logger.error(m)
+            raise
+
+    def bsm_FI_WF_WORKBOOK_path(self, wb_name: str, fi_key:str, wf_key:str,
+                                wb_type : str) -> Path:
+        """Return the output path of a workbook for (fi_key,wf_key,wb_type).
+        
+        A WF_WORKING xlsx workbook of a workflow with WF_WORKING_FORMAT 
+        WF_FORMAT_COLUMNAR is saved as a WB_FILETYPE_WORKING file, see 
+        working_data.py in the BSM. Use bsm_WORKING_file_export() to render
+        it to xlsx.
+        """
         try:
             f_id = self.bdm_WF_PURPOSE_FOLDER_MAP(wf_key, wb_type)
             if f_id is None:
@@ -1499,8 +1726,12 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
             # Prepend the out_prefix to the workbook name.
             wb_name = f"{self.bdm_WF_PREFIX_OUT(wf_key)}{wb_name}"
             wb_path = fi_wf_ap / wb_name
-            wb.save(wb_path)
-            logger.info(f"BizEVENT: Saved workbook '{wb_name}' to '{str(fi_wf_ap)}'")
+            # Working workbooks are only read by the next stage, not by people.
+            if (wb_type == WF_WORKING and 
+                wb_path.suffix.lower() == WB_FILETYPE_XLSX and
+                self.bdm_WF_WORKING_FORMAT(wf_key) == WF_FORMAT_COLUMNAR):
+                wb_path = wb_path.with_suffix(WB_FILETYPE_WORKING)
+            return wb_path
         except Exception as e:
             m = p3u.exc_err_msg(e)
             logger.error(m)
@@ -1815,13 +2046,17 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
             logger.error(m)
             raise
 
-    def bdmwd_WORKBOOK_save(self, wb_name:str, wb:Workbook) -> None:
+    def bdmwd_WORKBOOK_save(self, wb_name:str, wb:Workbook,
+                            wait:bool=True) -> None:
         """Save 1 workbook into the BDMWD, based on current BDMWD values.
 
         The named workbook is located for the current FI, WF, and WF_PURPOSE.
 
         Args:
             wb_name (str): The name of the workbook to load.
+            wait (bool): If False, queue the save on the BSM save queue and
+                return its Future, the caller must not change wb until
+                the save is done.
 
         Returns:
             Loaded Workbook.
@@ -1845,6 +2080,10 @@ class BudgetDomainModel(Model_Base,metaclass=BDMSingletonMeta):
                 m = f"Workbook '{wb_name}' not found in BDMWD_WORKBOOKS."
                 logger.error(m)
                 raise ValueError(m)
+            if not wait:
+                f = bsm_WORKBOOK_file_save_async(wb, wb_ap)
+                logger.debug(f"{d} queued save of wb: '{wb_name}' to '{wb_ap}'")
+                return f
             wb = bsm_WORKBOOK_file_save(wb,wb_ap)
             logger.debug(f"{d} saved wb: '{wb_name}' to '{wb_ap}'")
             return wb
@@ -131,7 +131,8 @@ class BDMConfig(metaclass=BDMSingletonMeta):
                 },
                 WF_PREFIX_IN: None,
                 WF_PREFIX_WORKING: None,
-                WF_PREFIX_OUT: "categorized_"
+                WF_PREFIX_OUT: "categorized_",
+                WF_WORKING_FORMAT: WF_FORMAT_XLSX  # or WF_FORMAT_COLUMNAR
             },
             BDM_WF_CATEGORIZATION: {     
                 # WF Object
@@ -147,7 +148,8 @@ class BDMConfig(metaclass=BDMSingletonMeta):
                 },
                 WF_PREFIX_IN: None,
                 WF_PREFIX_WORKING: "categorized_",
-                WF_PREFIX_OUT: "finalized_"
+                WF_PREFIX_OUT: "finalized_",
+                WF_WORKING_FORMAT: WF_FORMAT_XLSX  # or WF_FORMAT_COLUMNAR
             },
             BDM_WF_FINALIZATION: {   
                 # WF Object
@@ -163,7 +165,8 @@ class BDMConfig(metaclass=BDMSingletonMeta):
                 },
                 WF_PREFIX_IN: "categorized_",
                 WF_PREFIX_WORKING: "final_prep_",
-                WF_PREFIX_OUT: "finalized_"
+                WF_PREFIX_OUT: "finalized_",
+                WF_WORKING_FORMAT: WF_FORMAT_XLSX  # or WF_FORMAT_COLUMNAR
             }
         },
         BDM_OPTIONS: {
@@ -291,13 +294,14 @@ class BDMConfig(metaclass=BDMSingletonMeta):
         """Configure this BDMConfig object from loading a BDM_STORE url."""
         try:
             logger.debug("Start:  ...")
-            bdm_store = bsm_BDM_STORE_url_get(bdm_url)
+            # Rehydrate any python class objects from json, the rehydrated
+            # store is cached in the BSM binary snapshot.
+            bdm_store = bsm_BDM_STORE_url_get(bdm_url,
+                                              rehydrate=cls.BDM_STORE_rehydrate)
             # Ensure the URL used to load is set in the config
             bdm_store[BDM_URL] = bdm_url  
             # Validate the loaded BDM_STORE config. Raises error if not happy
             cls.BDM_CONFIG_validate_attributes(bdm_store)
-            # Rehydrate any python class objects from json
-            cls.BDM_STORE_rehydrate(bdm_store)
             # Get the instance of BDMConfig configured from bdms
             bdm_config = BDMConfig(bdm_config = bdm_store)            
             logger.debug(f"Complete:")   
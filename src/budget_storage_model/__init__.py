@@ -9,45 +9,235 @@ __license__ = "MIT"
 from .budget_storage_model import (
     bsm_BDM_STORE_url_get,
     bsm_BDM_STORE_url_put,
+    bsm_BDM_STORE_url_property_get,
     bsm_BDM_STORE_file_load,
     bsm_BDM_STORE_file_save,
     bsm_BDM_STORE_file_abs_path,
     bsm_verify_folder,
     bsm_get_workbook_names,
     bsm_get_workbook_names2,
+    bsm_WB_FOLDER_scan,
+    bsm_WB_FOLDER_scan_cache_clear,
     bsm_filter_workbook_names,
     bsm_WORKBOOK_url_get,
     bsm_WORKBOOK_url_put,
+    bsm_WORKBOOK_url_rows_get,
+    FileStorageBackend,
     bsm_WORKBOOK_file_load,
+    bsm_WORKBOOK_file_load_values,
     bsm_WORKBOOK_file_save,
     bsm_WB_URL_verify_file_scheme,
     bsm_WORKBOOK_verify_file_path_for_load,
+    bsm_file_sha256,
+    bsm_file_fingerprint,
+    bsm_file_fingerprint_match,
+)
+from .storage_backends import (
+    StorageBackend,
+    MemStorageBackend,
+    bsm_STORAGE_backend,
+    bsm_STORAGE_backend_register,
+    bsm_STORAGE_schemes,
+)
+from .sqlite_backend import SqliteStorageBackend
+from .folder_watcher import (
+    FolderWatcher,
+    BSM_WATCH_SETTLE_SECS,
+    BSM_WATCH_POLL_SECS,
+)
+from .bdm_store_journal import (
+    bsm_BDM_STORE_journal_path,
+    bsm_BDM_STORE_journal_load,
+    bsm_BDM_STORE_journal_save,
+    bsm_BDM_STORE_journal_attach,
+)
+from .bdm_store_snapshot import (
+    bsm_BDM_STORE_snapshot_path,
+    bsm_BDM_STORE_snapshot_load,
+    bsm_BDM_STORE_snapshot_save,
+)
+from .workbook_values import (
+    WorkbookValues,
+    WorksheetValues,
+)
+from .workbook_save_queue import (
+    WorkbookSaveQueue,
+    bsm_WORKBOOK_save_queue,
+    bsm_WORKBOOK_file_save_async,
+    bsm_WORKBOOK_save_pending_wait,
+    bsm_WORKBOOK_save_queue_flush,
+)
+from .workbook_bulk_save import (
+    bsm_WORKBOOKS_file_save,
+    BSM_BULK_SAVE_MAX_WORKERS,
+)
+from .columnar_sidecar import (
+    bsm_WORKBOOK_sidecar_load,
+    bsm_WORKBOOK_sidecar_save,
+    bsm_WORKBOOK_sidecar_write,
+    bsm_WORKBOOK_values_pack,
+    bsm_WORKBOOK_values_unpack,
+)
+from .xlsx_stream_reader import (
+    bsm_XLSX_file_load_values,
+    bsm_XLSX_file_columns,
+    BSM_XLSX_STREAM_READER,
+)
+from .workbook_batch_load import (
+    bsm_WORKBOOKS_file_load_values,
+)
+from .working_data import (
+    bsm_WORKING_file_write,
+    bsm_WORKING_file_load,
+    bsm_WORKING_file_load_values,
+    bsm_WORKING_file_export,
+)
+from .transaction_ledger import (
+    bsm_LEDGER_connect,
+    bsm_LEDGER_source_current,
+    bsm_LEDGER_source_upsert,
+    bsm_LEDGER_query,
+    BSM_LEDGER_FILENAME,
+    BSM_LEDGER_ROW_COLUMNS,
+)
+from .folder_manifest import (
+    bsm_WB_FILE_manifest_entry,
+    bsm_WB_FILE_manifest_update,
+    bsm_WB_FOLDER_manifest,
+    bsm_WB_FILES_manifest_sha256,
+    BSM_MANIFEST_FILENAME,
+)
+from .raw_store import (
+    bsm_RAW_STORE_ingest,
+    bsm_RAW_STORE_processed,
+    bsm_RAW_STORE_processed_set,
+    bsm_RAW_STORE_object_path,
+    BSM_RAW_STORE_FOLDER,
+)
+from .csv_chunk_reader import (
+    bsm_CSV_file_chunk_spans,
+    bsm_CSV_file_chunk_rows,
+    bsm_CSV_file_chunks,
+    BSM_CSV_CHUNK_BYTES,
 )
 from .csv_data_collection import (
     csv_DATA_COLLECTION_url_get,
     csv_DATA_COLLECTION_url_put,
     csv_DATA_COLLECTION_file_load,
     csv_DATA_COLLECTION_file_save,
+    csv_DATA_COLLECTION_file_rows,
+    csv_DATA_COLLECTION_file_chunks,
+    csv_value_type_infer,
+    csv_value_types_merge,
+    csv_column_types_infer,
+    CSV_KEY_COLUMN,
+    CSV_DATE_FORMATS,
+    CSV_TYPE_STR,
+    CSV_TYPE_INT,
+    CSV_TYPE_DATE,
+    CSV_TYPE_MONEY,
+    CSV_MONEY_DECIMAL,
+    CSV_MONEY_CENTS,
 )
 
 __all__ = [
     "bsm_BDM_STORE_url_get",
     "bsm_BDM_STORE_url_put",
+    "bsm_BDM_STORE_url_property_get",
     "bsm_BDM_STORE_file_load",
     "bsm_BDM_STORE_file_save",
     "bsm_BDM_STORE_file_abs_path",
     "bsm_verify_folder",
     "bsm_get_workbook_names",
     "bsm_get_workbook_names2",
+    "bsm_WB_FOLDER_scan",
+    "bsm_WB_FOLDER_scan_cache_clear",
+    "FolderWatcher",
+    "BSM_WATCH_SETTLE_SECS",
+    "BSM_WATCH_POLL_SECS",
     "bsm_filter_workbook_names",
     "bsm_WB_URL_verify_file_scheme",
     "bsm_WORKBOOK_verify_file_path_for_load",
     "bsm_WORKBOOK_url_get",
     "bsm_WORKBOOK_url_put",
+    "bsm_WORKBOOK_url_rows_get",
+    "FileStorageBackend",
+    "StorageBackend",
+    "MemStorageBackend",
+    "SqliteStorageBackend",
+    "bsm_STORAGE_backend",
+    "bsm_STORAGE_backend_register",
+    "bsm_STORAGE_schemes",
     "bsm_WORKBOOK_file_load",
+    "bsm_WORKBOOK_file_load_values",
     "bsm_WORKBOOK_file_save",
+    "bsm_file_sha256",
+    "bsm_file_fingerprint",
+    "bsm_file_fingerprint_match",
+    "bsm_BDM_STORE_journal_path",
+    "bsm_BDM_STORE_journal_load",
+    "bsm_BDM_STORE_journal_save",
+    "bsm_BDM_STORE_journal_attach",
+    "bsm_BDM_STORE_snapshot_path",
+    "bsm_BDM_STORE_snapshot_load",
+    "bsm_BDM_STORE_snapshot_save",
+    "WorkbookValues",
+    "WorksheetValues",
+    "WorkbookSaveQueue",
+    "bsm_WORKBOOK_save_queue",
+    "bsm_WORKBOOK_file_save_async",
+    "bsm_WORKBOOK_save_pending_wait",
+    "bsm_WORKBOOK_save_queue_flush",
+    "bsm_WORKBOOKS_file_save",
+    "BSM_BULK_SAVE_MAX_WORKERS",
+    "bsm_WORKBOOK_sidecar_load",
+    "bsm_WORKBOOK_sidecar_save",
+    "bsm_WORKBOOK_sidecar_write",
+    "bsm_WORKBOOK_values_pack",
+    "bsm_WORKBOOK_values_unpack",
+    "bsm_XLSX_file_load_values",
+    "bsm_XLSX_file_columns",
+    "BSM_XLSX_STREAM_READER",
+    "bsm_WORKBOOKS_file_load_values",
+    "bsm_WORKING_file_write",
+    "bsm_WORKING_file_load",
+    "bsm_WORKING_file_load_values",
+    "bsm_WORKING_file_export",
+    "bsm_LEDGER_connect",
+    "bsm_LEDGER_source_current",
+    "bsm_LEDGER_source_upsert",
+    "bsm_LEDGER_query",
+    "BSM_LEDGER_FILENAME",
+    "BSM_LEDGER_ROW_COLUMNS",
+    "bsm_WB_FILE_manifest_entry",
+    "bsm_WB_FILE_manifest_update",
+    "bsm_WB_FOLDER_manifest",
+    "bsm_WB_FILES_manifest_sha256",
+    "BSM_MANIFEST_FILENAME",
+    "bsm_RAW_STORE_ingest",
+    "bsm_RAW_STORE_processed",
+    "bsm_RAW_STORE_processed_set",
+    "bsm_RAW_STORE_object_path",
+    "BSM_RAW_STORE_FOLDER",
+    "bsm_CSV_file_chunk_spans",
+    "bsm_CSV_file_chunk_rows",
+    "bsm_CSV_file_chunks",
+    "BSM_CSV_CHUNK_BYTES",
     "csv_DATA_COLLECTION_url_get",
     "csv_DATA_COLLECTION_url_put",
     "csv_DATA_COLLECTION_file_load",
     "csv_DATA_COLLECTION_file_save",
+    "csv_DATA_COLLECTION_file_rows",
+    "csv_DATA_COLLECTION_file_chunks",
+    "csv_value_type_infer",
+    "csv_value_types_merge",
+    "csv_column_types_infer",
+    "CSV_KEY_COLUMN",
+    "CSV_DATE_FORMATS",
+    "CSV_TYPE_STR",
+    "CSV_TYPE_INT",
+    "CSV_TYPE_DATE",
+    "CSV_TYPE_MONEY",
+    "CSV_MONEY_DECIMAL",
+    "CSV_MONEY_CENTS",
 ]
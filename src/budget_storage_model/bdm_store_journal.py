@@ -0,0 +1,301 @@
+# ---------------------------------------------------------------------------- +
+#region    bdm_store_journal.py module
+""" Journaled storage of the BDM_STORE file for the BSM.
+
+    A BDM_STORE is a base snapshot, the .jsonc file, plus an append-only
+    journal file next to it, e.g., 'budget_manager_store.jsonc.journal'.
+    Each journal line is a json record of one property-level change:
+
+        {"op":"set","path":["fi_collection","boa","name"],"value":"BOA"}
+        {"op":"del","path":["options","old_option"]}
+
+    A save compares the store with the content last loaded or saved in this
+    process and appends only the changed properties, so it costs O(change)
+    in storage writes, not a rewrite of the whole store. A load replays the
+    journal onto the snapshot.
+
+    The first line of a journal is a base record with the sha256 of the 
+    snapshot file the journal applies to:
+
+        {"op":"base","sha":"9f86d081884c7d65..."}
+
+    The journal is compacted into a new snapshot when it grows past half the
+    snapshot size, at least BSM_JOURNAL_COMPACT_MIN_BYTES. A snapshot is also
+    written when the files changed on disk since this process last read or
+    wrote them. The snapshot is replaced atomically before the journal is
+    removed. A journal left over by a crash between the two has the base
+    sha of the old snapshot, so it is not replayed onto the new one, and 
+    the next save removes it. A torn last journal line is skipped on load.
+
+    No dependencies to other application layers.
+"""
+#endregion bdm_store_journal.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, os, copy, threading, dataclasses, hashlib
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Callable
+
+# third-party modules and packages
+import p3_utils as p3u
+import pyjson5 as json5
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_JOURNAL_SUFFIX = ".journal"
+BSM_JOURNAL_COMPACT_MIN_BYTES = 64 * 1024
+JOURNAL_OP_SET = "set"
+JOURNAL_OP_DEL = "del"
+JOURNAL_OP_BASE = "base"
+# Resolved bdms_path -> the journal state of the file in this process.
+_journal_states : Dict[str, "_JournalState"] = {}
+_journal_lock = threading.Lock()
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    _JournalState class
+class _JournalState:
+    """The store content as persisted, and the file sizes it was read from.
+
+    The content may be given as a loader function, called on the first save.
+    """
+    def __init__(self, content : Dict, snapshot_stat : Tuple[int, int],
+                 journal_size : int, loader : Callable[[], Dict] = None) -> None:
+        self._content = content
+        self._loader = loader
+        self.snapshot_stat = snapshot_stat
+        self.journal_size = journal_size
+
+    @property
+    def content(self) -> Dict:
+        if self._content is None and self._loader is not None:
+            self._content = self._loader()
+            self._loader = None
+        return self._content
+#endregion _JournalState class
+# ---------------------------------------------------------------------------- +
+#region    Journal record functions
+def bsm_BDM_STORE_journal_path(bdms_path : Path) -> Path:
+    """Return the path of the journal file for a BDM_STORE snapshot file."""
+    return bdms_path.with_name(bdms_path.name + BSM_JOURNAL_SUFFIX)
+
+def _plain(value : Any) -> Any:
+    """Return a dataclass object, e.g., a BDMWorkbook, as its field dict."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return value
+
+def store_diff(old : Dict, new : Dict, path : Tuple = ()) -> List[Dict[str, Any]]:
+    """Return the journal records to change the old store content to new.
+
+    Dataclass objects compare as their field dicts, so a rehydrated store
+    diffs cleanly against the json content it was loaded from.
+    """
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": JOURNAL_OP_DEL, "path": list(path + (key,))})
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": JOURNAL_OP_SET, "path": list(path + (key,)),
+                        "value": _plain(value)})
+            continue
+        value, old_value = _plain(value), _plain(old[key])
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            ops.extend(store_diff(old_value, value, path + (key,)))
+        elif old_value != value:
+            ops.append({"op": JOURNAL_OP_SET, "path": list(path + (key,)),
+                        "value": value})
+    return ops
+
+def store_apply(content : Dict, ops : List[Dict[str, Any]]) -> Dict:
+    """Apply journal records to store content in place, return content."""
+    for op in ops:
+        *parents, key = op["path"]
+        d = content
+        for p in parents:
+            if not isinstance(d.get(p), dict):
+                d[p] = {}
+            d = d[p]
+        if op["op"] == JOURNAL_OP_DEL:
+            d.pop(key, None)
+        else:
+            d[key] = op["value"]
+    return content
+
+def _journal_read(journal_path : Path) -> Tuple[List[Dict[str, Any]], bool]:
+    """Read the journal records, return (records, True if last line torn)."""
+    ops, torn = [], False
+    with open(journal_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            ops.append(json5.decode(line))
+        except json5.Json5DecoderException:
+            if i < len(lines) - 1:
+                raise
+            logger.warning(f"Skipping incomplete last record in journal "
+                           f"'{journal_path}'")
+            torn = True
+    return ops, torn
+
+def _file_stat(file_path : Path) -> Tuple[int, int]:
+    st = file_path.stat()
+    return (st.st_size, st.st_mtime_ns)
+
+def _file_sha(file_path : Path) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _base_record(bdms_path : Path) -> bytes:
+    """Return the base record line of a new journal for the snapshot."""
+    op = {"op": JOURNAL_OP_BASE, "sha": _file_sha(bdms_path)}
+    return (json5.encode(op) + "\n").encode("utf-8")
+
+def _journal_is_stale(ops : List[Dict[str, Any]], bdms_path : Path) -> bool:
+    """True if the journal's base record is not the snapshot file."""
+    if not ops or ops[0].get("op") != JOURNAL_OP_BASE:
+        return False  # A journal without a base record is replayed.
+    return ops[0].get("sha") != _file_sha(bdms_path)
+#endregion Journal record functions
+# ---------------------------------------------------------------------------- +
+#region    bsm_BDM_STORE_journal_load() function
+def bsm_BDM_STORE_journal_load(bdm_store : Dict, bdms_path : Path) -> Dict:
+    """Replay the journal of bdms_path onto the snapshot content.
+
+    Args:
+        bdm_store (Dict): The content decoded from the snapshot file.
+        bdms_path (Path): The path of the snapshot file.
+
+    Returns:
+        Dict: The BDM_STORE content with the journal changes applied.
+    """
+    try:
+        journal_path = bsm_BDM_STORE_journal_path(bdms_path)
+        journal_size = 0
+        if journal_path.exists():
+            ops, torn = _journal_read(journal_path)
+            if _journal_is_stale(ops, bdms_path):
+                # Left over from a compaction, the snapshot has the changes.
+                logger.warning(f"Ignoring journal of an older snapshot: "
+                               f"'{journal_path}'")
+                journal_size = -1  # The next save compacts.
+            else:
+                ops = [op for op in ops if op.get("op") != JOURNAL_OP_BASE]
+                store_apply(bdm_store, ops)
+                # Never append after a torn line, the next save compacts.
+                journal_size = -1 if torn else journal_path.stat().st_size
+                logger.info(f"BizEVENT: Replayed {len(ops)} journal records "
+                            f"from file: '{journal_path}'")
+        with _journal_lock:
+            _journal_states[str(bdms_path.resolve())] = _JournalState(
+                copy.deepcopy(bdm_store), _file_stat(bdms_path), journal_size)
+        return bdm_store
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+
+def bsm_BDM_STORE_journal_attach(bdms_path : Path,
+                                 loader : Callable[[], Dict]) -> None:
+    """Track bdms_path as loaded, without reading the snapshot or journal.
+
+    For a load that got the store content elsewhere, e.g., the binary 
+    snapshot. loader() returns a private copy of the persisted content, it
+    is called on the first save only.
+    """
+    try:
+        journal_path = bsm_BDM_STORE_journal_path(bdms_path)
+        j_size = journal_path.stat().st_size if journal_path.exists() else 0
+        if j_size > 0:
+            with open(journal_path, "rb") as f:
+                first = f.readline()
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    j_size = -1  # Torn last line, the next save compacts.
+            try:
+                base = [json5.decode(first.decode("utf-8"))]
+            except (json5.Json5DecoderException, UnicodeDecodeError):
+                base = []
+            if _journal_is_stale(base, bdms_path):
+                j_size = -1  # Left over from a compaction, the next save compacts.
+        with _journal_lock:
+            _journal_states[str(bdms_path.resolve())] = _JournalState(
+                None, _file_stat(bdms_path), j_size, loader)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_BDM_STORE_journal_load() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_BDM_STORE_journal_save() function
+def bsm_BDM_STORE_journal_save(bdm_store : Dict, bdms_path : Path,
+                               compact : bool = False) -> int:
+    """Persist the BDM_STORE content as journal records, or a new snapshot.
+
+    Args:
+        bdm_store (Dict): The BDM_STORE content to persist, filtered to the
+            BSM_PERSISTED_PROPERTIES.
+        bdms_path (Path): The path of the snapshot file.
+        compact (bool): Write a new snapshot and remove the journal.
+
+    Returns:
+        int: The count of journal records appended, -1 when a snapshot
+        was written.
+    """
+    try:
+        key = str(bdms_path.resolve())
+        journal_path = bsm_BDM_STORE_journal_path(bdms_path)
+        with _journal_lock:
+            state = _journal_states.get(key)
+            j_size = journal_path.stat().st_size if journal_path.exists() else 0
+            if (compact or state is None or not bdms_path.exists() or
+                state.snapshot_stat != _file_stat(bdms_path) or
+                state.journal_size != j_size):
+                # Nothing known to diff against, or changed on disk.
+                _snapshot_write(bdm_store, bdms_path, journal_path)
+                return -1
+            ops = store_diff(state.content, bdm_store)
+            if len(ops) == 0:
+                return 0
+            data = "".join(json5.encode(op) + "\n" for op in ops).encode("utf-8")
+            if state.journal_size == 0:
+                # A new journal starts with the snapshot it applies to.
+                data = _base_record(bdms_path) + data
+            limit = max(state.snapshot_stat[0] // 2, BSM_JOURNAL_COMPACT_MIN_BYTES)
+            if state.journal_size + len(data) > limit:
+                _snapshot_write(bdm_store, bdms_path, journal_path)
+                return -1
+            with open(journal_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            state.journal_size += len(data)
+            store_apply(state.content, copy.deepcopy(ops))
+            logger.debug(f"Appended {len(ops)} records to journal '{journal_path}'")
+            return len(ops)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+
+def _snapshot_write(bdm_store : Dict, bdms_path : Path,
+                    journal_path : Path) -> None:
+    """Write a new snapshot atomically, then remove the journal, lock held.
+    
+    A crash after the replace leaves the journal, its base record is the 
+    old snapshot, so the load does not replay it.
+    """
+    jsonc_content = json5.encode(bdm_store)
+    tmp_path = bdms_path.with_name(f".{bdms_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(jsonc_content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, bdms_path)
+    journal_path.unlink(missing_ok=True)
+    _journal_states[str(bdms_path.resolve())] = _JournalState(
+        copy.deepcopy(bdm_store), _file_stat(bdms_path), 0)
+    logger.debug(f"Wrote BDM_STORE snapshot '{bdms_path}'")
+#endregion bsm_BDM_STORE_journal_save() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,147 @@
+# ---------------------------------------------------------------------------- +
+#region    bdm_store_snapshot.py module
+""" Binary snapshot of a loaded BDM_STORE for fast startup in the BSM.
+
+    Decoding the BDM_STORE .jsonc file with pyjson5, replaying its journal
+    and rehydrating the BDMWorkbook objects all grow with the store size,
+    and happen on every start. After a load from the .jsonc file, the
+    loaded store is pickled to a hidden binary snapshot file next to it.
+    The next load of the unchanged store unpickles the snapshot instead.
+
+    The snapshot records BSM_SNAPSHOT_VERSION, a hash of the BDMWorkbook 
+    field names, the fingerprint of the .jsonc file, see 
+    bsm_file_fingerprint(), and the size and mtime of the journal file. A 
+    snapshot is used only when all of them still match, else the store is
+    loaded from the .jsonc file and the snapshot rewritten. So a snapshot
+    pickled before a change to the BDMWorkbook class is not unpickled. A
+    rehydrated store has its own snapshot file, named for the rehydrate
+    function applied to it.
+
+    Snapshots are pickles, only load snapshot files written by this module
+    in the user's own BDM folder.
+
+    No dependencies to other application layers.
+"""
+#endregion bdm_store_snapshot.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, os, pickle, re, hashlib, dataclasses
+from pathlib import Path
+from typing import Dict, Tuple, Callable
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budman_namespace.bdm_workbook_class import BDMWorkbook
+from budget_storage_model.bdm_store_journal import (
+    bsm_BDM_STORE_journal_path, bsm_BDM_STORE_journal_attach)
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_SNAPSHOT_SUFFIX = ".snapshot"
+BSM_SNAPSHOT_VERSION = 1
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    Snapshot helpers
+def bsm_BDM_STORE_snapshot_path(bdms_path : Path,
+                                rehydrate : Callable = None) -> Path:
+    """Return the binary snapshot path for a BDM_STORE file."""
+    tag = ""
+    if rehydrate is not None:
+        # e.g., '<locals>' in a qualname is not a valid windows file name.
+        tag = "." + re.sub(r"[^\w.-]", "_", rehydrate.__qualname__)
+    return bdms_path.with_name(f".{bdms_path.name}{tag}{BSM_SNAPSHOT_SUFFIX}")
+
+def _schema_hash() -> str:
+    """Return a hash of the BDMWorkbook field names pickled in a store."""
+    names = "|".join(f.name for f in dataclasses.fields(BDMWorkbook))
+    return hashlib.sha256(names.encode("utf-8")).hexdigest()[:16]
+
+def _journal_stat(bdms_path : Path) -> Tuple[int, int]:
+    journal_path = bsm_BDM_STORE_journal_path(bdms_path)
+    if not journal_path.exists():
+        return None
+    st = journal_path.stat()
+    return (st.st_size, st.st_mtime_ns)
+#endregion Snapshot helpers
+# ---------------------------------------------------------------------------- +
+#region    bsm_BDM_STORE_snapshot_load() function
+def bsm_BDM_STORE_snapshot_load(bdms_path : Path,
+                                rehydrate : Callable = None) -> Dict:
+    """Return the BDM_STORE from a valid binary snapshot, else None.
+
+    Args:
+        bdms_path (Path): The path of the BDM_STORE .jsonc file.
+        rehydrate (Callable): The rehydrate function the snapshot was
+            saved with, None for the plain decoded store.
+    """
+    # Import here, budget_storage_model imports this module.
+    from budget_storage_model.budget_storage_model import bsm_file_fingerprint_match
+    try:
+        st = p3u.start_timer()
+        snap_path = bsm_BDM_STORE_snapshot_path(bdms_path, rehydrate)
+        if not snap_path.exists():
+            return None
+        with open(snap_path, "rb") as f:
+            data = f.read()
+        header, store_bytes = pickle.loads(data)
+        if (header.get("version") != BSM_SNAPSHOT_VERSION or
+            header.get("schema") != _schema_hash() or
+            header.get("journal") != _journal_stat(bdms_path) or
+            not bsm_file_fingerprint_match(bdms_path, header.get("source"))):
+            logger.debug(f"BSM: Stale BDM_STORE snapshot '{snap_path}'")
+            return None
+        bdm_store = pickle.loads(store_bytes)
+        # Saves diff against a private copy, unpickled on the first save.
+        bsm_BDM_STORE_journal_attach(bdms_path, lambda: pickle.loads(store_bytes))
+        logger.info(f"BizEVENT: Loaded BDM_STORE snapshot '{snap_path}' "
+                    f"{p3u.stop_timer(st)}")
+        return bdm_store
+    except Exception as e:
+        # A bad snapshot is only a cache miss.
+        logger.warning(f"BSM: Ignoring BDM_STORE snapshot for '{bdms_path}': "
+                       f"{p3u.exc_err_msg(e)}")
+        return None
+#endregion bsm_BDM_STORE_snapshot_load() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_BDM_STORE_snapshot_save() function
+def bsm_BDM_STORE_snapshot_save(bdm_store : Dict, bdms_path : Path,
+                                rehydrate : Callable = None) -> bool:
+    """Write the binary snapshot of a BDM_STORE just loaded from bdms_path.
+
+    Args:
+        bdm_store (Dict): The loaded store, journal replayed, rehydrated
+            by rehydrate if given.
+        bdms_path (Path): The path of the BDM_STORE .jsonc file.
+        rehydrate (Callable): The rehydrate function applied, or None.
+
+    Returns:
+        bool: True if the snapshot was written.
+    """
+    from budget_storage_model.budget_storage_model import bsm_file_fingerprint
+    try:
+        snap_path = bsm_BDM_STORE_snapshot_path(bdms_path, rehydrate)
+        header = {
+            "version": BSM_SNAPSHOT_VERSION,
+            "schema": _schema_hash(),
+            "source": bsm_file_fingerprint(bdms_path),
+            "journal": _journal_stat(bdms_path)
+        }
+        # The store is pickled on its own, to check the header before
+        # unpickling the store.
+        store_bytes = pickle.dumps(bdm_store, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path = snap_path.with_name(f"{snap_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((header, store_bytes), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snap_path)
+        logger.debug(f"BSM: Wrote BDM_STORE snapshot '{snap_path}'")
+        return True
+    except Exception as e:
+        logger.warning(f"BSM: Failed to write BDM_STORE snapshot for "
+                       f"'{bdms_path}': {p3u.exc_err_msg(e)}")
+        return False
+#endregion bsm_BDM_STORE_snapshot_save() function
+# ---------------------------------------------------------------------------- +
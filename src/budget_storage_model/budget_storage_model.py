@@ -5,8 +5,8 @@
     Keep it simple, use a JSONC file to load/save the budget domain model 
     DATA_OBJECTs from/to storage. The BDM_STORE object is a dictionary in 
     memory and a json file in storage. Use a URL to reference it from other 
-    layers of application. Initially, the file scheme is supported for 
-    local files, but later it may be extended to support other storage services.
+    layers of application. The URL scheme selects the storage backend, the
+    file scheme for local files, see storage_backends.py for the others.
 
     BSM only depends on the dict to json mapping, not detailed content structure
     is used beyond that for validation. BSM is not BDM-aware.
@@ -24,10 +24,10 @@
 # ---------------------------------------------------------------------------- +
 #region    Imports
 # python standard library modules and packages
-import logging, os, time
+import logging, os, time, hashlib, threading, itertools
 from pathlib import Path
 from urllib.parse import urlparse, unquote
-from typing import Dict, List, Any
+from typing import Dict, List, Tuple, Any, Callable
 
 # third-party modules and packages
 import p3_utils as p3u, pyjson5, p3logging as p3l
@@ -37,7 +37,23 @@ from openpyxl import Workbook, load_workbook
 from budman_namespace import (
     BSM_PERSISTED_PROPERTIES, BDM_STORE, VALID_BSM_BDM_STORE_FILETYPES,
     VALID_WB_FILETYPES, BSM_DATA_COLLECTION_CSV_STORE_FILETYPES,
-    WB_FILETYPE_CSV, WB_FILETYPE_XLSX)
+    WB_FILETYPE_CSV, WB_FILETYPE_XLSX, WB_FILETYPE_WORKING,
+    WB_SUMMARY_FILE_SUFFIX)
+from budget_storage_model.workbook_values import WorkbookValues
+from budget_storage_model.bdm_store_journal import (
+    bsm_BDM_STORE_journal_load, bsm_BDM_STORE_journal_save)
+from budget_storage_model.bdm_store_snapshot import (
+    bsm_BDM_STORE_snapshot_load, bsm_BDM_STORE_snapshot_save)
+from budget_storage_model.columnar_sidecar import (
+    bsm_WORKBOOK_sidecar_load, bsm_WORKBOOK_sidecar_save)
+from budget_storage_model.working_data import (
+    bsm_WORKING_file_write, bsm_WORKING_file_load,
+    bsm_WORKING_file_load_values)
+from budget_storage_model.folder_manifest import bsm_WB_FILE_manifest_update
+from budget_storage_model.xlsx_stream_reader import bsm_XLSX_file_load_values
+from budget_storage_model.storage_backends import (
+    StorageBackend, bsm_STORAGE_backend, bsm_STORAGE_backend_register)
+from budget_storage_model.sqlite_backend import SqliteStorageBackend
 from budget_storage_model.csv_data_collection import (
     csv_DATA_COLLECTION_url_get, csv_DATA_COLLECTION_url_put,
     csv_DATA_COLLECTION_file_load, csv_DATA_COLLECTION_file_save
@@ -46,13 +62,23 @@ from budget_storage_model.csv_data_collection import (
 # ---------------------------------------------------------------------------- +
 #region    Globals and Constants
 logger = logging.getLogger(__name__)
+BSM_HASH_BLOCK_SIZE = 1024 * 1024  # read size for file content hashing
+BSM_SAVE_RETRIES = 5  # retries of a blocked workbook file replace
+BSM_SAVE_RETRY_DELAY = 0.2  # seconds, doubled on each retry
+_wb_save_tmp_ids = itertools.count()  # unique workbook save temp file names
+# A folder changed this recently may change again within its mtime tick.
+BSM_FOLDER_SCAN_RACY_SECS = 2.0
+# Resolved folder str -> (folder st_mtime_ns, {filetype: [Path, ...]})
+_folder_scan_cache : Dict[str, Tuple[int, Dict[str, List[Path]]]] = {}
+_folder_scan_lock = threading.Lock()
 # ---------------------------------------------------------------------------- +
 #endregion Globals and Constants
 # ---------------------------------------------------------------------------- +
 #region    BDM_STORE methods
 # ---------------------------------------------------------------------------- +
 #region    bsm_BDM_STORE_url_get() function
-def bsm_BDM_STORE_url_get(bdms_url : str = None) -> BDM_STORE:
+def bsm_BDM_STORE_url_get(bdms_url : str = None,
+                          rehydrate : Callable = None) -> BDM_STORE:
     """BSM: Load a BDM_STORE object from a URL.
     
     Entry point for a BDM_STORE file load operation. Parse the URL and decide
@@ -61,25 +87,16 @@ def bsm_BDM_STORE_url_get(bdms_url : str = None) -> BDM_STORE:
 
     Args:
         bdms_url (str): The URL to the BDM_STORE object to load.
+        rehydrate (Callable): Optional function applied to the decoded
+            store, see bsm_BDM_STORE_file_load().
     """
     try:
         # bdms_url must be a non-empty string.
         p3u.is_non_empty_str("bdms_url", bdms_url, raise_error=True)
-        # bdms_url must be a valid URL.
-        parsed_url = urlparse(bdms_url)
-        if not parsed_url.scheme:
-            raise ValueError(f"Invalid URL has no scheme: {bdms_url}")
-        if not parsed_url.path:
-            raise ValueError(f"Invalid URL has no path: {bdms_url}")
-        if parsed_url.scheme not in ["file", "http", "https"]:
-            raise ValueError(f"store_url scheme is not supported: {parsed_url.scheme}")
-        # If the scheme is file, load the BDM_STORE from a file.
-        if parsed_url.scheme == "file":
-            # Decode the URL and convert it to a Path object.
-            bdms_path = Path.from_uri(bdms_url)
-            logger.debug(f"Loading BDM_STORE from path: '{bdms_path}' URL: '{bdms_url}'")
-            return bsm_BDM_STORE_file_load(bdms_path)
-        raise ValueError(f"Unsupported URL scheme: {parsed_url.scheme}")
+        # The URL scheme selects the storage backend.
+        backend = bsm_STORAGE_backend(bdms_url)
+        logger.debug(f"Loading BDM_STORE from URL: '{bdms_url}'")
+        return backend.BDM_STORE_get(bdms_url, rehydrate)
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise
@@ -99,32 +116,50 @@ def bsm_BDM_STORE_url_put(bdm_store:BDM_STORE, bdms_url : str = None) -> Dict:
         p3u.is_obj_of_type("bdm_store", bdm_store, dict, raise_error=True)
         # store_url must be a non-empty string.
         p3u.is_non_empty_str("store_url", bdms_url, raise_error=True)
-        # store_url must be a valid URL.
-        try:
-            parsed_url = urlparse(bdms_url)
-        except Exception as e:
-            logger.error(p3u.exc_err_msg(e))
-            raise ValueError(f"Invalid URL: {bdms_url}")
-        if not parsed_url.scheme:
-            raise ValueError(f"store_url has no scheme: {bdms_url}")
-        if parsed_url.scheme not in ["file", "http", "https"]:
-            raise ValueError(f"store_url scheme is not supported: {parsed_url.scheme}")
-        # If the scheme is file, load the BDM_STORE from a file.
-        if parsed_url.scheme == "file":
-            # Decode the URL into a Path object.
-            bdms_path = Path.from_uri(bdms_url)
-            logger.debug(f"Putting BDM_STORE to url:'{bdms_path}' "
-                        f"url:'{bdms_url}'")
-            return bsm_BDM_STORE_file_save(bdm_store, bdms_path)
-        raise ValueError(f"Unsupported store_url scheme: {parsed_url.scheme}")
+        # The URL scheme selects the storage backend.
+        backend = bsm_STORAGE_backend(bdms_url)
+        logger.debug(f"Putting BDM_STORE to url:'{bdms_url}'")
+        return backend.BDM_STORE_put(bdm_store, bdms_url)
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise
 #endregion bsm_BDM_STORE_url_put() function
 # ---------------------------------------------------------------------------- +
+#region    bsm_BDM_STORE_url_property_get() function
+def bsm_BDM_STORE_url_property_get(bdms_url : str, name : str) -> Any:
+    """BSM: Get one property of the BDM_STORE at the url, None if absent.
+
+    A backend with partial reads, e.g., sqlite://, reads only that property.
+
+    Args:
+        bdms_url (str): The URL to the BDM_STORE object.
+        name (str): The BDM_STORE property name, e.g., BDM_OPTIONS.
+    """
+    try:
+        p3u.is_non_empty_str("bdms_url", bdms_url, raise_error=True)
+        p3u.is_non_empty_str("name", name, raise_error=True)
+        return bsm_STORAGE_backend(bdms_url).BDM_STORE_property_get(bdms_url, name)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_BDM_STORE_url_property_get() function
+# ---------------------------------------------------------------------------- +
 #region    bsm_BDM_STORE_file_load() function
-def bsm_BDM_STORE_file_load(bdms_path : Path = None) -> BDM_STORE:
-    """Load a BDM_STORE file from the given Path value."""
+def bsm_BDM_STORE_file_load(bdms_path : Path = None,
+                            rehydrate : Callable = None) -> BDM_STORE:
+    """Load a BDM_STORE file from the given Path value.
+
+    The changes saved in the BDM_STORE journal file are replayed onto the
+    content of the snapshot file, see bdm_store_journal.py. The loaded store
+    is kept in a binary snapshot, used by the next load while the files are
+    unchanged, see bdm_store_snapshot.py.
+
+    Args:
+        bdms_path (Path): The path of the .jsonc snapshot file.
+        rehydrate (Callable): Optional function applied to the decoded store
+            in place, e.g., to make BDMWorkbook objects. Its result is in
+            the binary snapshot, so it is not called for a snapshot load.
+    """
     try:
         if bdms_path is None or not isinstance(bdms_path, Path):
             raise ValueError("bdms_path is None or not a Path object.")
@@ -145,11 +180,18 @@ def bsm_BDM_STORE_file_load(bdms_path : Path = None) -> BDM_STORE:
             m = f"file is empty: {bdms_path}"
             logger.error(m)
             raise ValueError(m)
+        bdm_store_content = bsm_BDM_STORE_snapshot_load(bdms_path, rehydrate)
+        if bdm_store_content is not None:
+            return bdm_store_content
         with open(bdms_path, "r") as f:
             bdms_json : str = f.read()
             bdms_json_size = len(bdms_json)
             bdm_store_content = json5.decode(bdms_json,10)
         logger.info(f"BizEVENT: Loaded '{bdms_json_size}' chars of json content from file: '{bdms_path}'")
+        bsm_BDM_STORE_journal_load(bdm_store_content, bdms_path)
+        if rehydrate is not None:
+            rehydrate(bdm_store_content)
+        bsm_BDM_STORE_snapshot_save(bdm_store_content, bdms_path, rehydrate)
         return bdm_store_content
     except json5.Json5DecoderException as e:
         logger.error(p3u.exc_err_msg(e))
@@ -160,8 +202,19 @@ def bsm_BDM_STORE_file_load(bdms_path : Path = None) -> BDM_STORE:
 #endregion bsm_BDM_STORE_file_load() function
 # ---------------------------------------------------------------------------- +
 #region    bsm_BDM_STORE_file_save() function
-def bsm_BDM_STORE_file_save(bdm_store:BDM_STORE, bdms_path:Path) -> None:
-    """Save the Budget Manager Store to a .jsonc file."""
+def bsm_BDM_STORE_file_save(bdm_store:BDM_STORE, bdms_path:Path,
+                            compact:bool=False) -> None:
+    """Save the Budget Manager Store to a .jsonc file.
+
+    Only the properties changed since the store was last loaded or saved
+    are appended to the BDM_STORE journal file. The .jsonc snapshot is
+    rewritten when the journal is compacted, see bdm_store_journal.py.
+
+    Args:
+        bdm_store (BDM_STORE): The BDM_STORE to save.
+        bdms_path (Path): The path of the .jsonc snapshot file.
+        compact (bool): Write the full snapshot and remove the journal.
+    """
     try:
         # bdm_store must be a dictionary.
         p3u.is_obj_of_type("bdm_store", bdm_store, dict, raise_error=True)
@@ -170,10 +223,12 @@ def bsm_BDM_STORE_file_save(bdm_store:BDM_STORE, bdms_path:Path) -> None:
         logger.debug(f"Saving BDM_STORE to file: '{bdms_path}'")
         # Only persist the properties in BDM_PERSISTED_PROPERTIES.
         filtered_bsm = {k: v for k, v in bdm_store.items() if k in BSM_PERSISTED_PROPERTIES}
-        jsonc_content = json5.encode(filtered_bsm)
-        with open(bdms_path, "w") as f:
-            f.write(jsonc_content)
-        logger.info(f"BizEVENT: Saved BDM_STORE to file: {bdms_path}")
+        count = bsm_BDM_STORE_journal_save(filtered_bsm, bdms_path, compact)
+        if count < 0:
+            logger.info(f"BizEVENT: Saved BDM_STORE to file: {bdms_path}")
+        else:
+            logger.info(f"BizEVENT: Saved {count} BDM_STORE changes to "
+                        f"journal of file: {bdms_path}")
         return None
     except json5.Json5UnstringifiableType as e:
         logger.error(p3u.exc_err_msg(e))
@@ -233,35 +288,22 @@ def bsm_BDM_STORE_file_abs_path(filename : str, filetype : str, folder : str  )
 #region    WORKBOOK methods
 # ---------------------------------------------------------------------------- +
 #region    bsm_WORKBOOK_url_get(wb_url : str = None) -> Any
-def bsm_WORKBOOK_url_get(wb_url : str = None) -> Any:
+def bsm_WORKBOOK_url_get(wb_url : str = None, read_only : bool = False) -> Any:
     """Load a workbook from a URL.
 
     Args:
         wb_url (str): The URL to the workbook to load.
+        read_only (bool): For an excel workbook, return a WorkbookValues
+            view of the cell values instead of an editable Workbook, 
+            much faster to load. Use it when the workbook is not changed.
     
     Returns:
         Any: The loaded workbook object.
     """
     try:
         p3u.is_non_empty_str("wb_url", wb_url, raise_error=True)
-        wb_abs_path = bsm_WB_URL_verify_file_scheme(wb_url, test=True)
-        wb_filetype = wb_abs_path.suffix.lower()
-        # Dispatch based on filetype.
-        if wb_filetype not in [WB_FILETYPE_XLSX, WB_FILETYPE_CSV]:
-            # If the filetype is not supported, raise an error.
-            m = f"Unsupported workbook filetype: {wb_filetype} in file: {wb_abs_path}"
-            logger.error(m)
-            raise ValueError(m)
-        if wb_filetype == WB_FILETYPE_CSV:
-            # If the filetype is CSV, load it as a CSV file.
-            logger.debug(f"Loading workbook as CSV from file: '{wb_abs_path}'")
-            csv_data_collection = csv_DATA_COLLECTION_file_load(wb_abs_path)
-            return csv_data_collection
-        if wb_filetype == WB_FILETYPE_XLSX:
-            # If the filetype is XLSX, load it as an Excel workbook.
-            logger.debug(f"Loading workbook as XLSX from file: '{wb_abs_path}'")
-            wb_content = bsm_WORKBOOK_file_load(wb_abs_path)
-            return wb_content
+        # The URL scheme selects the storage backend.
+        return bsm_STORAGE_backend(wb_url).WORKBOOK_get(wb_url, read_only)
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise
@@ -280,35 +322,48 @@ def bsm_WORKBOOK_url_put(wb:Any, wb_url : str = None) -> Any:
     """
     try:
         p3u.is_non_empty_str("wb_url", wb_url, raise_error=True)
-        wb_abs_path = bsm_WB_URL_verify_file_scheme(wb_url, test=True)
-        wb_filetype = wb_abs_path.suffix.lower()
-        # Dispatch based on filetype.
-        if wb_filetype not in [WB_FILETYPE_XLSX, WB_FILETYPE_CSV]:
-            # If the filetype is not supported, raise an error.
-            m = f"Unsupported workbook filetype: {wb_filetype} in file: {wb_abs_path}"
-            logger.error(m)
-            raise ValueError(m)
-        if wb_filetype == WB_FILETYPE_CSV:
-            # If the filetype is CSV, load it as a CSV file.
-            logger.info(f"Loading workbook as CSV from file: '{wb_abs_path}'")
-            csv_data_collection = csv_DATA_COLLECTION_url_put(wb, wb_url)
-            return csv_data_collection
-        if wb_filetype == WB_FILETYPE_XLSX:
-            # If the filetype is XLSX, load it as an Excel workbook.
-            logger.info(f"Loading workbook as XLSX from file: '{wb_abs_path}'")
-            wb_content = bsm_WORKBOOK_file_save(wb,wb_abs_path)
-            return wb_content
+        # The URL scheme selects the storage backend.
+        return bsm_STORAGE_backend(wb_url).WORKBOOK_put(wb, wb_url)
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise
 #endregion bsm_WORKBOOK_url_put(wb_url : str = None) -> Any
 # ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_url_rows_get(wb_url, sheet_name, min_row, max_row) -> List
+def bsm_WORKBOOK_url_rows_get(wb_url : str, sheet_name : str,
+                              min_row : int = 1,
+                              max_row : int = None) -> List[Tuple[Any, ...]]:
+    """Get the cell values of a range of rows of a worksheet at a URL.
+
+    A backend with partial reads, e.g., sqlite://, reads only those rows.
+
+    Args:
+        wb_url (str): The URL to the workbook.
+        sheet_name (str): The worksheet title.
+        min_row (int): The first row, numbered from 1 as in openpyxl.
+        max_row (int): The last row, None for the last row of the sheet.
+
+    Returns:
+        List[Tuple[Any, ...]]: One tuple of cell values per row.
+    """
+    try:
+        p3u.is_non_empty_str("wb_url", wb_url, raise_error=True)
+        return bsm_STORAGE_backend(wb_url).WORKBOOK_rows_get(
+            wb_url, sheet_name, min_row, max_row)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKBOOK_url_rows_get(wb_url, sheet_name, min_row, max_row) -> List
+# ---------------------------------------------------------------------------- +
 #region    bsm_WORKBOOK_file_load(wb_abs_path : str = None) -> Any
 def bsm_WORKBOOK_file_load(wb_path:Path) -> Workbook:
     """Load a transaction file for a Financial Institution Workflow.
 
     Storage Model: This is a Model function, loading an excel workbook
-    file into memory.
+    file into memory. A WB_FILETYPE_WORKING file is loaded from its 
+    columns, see working_data.py. Use bsm_WORKBOOK_file_load_values() 
+    when the workbook is not changed, it reads the columnar sidecar of an
+    unchanged file instead of parsing it again.
 
     Args:
         wb_path (Path): The path of the workbook file to load.
@@ -317,8 +372,12 @@ def bsm_WORKBOOK_file_load(wb_path:Path) -> Workbook:
         Workbook: The loaded transaction workbook.
     """
     try:
+        wb_path = Path(wb_path)
         logger.debug(f"BSM: Loading workbook file: '{wb_path}'")
-        wb = load_workbook(filename=wb_path)
+        if wb_path.suffix.lower() == WB_FILETYPE_WORKING:
+            wb = bsm_WORKING_file_load(wb_path)
+        else:
+            wb = load_workbook(filename=wb_path)
         wb._source_filename = wb_path.stem
         return wb
     except Exception as e:
@@ -326,26 +385,102 @@ def bsm_WORKBOOK_file_load(wb_path:Path) -> Workbook:
         raise
 #endregion bsm_WORKBOOK_file_load(wb_abs_path : str = None) -> Any
 # ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_file_load_values(wb_path:Path) -> WorkbookValues
+def bsm_WORKBOOK_file_load_values(wb_path:Path,
+                                  use_sidecar:bool=True) -> WorkbookValues:
+    """Load the cell values of an excel workbook file, read-only.
+
+    Storage Model: The fast load path for inspection. The file is read
+    as with read_only=True, data_only=True, so styles are skipped and
+    formula cells hold their last calculated values, by the streaming
+    reader, see xlsx_stream_reader.py. The values of an unchanged file are
+    read from its columnar sidecar, and the sidecar is written after
+    parsing, under the file fingerprint taken before parsing, see
+    columnar_sidecar.py. A WB_FILETYPE_WORKING file is already columnar,
+    it has no sidecar.
+
+    Args:
+        wb_path (Path): The path of the workbook file to load.
+        use_sidecar (bool): Use the columnar sidecar cache, default True.
+
+    Returns:
+        WorkbookValues: A values-only view of the workbook's worksheets.
+    """
+    try:
+        st = p3u.start_timer()
+        wb_path = Path(wb_path)
+        if wb_path.suffix.lower() == WB_FILETYPE_WORKING:
+            return bsm_WORKING_file_load_values(wb_path)
+        if use_sidecar:
+            wb_values = bsm_WORKBOOK_sidecar_load(wb_path)
+            if wb_values is not None:
+                logger.debug(f"BSM: Loaded workbook values from sidecar: "
+                             f"'{wb_path}' {p3u.stop_timer(st)}")
+                return wb_values
+        # Fingerprint first, a file changed while parsing is then a stale sidecar.
+        fingerprint = bsm_file_fingerprint(wb_path) if use_sidecar else None
+        wb_values = bsm_XLSX_file_load_values(wb_path)
+        if use_sidecar:
+            bsm_WORKBOOK_sidecar_save(wb_path, fingerprint, wb_values)
+        logger.debug(f"BSM: Loaded workbook values: '{wb_path}' "
+                     f"{p3u.stop_timer(st)}")
+        return wb_values
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKBOOK_file_load_values(wb_path:Path) -> WorkbookValues
+# ---------------------------------------------------------------------------- +
 #region    bsm_WORKBOOK_file_save(wb:Workbook,wb_abs_path : str = None) -> Any
 def bsm_WORKBOOK_file_save(wb:Workbook,wb_path:Path) -> None:
     """Save a transaction file for a Financial Institution Workflow.
 
     Storage Model: This is a Model function, storing an excel workbook
-    file to storage.
+    file to storage. The workbook is written to a temp file in the same
+    folder, then replaces wb_path, so a failed save never leaves a 
+    partial file. A PermissionError, e.g., the file is open in Excel on 
+    Windows, is retried BSM_SAVE_RETRIES times with backoff. A
+    WB_FILETYPE_WORKING wb_path is written as columns, see working_data.py.
+    The entry of wb_path in its folder manifest is updated from wb, see
+    folder_manifest.py.
 
     Args:
         wb (Workbook): The workbook to save.
         wb_path (Path): The path of the workbook file to save.
 
     """
-    st = time.time()
+    st = p3u.start_timer()
+    wb_path = Path(wb_path)
+    # A unique temp file, saves of wb_path may run in several threads.
+    tmp_path = wb_path.with_name(f".{wb_path.name}.{os.getpid()}."
+                                 f"{threading.get_ident()}."
+                                 f"{next(_wb_save_tmp_ids)}.tmp")
     try:
-        # TODO: add logic to for workbook open in excel, work around.
         logger.info("Saving wb: ...")
-        wb.save(filename=wb_path)
-        logger.info(f"Saved wb to '{wb_path}'")
+        if wb_path.suffix.lower() == WB_FILETYPE_WORKING:
+            bsm_WORKING_file_write(wb, tmp_path)
+        else:
+            wb.save(filename=tmp_path)
+        for attempt in range(BSM_SAVE_RETRIES + 1):
+            try:
+                os.replace(tmp_path, wb_path)
+                break
+            except PermissionError as e:
+                if attempt == BSM_SAVE_RETRIES:
+                    raise
+                delay = BSM_SAVE_RETRY_DELAY * (2 ** attempt)
+                logger.warning(f"Save of '{wb_path}' is blocked, retry in "
+                               f"{delay:.2f}s: {p3u.exc_err_msg(e)}")
+                time.sleep(delay)
+        try:
+            bsm_WB_FILE_manifest_update(wb_path, wb)
+        except Exception as e:
+            # The save stands, the next folder refresh summarizes the file.
+            logger.warning(f"Manifest not updated for '{wb_path}': "
+                           f"{p3u.exc_err_msg(e)}")
+        logger.info(f"Saved wb to '{wb_path}' {p3u.stop_timer(st)}")
         return
     except Exception as e:
+        tmp_path.unlink(missing_ok=True)
         logger.error(p3u.exc_err_msg(e))
         raise    
 #endregion bsm_WORKBOOK_file_load(wb_abs_path : str = None) -> Any
@@ -404,14 +539,8 @@ def bsm_get_workbook_names2(abs_folder : Path) -> List[Path]:
     """Return list of workbook Paths from absolute folder path."""
     try:
         p3u.is_obj_of_type("wb_folder", abs_folder, Path, raise_error=True)
-        # Get a list of Path objects for all .xlsx files in the folder.
         wb_paths = []
-        for filetype in VALID_WB_FILETYPES:
-            my_glob = f"*{filetype}"
-            filetype_paths = list(abs_folder.glob(my_glob))
-            if not filetype_paths:
-                logger.debug(f"No '{filetype}' files found in folder: {abs_folder}")
-                continue
+        for filetype_paths in bsm_WB_FOLDER_scan(abs_folder).values():
             wb_paths.extend(filetype_paths)
         filtered_wb_paths = bsm_filter_workbook_names(wb_paths)
         return filtered_wb_paths
@@ -420,6 +549,60 @@ def bsm_get_workbook_names2(abs_folder : Path) -> List[Path]:
         raise
 #endregion bsm_get_workbook_names()
 # ---------------------------------------------------------------------------- +
+#region    bsm_WB_FOLDER_scan()
+def bsm_WB_FOLDER_scan(abs_folder : Path) -> Dict[str, List[Path]]:
+    """Return the workbook file Paths in a folder, by VALID_WB_FILETYPES.
+
+    One os.scandir() pass lists the folder, each file is classified by its
+    lower case suffix. The result is cached by the folder's mtime, which
+    changes when a file is added, removed or renamed in it, so an unchanged
+    folder is not listed again. A folder changed in the last
+    BSM_FOLDER_SCAN_RACY_SECS is not cached, a file added within the same
+    mtime tick would not change it.
+
+    Args:
+        abs_folder (Path): The absolute path of the folder to scan.
+
+    Returns:
+        Dict[str, List[Path]]: The Paths sorted by name for each filetype 
+        found, in VALID_WB_FILETYPES order. Empty for a missing folder.
+    """
+    try:
+        p3u.is_obj_of_type("wb_folder", abs_folder, Path, raise_error=True)
+        key = str(abs_folder)
+        try:
+            mtime_ns = os.stat(abs_folder).st_mtime_ns
+        except FileNotFoundError:
+            return {}  # As glob() of a missing folder, no workbooks.
+        with _folder_scan_lock:
+            cached = _folder_scan_cache.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return {ft: list(paths) for ft, paths in cached[1].items()}
+        found : Dict[str, List[Path]] = {}
+        with os.scandir(abs_folder) as entries:
+            for entry in entries:
+                filetype = os.path.splitext(entry.name)[1].lower()
+                if filetype in VALID_WB_FILETYPES and entry.is_file():
+                    found.setdefault(filetype, []).append(Path(entry.path))
+        result = {ft: sorted(found[ft]) for ft in VALID_WB_FILETYPES if ft in found}
+        with _folder_scan_lock:
+            if time.time_ns() - mtime_ns > BSM_FOLDER_SCAN_RACY_SECS * 1e9:
+                _folder_scan_cache[key] = (mtime_ns, result)
+            else:
+                _folder_scan_cache.pop(key, None)
+        logger.debug(f"Scanned folder: '{abs_folder}' found "
+                     f"{sum(len(p) for p in result.values())} workbook files")
+        return {ft: list(paths) for ft, paths in result.items()}
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+
+def bsm_WB_FOLDER_scan_cache_clear() -> None:
+    """Forget the cached workbook folder scans."""
+    with _folder_scan_lock:
+        _folder_scan_cache.clear()
+#endregion bsm_WB_FOLDER_scan()
+# ---------------------------------------------------------------------------- +
 #region    bsm_filter_workbook_names()
 def bsm_filter_workbook_names(wb_paths : List[Path]) -> List[Path]:
     """Filter out paths for invalid workbooks."""
@@ -428,7 +611,9 @@ def bsm_filter_workbook_names(wb_paths : List[Path]) -> List[Path]:
         if len(wb_paths) == 0:
             return []
         ret_list : List[Path] = []
-        ret_list = [f for f in wb_paths if not f.name.startswith("~$")]
+        # Skip excel lock files and workflow summary files.
+        ret_list = [f for f in wb_paths if not f.name.startswith("~$") and
+                    not f.name.endswith(WB_SUMMARY_FILE_SUFFIX)]
         return ret_list
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
@@ -484,5 +669,130 @@ def bsm_WORKBOOK_verify_file_path_for_load(file_path: Path) -> None:
         raise
 #endregion bsm_WORKBOOK_verify_file_path_for_load(url: str) function
 # ---------------------------------------------------------------------------- +
+#region    bsm_file_sha256(file_path: Path) function 
+def bsm_file_sha256(file_path: Path) -> str:
+    """Return the sha256 hex digest of the file content, read in blocks."""
+    try:
+        h = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(BSM_HASH_BLOCK_SIZE), b""):
+                h.update(block)
+        return h.hexdigest()
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_file_sha256(file_path: Path) function
+# ---------------------------------------------------------------------------- +
+#region    bsm_file_fingerprint(file_path: Path, content_hash:bool) function 
+def bsm_file_fingerprint(file_path: Path, content_hash:bool=True) -> Dict[str, Any]:
+    """Return a fingerprint of a file to detect changes to its content.
+
+    The fingerprint is a dict with keys 'path' (resolved str), 'size', 
+    'mtime_ns' and 'sha256'. The stat values are cheap to get, the sha256 
+    reads the whole file, so it is None when content_hash is False.
+    """
+    try:
+        p3u.is_obj_of_type("file_path", file_path, Path, raise_error=True)
+        st = file_path.stat()
+        return {
+            "path": str(file_path.resolve()),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": bsm_file_sha256(file_path) if content_hash else None
+        }
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_file_fingerprint(file_path: Path, content_hash:bool) function
+# ---------------------------------------------------------------------------- +
+#region    bsm_file_fingerprint_match(file_path: Path, fingerprint: Dict) function 
+def bsm_file_fingerprint_match(file_path: Path, fingerprint: Dict[str, Any]) -> bool:
+    """Return True if the file content still matches the fingerprint.
+
+    When size and mtime_ns are unchanged the file is taken as unchanged 
+    without reading it. When only the mtime_ns changed, e.g., the file was 
+    touched or re-synced, the content sha256 decides, and a match updates 
+    the fingerprint's mtime_ns in place.
+    """
+    try:
+        if fingerprint is None or not file_path.exists():
+            return False
+        st = file_path.stat()
+        if st.st_size != fingerprint.get("size"):
+            return False
+        if st.st_mtime_ns == fingerprint.get("mtime_ns"):
+            return True
+        if fingerprint.get("sha256") is None:
+            return False
+        if bsm_file_sha256(file_path) != fingerprint["sha256"]:
+            return False
+        fingerprint["mtime_ns"] = st.st_mtime_ns
+        return True
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_file_fingerprint_match(file_path: Path, fingerprint: Dict) function
+# ---------------------------------------------------------------------------- +
 #endregion Common methods
-# ---------------------------------------------------------------------------- +
\ No newline at end of file
+# ---------------------------------------------------------------------------- +
+#region    FileStorageBackend class
+class FileStorageBackend(StorageBackend):
+    """Store BDM_STOREs and workbooks in local files, for file:// URLs."""
+    scheme = "file"
+
+    def BDM_STORE_get(self, bdms_url : str,
+                      rehydrate : Callable = None) -> BDM_STORE:
+        parsed_url = urlparse(bdms_url)
+        if not parsed_url.path:
+            raise ValueError(f"Invalid URL has no path: {bdms_url}")
+        # Decode the URL and convert it to a Path object.
+        bdms_path = Path.from_uri(bdms_url)
+        return bsm_BDM_STORE_file_load(bdms_path, rehydrate)
+
+    def BDM_STORE_put(self, bdm_store : BDM_STORE, bdms_url : str) -> None:
+        # Decode the URL into a Path object.
+        bdms_path = Path.from_uri(bdms_url)
+        return bsm_BDM_STORE_file_save(bdm_store, bdms_path)
+
+    def WORKBOOK_get(self, wb_url : str, read_only : bool = False) -> Any:
+        wb_abs_path = bsm_WB_URL_verify_file_scheme(wb_url, test=True)
+        wb_filetype = wb_abs_path.suffix.lower()
+        # Dispatch based on filetype.
+        if wb_filetype not in [WB_FILETYPE_XLSX, WB_FILETYPE_CSV,
+                               WB_FILETYPE_WORKING]:
+            # If the filetype is not supported, raise an error.
+            m = f"Unsupported workbook filetype: {wb_filetype} in file: {wb_abs_path}"
+            logger.error(m)
+            raise ValueError(m)
+        if wb_filetype == WB_FILETYPE_CSV:
+            # If the filetype is CSV, load it as a CSV file.
+            logger.debug(f"Loading workbook as CSV from file: '{wb_abs_path}'")
+            csv_data_collection = csv_DATA_COLLECTION_file_load(wb_abs_path)
+            return csv_data_collection
+        # If the filetype is XLSX or WORKING, load it as an Excel workbook.
+        logger.debug(f"Loading workbook as XLSX from file: '{wb_abs_path}'")
+        if read_only:
+            return bsm_WORKBOOK_file_load_values(wb_abs_path)
+        return bsm_WORKBOOK_file_load(wb_abs_path)
+
+    def WORKBOOK_put(self, wb : Any, wb_url : str) -> Any:
+        wb_abs_path = bsm_WB_URL_verify_file_scheme(wb_url, test=True)
+        wb_filetype = wb_abs_path.suffix.lower()
+        # Dispatch based on filetype.
+        if wb_filetype not in [WB_FILETYPE_XLSX, WB_FILETYPE_CSV,
+                               WB_FILETYPE_WORKING]:
+            # If the filetype is not supported, raise an error.
+            m = f"Unsupported workbook filetype: {wb_filetype} in file: {wb_abs_path}"
+            logger.error(m)
+            raise ValueError(m)
+        if wb_filetype == WB_FILETYPE_CSV:
+            # If the filetype is CSV, save it as a CSV file.
+            logger.info(f"Saving workbook as CSV to file: '{wb_abs_path}'")
+            return csv_DATA_COLLECTION_url_put(wb, wb_url)
+        # If the filetype is XLSX or WORKING, save it as an Excel workbook.
+        logger.info(f"Saving workbook as XLSX to file: '{wb_abs_path}'")
+        return bsm_WORKBOOK_file_save(wb, wb_abs_path)
+
+bsm_STORAGE_backend_register(FileStorageBackend.scheme, FileStorageBackend())
+#endregion FileStorageBackend class
+# ---------------------------------------------------------------------------- +
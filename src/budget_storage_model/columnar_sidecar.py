@@ -0,0 +1,376 @@
+# ---------------------------------------------------------------------------- +
+#region    columnar_sidecar.py module
+""" Columnar sidecar files of parsed workbook values for the BSM.
+
+    Parsing an xlsx file is the slowest part of a load, and the input files
+    in the IF and CF workflow folders rarely change after download. The
+    first values-only load of a workbook file writes its WorkbookValues to
+    a columnar sidecar, a NumPy .npz file in a hidden BSM_SIDECAR_FOLDER
+    next to the workbook. Later values-only loads of the unchanged file
+    read the sidecar instead of parsing the xlsx again.
+
+    Sidecars are named by the sha256 of the source file content. An index
+    json file in the sidecar folder maps each source file to its
+    fingerprint, see bsm_file_fingerprint(), so a lookup does not hash the
+    file unless its mtime changed. A changed source file is a miss, and
+    the stale sidecar is replaced by the next values-only load.
+
+    Each worksheet column is stored as one typed array: float64, int64,
+    bool, datetime64, timedelta64 or unicode, plus a mask of the empty
+    cells. Whole and fractional numbers share a float64 column with an int
+    mask, datetime.time values are stored as iso text. A column with other
+    mixed cell types is stored as unicode text with a type tag per cell.
+    Arrays are loaded with allow_pickle=False. A workbook with cell values
+    of other types gets no sidecar.
+
+    Depends on numpy. No dependencies to other application layers.
+"""
+#endregion columnar_sidecar.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, io, json, os, threading, datetime
+from pathlib import Path
+from typing import Dict, List, Tuple, Any
+
+# third-party modules and packages
+import numpy as np
+import p3_utils as p3u
+
+# local modules and packages
+from budget_storage_model.workbook_values import WorkbookValues, WorksheetValues
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_SIDECAR_FOLDER = ".budman_cache"
+BSM_SIDECAR_INDEX = "sidecar_index.json"
+BSM_SIDECAR_FILETYPE = ".npz"
+BSM_SIDECAR_VERSION = 1
+# Column kinds, and the cell type tags of a mixed column.
+KIND_NONE = "n"
+KIND_BOOL = "b"
+KIND_INT = "i"
+KIND_FLOAT = "f"
+KIND_STR = "s"
+KIND_DATETIME = "d"
+KIND_DATE = "a"
+KIND_TIME = "t"
+KIND_TIMEDELTA = "e"
+KIND_NUMBER = "x"
+KIND_MIXED = "m"
+_index_lock = threading.Lock()
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    Column encoding
+def _cell_kind(value : Any) -> str:
+    """Return the kind tag of a cell value, raise TypeError if unsupported."""
+    if value is None:
+        return KIND_NONE
+    if isinstance(value, bool):
+        return KIND_BOOL
+    if isinstance(value, int):
+        return KIND_INT
+    if isinstance(value, float):
+        return KIND_FLOAT
+    if isinstance(value, str):
+        return KIND_STR
+    if isinstance(value, datetime.datetime):
+        return KIND_DATETIME
+    if isinstance(value, datetime.date):
+        return KIND_DATE
+    if isinstance(value, datetime.time):
+        return KIND_TIME
+    if isinstance(value, datetime.timedelta):
+        return KIND_TIMEDELTA
+    raise TypeError(f"No sidecar encoding for cell type {type(value).__name__}")
+
+def _encode_column(values : List[Any]) -> Tuple[str, Dict[str, np.ndarray]]:
+    """Encode one column of cell values as typed arrays, return (kind, arrays)."""
+    kinds = {_cell_kind(v) for v in values}
+    kinds.discard(KIND_NONE)
+    mask = np.array([v is None for v in values], dtype=bool)
+    if len(kinds) == 0:
+        return KIND_NONE, {}
+    if kinds == {KIND_INT, KIND_FLOAT} and all(
+        abs(v) <= 2**53 for v in values if type(v) is int):
+        # Excel numbers load as int when whole, else float, e.g., Amount.
+        arr = np.array([np.nan if v is None else v for v in values],
+                       dtype=np.float64)
+        is_int = np.array([type(v) is int for v in values], dtype=bool)
+        return KIND_NUMBER, {"v": arr, "m": mask, "k": is_int}
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        if kind == KIND_STR:
+            arr = np.array(["" if v is None else v for v in values], dtype=str)
+        elif kind == KIND_DATETIME:
+            arr = np.array([np.datetime64("NaT") if v is None else
+                            np.datetime64(v, "us") for v in values],
+                           dtype="datetime64[us]")
+        elif kind == KIND_DATE:
+            arr = np.array([np.datetime64("NaT") if v is None else
+                            np.datetime64(v, "D") for v in values],
+                           dtype="datetime64[D]")
+        elif kind == KIND_TIME:
+            arr = np.array(["" if v is None else v.isoformat() for v in values],
+                           dtype=str)
+        elif kind == KIND_TIMEDELTA:
+            arr = np.array([np.timedelta64("NaT") if v is None else
+                            np.timedelta64(v, "us") for v in values],
+                           dtype="timedelta64[us]")
+        elif kind == KIND_FLOAT:
+            arr = np.array([np.nan if v is None else v for v in values],
+                           dtype=np.float64)
+        elif kind == KIND_INT:
+            arr = np.array([0 if v is None else v for v in values], dtype=np.int64)
+        else:
+            arr = np.array([False if v is None else v for v in values], dtype=bool)
+        return kind, {"v": arr, "m": mask}
+    # Mixed cell types, a tag and a text form per cell.
+    tags, text = [], []
+    for v in values:
+        tag = _cell_kind(v)
+        tags.append(tag)
+        if tag in (KIND_DATETIME, KIND_DATE, KIND_TIME):
+            text.append(v.isoformat())
+        elif tag == KIND_TIMEDELTA:
+            text.append(str(v // datetime.timedelta(microseconds=1)))
+        elif tag == KIND_FLOAT:
+            text.append(repr(v))
+        elif tag == KIND_NONE:
+            text.append("")
+        else:
+            text.append(str(int(v)) if tag == KIND_BOOL else str(v))
+    return KIND_MIXED, {"v": np.array(text, dtype=str),
+                        "t": np.array(tags, dtype=str)}
+
+def _decode_text(tag : str, text : str) -> Any:
+    """Decode one cell of a mixed column."""
+    if tag == KIND_NONE:
+        return None
+    if tag == KIND_STR:
+        return text
+    if tag == KIND_INT:
+        return int(text)
+    if tag == KIND_FLOAT:
+        return float(text)
+    if tag == KIND_BOOL:
+        return text == "1"
+    if tag == KIND_DATE:
+        return datetime.date.fromisoformat(text)
+    if tag == KIND_TIME:
+        return datetime.time.fromisoformat(text)
+    if tag == KIND_TIMEDELTA:
+        return datetime.timedelta(microseconds=int(text))
+    return datetime.datetime.fromisoformat(text)
+
+def _decode_column(kind : str, arrays : Dict[str, np.ndarray],
+                   n_rows : int) -> List[Any]:
+    """Decode a column's typed arrays back to a list of cell values."""
+    if kind == KIND_NONE:
+        return [None] * n_rows
+    if kind == KIND_MIXED:
+        return [_decode_text(t, v) for t, v in
+                zip(arrays["t"].tolist(), arrays["v"].tolist())]
+    values = arrays["v"].tolist()
+    if kind == KIND_TIME:
+        values = [datetime.time.fromisoformat(v) if v else None
+                  for v in values]
+    if kind == KIND_NUMBER:
+        for i in np.flatnonzero(arrays["k"]).tolist():
+            values[i] = int(values[i])
+    mask = arrays["m"]
+    if mask.any():
+        for i in np.flatnonzero(mask).tolist():
+            values[i] = None
+    return values
+#endregion Column encoding
+# ---------------------------------------------------------------------------- +
+#region    Sidecar index
+def _sidecar_folder(wb_path : Path) -> Path:
+    return wb_path.resolve().parent / BSM_SIDECAR_FOLDER
+
+def _index_load(folder : Path) -> Dict[str, Dict[str, Any]]:
+    """Return the sidecar index of a folder, empty if absent or unreadable."""
+    index_path = folder / BSM_SIDECAR_INDEX
+    if not index_path.exists():
+        return {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BSM_SIDECAR_VERSION:
+            return {}
+        return data.get("entries", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable sidecar index '{index_path}': "
+                       f"{p3u.exc_err_msg(e)}")
+        return {}
+
+def _index_save(folder : Path, entries : Dict[str, Dict[str, Any]]) -> None:
+    """Write the sidecar index of a folder, replacing it atomically."""
+    index_path = folder / BSM_SIDECAR_INDEX
+    tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": BSM_SIDECAR_VERSION, "entries": entries}, f, indent=1)
+    os.replace(tmp_path, index_path)
+#endregion Sidecar index
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_values_pack() function
+def bsm_WORKBOOK_values_pack(wb_values : WorkbookValues) -> bytes:
+    """Encode WorkbookValues as a compact columnar buffer, the sidecar format.
+
+    The buffer is a NumPy .npz archive of the typed column arrays and a
+    json meta array, so it is a fraction of the size of the pickled values
+    and is decoded with allow_pickle=False.
+
+    Raises:
+        TypeError: A cell value type has no column encoding.
+    """
+    arrays : Dict[str, np.ndarray] = {}
+    sheets = []
+    for si, ws in enumerate(wb_values.worksheets):
+        width = ws.max_column
+        kinds = []
+        for ci in range(width):
+            col = [r[ci] if ci < len(r) else None for r in ws.rows]
+            kind, col_arrays = _encode_column(col)
+            kinds.append(kind)
+            for k, a in col_arrays.items():
+                arrays[f"s{si}_c{ci}_{k}"] = a
+        sheets.append({"title": ws.title, "rows": ws.max_row, "kinds": kinds})
+    meta = {"sheets": sheets, "active": wb_values.active.title
+            if wb_values.active is not None else None}
+    arrays["meta"] = np.array(json.dumps(meta))
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+#endregion bsm_WORKBOOK_values_pack() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_values_unpack() function
+def bsm_WORKBOOK_values_unpack(data : bytes, wb_path : Path) -> WorkbookValues:
+    """Decode a buffer from bsm_WORKBOOK_values_pack() to WorkbookValues.
+
+    Args:
+        data (bytes): The packed buffer.
+        wb_path (Path): The path of the source workbook file.
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        meta = json.loads(str(npz["meta"]))
+        worksheets = []
+        for si, sheet in enumerate(meta["sheets"]):
+            n_rows = sheet["rows"]
+            cols = []
+            for ci, kind in enumerate(sheet["kinds"]):
+                pfx = f"s{si}_c{ci}_"
+                arrays = {k[len(pfx):]: npz[k] for k in npz.files
+                          if k.startswith(pfx)}
+                cols.append(_decode_column(kind, arrays, n_rows))
+            rows = list(zip(*cols)) if cols else [()] * n_rows
+            worksheets.append(WorksheetValues(sheet["title"], rows))
+    return WorkbookValues(wb_path, worksheets, meta["active"])
+#endregion bsm_WORKBOOK_values_unpack() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_sidecar_write() function
+def bsm_WORKBOOK_sidecar_write(wb_path : Path, fingerprint : Dict[str, Any],
+                               data : bytes) -> Path:
+    """Write a packed buffer as the sidecar of wb_path, return its path.
+
+    Args:
+        wb_path (Path): The path of the source workbook file.
+        fingerprint (Dict[str, Any]): The bsm_file_fingerprint() of wb_path
+            taken before its values were parsed.
+        data (bytes): The values of wb_path, see bsm_WORKBOOK_values_pack().
+    """
+    folder = _sidecar_folder(wb_path)
+    folder.mkdir(exist_ok=True)
+    sc_path = folder / f"{fingerprint['sha256']}{BSM_SIDECAR_FILETYPE}"
+    tmp_path = sc_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, sc_path)
+    with _index_lock:
+        entries = _index_load(folder)
+        old = entries.get(wb_path.name)
+        entries[wb_path.name] = fingerprint
+        _index_save(folder, entries)
+        # Remove the replaced sidecar unless another file shares it.
+        if old is not None and old.get("sha256") != fingerprint["sha256"]:
+            if all(e.get("sha256") != old.get("sha256") for e in entries.values()):
+                old_path = folder / f"{old.get('sha256')}{BSM_SIDECAR_FILETYPE}"
+                old_path.unlink(missing_ok=True)
+    return sc_path
+#endregion bsm_WORKBOOK_sidecar_write() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_sidecar_load() function
+def bsm_WORKBOOK_sidecar_load(wb_path : Path) -> WorkbookValues:
+    """Return the WorkbookValues from the sidecar of an unchanged file, else None.
+
+    Args:
+        wb_path (Path): The path of the source workbook file.
+    """
+    # Import here, budget_storage_model imports this module.
+    from budget_storage_model.budget_storage_model import bsm_file_fingerprint_match
+    try:
+        folder = _sidecar_folder(wb_path)
+        if not folder.exists():
+            return None
+        with _index_lock:
+            entries = _index_load(folder)
+        fingerprint = entries.get(wb_path.name)
+        if fingerprint is None:
+            return None
+        mtime_ns = fingerprint.get("mtime_ns")
+        if not bsm_file_fingerprint_match(wb_path, fingerprint):
+            logger.debug(f"BSM: Stale sidecar for '{wb_path}'")
+            return None
+        sc_path = folder / f"{fingerprint['sha256']}{BSM_SIDECAR_FILETYPE}"
+        if not sc_path.exists():
+            return None
+        with open(sc_path, "rb") as f:
+            wb_values = bsm_WORKBOOK_values_unpack(f.read(), wb_path)
+        if fingerprint.get("mtime_ns") != mtime_ns:
+            # The file was touched, content unchanged, keep the new mtime_ns.
+            with _index_lock:
+                entries = _index_load(folder)
+                entries[wb_path.name] = fingerprint
+                _index_save(folder, entries)
+        return wb_values
+    except Exception as e:
+        # A bad sidecar is only a cache miss.
+        logger.warning(f"BSM: Ignoring sidecar for '{wb_path}': "
+                       f"{p3u.exc_err_msg(e)}")
+        return None
+#endregion bsm_WORKBOOK_sidecar_load() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOK_sidecar_save() function
+def bsm_WORKBOOK_sidecar_save(wb_path : Path, fingerprint : Dict[str, Any],
+                              wb_values : WorkbookValues) -> bool:
+    """Write the columnar sidecar of a workbook file's values.
+
+    Args:
+        wb_path (Path): The path of the source workbook file.
+        fingerprint (Dict[str, Any]): The bsm_file_fingerprint() of wb_path
+            taken before wb_values were parsed, so a file changed while
+            parsing leaves a stale sidecar, not a wrong one.
+        wb_values (WorkbookValues): The values parsed from wb_path.
+
+    Returns:
+        bool: True if the sidecar was written, False if the values have
+        no sidecar encoding or the write failed.
+    """
+    try:
+        st = p3u.start_timer()
+        sc_path = bsm_WORKBOOK_sidecar_write(
+            wb_path, fingerprint, bsm_WORKBOOK_values_pack(wb_values))
+        logger.debug(f"BSM: Wrote sidecar '{sc_path.name}' for '{wb_path}' "
+                     f"{p3u.stop_timer(st)}")
+        return True
+    except (TypeError, OverflowError) as e:
+        logger.debug(f"BSM: No sidecar for '{wb_path}': {p3u.exc_err_msg(e)}")
+        return False
+    except Exception as e:
+        logger.warning(f"BSM: Failed to write sidecar for '{wb_path}': "
+                       f"{p3u.exc_err_msg(e)}")
+        return False
+#endregion bsm_WORKBOOK_sidecar_save() function
+# ---------------------------------------------------------------------------- +
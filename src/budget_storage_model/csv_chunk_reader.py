@@ -0,0 +1,151 @@
+# ---------------------------------------------------------------------------- +
+#region    csv_chunk_reader.py module
+""" Memory-mapped, chunked reads of very large csv files for the BSM.
+
+    A multi-year csv export can be hundreds of MB. The file is memory-mapped
+    and split into chunks of about chunk_bytes at record boundaries, a
+    newline outside of quotes. A chunk is a (start, end) byte span, so it is
+    cheap to send to a worker process, which parses only its own span.
+    Only one chunk at a time is decoded into Python strings, so memory is
+    bounded by the chunk size, not the file size.
+
+    The header row must not contain quoted newlines.
+
+    No dependencies to other application layers.
+"""
+#endregion csv_chunk_reader.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import csv, logging, mmap
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_CSV_CHUNK_BYTES = 8 * 1024 * 1024  # target size of one chunk
+_QUOTE = b'"'
+_NEWLINE = b"\n"
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    _decode_rows() function
+def _decode_rows(data : bytes, encoding : str) -> List[List[str]]:
+    # Parse the records of a span, csv keeps the quoted newlines.
+    return [row for row in csv.reader(data.decode(encoding).splitlines(True))
+            if row]
+#endregion _decode_rows() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_CSV_file_chunk_spans() function
+def bsm_CSV_file_chunk_spans(csv_path : Path,
+                             chunk_bytes : int = BSM_CSV_CHUNK_BYTES
+                             ) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Return the header and the record-aligned chunk spans of a csv file.
+
+    Args:
+        csv_path (Path): The csv file.
+        chunk_bytes (int): The target size of a chunk. A chunk ends at the
+            first record boundary at or after it.
+
+    Returns:
+        Tuple[List[str], List[Tuple[int, int]]]: The header row, and the
+        (start, end) byte spans of the data rows, in file order.
+    """
+    try:
+        p3u.is_obj_of_type("csv_path", csv_path, Path, raise_error=True)
+        if chunk_bytes < 1:
+            raise ValueError(f"chunk_bytes must be 1 or more: {chunk_bytes}")
+        with open(csv_path, "rb") as f:
+            if f.seek(0, 2) == 0:
+                return [], []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                hdr_end = mm.find(_NEWLINE)
+                hdr_end = size if hdr_end == -1 else hdr_end + 1
+                header = next(csv.reader(
+                    [mm[:hdr_end].decode("utf-8-sig")]), [])
+                spans = []
+                start = hdr_end
+                while start < size:
+                    end = min(start + chunk_bytes, size)
+                    # Count the quotes up to each candidate boundary, a
+                    # newline after an odd count is inside a quoted value.
+                    pos = search = end - 1
+                    quotes = mm[start:pos].count(_QUOTE)
+                    while end < size:
+                        nl = mm.find(_NEWLINE, search)
+                        if nl == -1:
+                            end = size
+                            break
+                        quotes += mm[pos:nl].count(_QUOTE)
+                        pos = search = end = nl + 1
+                        if quotes % 2 == 0:
+                            break
+                    spans.append((start, end))
+                    start = end
+        logger.debug(f"BSM: '{csv_path.name}' {size} bytes in "
+                     f"{len(spans)} chunks")
+        return header, spans
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_CSV_file_chunk_spans() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_CSV_file_chunk_rows() function
+def bsm_CSV_file_chunk_rows(csv_path : Path, span : Tuple[int, int],
+                            encoding : str = "utf-8") -> List[List[str]]:
+    """Return the parsed rows of one chunk span of a csv file.
+
+    Only the span is read from the memory map, so a worker process given
+    (csv_path, span) parses its chunk without reading the rest of the file.
+
+    Args:
+        csv_path (Path): The csv file.
+        span (Tuple[int, int]): A (start, end) span from
+            bsm_CSV_file_chunk_spans().
+        encoding (str): The text encoding of the file.
+
+    Returns:
+        List[List[str]]: The rows of the chunk, blank lines skipped.
+    """
+    try:
+        start, end = span
+        with open(csv_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _decode_rows(mm[start:end], encoding)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_CSV_file_chunk_rows() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_CSV_file_chunks() function
+def bsm_CSV_file_chunks(csv_path : Path,
+                        chunk_bytes : int = BSM_CSV_CHUNK_BYTES,
+                        encoding : str = "utf-8"
+                        ) -> Iterator[Tuple[List[str], List[List[str]]]]:
+    """Yield (header, rows) for each chunk of a csv file, in file order.
+
+    Args:
+        csv_path (Path): The csv file.
+        chunk_bytes (int): The target size of a chunk.
+        encoding (str): The text encoding of the file.
+
+    Yields:
+        Tuple[List[str], List[List[str]]]: The header row and the rows of
+        one chunk.
+    """
+    csv_path = Path(csv_path)
+    header, spans = bsm_CSV_file_chunk_spans(csv_path, chunk_bytes)
+    if not spans:
+        return
+    with open(csv_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in spans:
+                yield header, _decode_rows(mm[start:end], encoding)
+#endregion bsm_CSV_file_chunks() function
+# ---------------------------------------------------------------------------- +
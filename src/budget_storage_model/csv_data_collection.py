@@ -12,6 +12,22 @@
     Only depend on the dict to csv header row mapping, not detailed content structure
     is used beyond that for validation.
 
+    A DATA_COLLECTION is keyed by the value of its key column, "Number" by
+    default for a check register. Rows are read as strings, or typed with
+    typed=True: dates as datetime.date, money as Decimal or int cents,
+    whole numbers as int. The key column is always a string. The column
+    types are given with col_types, or inferred from all the values of
+    each column (or the first infer_rows rows), so a column never mixes
+    types.
+
+    Large files: csv_DATA_COLLECTION_file_rows() streams the rows one at a
+    time and csv_DATA_COLLECTION_file_chunks() yields DATA_COLLECTIONs of
+    at most chunk_rows rows, so memory is bounded by the chunk, not the
+    file. csv_DATA_COLLECTION_file_save() takes a DATA_COLLECTION or any
+    iterable of rows, writes them in batches through a large buffer to a
+    temp file, then replaces the target, so a failed save never leaves a
+    partial file.
+
     No dependencies to other application layers.
 
     # TODO: switch verbs to put/get from save/load, consistent with URL usage.
@@ -21,10 +37,11 @@
 # ---------------------------------------------------------------------------- +
 #region    Imports
 # python standard library modules and packages
-import csv, logging, os, time
+import csv, logging, os, time, re, itertools, datetime
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
 from urllib.parse import urlparse, unquote
-from typing import Dict, List
+from typing import Dict, List, Any, Callable, Iterable, Iterator
 
 # third-party modules and packages
 import p3_utils as p3u, pyjson5, p3logging as p3l
@@ -35,27 +52,154 @@ from budman_namespace import (
 # ---------------------------------------------------------------------------- +
 #region    Globals and Constants
 logger = logging.getLogger(__name__)
+CSV_KEY_COLUMN = "Number"  # default key column, check registers
+CSV_WRITE_BUFFER_ROWS = 1000  # rows per writerows() call
+CSV_IO_BUFFER_BYTES = 1024 * 1024  # file buffer for reads and writes
+CSV_CHUNK_ROWS = 10000  # rows per DATA_COLLECTION in chunked reads
+# The first format is used to write dates.
+CSV_DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d")
+# Column types, the values of col_types.
+CSV_TYPE_STR = "str"
+CSV_TYPE_INT = "int"
+CSV_TYPE_DATE = "date"
+CSV_TYPE_MONEY = "money"
+# Money values, the values of money.
+CSV_MONEY_DECIMAL = "decimal"
+CSV_MONEY_CENTS = "cents"
+_INT_PATTERN = re.compile(r"^-?\d+$")
+# e.g., 12.34, -1,234.50, $5.00, ($5.00)
+_MONEY_PATTERN = re.compile(r"^\(?-?\$?-?[\d,]*\.\d{2}\)?$")
 # ---------------------------------------------------------------------------- +
 #endregion Globals and Constants
 # ---------------------------------------------------------------------------- +
+#region    Typed value conversion
+def _parse_money(value : str, money : str) -> Any:
+    v = value.replace("$", "").replace(",", "")
+    negative = v.startswith("(") and v.endswith(")")
+    d = Decimal(v.strip("()"))
+    if negative:
+        d = -d
+    if money == CSV_MONEY_CENTS:
+        return int(d.scaleb(2).to_integral_exact())
+    return d
+
+def _parse_date(value : str) -> datetime.date:
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"not a date: '{value}'")
+
+def _converter(col_type : str, money : str) -> Callable[[str], Any]:
+    if col_type == CSV_TYPE_STR:
+        return str
+    if col_type == CSV_TYPE_INT:
+        return int
+    if col_type == CSV_TYPE_DATE:
+        return _parse_date
+    if col_type == CSV_TYPE_MONEY:
+        return lambda v: _parse_money(v, money)
+    raise ValueError(f"Unsupported csv column type: '{col_type}'")
+
+def csv_value_type_infer(value : str) -> str:
+    """Return the column type of a csv string value, see CSV_TYPE_*."""
+    v = value.strip()
+    if _INT_PATTERN.match(v):
+        return CSV_TYPE_INT
+    if _MONEY_PATTERN.match(v):
+        return CSV_TYPE_MONEY
+    try:
+        _parse_date(v)
+        return CSV_TYPE_DATE
+    except ValueError:
+        return CSV_TYPE_STR
+
+def csv_value_types_merge(t1 : str, t2 : str) -> str:
+    """Return the column type holding values of types t1 and t2."""
+    if t1 is None or t1 == t2:
+        return t2
+    if t2 is None:
+        return t1
+    if {t1, t2} == {CSV_TYPE_INT, CSV_TYPE_MONEY}:
+        return CSV_TYPE_MONEY
+    return CSV_TYPE_STR
+
+def csv_column_types_infer(csv_path : Path,
+                           infer_rows : int = None,
+                           skip_cols : Iterable[str] = ()) -> Dict[str, str]:
+    """Infer the type of each column of a csv file from its values.
+
+    A whole number column with a money value is money, any other mix of
+    types is str. Columns with only empty values are str.
+
+    Args:
+        csv_path (Path): The path of the csv file.
+        infer_rows (int): The rows to infer from, None for all rows.
+        skip_cols (Iterable[str]): Columns not to infer.
+
+    Returns:
+        Dict[str, str]: Column name -> CSV_TYPE_*.
+    """
+    skip = set(skip_cols)
+    types : Dict[str, str] = {}
+    with open(csv_path, "r", newline="", buffering=CSV_IO_BUFFER_BYTES) as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        for col in reader.fieldnames or ():
+            if col not in skip:
+                types[col] = None
+        for row in itertools.islice(reader, infer_rows):
+            for col, value in row.items():
+                if col not in types or value is None:
+                    continue
+                v = value.strip()
+                if v and types[col] != CSV_TYPE_STR:
+                    types[col] = csv_value_types_merge(
+                        types[col], csv_value_type_infer(v))
+    return {col: t or CSV_TYPE_STR for col, t in types.items()}
+
+def _format_value(value : Any, col_type : str, money : str) -> Any:
+    if value is None:
+        return ""
+    if (col_type == CSV_TYPE_MONEY and money == CSV_MONEY_CENTS
+            and isinstance(value, int)):
+        return f"{Decimal(value).scaleb(-2):.2f}"
+    if isinstance(value, Decimal):
+        return f"{value:f}"
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, datetime.date):
+        return value.strftime(CSV_DATE_FORMATS[0])
+    return value
+#endregion Typed value conversion
+# ---------------------------------------------------------------------------- +
 #region    csv_DATA_COLLECTION_get_url() function
-def csv_DATA_COLLECTION_url_get(csv_url : str = None) -> DATA_COLLECTION:
+def csv_DATA_COLLECTION_url_get(csv_url : str = None,
+                                key_col : str = CSV_KEY_COLUMN,
+                                typed : bool = False,
+                                col_types : Dict[str, str] = None,
+                                money : str = CSV_MONEY_DECIMAL
+                                ) -> DATA_COLLECTION:
     """Get a DATA_COLLECTION object from a URL to a csv file in storage.
     
     A csv dictionary is read in from the csv_url. Parse the URL and decide
-    how to load the DATA_COLLECTION object based on the URL scheme. Decode the
-    json content and return it as a dictionary.
+    how to load the DATA_COLLECTION object based on the URL scheme.
 
     Args:
         csv_url (str): The URL to the DATA_COLLECTION object to load.
+        key_col (str): The column with the DATA_COLLECTION keys.
+        typed (bool): Convert the values to their column types.
+        col_types (Dict[str, str]): Column name -> CSV_TYPE_*, the others
+            are inferred.
+        money (str): CSV_MONEY_DECIMAL or CSV_MONEY_CENTS.
     """
     try:
         st = p3u.start_timer()
         logger.debug(f"Get DATA_COLLECTION from  url: '{csv_url}'")
         # only support file:// scheme for now.
-        # csv_path = verify_url_file_path(csv_url, test=True)
         csv_path = p3u.verify_url_file_path(csv_url, test=True)
-        result = csv_DATA_COLLECTION_file_load(csv_path)
+        result = csv_DATA_COLLECTION_file_load(csv_path, key_col, typed,
+                                               col_types, money)
         logger.debug(f"Complete csv_path: {csv_path} {p3u.stop_timer(st)}")
         return result
     except Exception as e:
@@ -64,86 +208,257 @@ def csv_DATA_COLLECTION_url_get(csv_url : str = None) -> DATA_COLLECTION:
 #endregion csv_DATA_COLLECTION_get_url() function
 # ---------------------------------------------------------------------------- +
 #region    csv_DATA_COLLECTION_put_url() function
-def csv_DATA_COLLECTION_url_put(csv_dict:dict,csv_url : str = None) -> DATA_COLLECTION:
+def csv_DATA_COLLECTION_url_put(csv_dict : DATA_COLLECTION,
+                                csv_url : str = None,
+                                col_types : Dict[str, str] = None,
+                                money : str = CSV_MONEY_DECIMAL) -> int:
     """Put a DATA_COLLECTION object to a URL in storage.
     
     A csv dictionary is stored to the csv_url. Parse the URL and decide
-    how to load the DATA_COLLECTION object based on the URL scheme. Decode the
-    json content and return it as a dictionary.
+    how to save the DATA_COLLECTION object based on the URL scheme.
 
     Args:
-        csv_dict (dict): The DATA_COLLECTION object to save.
-        csv_url (str): The URL to the DATA_COLLECTION object to load.
+        csv_dict (DATA_COLLECTION): The DATA_COLLECTION object to save.
+        csv_url (str): The URL to save the DATA_COLLECTION object to.
+        col_types (Dict[str, str]): Column name -> CSV_TYPE_*, needed only
+            for int cents money columns.
+        money (str): CSV_MONEY_DECIMAL or CSV_MONEY_CENTS.
+
+    Returns:
+        int: The number of rows saved.
     """
     try:
         st = p3u.start_timer()
-        logger.debug(f"Get DATA_COLLECTION from  url: '{csv_url}'")
+        logger.debug(f"Put DATA_COLLECTION to url: '{csv_url}'")
         # only support file:// scheme for now.
-        # csv_path = verify_url_file_path(csv_url, test=True)
-        csv_path = p3u.verify_url_file_path(csv_url, test=True)
-        result = csv_DATA_COLLECTION_file_save(csv_path)
+        csv_path = p3u.verify_url_file_path(csv_url, test=False)
+        result = csv_DATA_COLLECTION_file_save(csv_dict, csv_path,
+                                               col_types=col_types, money=money)
         logger.debug(f"Complete csv_path: {csv_path} {p3u.stop_timer(st)}")
         return result
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise
-#endregion csv_DATA_COLLECTION_get_url() function
+#endregion csv_DATA_COLLECTION_put_url() function
+# ---------------------------------------------------------------------------- +
+#region    csv_DATA_COLLECTION_file_rows() function
+def csv_DATA_COLLECTION_file_rows(csv_path : Path,
+                                  typed : bool = True,
+                                  col_types : Dict[str, str] = None,
+                                  money : str = CSV_MONEY_DECIMAL,
+                                  str_cols : Iterable[str] = (),
+                                  infer_rows : int = None
+                                  ) -> Iterator[Dict[str, Any]]:
+    """Stream the rows of a csv file as dicts, typed if typed.
+
+    One row is in memory at a time. The type of a column not in col_types
+    is inferred by csv_column_types_infer() in a first pass over the file,
+    so every value of a column has the same type. With infer_rows, only
+    that many rows are read to infer, and a later value that does not
+    convert raises ValueError, as does a value that does not convert to
+    a col_types type. Empty values are None.
+
+    Args:
+        csv_path (Path): The path of the csv file.
+        typed (bool): Convert the values to their column types.
+        col_types (Dict[str, str]): Column name -> CSV_TYPE_*.
+        money (str): CSV_MONEY_DECIMAL or CSV_MONEY_CENTS.
+        str_cols (Iterable[str]): Columns always kept as strings, e.g.,
+            the key column.
+        infer_rows (int): The rows to infer column types from, None for
+            all rows.
+
+    Yields:
+        Dict[str, Any]: The rows, column name -> value.
+    """
+    p3u.verify_file_path_for_load(csv_path)
+    col_types = dict(col_types or {})
+    for col in str_cols:
+        col_types[col] = CSV_TYPE_STR
+    if typed:
+        inferred = csv_column_types_infer(csv_path, infer_rows, col_types)
+        col_types = {**inferred, **col_types}
+    converters : Dict[str, Callable] = {
+        col: _converter(t, money) for col, t in col_types.items()}
+    with open(csv_path, "r", newline="", buffering=CSV_IO_BUFFER_BYTES) as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        for line, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            if not typed:
+                yield row
+                continue
+            for col, value in row.items():
+                if value is None or col is None:
+                    continue
+                v = value.strip()
+                if not v:
+                    row[col] = None
+                    continue
+                conv = converters.get(col, str)
+                try:
+                    row[col] = conv(v)
+                except (ValueError, InvalidOperation, ArithmeticError) as e:
+                    raise ValueError(f"{csv_path}:{line}: column '{col}' "
+                                     f"value '{v}': {e}") from e
+            yield row
+#endregion csv_DATA_COLLECTION_file_rows() function
+# ---------------------------------------------------------------------------- +
+#region    csv_DATA_COLLECTION_file_chunks() function
+def csv_DATA_COLLECTION_file_chunks(csv_path : Path,
+                                    key_col : str = CSV_KEY_COLUMN,
+                                    typed : bool = False,
+                                    col_types : Dict[str, str] = None,
+                                    money : str = CSV_MONEY_DECIMAL,
+                                    chunk_rows : int = CSV_CHUNK_ROWS
+                                    ) -> Iterator[DATA_COLLECTION]:
+    """Yield a csv file as DATA_COLLECTIONs of at most chunk_rows rows.
+
+    The bounded-memory mode for large check registers and exports. Only
+    the keys seen so far are kept across chunks, to skip duplicates.
+
+    Args:
+        csv_path (Path): The path of the csv file.
+        key_col (str): The column with the DATA_COLLECTION keys.
+        typed (bool): Convert the values to their column types.
+        col_types (Dict[str, str]): Column name -> CSV_TYPE_*.
+        money (str): CSV_MONEY_DECIMAL or CSV_MONEY_CENTS.
+        chunk_rows (int): The most rows in one DATA_COLLECTION, None for
+            all rows in one.
+
+    Yields:
+        DATA_COLLECTION: key -> row, in file order.
+    """
+    p3u.is_non_empty_str("key_col", key_col, raise_error=True)
+    if chunk_rows is not None and chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be 1 or more: {chunk_rows}")
+    seen = set()
+    chunk : DATA_COLLECTION = {}
+    rows = csv_DATA_COLLECTION_file_rows(csv_path, typed, col_types, money,
+                                         str_cols=(key_col,))
+    for row in rows:
+        if key_col not in row:
+            raise ValueError(f"Key column '{key_col}' not in csv header: "
+                             f"'{csv_path}'")
+        key = (row[key_col] or "").strip()
+        if not key:
+            logger.warning(f"Skipping row with no '{key_col}': {row}")
+            continue
+        if key in seen:
+            logger.warning(f"Duplicate key found: {key}")
+            logger.warning(f"Skipping row: {row}")
+            continue
+        seen.add(key)
+        chunk[key] = row
+        if chunk_rows is not None and len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = {}
+    if chunk:
+        yield chunk
+#endregion csv_DATA_COLLECTION_file_chunks() function
 # ---------------------------------------------------------------------------- +
 #region    csv_DATA_COLLECTION_file_load() function
-def csv_DATA_COLLECTION_file_load(csv_path : Path = None) -> DATA_COLLECTION:
-    """Load a DATA_COLLECTION from a csv file at the given Path."""
+def csv_DATA_COLLECTION_file_load(csv_path : Path = None,
+                                  key_col : str = CSV_KEY_COLUMN,
+                                  typed : bool = False,
+                                  col_types : Dict[str, str] = None,
+                                  money : str = CSV_MONEY_DECIMAL
+                                  ) -> DATA_COLLECTION:
+    """Load a DATA_COLLECTION from a csv file at the given Path.
+
+    Args:
+        csv_path (Path): The path of the csv file.
+        key_col (str): The column with the DATA_COLLECTION keys.
+        typed (bool): Convert the values to their column types.
+        col_types (Dict[str, str]): Column name -> CSV_TYPE_*.
+        money (str): CSV_MONEY_DECIMAL or CSV_MONEY_CENTS.
+
+    Returns:
+        DATA_COLLECTION: key -> row, in file order.
+    """
     try:
         st = p3u.start_timer()
         logger.debug(f"Loading DATA_COLLECTION from  file: '{csv_path}'")
-        p3u.verify_file_path_for_load(csv_path)
-        with open(csv_path, "r",newline="") as f:
-            reader = csv.DictReader(f, skipinitialspace=True)
-            data_collection: DATA_COLLECTION = {}
-            for row in reader:
-                # Use the first column as the key, rest as values.
-                if row:
-                    check_number = row["Number"].strip()
-                    if check_number in data_collection:
-                        logger.warning(f"Duplicate key found: {check_number}")
-                        logger.warning(f"Skipping row: {row}")
-                        continue
-                    data_collection[check_number] = row
+        chunks = csv_DATA_COLLECTION_file_chunks(
+            csv_path, key_col, typed, col_types, money, chunk_rows=None)
+        data_collection: DATA_COLLECTION = next(chunks, {})
         logger.info(f"BizEVENT: Loaded DATA_COLLECTION from  file: '{csv_path}'")
-        logger.debug(f"Complete {p3u.stop_timer(st)}")
+        logger.debug(f"Complete rows({len(data_collection)}) "
+                     f"{p3u.stop_timer(st)}")
         return data_collection
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise
-#endregion bsm_BDM_STORE_file_load() function
+#endregion csv_DATA_COLLECTION_file_load() function
 # ---------------------------------------------------------------------------- +
 #region    csv_DATA_COLLECTION_file_save() function
-def csv_DATA_COLLECTION_file_save(wb_dict:dict,csv_path : Path = None) -> DATA_COLLECTION:
-    """Load a DATA_COLLECTION from a csv file at the given Path."""
+def csv_DATA_COLLECTION_file_save(data_collection : DATA_COLLECTION | Iterable[Dict],
+                                  csv_path : Path = None,
+                                  fieldnames : List[str] = None,
+                                  col_types : Dict[str, str] = None,
+                                  money : str = CSV_MONEY_DECIMAL,
+                                  buffer_rows : int = CSV_WRITE_BUFFER_ROWS
+                                  ) -> int:
+    """Save a DATA_COLLECTION, or a stream of rows, to a csv file.
+
+    The rows are written buffer_rows at a time to a temp file in the same
+    folder, which then replaces csv_path. Typed values are written in the
+    form csv_DATA_COLLECTION_file_rows() reads back.
+
+    Args:
+        data_collection (DATA_COLLECTION | Iterable[Dict]): key -> row, or
+            an iterable of rows, e.g., from csv_DATA_COLLECTION_file_rows().
+            A row is a dict, or a list of values in fieldnames order.
+        csv_path (Path): The path of the csv file to save.
+        fieldnames (List[str]): The header, by default the columns of the
+            first row, which must then be a dict.
+        col_types (Dict[str, str]): Column name -> CSV_TYPE_*, needed only
+            for int cents money columns.
+        money (str): CSV_MONEY_DECIMAL or CSV_MONEY_CENTS.
+        buffer_rows (int): Rows per batch write.
+
+    Returns:
+        int: The number of rows saved.
+    """
+    csv_path = Path(csv_path)
+    tmp_path = csv_path.with_name(f".{csv_path.name}.{os.getpid()}.tmp")
     try:
-        # NEED TO FINISH THIS FUNCTION
         st = p3u.start_timer()
-        logger.debug(f"Loading DATA_COLLECTION from  file: '{csv_path}'")
-        p3u.verify_file_path_for_load(csv_path)
-        with open(csv_path, "r",newline="") as f:
-            reader = csv.DictReader(f)
-            data_collection: DATA_COLLECTION = {}
-            for row in reader:
-                # Use the first column as the key, rest as values.
-                if row:
-                    check_number = row["Number"].strip()
-                    new_key = "check-" + check_number
-                    if new_key in data_collection:
-                        logger.warning(f"Duplicate key found: {new_key}")
-                        logger.warning(f"Skipping row: {row}")
-                        continue
-                    data_collection[new_key] = row
-        logger.info(f"BizEVENT: Loading DATA_COLLECTION from  file: '{csv_path}'")
-        logger.debug(f"Complete {p3u.stop_timer(st)}")
-        return data_collection
+        logger.debug(f"Saving DATA_COLLECTION to file: '{csv_path}'")
+        if csv_path.suffix.lower() not in BSM_DATA_COLLECTION_CSV_STORE_FILETYPES:
+            raise ValueError(f"csv_path filetype is not supported: "
+                             f"{csv_path.suffix}")
+        rows = iter(data_collection.values() if isinstance(data_collection, dict)
+                    else data_collection)
+        first = next(rows, None)
+        if fieldnames is None:
+            if first is not None and not isinstance(first, dict):
+                raise ValueError("fieldnames are required for list rows.")
+            fieldnames = list(first.keys()) if first is not None else []
+        if first is not None:
+            rows = itertools.chain((first,), rows)
+        col_types = col_types or {}
+        types = [col_types.get(col) for col in fieldnames]
+        count = 0
+        with open(tmp_path, "w", newline="", 
+                  buffering=CSV_IO_BUFFER_BYTES) as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            while batch := list(itertools.islice(rows, buffer_rows)):
+                writer.writerows(
+                    [_format_value(v, t, money) for v, t in zip(
+                        map(row.get, fieldnames) if isinstance(row, dict)
+                        else row, types)] for row in batch)
+                count += len(batch)
+        os.replace(tmp_path, csv_path)
+        logger.info(f"BizEVENT: Saved DATA_COLLECTION to file: '{csv_path}'")
+        logger.debug(f"Complete rows({count}) {p3u.stop_timer(st)}")
+        return count
     except Exception as e:
+        tmp_path.unlink(missing_ok=True)
         logger.error(p3u.exc_err_msg(e))
         raise
-#endregion bsm_BDM_STORE_file_save() function
+#endregion csv_DATA_COLLECTION_file_save() function
 # ---------------------------------------------------------------------------- +
 #region    verify_url_file_path(url: str) function 
 # def verify_url_file_path(url: str,test:bool=True) -> Path:
@@ -0,0 +1,467 @@
+# ---------------------------------------------------------------------------- +
+#region    folder_manifest.py module
+""" Per-folder manifest of workbook file metadata, in the BSM.
+
+    Knowing a workbook's row count or date range used to mean loading it.
+    Each WF folder keeps a manifest, BSM_MANIFEST_FILENAME in its
+    BSM_SIDECAR_FOLDER, with one entry per workbook file, by file name:
+    the fingerprint of bsm_file_fingerprint(), size, mtime_ns and sha256,
+    and the content summary: the sheet names, the header row of the active
+    sheet, its data row count, the min and max date of its first and last
+    data rows, and whether it has been categorized, i.e., has a
+    BSM_MANIFEST_CATEGORY_COLUMN.
+
+    The summary of an xlsx file is read from the zip archive without
+    openpyxl: the sheet names from xl/workbook.xml, the row count from the
+    <dimension> tag of the active sheet XML, and the cells of only its
+    first and last rows, with just the shared strings they use. The dates
+    of the first and last data rows give the date range, the FI exports
+    are in date order.
+
+    The manifest is updated incrementally. bsm_WORKBOOK_file_save() updates
+    the entry of the saved file, from the Workbook in memory, and
+    bsm_WB_FOLDER_manifest() refreshes a folder, summarizing only the files
+    whose fingerprint changed. An entry lost to a concurrent write from
+    another process is summarized again on the next refresh.
+
+    Neither a refresh nor a save reads a whole file to hash it, the sha256
+    of an entry is None until bsm_WB_FILES_manifest_sha256() asks for it.
+    It is then kept while the size and mtime_ns of the file are unchanged,
+    e.g., for the raw store, see raw_store.py.
+
+    No dependencies to other application layers.
+"""
+#endregion folder_manifest.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, os, re, csv, json, zipfile, datetime, threading
+import xml.etree.ElementTree as ET
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional, Sequence, Union
+from xml.sax.saxutils import unescape
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl import Workbook
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.datetime import from_excel
+
+# local modules and packages
+from budman_namespace import (
+    WB_FILETYPE_CSV, WB_FILETYPE_WORKING)
+from budget_storage_model.workbook_values import WorkbookValues
+from budget_storage_model.columnar_sidecar import BSM_SIDECAR_FOLDER
+from budget_storage_model.csv_data_collection import CSV_DATE_FORMATS
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_MANIFEST_FILENAME = "manifest.json"  # in the BSM_SIDECAR_FOLDER
+BSM_MANIFEST_VERSION = 1
+# Header names of the workflow columns summarized, see budget_categorization.py.
+BSM_MANIFEST_DATE_COLUMN = "Date"
+BSM_MANIFEST_CATEGORY_COLUMN = "Budget Category"
+_XLSX_BLOCK_SIZE = 64 * 1024
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_DIMENSION_RE = re.compile(rb"<dimension\s+ref=\"([A-Z]*)(\d+)(?::[A-Z]*(\d+))?\"")
+_ROW_RE = re.compile(rb"<row\b[^>]*(?<!/)>.*?</row>", re.DOTALL)
+_CELL_RE = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.DOTALL)
+_ATTR_RE = re.compile(rb"\b(r|t)=\"([^\"]*)\"")
+_V_RE = re.compile(rb"<v>(.*?)</v>", re.DOTALL)
+_T_RE = re.compile(rb"<t\b[^>]*>(.*?)</t>", re.DOTALL)
+_manifest_locks : Dict[str, threading.Lock] = {}
+_manifest_locks_lock = threading.Lock()
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    Manifest file
+def _manifest_path(abs_folder : Path) -> Path:
+    return Path(abs_folder).resolve() / BSM_SIDECAR_FOLDER / BSM_MANIFEST_FILENAME
+
+def _manifest_lock(abs_folder : Path) -> threading.Lock:
+    key = str(Path(abs_folder).resolve())
+    with _manifest_locks_lock:
+        return _manifest_locks.setdefault(key, threading.Lock())
+
+def _manifest_load(abs_folder : Path) -> Dict[str, Dict[str, Any]]:
+    """Return the manifest entries of a folder, empty if absent or unreadable."""
+    manifest_path = _manifest_path(abs_folder)
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BSM_MANIFEST_VERSION:
+            return {}
+        return data.get("entries", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest '{manifest_path}': "
+                       f"{p3u.exc_err_msg(e)}")
+        return {}
+
+def _manifest_save(abs_folder : Path, entries : Dict[str, Dict[str, Any]]) -> None:
+    """Write the manifest of a folder, replacing it atomically."""
+    manifest_path = _manifest_path(abs_folder)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": BSM_MANIFEST_VERSION, "entries": entries}, f,
+                  indent=1, default=str)
+    os.replace(tmp_path, manifest_path)
+#endregion Manifest file
+# ---------------------------------------------------------------------------- +
+#region    Content summary
+def _date_iso(value : Any) -> Optional[str]:
+    """Return a cell value as an ISO date string, None if not a date."""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # An xlsx date is a serial day number, formatted by a cell style.
+        try:
+            return from_excel(value).date().isoformat()
+        except (ValueError, OverflowError, AttributeError):
+            return None
+    if isinstance(value, str):
+        value = value.strip()
+        for fmt in CSV_DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(value[:10], fmt).date().isoformat()
+            except ValueError:
+                continue
+    return None
+
+def _summary(sheets : List[str], header : Sequence[Any], rows : int,
+             first : Sequence[Any], last : Sequence[Any]) -> Dict[str, Any]:
+    """Return the content summary of a sheet's header, first and last rows."""
+    header = ["" if c is None else str(c) for c in (header or ())]
+    dates = []
+    if BSM_MANIFEST_DATE_COLUMN in header:
+        i = header.index(BSM_MANIFEST_DATE_COLUMN)
+        dates = [d for d in (_date_iso(r[i]) if r and i < len(r) else None
+                             for r in (first, last)) if d is not None]
+    return {
+        "sheets": list(sheets),
+        "header": header,
+        "rows": rows,
+        "min_date": min(dates) if dates else None,
+        "max_date": max(dates) if dates else None,
+        "categorized": BSM_MANIFEST_CATEGORY_COLUMN in header,
+    }
+
+def _values_summary(wb : Union[Workbook, WorkbookValues]) -> Dict[str, Any]:
+    """Return the content summary of a Workbook or WorkbookValues in memory."""
+    ws = wb.active
+    if ws is None or ws.max_row == 0:
+        return _summary(wb.sheetnames, [], 0, None, None)
+    def row(r : int) -> Sequence[Any]:
+        return next(ws.iter_rows(min_row=r, max_row=r, values_only=True), None)
+    header = row(1)
+    if header is None or all(c is None for c in header):
+        return _summary(wb.sheetnames, [], 0, None, None)
+    n = ws.max_row - 1
+    return _summary(wb.sheetnames, header, n,
+                    row(2) if n else None, row(ws.max_row) if n else None)
+
+def _csv_summary(csv_path : Path) -> Dict[str, Any]:
+    """Return the content summary of a csv file, in one pass of the reader."""
+    with open(csv_path, "r", newline="", encoding="utf-8-sig",
+              errors="replace") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        first = last = None
+        n = 0
+        for last in reader:
+            if n == 0:
+                first = last
+            n += 1
+    return _summary([], header, n, first, last)
+
+def _xlsx_cells(row_xml : bytes, shared : Dict[int, str]) -> List[Any]:
+    """Return the cell values of a sheet XML <row>, shared strings resolved."""
+    cells : Dict[int, Any] = {}
+    for m in _CELL_RE.finditer(row_xml):
+        attrs = dict(_ATTR_RE.findall(m.group(1)))
+        body = m.group(2) or b""
+        col = column_index_from_string(
+            re.match(rb"[A-Z]+", attrs[b"r"]).group().decode()) - 1
+        t = attrs.get(b"t", b"n")
+        if t == b"inlineStr":
+            value = "".join(unescape(x.decode("utf-8")) for x in _T_RE.findall(body))
+        else:
+            v = _V_RE.search(body)
+            if v is None:
+                continue
+            text = unescape(v.group(1).decode("utf-8"))
+            if t == b"s":
+                value = shared.get(int(text))
+            elif t in (b"str", b"e", b"d"):
+                value = text
+            elif t == b"b":
+                value = text == "1"
+            else:
+                value = float(text)
+                value = int(value) if value.is_integer() else value
+        cells[col] = value
+    return [cells.get(i) for i in range(max(cells) + 1)] if cells else []
+
+def _xlsx_shared_strings(zf : zipfile.ZipFile, indexes : set) -> Dict[int, str]:
+    """Return the shared strings of the indexes, parsed only up to the last."""
+    shared : Dict[int, str] = {}
+    if not indexes or "xl/sharedStrings.xml" not in zf.namelist():
+        return shared
+    last = max(indexes)
+    with zf.open("xl/sharedStrings.xml") as f:
+        i = 0
+        for _, elem in ET.iterparse(f):
+            if elem.tag != f"{_NS_MAIN}si":
+                continue
+            if i in indexes:
+                shared[i] = "".join(t.text or "" for t in elem.iter(f"{_NS_MAIN}t"))
+            elem.clear()
+            if i >= last:
+                break
+            i += 1
+    return shared
+
+def _xlsx_summary(wb_path : Path) -> Dict[str, Any]:
+    """Return the content summary of an xlsx file, read from its XML.
+
+    Raises:
+        ValueError: The active sheet has no <dimension> tag.
+    """
+    with zipfile.ZipFile(wb_path) as zf:
+        root = ET.fromstring(zf.read("xl/workbook.xml"))
+        sheets = [(s.get("name"), s.get(f"{_NS_REL}id"))
+                  for s in root.iter(f"{_NS_MAIN}sheet")]
+        view = next(root.iter(f"{_NS_MAIN}workbookView"), None)
+        active = int(view.get("activeTab", 0)) if view is not None else 0
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {r.get("Id"): r.get("Target")
+                   for r in rels.iter(f"{_NS_PKG_REL}Relationship")}
+        target = targets[sheets[min(active, len(sheets) - 1)][1]]
+        member = (target.lstrip("/") if target.startswith("/")
+                  else str(PurePosixPath("xl") / target))
+        # Stream the sheet XML, keep the head up to the first data row, and
+        # a tail long enough to hold the last row.
+        head, tail = b"", b""
+        with zf.open(member) as f:
+            for block in iter(lambda: f.read(_XLSX_BLOCK_SIZE), b""):
+                if len(_ROW_RE.findall(head)) < 2:
+                    head += block
+                tail = tail[-_XLSX_BLOCK_SIZE:] + block
+        dimension = _DIMENSION_RE.search(head)
+        if dimension is None:
+            raise ValueError(f"No sheet dimension in '{wb_path}'")
+        head_rows = _ROW_RE.findall(head)[:2]
+        tail_rows = _ROW_RE.findall(tail)
+        # A one cell ref, e.g., 'A1', is the dimension of an empty sheet.
+        n = (int(dimension.group(3)) - int(dimension.group(2))
+             if dimension.group(3) and head_rows else 0)
+        rows_xml = head_rows + tail_rows[-1:]
+        indexes = {int(unescape(v.decode()))
+                   for r in rows_xml for m in _CELL_RE.finditer(r)
+                   if dict(_ATTR_RE.findall(m.group(1))).get(b"t") == b"s"
+                   for v in _V_RE.findall(m.group(2) or b"")}
+        shared = _xlsx_shared_strings(zf, indexes)
+    rows = [_xlsx_cells(r, shared) for r in rows_xml]
+    header = rows[0] if head_rows else []
+    first = rows[1] if n and len(head_rows) > 1 else None
+    last = rows[-1] if n else None
+    return _summary([name for name, _ in sheets], header, n, first, last)
+
+def _file_summary(wb_path : Path) -> Dict[str, Any]:
+    """Return the content summary of a workbook file, by its file type."""
+    from budget_storage_model.working_data import bsm_WORKING_file_load_values
+    suffix = wb_path.suffix.lower()
+    if suffix == WB_FILETYPE_CSV:
+        return _csv_summary(wb_path)
+    if suffix == WB_FILETYPE_WORKING:
+        return _values_summary(bsm_WORKING_file_load_values(wb_path))
+    try:
+        return _xlsx_summary(wb_path)
+    except (KeyError, ValueError, IndexError, zipfile.BadZipFile,
+            ET.ParseError) as e:
+        # Not as written by openpyxl or Excel, let openpyxl read it.
+        logger.debug(f"BSM: Manifest reading '{wb_path.name}' with openpyxl: "
+                     f"{p3u.exc_err_msg(e)}")
+        return _values_summary(WorkbookValues.load(wb_path))
+#endregion Content summary
+# ---------------------------------------------------------------------------- +
+#region    bsm_WB_FILE_manifest_entry() function
+def bsm_WB_FILE_manifest_entry(wb_path : Path,
+                               wb : Union[Workbook, WorkbookValues] = None
+                               ) -> Dict[str, Any]:
+    """Return the manifest entry of a workbook file.
+
+    Args:
+        wb_path (Path): The workbook file.
+        wb (Union[Workbook, WorkbookValues]): The workbook content just
+            saved to wb_path, if at hand, the file is then not read.
+
+    Returns:
+        Dict[str, Any]: The fingerprint keys 'size', 'mtime_ns' and
+        'sha256', None, see bsm_WB_FILES_manifest_sha256(), and the summary
+        keys 'sheets', 'header', 'rows', 'min_date', 'max_date' and 
+        'categorized'.
+    """
+    from budget_storage_model.budget_storage_model import bsm_file_fingerprint
+    try:
+        wb_path = Path(wb_path)
+        # Fingerprint first, a file changed while summarized is then stale.
+        entry = bsm_file_fingerprint(wb_path, content_hash=False)
+        del entry["path"]
+        entry.update(_values_summary(wb) if wb is not None
+                     else _file_summary(wb_path))
+        return entry
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WB_FILE_manifest_entry() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WB_FILE_manifest_update() function
+def bsm_WB_FILE_manifest_update(wb_path : Path,
+                                wb : Union[Workbook, WorkbookValues] = None
+                                ) -> Dict[str, Any]:
+    """Update the entry of a workbook file in its folder's manifest.
+
+    Args:
+        wb_path (Path): The workbook file, added, changed or saved.
+        wb (Union[Workbook, WorkbookValues]): The workbook content just
+            saved to wb_path, see bsm_WB_FILE_manifest_entry().
+
+    Returns:
+        Dict[str, Any]: The manifest entry of the file.
+    """
+    try:
+        wb_path = Path(wb_path)
+        entry = bsm_WB_FILE_manifest_entry(wb_path, wb)
+        with _manifest_lock(wb_path.parent):
+            entries = _manifest_load(wb_path.parent)
+            entries[wb_path.name] = entry
+            _manifest_save(wb_path.parent, entries)
+        return entry
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WB_FILE_manifest_update() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WB_FOLDER_manifest() function
+def bsm_WB_FOLDER_manifest(abs_folder : Path,
+                           refresh : bool = True) -> Dict[str, Dict[str, Any]]:
+    """Return the manifest entries of the workbook files in a folder.
+
+    Args:
+        abs_folder (Path): The absolute path of the WF folder.
+        refresh (bool): Bring the manifest up to date with the folder
+            first, default True. Only the files added or changed since the
+            last update are summarized, the manifest is saved if changed.
+            With False, the saved manifest is returned as is.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The entries by file name, see
+        bsm_WB_FILE_manifest_entry(). A file that cannot be summarized
+        has just the key 'error'.
+    """
+    from budget_storage_model.budget_storage_model import (
+        bsm_WB_FOLDER_scan, bsm_file_fingerprint_match)
+    try:
+        st = p3u.start_timer()
+        abs_folder = Path(abs_folder)
+        with _manifest_lock(abs_folder):
+            entries = _manifest_load(abs_folder)
+            if not refresh:
+                return entries
+            wb_paths = [p for paths in bsm_WB_FOLDER_scan(abs_folder).values()
+                        for p in paths]
+            names = {p.name for p in wb_paths}
+            changed = [name for name in entries if name not in names]
+            for name in changed:
+                del entries[name]
+            summarized = 0
+            for wb_path in wb_paths:
+                entry = entries.get(wb_path.name)
+                if entry is not None:
+                    mtime_ns = entry.get("mtime_ns")
+                    if bsm_file_fingerprint_match(wb_path, entry):
+                        if entry["mtime_ns"] != mtime_ns:
+                            changed.append(wb_path.name)
+                        continue
+                try:
+                    entries[wb_path.name] = bsm_WB_FILE_manifest_entry(wb_path)
+                except Exception as e:
+                    # No fingerprint, so it is tried again on the next refresh.
+                    entries[wb_path.name] = {"error": p3u.exc_err_msg(e)}
+                changed.append(wb_path.name)
+                summarized += 1
+            if changed:
+                _manifest_save(abs_folder, entries)
+        logger.debug(f"BSM: Manifest of '{abs_folder}' has {len(entries)} "
+                     f"workbooks, summarized({summarized}) {p3u.stop_timer(st)}")
+        return entries
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WB_FOLDER_manifest() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WB_FILES_manifest_sha256() function
+def bsm_WB_FILES_manifest_sha256(wb_paths : Sequence[Path]) -> Dict[str, str]:
+    """Return the content sha256 of workbook files, from their manifests.
+
+    The sha256 in a file's manifest entry is used while the file's size
+    and mtime_ns are unchanged. Otherwise the file is hashed, and the
+    entry, summarized again if stale, is saved with its sha256. A file
+    that cannot be summarized is hashed, its entry is left as is.
+
+    Args:
+        wb_paths (Sequence[Path]): The files, in one or more folders.
+
+    Returns:
+        Dict[str, str]: The sha256 of each file, by str(wb_path).
+    """
+    from budget_storage_model.budget_storage_model import bsm_file_sha256
+    try:
+        shas = {}
+        by_folder : Dict[Path, List[Path]] = {}
+        for wb_path in map(Path, wb_paths):
+            by_folder.setdefault(wb_path.resolve().parent, []).append(wb_path)
+        for abs_folder, folder_paths in by_folder.items():
+            with _manifest_lock(abs_folder):
+                entries = _manifest_load(abs_folder)
+                changed = False
+                for wb_path in folder_paths:
+                    entry = entries.get(wb_path.name) or {}
+                    st = wb_path.stat()
+                    if (entry.get("sha256") is not None and
+                            (st.st_size, st.st_mtime_ns) ==
+                            (entry.get("size"), entry.get("mtime_ns"))):
+                        shas[str(wb_path)] = entry["sha256"]
+                        continue
+                    sha = shas[str(wb_path)] = bsm_file_sha256(wb_path)
+                    if st.st_size != entry.get("size") or (
+                            st.st_mtime_ns != entry.get("mtime_ns") and
+                            sha != entry.get("sha256")):
+                        # New or changed, summarize it again.
+                        try:
+                            entry = bsm_WB_FILE_manifest_entry(wb_path)
+                        except Exception as e:
+                            logger.debug(f"BSM: No manifest entry for "
+                                         f"'{wb_path}': {p3u.exc_err_msg(e)}")
+                            continue
+                        entries[wb_path.name] = entry
+                    # The stat taken before hashing, a file changed since
+                    # is then stale.
+                    entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns,
+                                 sha256=sha)
+                    changed = True
+                if changed:
+                    _manifest_save(abs_folder, entries)
+        return shas
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WB_FILES_manifest_sha256() function
+# ---------------------------------------------------------------------------- +
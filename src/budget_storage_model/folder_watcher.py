@@ -0,0 +1,189 @@
+# ---------------------------------------------------------------------------- +
+#region    folder_watcher.py module
+""" Watch folders for new workbook files in the BSM.
+
+    A FolderWatcher reports the workbook files that arrive in a set of
+    folders after it starts. Files already there are known at the start and
+    not reported. A new file is reported once, after its size and mtime
+    are unchanged for settle_secs, so a file still being copied or saved
+    into the folder is not reported half written.
+
+    On Linux, the watcher sleeps on inotify events for the folders and
+    wakes when a file is created, written, moved or deleted. Elsewhere, or
+    if inotify is not available, it polls every poll_secs. A folder is
+    listed with bsm_WB_FOLDER_scan(), cached by the folder mtime, so a
+    poll of an unchanged folder is one stat() call.
+
+    No dependencies to other application layers.
+"""
+#endregion folder_watcher.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, os, sys, time, select, ctypes, ctypes.util
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budget_storage_model.budget_storage_model import (
+    bsm_WB_FOLDER_scan, bsm_filter_workbook_names)
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_WATCH_SETTLE_SECS = 2.0  # a new file is unchanged this long to be reported
+BSM_WATCH_POLL_SECS = 1.0  # poll interval, also while files are settling
+BSM_WATCH_IDLE_SECS = 5.0  # longest inotify wait, to check for a stop
+# inotify(7) constants
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+                  _IN_CREATE | _IN_DELETE)
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    _Inotify class
+class _Inotify:
+    """Wait for changes in folders with Linux inotify, through libc."""
+    def __init__(self, folders : List[Path]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                           use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            for folder in folders:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(folder),
+                                            _IN_WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(),
+                                  f"inotify_add_watch failed: '{folder}'")
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout : float) -> bool:
+        """Wait for events up to timeout seconds, True if any arrived."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # The events only wake the watcher, the folders are scanned after.
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+#endregion _Inotify class
+# ---------------------------------------------------------------------------- +
+#region    FolderWatcher class
+class FolderWatcher:
+    """Report workbook files that arrive in folders, once they settle.
+
+    Use wait() to sleep until a folder may have changed, and poll() to get
+    the new files that settled since the last poll().
+    """
+    def __init__(self, folders : List[Path],
+                 settle_secs : float = BSM_WATCH_SETTLE_SECS,
+                 poll_secs : float = BSM_WATCH_POLL_SECS,
+                 use_inotify : bool = True) -> None:
+        try:
+            p3u.is_obj_of_type("folders", folders, list, raise_error=True)
+            self.folders = [Path(f) for f in folders]
+            self.settle_secs = settle_secs
+            self.poll_secs = poll_secs
+            # Path str -> ((size, mtime_ns), monotonic time first seen so).
+            self._pending : Dict[str, Tuple[Tuple[int, int], float]] = {}
+            # The files present at the start are not new.
+            self._known : Set[str] = set(map(str, self._scan()))
+            self._inotify : _Inotify = None
+            if use_inotify and sys.platform.startswith("linux"):
+                try:
+                    self._inotify = _Inotify(self.folders)
+                except Exception as e:
+                    logger.warning(f"BSM: inotify not available, polling: "
+                                   f"{p3u.exc_err_msg(e)}")
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+
+    def __enter__(self) -> "FolderWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def mode(self) -> str:
+        """'inotify' or 'poll', how the watcher waits for changes."""
+        return "inotify" if self._inotify is not None else "poll"
+
+    def _scan(self) -> List[Path]:
+        paths = []
+        for folder in self.folders:
+            for filetype_paths in bsm_WB_FOLDER_scan(folder).values():
+                paths.extend(filetype_paths)
+        return bsm_filter_workbook_names(paths)
+
+    def wait(self, timeout : float = None) -> None:
+        """Sleep until a folder may have changed, or a poll is due."""
+        t = self.poll_secs
+        if self._inotify is not None and not self._pending:
+            # Nothing is settling, sleep until inotify reports a change.
+            t = BSM_WATCH_IDLE_SECS
+        if timeout is not None:
+            t = max(0.0, min(t, timeout))
+        if self._inotify is not None:
+            self._inotify.wait(t)
+        else:
+            time.sleep(t)
+
+    def poll(self) -> List[Path]:
+        """Return the new workbook files settled since the last poll."""
+        try:
+            now = time.monotonic()
+            current, ready = set(), []
+            for path in self._scan():
+                key = str(path)
+                current.add(key)
+                if key in self._known:
+                    continue
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                sig = (st.st_size, st.st_mtime_ns)
+                seen = self._pending.get(key)
+                if seen is None or seen[0] != sig:
+                    # New, or still changing, the settle time restarts.
+                    self._pending[key] = (sig, now)
+                elif now - seen[1] >= self.settle_secs:
+                    del self._pending[key]
+                    self._known.add(key)
+                    ready.append(path)
+            # A removed file is forgotten, it is new if it comes back.
+            self._known &= current
+            for key in [k for k in self._pending if k not in current]:
+                del self._pending[key]
+            return sorted(ready)
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+
+    def close(self) -> None:
+        """Release the inotify file descriptor, if any."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+#endregion FolderWatcher class
+# ---------------------------------------------------------------------------- +
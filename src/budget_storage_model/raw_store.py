@@ -0,0 +1,181 @@
+# ---------------------------------------------------------------------------- +
+#region    raw_store.py module
+""" Content-addressed store of the raw input files of an FI, in the BSM.
+
+    Raw downloads are never modified. The same statement is often
+    downloaded again under another name, e.g., 'May2024_4747 (1).csv'. The
+    raw store keeps each distinct file content once, by its sha256, in the
+    BSM_RAW_STORE_FOLDER of the FI folder, apart from the user's raw
+    download folder:
+
+        .budman_raw_store/objects/<sha256>   The file content, read-only.
+        .budman_raw_store/manifest.json      The name -> sha256 manifest.
+
+    The sha256 of a file comes from the manifest of its own folder, see
+    bsm_WB_FILES_manifest_sha256(), so an unchanged file is not hashed
+    again. The manifest also has the files processed by each workflow, by
+    sha256, with the fingerprint of each output. A workflow checks
+    bsm_RAW_STORE_processed() to skip a file with the same content as one
+    it already processed under another name, while that output is
+    unchanged.
+
+    No dependencies to other application layers.
+"""
+#endregion raw_store.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, json, os, shutil, stat, threading
+from pathlib import Path
+from typing import Dict, List, Any
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budget_storage_model.budget_storage_model import bsm_file_fingerprint
+from budget_storage_model.folder_manifest import bsm_WB_FILES_manifest_sha256
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_RAW_STORE_FOLDER = ".budman_raw_store"  # in the FI folder
+BSM_RAW_OBJECTS_FOLDER = "objects"
+BSM_RAW_MANIFEST = "manifest.json"
+BSM_RAW_MANIFEST_VERSION = 1
+# Manifest keys.
+RAW_NAMES = "names"  # file name -> sha256
+RAW_PROCESSED = "processed"  # sha256 -> wf_key -> {name, out_path, out_fp}
+_manifest_lock = threading.Lock()
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    Manifest functions
+def _manifest_path(raw_root : Path) -> Path:
+    return Path(raw_root) / BSM_RAW_MANIFEST
+
+def _manifest_load(raw_root : Path) -> Dict[str, Any]:
+    path = _manifest_path(raw_root)
+    manifest = None
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"BSM: Ignoring unreadable raw manifest "
+                           f"'{path}': {p3u.exc_err_msg(e)}")
+    if not isinstance(manifest, dict) or \
+            manifest.get("version") != BSM_RAW_MANIFEST_VERSION:
+        manifest = {"version": BSM_RAW_MANIFEST_VERSION}
+    for key in (RAW_NAMES, RAW_PROCESSED):
+        manifest.setdefault(key, {})
+    return manifest
+
+def _manifest_save(raw_root : Path, manifest : Dict[str, Any]) -> None:
+    path = _manifest_path(raw_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+#endregion Manifest functions
+# ---------------------------------------------------------------------------- +
+#region    bsm_RAW_STORE_object_path() function
+def bsm_RAW_STORE_object_path(raw_root : Path, sha256 : str) -> Path:
+    """Return the path of the object with the content sha256."""
+    return Path(raw_root) / BSM_RAW_OBJECTS_FOLDER / sha256
+#endregion bsm_RAW_STORE_object_path() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_RAW_STORE_ingest() function
+def bsm_RAW_STORE_ingest(raw_root : Path,
+                         file_paths : List[Path]) -> Dict[str, str]:
+    """Store the content of the files in the raw store, once per content.
+
+    A file is hashed only if it is new or its fingerprint changed, see
+    bsm_WB_FILES_manifest_sha256(). A file with the same content as one
+    stored under another name is logged and not stored again.
+
+    Args:
+        raw_root (Path): The raw store folder of the FI.
+        file_paths (List[Path]): The files to ingest.
+
+    Returns:
+        Dict[str, str]: The sha256 of each file, by str(file_path).
+    """
+    try:
+        p3u.is_obj_of_type("file_paths", file_paths, list, raise_error=True)
+        raw_root = Path(raw_root)
+        shas = bsm_WB_FILES_manifest_sha256(file_paths)
+        with _manifest_lock:
+            manifest = _manifest_load(raw_root)
+            names = manifest[RAW_NAMES]
+            changed = False
+            for file_path in map(Path, file_paths):
+                sha = shas[str(file_path)]
+                obj_path = bsm_RAW_STORE_object_path(raw_root, sha)
+                if not obj_path.exists():
+                    obj_path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = obj_path.with_name(f".{sha}.{os.getpid()}.tmp")
+                    shutil.copyfile(file_path, tmp_path)
+                    os.chmod(tmp_path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+                    os.replace(tmp_path, obj_path)
+                    logger.info(f"BizEVENT: BSM: Stored raw file "
+                                f"'{file_path.name}' as '{sha[:12]}'")
+                elif names.get(file_path.name) != sha:
+                    same = sorted(n for n, s in names.items() if s == sha)
+                    if same:
+                        logger.info(f"BizEVENT: BSM: Raw file "
+                                    f"'{file_path.name}' has the same "
+                                    f"content as {same}")
+                if names.get(file_path.name) != sha:
+                    names[file_path.name] = sha
+                    changed = True
+            if changed:
+                _manifest_save(raw_root, manifest)
+        return shas
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_RAW_STORE_ingest() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_RAW_STORE_processed() function
+def bsm_RAW_STORE_processed(raw_root : Path, sha256 : str,
+                            wf_key : str) -> Dict[str, Any]:
+    """Return how wf_key processed the content sha256, None if it did not.
+
+    Returns:
+        Dict[str, Any]: With keys 'name', the file name processed,
+        'out_path', the output it was processed to, and 'out_fp', the
+        bsm_file_fingerprint() of the output when it was processed.
+    """
+    with _manifest_lock:
+        manifest = _manifest_load(raw_root)
+    return manifest[RAW_PROCESSED].get(sha256, {}).get(wf_key)
+#endregion bsm_RAW_STORE_processed() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_RAW_STORE_processed_set() function
+def bsm_RAW_STORE_processed_set(raw_root : Path, wf_key : str,
+                                processed : Dict[str, Dict[str, str]]) -> None:
+    """Record the contents wf_key processed, with their output fingerprints.
+
+    Args:
+        raw_root (Path): The raw store folder of the FI.
+        wf_key (str): The workflow.
+        processed (Dict[str, Dict[str, str]]): sha256 -> {'name': file name,
+            'out_path': output path}. The output must exist.
+    """
+    try:
+        if not processed:
+            return
+        with _manifest_lock:
+            manifest = _manifest_load(raw_root)
+            for sha, entry in processed.items():
+                entry = dict(entry)
+                entry["out_fp"] = bsm_file_fingerprint(Path(entry["out_path"]),
+                                                       content_hash=False)
+                manifest[RAW_PROCESSED].setdefault(sha, {})[wf_key] = entry
+            _manifest_save(raw_root, manifest)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_RAW_STORE_processed_set() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,222 @@
+# ---------------------------------------------------------------------------- +
+#region    sqlite_backend.py module
+""" SQLite storage backend for BSM URLs.
+
+    A sqlite:// URL names a SQLite database file and the key of an object
+    stored in it, e.g.,
+
+        sqlite:///home/me/budman/budman.db?key=budget_manager_store
+        sqlite:///home/me/budman/budman.db?key=boa/new/checking.xlsx
+
+    A BDM_STORE is stored one row per top-level property, the value as json.
+    A put writes only the properties changed, a property can be read alone.
+    A workbook is stored one row per worksheet row, the cell values as a
+    json array, so a range of rows is read through the primary key index.
+    Only the cell values of a workbook are stored, not styles or formulas.
+
+    No dependencies to other application layers.
+"""
+#endregion sqlite_backend.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, json, sqlite3, datetime
+from contextlib import closing
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from typing import List, Tuple, Any, Callable
+
+# third-party modules and packages
+import pyjson5 as json5
+from openpyxl import Workbook
+
+# local modules and packages
+from budman_namespace import BSM_PERSISTED_PROPERTIES, BDM_STORE
+from budget_storage_model.storage_backends import (
+    StorageBackend, bsm_STORAGE_backend_register)
+from budget_storage_model.workbook_values import WorkbookValues, WorksheetValues
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bdm_store (
+    store_key TEXT NOT NULL, prop TEXT NOT NULL, value TEXT,
+    PRIMARY KEY (store_key, prop)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS wb_sheet (
+    wb_key TEXT NOT NULL, sheet_idx INTEGER NOT NULL, title TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (wb_key, sheet_idx)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS wb_row (
+    wb_key TEXT NOT NULL, title TEXT NOT NULL, row_idx INTEGER NOT NULL,
+    cells TEXT NOT NULL,
+    PRIMARY KEY (wb_key, title, row_idx)) WITHOUT ROWID;
+"""
+# Tags of the cell value types json has no type for.
+_CELL_TYPES = {
+    "$dt": (datetime.datetime, datetime.datetime.fromisoformat),
+    "$d": (datetime.date, datetime.date.fromisoformat),
+    "$t": (datetime.time, datetime.time.fromisoformat),
+}
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    Cell value encoding
+def _cell_default(value : Any) -> Any:
+    # datetime is a subclass of date, so it is tested first.
+    for tag, (cls, _) in _CELL_TYPES.items():
+        if isinstance(value, cls):
+            return {tag: value.isoformat()}
+    return str(value)
+
+def _cell_hook(obj : dict) -> Any:
+    if len(obj) == 1:
+        tag, value = next(iter(obj.items()))
+        if tag in _CELL_TYPES:
+            return _CELL_TYPES[tag][1](value)
+    return obj
+
+def _row_encode(row : Tuple[Any, ...]) -> str:
+    return json.dumps(row, default=_cell_default, separators=(",", ":"))
+
+def _row_decode(cells : str) -> Tuple[Any, ...]:
+    return tuple(json.loads(cells, object_hook=_cell_hook))
+#endregion Cell value encoding
+# ---------------------------------------------------------------------------- +
+#region    SqliteStorageBackend class
+class SqliteStorageBackend(StorageBackend):
+    """Store BDM_STOREs and workbook values in SQLite database files."""
+    scheme = "sqlite"
+
+    @staticmethod
+    def _parse(url : str) -> Tuple[Path, str]:
+        """Return the database path and object key of a sqlite:// URL."""
+        parsed_url = urlparse(url)
+        if not parsed_url.path:
+            raise ValueError(f"Invalid URL has no path: {url}")
+        db_path = Path.from_uri(
+            parsed_url._replace(scheme="file", query="", fragment="").geturl())
+        keys = parse_qs(parsed_url.query).get("key")
+        if not keys or not keys[0]:
+            raise ValueError(f"sqlite URL has no key: {url}")
+        return db_path, keys[0]
+
+    @staticmethod
+    def _connect(db_path : Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def BDM_STORE_get(self, bdms_url : str,
+                      rehydrate : Callable = None) -> BDM_STORE:
+        db_path, key = self._parse(bdms_url)
+        if not db_path.exists():
+            raise FileNotFoundError(f"file does not exist: {db_path}")
+        with closing(self._connect(db_path)) as conn:
+            rows = conn.execute(
+                "SELECT prop, value FROM bdm_store WHERE store_key = ?",
+                (key,)).fetchall()
+        if len(rows) == 0:
+            raise FileNotFoundError(f"No BDM_STORE at url: {bdms_url}")
+        bdm_store = {prop: json5.decode(value) for prop, value in rows}
+        if rehydrate is not None:
+            rehydrate(bdm_store)
+        return bdm_store
+
+    def BDM_STORE_put(self, bdm_store : BDM_STORE, bdms_url : str) -> None:
+        db_path, key = self._parse(bdms_url)
+        values = {k: json5.encode(v) for k, v in bdm_store.items()
+                  if k in BSM_PERSISTED_PROPERTIES}
+        with closing(self._connect(db_path)) as conn, conn:
+            stored = dict(conn.execute(
+                "SELECT prop, value FROM bdm_store WHERE store_key = ?",
+                (key,)).fetchall())
+            changed = [(key, k, v) for k, v in values.items()
+                       if stored.get(k) != v]
+            removed = [(key, k) for k in stored if k not in values]
+            conn.executemany(
+                "INSERT OR REPLACE INTO bdm_store (store_key, prop, value) "
+                "VALUES (?, ?, ?)", changed)
+            conn.executemany(
+                "DELETE FROM bdm_store WHERE store_key = ? AND prop = ?", removed)
+        logger.debug(f"BSM: Put {len(changed)} changed, {len(removed)} removed "
+                     f"BDM_STORE properties to '{bdms_url}'")
+
+    def BDM_STORE_property_get(self, bdms_url : str, name : str) -> Any:
+        db_path, key = self._parse(bdms_url)
+        if not db_path.exists():
+            raise FileNotFoundError(f"file does not exist: {db_path}")
+        with closing(self._connect(db_path)) as conn:
+            row = conn.execute(
+                "SELECT value FROM bdm_store WHERE store_key = ? AND prop = ?",
+                (key, name)).fetchone()
+        return None if row is None else json5.decode(row[0])
+
+    def WORKBOOK_get(self, wb_url : str, read_only : bool = False) -> Any:
+        db_path, key = self._parse(wb_url)
+        if not db_path.exists():
+            raise FileNotFoundError(f"file does not exist: {db_path}")
+        with closing(self._connect(db_path)) as conn:
+            sheets = conn.execute(
+                "SELECT title, active FROM wb_sheet WHERE wb_key = ? "
+                "ORDER BY sheet_idx", (key,)).fetchall()
+            if len(sheets) == 0:
+                raise FileNotFoundError(f"No workbook at url: {wb_url}")
+            worksheets = [
+                WorksheetValues(title, [_row_decode(r[0]) for r in conn.execute(
+                    "SELECT cells FROM wb_row WHERE wb_key = ? AND title = ? "
+                    "ORDER BY row_idx", (key, title))])
+                for title, _ in sheets]
+        active_title = next((t for t, a in sheets if a), None)
+        if read_only:
+            return WorkbookValues(wb_url, worksheets, active_title)
+        wb = Workbook()
+        wb.remove(wb.active)
+        for wsv in worksheets:
+            ws = wb.create_sheet(wsv.title)
+            for row in wsv.rows:
+                ws.append(row)
+            if wsv.title == active_title:
+                wb.active = ws
+        return wb
+
+    def WORKBOOK_put(self, wb : Any, wb_url : str) -> None:
+        if not isinstance(wb, (Workbook, WorkbookValues)):
+            raise TypeError(f"sqlite:// stores Workbook objects, "
+                            f"not {type(wb).__name__}")
+        db_path, key = self._parse(wb_url)
+        active_title = wb.active.title if wb.active is not None else None
+        worksheets = wb.worksheets
+        with closing(self._connect(db_path)) as conn, conn:
+            conn.execute("DELETE FROM wb_sheet WHERE wb_key = ?", (key,))
+            conn.execute("DELETE FROM wb_row WHERE wb_key = ?", (key,))
+            for i, ws in enumerate(worksheets):
+                conn.execute(
+                    "INSERT INTO wb_sheet (wb_key, sheet_idx, title, active) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, i, ws.title, int(ws.title == active_title)))
+                conn.executemany(
+                    "INSERT INTO wb_row (wb_key, title, row_idx, cells) "
+                    "VALUES (?, ?, ?, ?)",
+                    ((key, ws.title, r, _row_encode(row)) for r, row in
+                     enumerate(ws.iter_rows(values_only=True), start=1)))
+        logger.debug(f"BSM: Put {len(worksheets)} worksheets to '{wb_url}'")
+
+    def WORKBOOK_rows_get(self, wb_url : str, sheet_name : str,
+                          min_row : int = 1,
+                          max_row : int = None) -> List[Tuple[Any, ...]]:
+        db_path, key = self._parse(wb_url)
+        if not db_path.exists():
+            raise FileNotFoundError(f"file does not exist: {db_path}")
+        sql = ("SELECT cells FROM wb_row WHERE wb_key = ? AND title = ? "
+               "AND row_idx >= ?")
+        params = [key, sheet_name, min_row]
+        if max_row is not None:
+            sql += " AND row_idx <= ?"
+            params.append(max_row)
+        with closing(self._connect(db_path)) as conn:
+            rows = conn.execute(sql + " ORDER BY row_idx", params).fetchall()
+        return [_row_decode(r[0]) for r in rows]
+
+bsm_STORAGE_backend_register(SqliteStorageBackend.scheme, SqliteStorageBackend())
+#endregion SqliteStorageBackend class
+# ---------------------------------------------------------------------------- +
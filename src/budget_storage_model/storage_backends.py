@@ -0,0 +1,170 @@
+# ---------------------------------------------------------------------------- +
+#region    storage_backends.py module
+""" Storage backends for BSM URLs, selected by the URL scheme.
+
+    The BSM url functions, bsm_BDM_STORE_url_get() and _url_put(), and
+    bsm_WORKBOOK_url_get() and _url_put(), look up the StorageBackend
+    registered for the scheme of the URL and call it. Backends:
+
+        file://    Files in the local file system, see budget_storage_model.py.
+        mem://     Objects held in this process, for tests and batch jobs.
+        sqlite://  Tables in a SQLite database file, see sqlite_backend.py.
+
+    A StorageBackend also supports partial reads, one BDM_STORE property or
+    a range of worksheet rows. The StorageBackend class implements them
+    with a full get, a backend overrides them when it can read less.
+
+    Register another backend with bsm_STORAGE_backend_register().
+
+    No dependencies to other application layers.
+"""
+#endregion storage_backends.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, copy, threading
+from urllib.parse import urlparse
+from typing import Dict, List, Tuple, Any, Callable
+
+# third-party modules and packages
+import p3_utils as p3u
+
+from openpyxl import Workbook
+
+# local modules and packages
+from budman_namespace import BSM_PERSISTED_PROPERTIES, BDM_STORE
+from budget_storage_model.workbook_values import WorkbookValues
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+# URL scheme -> StorageBackend
+_backends : Dict[str, "StorageBackend"] = {}
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    StorageBackend class
+class StorageBackend:
+    """Base class of the storage backends for BSM URLs."""
+    scheme : str = None
+
+    def BDM_STORE_get(self, bdms_url : str,
+                      rehydrate : Callable = None) -> BDM_STORE:
+        """Return the BDM_STORE at bdms_url, rehydrated if given."""
+        raise NotImplementedError(f"{self.scheme}:// does not store BDM_STORE.")
+
+    def BDM_STORE_put(self, bdm_store : BDM_STORE, bdms_url : str) -> None:
+        """Store the BSM_PERSISTED_PROPERTIES of bdm_store at bdms_url."""
+        raise NotImplementedError(f"{self.scheme}:// does not store BDM_STORE.")
+
+    def BDM_STORE_property_get(self, bdms_url : str, name : str) -> Any:
+        """Return one property of the BDM_STORE at bdms_url, None if absent."""
+        return self.BDM_STORE_get(bdms_url).get(name)
+
+    def WORKBOOK_get(self, wb_url : str, read_only : bool = False) -> Any:
+        """Return the workbook at wb_url, a read-only view if read_only."""
+        raise NotImplementedError(f"{self.scheme}:// does not store workbooks.")
+
+    def WORKBOOK_put(self, wb : Any, wb_url : str) -> None:
+        """Store the workbook wb at wb_url."""
+        raise NotImplementedError(f"{self.scheme}:// does not store workbooks.")
+
+    def WORKBOOK_rows_get(self, wb_url : str, sheet_name : str,
+                          min_row : int = 1,
+                          max_row : int = None) -> List[Tuple[Any, ...]]:
+        """Return the value tuples of rows min_row to max_row of a worksheet."""
+        wb = self.WORKBOOK_get(wb_url, read_only=True)
+        return list(wb[sheet_name].iter_rows(min_row=min_row, max_row=max_row,
+                                             values_only=True))
+#endregion StorageBackend class
+# ---------------------------------------------------------------------------- +
+#region    MemStorageBackend class
+class MemStorageBackend(StorageBackend):
+    """Store objects in this process, keyed by the URL without its scheme.
+
+    e.g., 'mem://test/budget_manager_store'. A BDM_STORE is copied in and
+    out, as a file would be. A workbook object is kept as is, a get returns
+    the object that was put.
+    """
+    scheme = "mem"
+
+    def __init__(self) -> None:
+        self._stores : Dict[str, BDM_STORE] = {}
+        self._workbooks : Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url : str) -> str:
+        parsed_url = urlparse(url)
+        key = parsed_url.netloc + parsed_url.path
+        if not key:
+            raise ValueError(f"Invalid URL has no path: {url}")
+        return key
+
+    def BDM_STORE_get(self, bdms_url : str,
+                      rehydrate : Callable = None) -> BDM_STORE:
+        key = self._key(bdms_url)
+        with self._lock:
+            if key not in self._stores:
+                raise FileNotFoundError(f"No BDM_STORE at url: {bdms_url}")
+            bdm_store = copy.deepcopy(self._stores[key])
+        if rehydrate is not None:
+            rehydrate(bdm_store)
+        return bdm_store
+
+    def BDM_STORE_put(self, bdm_store : BDM_STORE, bdms_url : str) -> None:
+        filtered = {k: v for k, v in bdm_store.items()
+                    if k in BSM_PERSISTED_PROPERTIES}
+        with self._lock:
+            self._stores[self._key(bdms_url)] = copy.deepcopy(filtered)
+
+    def WORKBOOK_get(self, wb_url : str, read_only : bool = False) -> Any:
+        key = self._key(wb_url)
+        with self._lock:
+            if key not in self._workbooks:
+                raise FileNotFoundError(f"No workbook at url: {wb_url}")
+            wb = self._workbooks[key]
+            if read_only and isinstance(wb, Workbook):
+                # The caller gets the values, not the stored Workbook.
+                return WorkbookValues.from_workbook(wb)
+            return wb
+
+    def WORKBOOK_put(self, wb : Any, wb_url : str) -> None:
+        with self._lock:
+            self._workbooks[self._key(wb_url)] = wb
+
+    def clear(self) -> None:
+        """Remove all stored objects."""
+        with self._lock:
+            self._stores.clear()
+            self._workbooks.clear()
+#endregion MemStorageBackend class
+# ---------------------------------------------------------------------------- +
+#region    Backend registry functions
+def bsm_STORAGE_backend_register(scheme : str, backend : StorageBackend) -> None:
+    """Register the backend for URLs with the scheme, replacing any other."""
+    try:
+        p3u.is_non_empty_str("scheme", scheme, raise_error=True)
+        p3u.is_obj_of_type("backend", backend, StorageBackend, raise_error=True)
+        _backends[scheme.lower()] = backend
+        logger.debug(f"BSM: Registered storage backend for '{scheme}://'")
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+
+def bsm_STORAGE_backend(url : str) -> StorageBackend:
+    """Return the backend registered for the scheme of url."""
+    p3u.is_non_empty_str("url", url, raise_error=True)
+    scheme = urlparse(url).scheme.lower()
+    if not scheme:
+        raise ValueError(f"Invalid URL has no scheme: {url}")
+    if scheme not in _backends:
+        raise ValueError(f"URL scheme is not supported: {scheme}")
+    return _backends[scheme]
+
+def bsm_STORAGE_schemes() -> List[str]:
+    """Return the URL schemes with a registered backend."""
+    return sorted(_backends)
+
+bsm_STORAGE_backend_register(MemStorageBackend.scheme, MemStorageBackend())
+#endregion Backend registry functions
+# ---------------------------------------------------------------------------- +
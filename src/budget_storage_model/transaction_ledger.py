@@ -0,0 +1,161 @@
+# ---------------------------------------------------------------------------- +
+#region    transaction_ledger.py module
+""" SQLite ledger of the categorized transactions of all FIs, in the BSM.
+
+    The categorized transactions are spread over many workbook files, per
+    FI and per month, so a question about a year of spending means opening
+    every one of them. The ledger keeps every categorized row in one local
+    SQLite database file in the budget folder, BSM_LEDGER_FILENAME, one
+    row per transaction keyed by its TID, with indexes for the usual
+    queries: date, year_month, level1/level2, account_code and amount.
+
+    The ledger is updated one source file at a time. The rows of a source
+    file replace the rows last stored from it, and its fingerprint, see
+    bsm_file_fingerprint(), is kept in the ledger_source table, so an
+    unchanged source file is not read again.
+
+    No dependencies to other application layers.
+"""
+#endregion transaction_ledger.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, json, sqlite3, datetime
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable, List, Sequence
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_LEDGER_FILENAME = "budman_ledger.db"  # in the budget folder
+# The columns of a ledger row, in the order given to bsm_LEDGER_source_upsert().
+BSM_LEDGER_ROW_COLUMNS = (
+    "tid", "date", "year_month", "description", "currency", "amount",
+    "account_name", "account_code", "category", "level1", "level2", "level3",
+    "debit_credit")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    tid TEXT PRIMARY KEY, date TEXT, year_month TEXT, description TEXT,
+    currency TEXT, amount REAL, account_name TEXT, account_code TEXT,
+    category TEXT, level1 TEXT, level2 TEXT, level3 TEXT, debit_credit TEXT,
+    fi_key TEXT NOT NULL, source TEXT NOT NULL, updated TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS ledger_date ON ledger (date);
+CREATE INDEX IF NOT EXISTS ledger_year_month ON ledger (year_month);
+CREATE INDEX IF NOT EXISTS ledger_level ON ledger (level1, level2);
+CREATE INDEX IF NOT EXISTS ledger_account_code ON ledger (account_code);
+CREATE INDEX IF NOT EXISTS ledger_amount ON ledger (amount);
+CREATE INDEX IF NOT EXISTS ledger_by_source ON ledger (source);
+CREATE TABLE IF NOT EXISTS ledger_source (
+    source TEXT PRIMARY KEY, fi_key TEXT NOT NULL, fingerprint TEXT NOT NULL,
+    rows INTEGER NOT NULL, updated TEXT NOT NULL) WITHOUT ROWID;
+"""
+_UPSERT = (
+    f"INSERT INTO ledger ({', '.join(BSM_LEDGER_ROW_COLUMNS)}, "
+    f"fi_key, source, updated) "
+    f"VALUES ({', '.join('?' * (len(BSM_LEDGER_ROW_COLUMNS) + 3))}) "
+    f"ON CONFLICT (tid) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in BSM_LEDGER_ROW_COLUMNS[1:]
+                + ("fi_key", "source", "updated")))
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    bsm_LEDGER_connect() function
+def bsm_LEDGER_connect(db_path : Path) -> sqlite3.Connection:
+    """Open the ledger database, create its tables if new.
+
+    The caller closes the connection, e.g., with contextlib.closing().
+    """
+    try:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        # Readers are not blocked while a categorization run writes.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_LEDGER_connect() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_LEDGER_source_current() function
+def bsm_LEDGER_source_current(db_path : Path, source_path : Path) -> bool:
+    """Return True if the ledger has the rows of the unchanged source file."""
+    from budget_storage_model.budget_storage_model import bsm_file_fingerprint_match
+    if not Path(db_path).exists():
+        return False
+    with closing(bsm_LEDGER_connect(db_path)) as conn:
+        row = conn.execute("SELECT fingerprint FROM ledger_source WHERE source = ?",
+                           (str(Path(source_path).resolve()),)).fetchone()
+    return row is not None and bsm_file_fingerprint_match(
+        Path(source_path), json.loads(row["fingerprint"]))
+#endregion bsm_LEDGER_source_current() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_LEDGER_source_upsert() function
+def bsm_LEDGER_source_upsert(db_path : Path, fi_key : str, source_path : Path,
+                             rows : Iterable[Sequence[Any]]) -> int:
+    """Replace the ledger rows of a source file, in one transaction.
+
+    The rows last stored from source_path are deleted, then each row is
+    upserted by TID. A TID already stored from another source file moves
+    to this one.
+
+    Args:
+        db_path (Path): The ledger database file.
+        fi_key (str): The FI of the source file.
+        source_path (Path): The categorized workbook file of the rows.
+        rows (Iterable[Sequence[Any]]): The rows, in BSM_LEDGER_ROW_COLUMNS
+            order.
+
+    Returns:
+        int: The number of rows stored.
+    """
+    from budget_storage_model.budget_storage_model import bsm_file_fingerprint
+    try:
+        st = p3u.start_timer()
+        source_path = Path(source_path)
+        source = str(source_path.resolve())
+        # Fingerprint before the rows are read, a later change is then seen.
+        fingerprint = bsm_file_fingerprint(source_path)
+        updated = datetime.datetime.now().isoformat(timespec="seconds")
+        tail = (fi_key, source, updated)
+        with closing(bsm_LEDGER_connect(db_path)) as conn:
+            with conn:
+                conn.execute("DELETE FROM ledger WHERE source = ?", (source,))
+                cur = conn.executemany(_UPSERT, (tuple(r) + tail for r in rows))
+                count = cur.rowcount
+                conn.execute(
+                    "INSERT OR REPLACE INTO ledger_source VALUES (?, ?, ?, ?, ?)",
+                    (source, fi_key, json.dumps(fingerprint), count, updated))
+        logger.debug(f"BSM: Ledger stored {count} rows from '{source_path.name}' "
+                     f"{p3u.stop_timer(st)}")
+        return count
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_LEDGER_source_upsert() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_LEDGER_query() function
+def bsm_LEDGER_query(db_path : Path, sql : str,
+                     params : Sequence[Any] = ()) -> List[sqlite3.Row]:
+    """Run a read-only query on the ledger, return the result rows.
+
+    Example:
+        bsm_LEDGER_query(db_path, "SELECT level1, SUM(amount) FROM ledger "
+                         "WHERE year_month LIKE ? GROUP BY level1", ("2025-%",))
+    """
+    try:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as conn:
+            conn.row_factory = sqlite3.Row
+            return conn.execute(sql, params).fetchall()
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_LEDGER_query() function
+# ---------------------------------------------------------------------------- +
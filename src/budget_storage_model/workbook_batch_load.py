@@ -0,0 +1,127 @@
+# ---------------------------------------------------------------------------- +
+#region    workbook_batch_load.py module
+""" Parallel values-only loads of a list of workbook files for the BSM.
+
+    A year view loads twelve monthly workbooks, and parsing each xlsx file
+    uses one core. bsm_WORKBOOKS_file_load_values() parses the files in
+    worker processes. An openpyxl Workbook, or even the row tuples of its
+    values, is slow to pickle back to the parent process. Each worker
+    instead packs the parsed values into the compact columnar buffer of
+    the sidecar format, see bsm_WORKBOOK_values_pack(), and the parent
+    unpacks it to WorkbookValues.
+
+    The buffer is also the sidecar file content, so the parent writes the
+    sidecars of the parsed files, and the workers never touch the sidecar
+    index. Files with an up-to-date sidecar are not sent to a worker.
+
+    Depends on numpy. No dependencies to other application layers.
+"""
+#endregion workbook_batch_load.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budman_namespace import WB_FILETYPE_WORKING
+from budget_storage_model.workbook_values import WorkbookValues
+from budget_storage_model.xlsx_stream_reader import bsm_XLSX_file_load_values
+from budget_storage_model.columnar_sidecar import (
+    bsm_WORKBOOK_sidecar_load, bsm_WORKBOOK_sidecar_write,
+    bsm_WORKBOOK_values_pack, bsm_WORKBOOK_values_unpack)
+from budget_storage_model.budget_storage_model import (
+    bsm_file_fingerprint, bsm_WORKBOOK_file_load_values)
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_BATCH_LOAD_MAX_WORKERS = None  # None for os.cpu_count()
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    _WORKBOOK_values_parse() function
+def _WORKBOOK_values_parse(wb_path : Path) -> Tuple[Dict[str, Any], bytes]:
+    """Worker: parse a workbook file, return (fingerprint, packed values).
+
+    The packed values are None if a cell value type has no column
+    encoding, the parent then loads that file itself.
+    """
+    # Fingerprint first, a file changed while parsing is then a stale sidecar.
+    fingerprint = bsm_file_fingerprint(wb_path)
+    wb_values = bsm_XLSX_file_load_values(wb_path)
+    try:
+        return fingerprint, bsm_WORKBOOK_values_pack(wb_values)
+    except (TypeError, OverflowError):
+        return fingerprint, None
+#endregion _WORKBOOK_values_parse() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOKS_file_load_values() function
+def bsm_WORKBOOKS_file_load_values(wb_paths : List[Path],
+                                   max_workers : int = None,
+                                   use_sidecar : bool = True
+                                   ) -> List[WorkbookValues]:
+    """Load the cell values of a list of workbook files, in parallel.
+
+    Args:
+        wb_paths (List[Path]): The workbook files to load.
+        max_workers (int): The process pool size limit, defaults to
+            BSM_BATCH_LOAD_MAX_WORKERS or os.cpu_count(). 1 loads the files
+            in this process.
+        use_sidecar (bool): Use the columnar sidecar cache, default True.
+
+    Returns:
+        List[WorkbookValues]: The values of each file, in wb_paths order.
+    """
+    try:
+        st = p3u.start_timer()
+        p3u.is_obj_of_type("wb_paths", wb_paths, list, raise_error=True)
+        wb_paths = [Path(p) for p in wb_paths]
+        loaded : Dict[int, WorkbookValues] = {}
+        misses = []
+        for i, wb_path in enumerate(wb_paths):
+            if wb_path.suffix.lower() == WB_FILETYPE_WORKING:
+                # Already columnar, nothing to parse.
+                loaded[i] = bsm_WORKBOOK_file_load_values(wb_path)
+                continue
+            wb_values = bsm_WORKBOOK_sidecar_load(wb_path) if use_sidecar else None
+            if wb_values is None:
+                misses.append(i)
+            else:
+                loaded[i] = wb_values
+        max_workers = max_workers or BSM_BATCH_LOAD_MAX_WORKERS or os.cpu_count()
+        max_workers = max(1, min(max_workers, len(misses)))
+        if max_workers == 1:
+            for i in misses:
+                loaded[i] = bsm_WORKBOOK_file_load_values(wb_paths[i],
+                                                          use_sidecar)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                parsed = pool.map(_WORKBOOK_values_parse,
+                                  [wb_paths[i] for i in misses])
+                for i, (fingerprint, data) in zip(misses, parsed):
+                    wb_path = wb_paths[i]
+                    if data is None:
+                        loaded[i] = bsm_WORKBOOK_file_load_values(wb_path, False)
+                        continue
+                    loaded[i] = bsm_WORKBOOK_values_unpack(data, wb_path)
+                    if use_sidecar:
+                        try:
+                            bsm_WORKBOOK_sidecar_write(wb_path, fingerprint,
+                                                       data)
+                        except OSError as e:
+                            logger.warning(f"BSM: Failed to write sidecar for "
+                                           f"'{wb_path}': {p3u.exc_err_msg(e)}")
+        logger.debug(f"BSM: Loaded values of {len(wb_paths)} workbooks, "
+                     f"parsed({len(misses)}) max_workers({max_workers}) "
+                     f"{p3u.stop_timer(st)}")
+        return [loaded[i] for i in range(len(wb_paths))]
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKBOOKS_file_load_values() function
+# ---------------------------------------------------------------------------- +
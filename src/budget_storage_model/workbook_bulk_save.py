@@ -0,0 +1,119 @@
+# ---------------------------------------------------------------------------- +
+#region    workbook_bulk_save.py module
+""" Concurrent saves of a batch of excel workbooks for the BSM.
+
+    Saving the LOADED_WORKBOOKS at month end writes a dozen or more xlsx
+    files. bsm_WORKBOOKS_file_save() saves them on a bounded thread pool.
+    A Workbook is not sent to another process, it is slow to pickle, but
+    the zip compression and file writes of a save release the GIL, so the
+    saves overlap. Each save is bsm_WORKBOOK_file_save(), an atomic temp
+    file write and replace.
+
+    The path of each workbook is looked up by wb_name in a dict. A
+    workbook with no path, a path shared with another workbook, or a value
+    that is not a Workbook, e.g., a read-only WorkbookValues, is not saved
+    and is reported in its result. One failed save does not stop the
+    others.
+
+    No dependencies to other application layers.
+"""
+#endregion workbook_bulk_save.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl import Workbook
+
+# local modules and packages
+from budget_storage_model.budget_storage_model import bsm_WORKBOOK_file_save
+from budget_storage_model.workbook_save_queue import bsm_WORKBOOK_save_pending_wait
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_BULK_SAVE_MAX_WORKERS = 4  # save threads
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    _WORKBOOK_save_timed() function
+def _WORKBOOK_save_timed(wb : Workbook, wb_path : Path,
+                         result : Dict[str, Any]) -> Dict[str, Any]:
+    """Save one workbook, record the status and elapsed time in result."""
+    st = p3u.start_timer()
+    try:
+        # A background save of the same Workbook must not overlap this one.
+        bsm_WORKBOOK_save_pending_wait(wb)
+        bsm_WORKBOOK_file_save(wb, wb_path)
+        result["success"] = True
+    except Exception as e:
+        result["error"] = p3u.exc_err_msg(e)
+    result["elapsed"] = p3u.stop_timer(st)
+    return result
+#endregion _WORKBOOK_save_timed() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKBOOKS_file_save() function
+def bsm_WORKBOOKS_file_save(workbooks : Dict[str, Workbook],
+                            wb_paths : Dict[str, Path],
+                            max_workers : int = BSM_BULK_SAVE_MAX_WORKERS
+                            ) -> Dict[str, Dict[str, Any]]:
+    """Save a batch of workbooks concurrently, each atomically.
+
+    Args:
+        workbooks (Dict[str, Workbook]): The workbooks to save, by wb_name.
+        wb_paths (Dict[str, Path]): The file path of each wb_name.
+        max_workers (int): The save thread pool size limit.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The result of each save, by wb_name, with
+        keys 'wb_name', 'wb_path', 'success', 'error' and 'elapsed'. Errors
+        are in the result rather than raised.
+    """
+    try:
+        st = p3u.start_timer()
+        p3u.is_obj_of_type("workbooks", workbooks, dict, raise_error=True)
+        p3u.is_obj_of_type("wb_paths", wb_paths, dict, raise_error=True)
+        results : Dict[str, Dict[str, Any]] = {}
+        todo = []
+        targets : Dict[str, str] = {}  # resolved path -> wb_name
+        for wb_name, wb in workbooks.items():
+            wb_path = wb_paths.get(wb_name)
+            result = {"wb_name": wb_name, "success": False,
+                      "wb_path": None if wb_path is None else str(wb_path),
+                      "error": None, "elapsed": None}
+            results[wb_name] = result
+            if wb_path is None:
+                result["error"] = f"No path for workbook '{wb_name}'"
+            elif not isinstance(wb, Workbook):
+                result["error"] = (f"Workbook '{wb_name}' is a "
+                                   f"{type(wb).__name__}, not a Workbook")
+            else:
+                key = str(Path(wb_path).resolve())
+                if key in targets:
+                    result["error"] = (f"Workbook '{wb_name}' has the same "
+                                       f"path as '{targets[key]}'")
+                else:
+                    targets[key] = wb_name
+                    todo.append((wb, Path(wb_path), result))
+        if todo:
+            max_workers = max(1, min(max_workers or 1, len(todo)))
+            with ThreadPoolExecutor(max_workers=max_workers,
+                                    thread_name_prefix="bsm_bulk_save") as pool:
+                for f in [pool.submit(_WORKBOOK_save_timed, *args)
+                          for args in todo]:
+                    f.result()
+        failed = [r for r in results.values() if not r["success"]]
+        for r in failed:
+            logger.error(f"BSM: Failed to save wb '{r['wb_name']}': {r['error']}")
+        logger.info(f"BSM: Saved {len(results) - len(failed)} of "
+                    f"{len(results)} workbooks {p3u.stop_timer(st)}")
+        return results
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKBOOKS_file_save() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,182 @@
+# ---------------------------------------------------------------------------- +
+#region    workbook_save_queue.py module
+""" Background save queue for excel workbooks in the BSM.
+
+    Saving an xlsx file zip-compresses every worksheet and can take seconds
+    for a large workbook. The WORKBOOK save queue runs the saves on one
+    worker thread, so the caller, e.g., the CLI, gets control back at once.
+    Each save is bsm_WORKBOOK_file_save(), an atomic temp file write and
+    replace, retried when the file is locked.
+
+    Saves run in the order queued. A save queued for a file that already
+    has a save waiting to start replaces it, the file is written once with
+    the latest Workbook. The Future returned for both saves is the same.
+
+    A queued Workbook must not be changed until its save is done, use
+    bsm_WORKBOOK_save_pending_wait(wb) before changing it again. The 
+    worker is a daemon thread, so the queue is flushed by an atexit 
+    handler, the queued saves are written before the process exits.
+
+    No dependencies to other application layers.
+"""
+#endregion workbook_save_queue.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import atexit, logging, threading
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from pathlib import Path
+from typing import Dict, Tuple
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl import Workbook
+
+# local modules and packages
+from budget_storage_model.budget_storage_model import bsm_WORKBOOK_file_save
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    WorkbookSaveQueue class
+class WorkbookSaveQueue:
+    """Saves workbooks on a background thread, coalescing saves per file."""
+    def __init__(self) -> None:
+        # path_str -> (wb, wb_path, future), waiting to start, oldest first.
+        self._pending : OrderedDict[str, Tuple[Workbook, Path, Future]] = OrderedDict()
+        # Futures not yet reported by flush(), with the path saved.
+        self._futures : Dict[Future, str] = {}
+        self._active : Tuple[Workbook, Future] = None
+        self._cond = threading.Condition()
+        self._thread : threading.Thread = None
+        self.saved = self.coalesced = self.failed = 0
+
+    def submit(self, wb : Workbook, wb_path : Path) -> Future:
+        """Queue a save of wb to wb_path, return the Future of the save."""
+        path_str = str(Path(wb_path).resolve())
+        with self._cond:
+            entry = self._pending.pop(path_str, None)
+            if entry is not None:
+                # Not started yet, the newer wb is saved in its place.
+                f = entry[2]
+                self.coalesced += 1
+            else:
+                f = Future()
+                self._futures[f] = path_str
+            self._pending[path_str] = (wb, Path(wb_path), f)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run,
+                                                name="bsm_save_queue",
+                                                daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return f
+
+    def wait_for(self, wb : Workbook, timeout : float = None) -> None:
+        """Wait until no save of wb is queued or running."""
+        futures = self._futures_of(wb)
+        if futures:
+            wait(futures, timeout=timeout)
+
+    def flush(self, timeout : float = None) -> Dict[str, str]:
+        """Wait for all queued saves, return error messages keyed by path."""
+        with self._cond:
+            futures = dict(self._futures)
+        done, _ = wait(list(futures), timeout=timeout)
+        errors = {}
+        with self._cond:
+            for f in done:
+                self._futures.pop(f, None)
+                if f.exception() is not None:
+                    errors[futures[f]] = p3u.exc_err_msg(f.exception())
+        return errors
+
+    def stats(self) -> Dict[str, int]:
+        """Return the save queue statistics."""
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "active": 0 if self._active is None else 1,
+                "saved": self.saved,
+                "coalesced": self.coalesced,
+                "failed": self.failed
+            }
+
+    def _futures_of(self, wb : Workbook) -> list:
+        with self._cond:
+            futures = [e[2] for e in self._pending.values() if e[0] is wb]
+            if self._active is not None and self._active[0] is wb:
+                futures.append(self._active[1])
+            return futures
+
+    def _run(self) -> None:
+        """The worker thread, save the pending workbooks in order."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    # Idle worker threads exit, submit() starts a new one.
+                    if not self._cond.wait(timeout=5.0) and not self._pending:
+                        self._thread = None
+                        return
+                _, (wb, wb_path, f) = self._pending.popitem(last=False)
+                self._active = (wb, f)
+            if f.set_running_or_notify_cancel():
+                try:
+                    bsm_WORKBOOK_file_save(wb, wb_path)
+                    self.saved += 1
+                    f.set_result(wb_path)
+                except Exception as e:
+                    self.failed += 1
+                    f.set_exception(e)
+            with self._cond:
+                self._active = None
+#endregion WorkbookSaveQueue class
+# ---------------------------------------------------------------------------- +
+#region    BSM WORKBOOK save queue functions
+_save_queue = WorkbookSaveQueue()
+
+def bsm_WORKBOOK_save_queue() -> WorkbookSaveQueue:
+    """Return the process-wide WORKBOOK save queue."""
+    return _save_queue
+
+def bsm_WORKBOOK_file_save_async(wb : Workbook, wb_path : Path) -> Future:
+    """Queue a bsm_WORKBOOK_file_save() of wb to wb_path, return its Future."""
+    try:
+        p3u.is_obj_of_type("wb", wb, Workbook, raise_error=True)
+        f = _save_queue.submit(wb, Path(wb_path))
+        logger.debug(f"BSM: Queued save of wb to '{wb_path}'")
+        return f
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+
+def bsm_WORKBOOK_save_pending_wait(wb : Workbook, timeout : float = None) -> None:
+    """Wait for the queued saves of wb to finish, before changing it."""
+    _save_queue.wait_for(wb, timeout)
+
+def bsm_WORKBOOK_save_queue_flush(timeout : float = None) -> Dict[str, str]:
+    """Wait for all queued WORKBOOK saves, return errors keyed by file path."""
+    try:
+        st = p3u.start_timer()
+        errors = _save_queue.flush(timeout)
+        for path_str, error in errors.items():
+            logger.error(f"BSM: Failed to save wb '{path_str}': {error}")
+        logger.debug(f"BSM: Flushed save queue {p3u.stop_timer(st)}")
+        return errors
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+
+def _save_queue_atexit() -> None:
+    """Write the queued saves before the daemon worker thread is stopped."""
+    try:
+        bsm_WORKBOOK_save_queue_flush()
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+
+atexit.register(_save_queue_atexit)
+#endregion BSM WORKBOOK save queue functions
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,131 @@
+# ---------------------------------------------------------------------------- +
+#region    workbook_values.py module
+""" Read-only, values-only views of excel workbooks for the BSM.
+
+    Commands that only inspect a workbook, e.g., show or check, do not need
+    the styled, editable Workbook object from a full openpyxl load. A
+    WorkbookValues object holds just the cell values of each worksheet as
+    tuples. It is built from a read_only=True, data_only=True load, which
+    streams the rows and skips styles, so it is much faster to load and
+    much smaller in memory. The file is closed once the values are read.
+
+    A WorkbookValues supports the read side of the Workbook API used in
+    Budget Manager: sheetnames, active, wb[sheet_name], and for each
+    worksheet title, max_row, max_column and iter_rows(values_only=True).
+    It cannot be changed or saved.
+
+    No dependencies to other application layers.
+"""
+#endregion workbook_values.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging
+from pathlib import Path
+from typing import List, Tuple, Iterator, Any
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl import load_workbook
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    WorksheetValues class
+class WorksheetValues:
+    """The cell values of one worksheet, one tuple per row."""
+    def __init__(self, title : str, rows : List[Tuple[Any, ...]]) -> None:
+        self.title = title
+        self.rows = rows
+        self.max_row = len(rows)
+        self.max_column = max((len(r) for r in rows), default=0)
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}('{self.title}', "
+                f"rows={self.max_row}, cols={self.max_column})")
+
+    @property
+    def header(self) -> Tuple[Any, ...]:
+        """The first row, the column names of a transaction sheet."""
+        return self.rows[0] if self.rows else ()
+
+    def iter_rows(self, min_row : int = 1, max_row : int = None,
+                  values_only : bool = True) -> Iterator[Tuple[Any, ...]]:
+        """Yield row value tuples, rows are numbered from 1 as in openpyxl."""
+        if not values_only:
+            raise ValueError("WorksheetValues only has cell values, "
+                             "use values_only=True.")
+        end = self.max_row if max_row is None else min(max_row, self.max_row)
+        for i in range(max(min_row, 1) - 1, end):
+            yield self.rows[i]
+#endregion WorksheetValues class
+# ---------------------------------------------------------------------------- +
+#region    WorkbookValues class
+class WorkbookValues:
+    """The cell values of every worksheet in a workbook file, read-only."""
+    read_only = True
+
+    def __init__(self, wb_path : Path, worksheets : List[WorksheetValues],
+                 active_title : str = None) -> None:
+        self.wb_path = wb_path
+        self.worksheets = worksheets
+        self._by_title = {ws.title: ws for ws in worksheets}
+        self._active_title = active_title
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}('{self.wb_path}', "
+                f"sheets={self.sheetnames})")
+
+    def __getitem__(self, title : str) -> WorksheetValues:
+        return self._by_title[title]
+
+    def __contains__(self, title : str) -> bool:
+        return title in self._by_title
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return [ws.title for ws in self.worksheets]
+
+    @property
+    def active(self) -> WorksheetValues:
+        if self._active_title in self._by_title:
+            return self._by_title[self._active_title]
+        return self.worksheets[0] if self.worksheets else None
+
+    @classmethod
+    def load(cls, wb_path : Path) -> "WorkbookValues":
+        """Read the values of an excel workbook file with a read-only load."""
+        try:
+            p3u.is_obj_of_type("wb_path", wb_path, Path, raise_error=True)
+            wb = load_workbook(filename=wb_path, read_only=True, data_only=True)
+            try:
+                active_title = wb.active.title if wb.active is not None else None
+                worksheets = [
+                    WorksheetValues(ws.title, list(ws.iter_rows(values_only=True)))
+                    for ws in wb.worksheets
+                ]
+            finally:
+                # Read-only workbooks hold the file open until closed.
+                wb.close()
+            return cls(wb_path, worksheets, active_title)
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+
+    @classmethod
+    def from_workbook(cls, wb : Any, wb_path : Path = None) -> "WorkbookValues":
+        """Return the values of an in-memory Workbook, a copy of its cells."""
+        try:
+            active_title = wb.active.title if wb.active is not None else None
+            worksheets = [
+                WorksheetValues(ws.title, list(ws.iter_rows(values_only=True)))
+                for ws in wb.worksheets
+            ]
+            return cls(wb_path, worksheets, active_title)
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+#endregion WorkbookValues class
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,142 @@
+# ---------------------------------------------------------------------------- +
+#region    working_data.py module
+""" Columnar working data files for the WF_WORKING workflow stages, in the BSM.
+
+    A WF_WORKING workbook is written by one workflow stage and read by the
+    next, no one opens it in Excel. Saved as xlsx, every stage pays to
+    zip-compress the sheet XML and the next stage pays to parse it again.
+    A workflow with WF_WORKING_FORMAT WF_FORMAT_COLUMNAR saves its working
+    workbooks as WB_FILETYPE_WORKING files instead, the packed column
+    arrays of bsm_WORKBOOK_values_pack(). The file carries the schema, the
+    sheet titles, header row and column types, and every row, TIDs
+    included, with no XML to write or parse. The arrays are compressed
+    with fast zlib level 1, text columns are fixed width and mostly
+    padding, so the file is smaller than the xlsx.
+
+    bsm_WORKBOOK_file_load(), bsm_WORKBOOK_file_load_values() and
+    bsm_WORKBOOK_file_save() dispatch to this module by the file type, so
+    callers do not change. Only the values are kept, not the cell styles.
+    Use bsm_WORKING_file_export() to render a working file to xlsx.
+
+    Depends on numpy. No dependencies to other application layers.
+"""
+#endregion working_data.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, os, zlib
+from pathlib import Path
+from typing import Union
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl import Workbook
+
+# local modules and packages
+from budget_storage_model.workbook_values import WorkbookValues, WorksheetValues
+from budget_storage_model.columnar_sidecar import (
+    bsm_WORKBOOK_values_pack, bsm_WORKBOOK_values_unpack)
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_WORKING_MAGIC = b"BMWD1\n"  # file header, format version 1
+BSM_WORKING_ZLIB_LEVEL = 1
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKING_file_write() function
+def bsm_WORKING_file_write(wb : Union[Workbook, WorkbookValues],
+                           wb_path : Path) -> None:
+    """Write the values of a workbook to a working data file.
+
+    Not atomic, bsm_WORKBOOK_file_save() writes to a temp file and
+    replaces the working file.
+
+    Raises:
+        TypeError: A cell value type has no column encoding.
+    """
+    if isinstance(wb, Workbook):
+        active = wb.active.title if wb.active is not None else None
+        wb = WorkbookValues(wb_path, [
+            WorksheetValues(ws.title, list(ws.iter_rows(values_only=True)))
+            for ws in wb.worksheets], active)
+    with open(wb_path, "wb") as f:
+        f.write(BSM_WORKING_MAGIC)
+        f.write(zlib.compress(bsm_WORKBOOK_values_pack(wb),
+                              BSM_WORKING_ZLIB_LEVEL))
+#endregion bsm_WORKING_file_write() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKING_file_load_values() function
+def bsm_WORKING_file_load_values(wb_path : Path) -> WorkbookValues:
+    """Load the values of a working data file, read-only."""
+    try:
+        with open(wb_path, "rb") as f:
+            data = f.read()
+        if not data.startswith(BSM_WORKING_MAGIC):
+            raise ValueError(f"Not a working data file: '{wb_path}'")
+        data = zlib.decompress(memoryview(data)[len(BSM_WORKING_MAGIC):])
+        return bsm_WORKBOOK_values_unpack(data, Path(wb_path))
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKING_file_load_values() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKING_file_load() function
+def bsm_WORKING_file_load(wb_path : Path) -> Workbook:
+    """Load a working data file as an editable Workbook, without styles."""
+    try:
+        wb_values = bsm_WORKING_file_load_values(wb_path)
+        wb = Workbook()
+        wb.remove(wb.active)
+        for ws_values in wb_values.worksheets:
+            ws = wb.create_sheet(ws_values.title)
+            for row in ws_values.rows:
+                ws.append(row)
+        if wb_values.active is not None:
+            wb.active = wb.sheetnames.index(wb_values.active.title)
+        elif not wb.worksheets:
+            wb.create_sheet()
+        return wb
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKING_file_load() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_WORKING_file_export() function
+def bsm_WORKING_file_export(wb_path : Path, xlsx_path : Path = None) -> Path:
+    """Render a working data file to an xlsx workbook file.
+
+    Args:
+        wb_path (Path): The working data file.
+        xlsx_path (Path): The xlsx file to write, defaults to wb_path with
+            the .xlsx suffix.
+
+    Returns:
+        Path: The xlsx file written.
+    """
+    try:
+        st = p3u.start_timer()
+        wb_path = Path(wb_path)
+        xlsx_path = Path(xlsx_path or wb_path.with_suffix(".xlsx"))
+        wb_values = bsm_WORKING_file_load_values(wb_path)
+        wb = Workbook(write_only=True)
+        for ws_values in wb_values.worksheets:
+            ws = wb.create_sheet(ws_values.title)
+            for row in ws_values.rows:
+                ws.append(row)
+        if wb_values.active is not None:
+            wb.active = wb_values.sheetnames.index(wb_values.active.title)
+        tmp_path = xlsx_path.with_name(f".{xlsx_path.name}.{os.getpid()}.tmp")
+        try:
+            wb.save(tmp_path)
+            os.replace(tmp_path, xlsx_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        logger.info(f"BizEVENT: BSM: Exported working data '{wb_path.name}' "
+                    f"to '{xlsx_path}' {p3u.stop_timer(st)}")
+        return xlsx_path
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_WORKING_file_export() function
+# ---------------------------------------------------------------------------- +
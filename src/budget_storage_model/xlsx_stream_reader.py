@@ -0,0 +1,291 @@
+# ---------------------------------------------------------------------------- +
+#region    xlsx_stream_reader.py module
+""" Streaming reader of the cell values of xlsx workbook files, in the BSM.
+
+    BudMan workbooks are flat tables, a header row and one row per
+    transaction, yet even a read-only openpyxl load builds a cell dict and
+    a coordinate tuple for every cell. This reader opens the xlsx zip,
+    reads the shared string table and the cell styles once, with the
+    openpyxl readers, then streams each worksheet XML with iterparse and
+    converts the <c> elements of a row straight to values. The values are
+    the same as WorkbookValues.load(), a read-only, data_only openpyxl
+    load: shared and inline strings, numbers as int or float, booleans,
+    and dates by the cell's number format, with the 1904 epoch if set.
+
+    bsm_XLSX_file_columns() returns the typed value columns of a sheet by
+    header name, and converts only the cells of the columns asked for,
+    e.g., BUDMAN_WB_COLUMNS.
+
+    Anything unexpected, a chartsheet, a sheet without a <dimension>, a
+    malformed part, falls back to openpyxl. Set BSM_XLSX_STREAM_READER to
+    False to always use openpyxl.
+
+    No dependencies to other application layers.
+"""
+#endregion xlsx_stream_reader.py module
+# ---------------------------------------------------------------------------- +
+#region    Imports
+# python standard library modules and packages
+import logging, zipfile, posixpath
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl.cell.text import Text
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import (
+    from_excel, from_ISO8601, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904)
+
+# local modules and packages
+from budget_storage_model.workbook_values import WorkbookValues, WorksheetValues
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region    Globals and Constants
+logger = logging.getLogger(__name__)
+BSM_XLSX_STREAM_READER = True  # False to load all values with openpyxl
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+_DIMENSION_TAG = f"{_NS_MAIN}dimension"
+_ROW_TAG = f"{_NS_MAIN}row"
+_CELL_TAG = f"{_NS_MAIN}c"
+_VALUE_TAG = f"{_NS_MAIN}v"
+_INLINE_TAG = f"{_NS_MAIN}is"
+_TEXT_TAG = f"{_NS_MAIN}t"
+_RUN_TAG = f"{_NS_MAIN}r"
+_DIGITS = "0123456789"
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region    _XlsxContext class
+class _XlsxContext:
+    """The workbook parts every worksheet needs, read once per file."""
+    def __init__(self, zf : zipfile.ZipFile) -> None:
+        root = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {r.get("Id"): (r.get("Type"), self._part(r.get("Target")))
+                   for r in rels.iter(f"{_NS_PKG_REL}Relationship")}
+        # (title, member) of each sheet, a chartsheet raises KeyError.
+        self.sheets : List[Tuple[str, str]] = []
+        for s in root.iter(f"{_NS_MAIN}sheet"):
+            rel_type, member = targets[s.get(f"{_NS_REL}id")]
+            if rel_type != f"{_REL_TYPE}worksheet":
+                raise KeyError(f"Not a worksheet: '{s.get('name')}'")
+            self.sheets.append((s.get("name"), member))
+        view = next(root.iter(f"{_NS_MAIN}workbookView"), None)
+        self.active = int(view.get("activeTab", 0)) if view is not None else 0
+        pr = next(root.iter(f"{_NS_MAIN}workbookPr"), None)
+        self.epoch = (CALENDAR_MAC_1904 if pr is not None and
+                      pr.get("date1904") in ("1", "true") else CALENDAR_WINDOWS_1900)
+        self.shared : List[str] = []
+        self.date_styles, self.timedelta_styles = set(), set()
+        for rel_type, member in targets.values():
+            if rel_type == f"{_REL_TYPE}sharedStrings":
+                with zf.open(member) as f:
+                    self.shared = read_string_table(f)
+            elif rel_type == f"{_REL_TYPE}styles":
+                stylesheet = Stylesheet.from_tree(ET.fromstring(zf.read(member)))
+                # By the <c> s attribute text, style 0 is also s absent.
+                self.date_styles = {str(i) for i in stylesheet.date_formats}
+                self.timedelta_styles = {str(i) for i in stylesheet.timedelta_formats}
+                if 0 in stylesheet.date_formats:
+                    self.date_styles.add(None)
+                    if 0 in stylesheet.timedelta_formats:
+                        self.timedelta_styles.add(None)
+        self._columns : Dict[str, int] = {}
+        self._dates : Dict[Tuple[str, str], Any] = {}
+
+    @staticmethod
+    def _part(target : str) -> str:
+        """Return the zip member name of a workbook relationship target."""
+        if target.startswith("/"):
+            return target.lstrip("/")
+        return posixpath.normpath(posixpath.join("xl", target))
+
+    def column(self, coordinate : str) -> int:
+        """Return the column number of a cell coordinate, e.g., 'C12' is 3."""
+        letters = coordinate.rstrip(_DIGITS)
+        col = self._columns.get(letters)
+        if col is None:
+            col = self._columns[letters] = column_index_from_string(letters)
+        return col
+
+    def value(self, c : ET.Element) -> Any:
+        """Return the value of a <c> element, as openpyxl reads it."""
+        t = c.get("t", "n")
+        if t == "inlineStr":
+            child = c.find(_INLINE_TAG)
+            if child is None:
+                return None
+            if len(child) == 1 and child[0].tag == _TEXT_TAG:
+                # Plain text, what openpyxl writes, Text.content is slow.
+                return child[0].text or ""
+            return Text.from_tree(child).content
+        v = c.findtext(_VALUE_TAG, None) or None
+        if v is None:
+            return None
+        if t == "n":
+            s = c.get("s")
+            if s in self.date_styles:
+                # Transaction dates repeat, convert each serial once.
+                key = (v, s)
+                if key not in self._dates:
+                    self._dates[key] = self._date(v, s)
+                return self._dates[key]
+            return float(v) if "." in v or "E" in v or "e" in v else int(v)
+        if t == "s":
+            return self.shared[int(v)]
+        if t == "b":
+            return bool(int(v))
+        if t == "d":
+            return from_ISO8601(v)
+        return v
+
+    def _date(self, v : str, s : str) -> Any:
+        """Return a date styled serial number as openpyxl converts it."""
+        value = float(v) if "." in v or "E" in v or "e" in v else int(v)
+        try:
+            return from_excel(value, self.epoch,
+                              timedelta=s in self.timedelta_styles)
+        except (OverflowError, ValueError):
+            return "#VALUE!"
+#endregion _XlsxContext class
+# ---------------------------------------------------------------------------- +
+#region    _sheet_rows() function
+def _sheet_rows(zf : zipfile.ZipFile, member : str, ctx : _XlsxContext,
+                columns : Sequence[str] = None) -> List[Tuple[Any, ...]]:
+    """Stream a worksheet XML, return its rows as WorkbookValues.load() does.
+
+    Rows are numbered from 1, missing rows are empty, and each row has the
+    columns of the sheet <dimension>. With columns, only the cells of the
+    header row and of the named columns are converted, others are None.
+
+    Raises:
+        ValueError: The sheet has no <dimension>.
+    """
+    rows : List[Tuple[Any, ...]] = []
+    max_col = max_row = None
+    keep = None  # the column numbers to convert, None for all
+    counter = idx = 1
+    row_counter = 0  # the number of the last row read
+    with zf.open(member) as src:
+        for _, elem in ET.iterparse(src):
+            tag = elem.tag
+            if tag == _DIMENSION_TAG:
+                _, _, max_col, max_row = range_boundaries(elem.get("ref"))
+                empty_row = (None,) * max_col
+            elif tag == _ROW_TAG:
+                if max_col is None:
+                    raise ValueError(f"No dimension in sheet '{member}'")
+                r = elem.get("r")
+                idx = row_counter = int(r) if r else row_counter + 1
+                if idx > max_row:
+                    break
+                while counter < idx:
+                    rows.append(empty_row)
+                    counter += 1
+                if counter == idx:
+                    row = [None] * max_col
+                    col = 0
+                    for c in elem:
+                        if c.tag != _CELL_TAG:
+                            continue
+                        coordinate = c.get("r")
+                        col = ctx.column(coordinate) if coordinate else col + 1
+                        if col <= max_col and (keep is None or col in keep):
+                            row[col - 1] = ctx.value(c)
+                    rows.append(tuple(row))
+                    counter += 1
+                    if columns is not None and keep is None and rows[0]:
+                        keep = {i + 1 for i, name in enumerate(rows[0])
+                                if name in columns}
+                elem.clear()
+    if max_row is not None and idx > max_row:
+        # As openpyxl, a sheet cut short by its dimension is filled out.
+        while counter <= max_row:
+            rows.append(empty_row)
+            counter += 1
+    return rows
+#endregion _sheet_rows() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_XLSX_file_load_values() function
+def bsm_XLSX_file_load_values(wb_path : Path) -> WorkbookValues:
+    """Load the cell values of an xlsx file, streamed, openpyxl as fallback.
+
+    Args:
+        wb_path (Path): The xlsx workbook file.
+
+    Returns:
+        WorkbookValues: The values of every worksheet, as from
+        WorkbookValues.load().
+    """
+    try:
+        wb_path = Path(wb_path)
+        if not BSM_XLSX_STREAM_READER:
+            return WorkbookValues.load(wb_path)
+        try:
+            with zipfile.ZipFile(wb_path) as zf:
+                ctx = _XlsxContext(zf)
+                worksheets = [WorksheetValues(title, _sheet_rows(zf, member, ctx))
+                              for title, member in ctx.sheets]
+            active = ctx.sheets[ctx.active][0] if ctx.active < len(ctx.sheets) else None
+            return WorkbookValues(wb_path, worksheets, active)
+        except (KeyError, ValueError, IndexError, TypeError,
+                zipfile.BadZipFile, ET.ParseError) as e:
+            logger.debug(f"BSM: Loading '{wb_path.name}' with openpyxl: "
+                         f"{p3u.exc_err_msg(e)}")
+            return WorkbookValues.load(wb_path)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_XLSX_file_load_values() function
+# ---------------------------------------------------------------------------- +
+#region    bsm_XLSX_file_columns() function
+def bsm_XLSX_file_columns(wb_path : Path, columns : Sequence[str] = None,
+                          sheet_title : str = None) -> Dict[str, List[Any]]:
+    """Return the typed value columns of a flat table sheet, by header name.
+
+    Args:
+        wb_path (Path): The xlsx workbook file.
+        columns (Sequence[str]): The header names of the columns to read,
+            e.g., BUDMAN_WB_COLUMNS, default all. Names not in the header
+            are left out of the result.
+        sheet_title (str): The sheet to read, default the active sheet.
+
+    Returns:
+        Dict[str, List[Any]]: The values below the header row, one list
+        per column, in header order. Empty if the sheet has no rows.
+    """
+    try:
+        wb_path = Path(wb_path)
+        rows = None
+        if BSM_XLSX_STREAM_READER:
+            try:
+                with zipfile.ZipFile(wb_path) as zf:
+                    ctx = _XlsxContext(zf)
+                    titles = [title for title, _ in ctx.sheets]
+                    i = titles.index(sheet_title) if sheet_title else ctx.active
+                    rows = _sheet_rows(zf, ctx.sheets[i][1], ctx, columns)
+            except (KeyError, ValueError, IndexError, TypeError,
+                    zipfile.BadZipFile, ET.ParseError) as e:
+                logger.debug(f"BSM: Reading '{wb_path.name}' with openpyxl: "
+                             f"{p3u.exc_err_msg(e)}")
+        if rows is None:
+            wb_values = WorkbookValues.load(wb_path)
+            ws = wb_values[sheet_title] if sheet_title else wb_values.active
+            rows = ws.rows if ws is not None else []
+        if not rows:
+            return {}
+        wanted = set(columns) if columns is not None else None
+        return {name: [r[i] for r in rows[1:]]
+                for i, name in enumerate(rows[0])
+                if name is not None and (wanted is None or name in wanted)}
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion bsm_XLSX_file_columns() function
+# ---------------------------------------------------------------------------- +
@@ -16,6 +16,7 @@ from p3_utils import exc_err_msg, dscr, start_timer, stop_timer
 # local packages and module libraries
 from budman_settings import *
 from budman_namespace import BDMSingletonMeta
+from budget_storage_model import bsm_WORKBOOK_save_queue_flush
 from budman_view_model import (BudManViewModel, BudManCLIViewDataContext)
 from budman_cli_view import BudManCLIView
 #endregion Imports
@@ -99,6 +100,10 @@ class BudManApp(metaclass=BDMSingletonMeta):
     def budman_app_exit_handler(self):
         """start the cli repl loop."""
         try:
+            # Finish the background workbook saves before exiting.
+            errors = bsm_WORKBOOK_save_queue_flush()
+            if errors:
+                logger.error(f"{len(errors)} workbook saves failed at exit.")
             m = f"BizEVENT: Exiting application {self.settings[APP_NAME]}..."
             logger.info(m)
         except Exception as e:
@@ -454,9 +454,32 @@ class BudManCLIParser():
                 action="store_true", 
                 help="Command is only parsed with results returned.")
 
+            # workflow watch subcommand
+            watch_parser = subparsers.add_parser(
+                "watch",
+                aliases=["w"], 
+                help="Watch the input folder, categorize new workbooks as they arrive.")
+            watch_parser.set_defaults(workflow_cmd="watch")
+            watch_parser.add_argument(
+                "--duration", "-d", type=float,
+                action="store", 
+                default=None,
+                help="Seconds to watch, default is until Ctrl-C.")
+            watch_parser.add_argument(
+                "--settle", "-s", type=float, dest="settle_secs",
+                action="store", 
+                default=None,
+                help="Seconds a new file must be unchanged before it is processed.")
+            watch_parser.add_argument(
+                "--poll", "-p", type=float, dest="poll_secs",
+                action="store", 
+                default=None,
+                help="Seconds between polls of the input folder.")
+
             # self.add_common_args(parser)
             # Instead of propagating, just add common args directly to each subparser:
-            for subparser in [apply_parser, check_parser, reload_parser, categorization_parser]:
+            for subparser in [apply_parser, check_parser, reload_parser, 
+                              categorization_parser, watch_parser]:
                 self.add_common_args(subparser)
         except Exception as e:
             logger.exception(p3u.exc_err_msg(e))
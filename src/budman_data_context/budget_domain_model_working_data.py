@@ -184,6 +184,29 @@ class BDMWorkingData(BudManDataContext, Model_Binding):
             m = f"Error loading workbook with index '{wb_index}': {p3u.exc_err_msg(e)}"
             logger.error(m)
             return False, m
+
+    def dc_WORKBOOK_values_get(self, wb_index: str) -> WORKBOOK_CONTENT:
+        """Model-aware: Return the workbook content at wb_index for reading.
+
+        A workbook in dc_LOADED_WORKBOOKS is returned as is, with any unsaved
+        changes. Otherwise the workbook is read with the read-only fast load
+        path and is not added to dc_LOADED_WORKBOOKS. For commands that never
+        change the workbook.
+        """
+        try:
+            success, result = self.dc_WORKBOOK_by_index(str(wb_index))
+            if not success:
+                raise ValueError(result)
+            wb : BDMWorkbook = result
+            content = self.dc_LOADED_WORKBOOKS.get(wb.wb_id, None)
+            if content is not None:
+                return content
+            logger.debug(f"Reading workbook '{wb.wb_id}' values "
+                         f"from url '{wb.wb_url}'.")
+            return bsm_WORKBOOK_url_get(wb.wb_url, read_only=True)
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
     #endregion BudManDataContext Method Overrides.
     # ------------------------------------------------------------------------ +
     #endregion BudManDataContext (Interface) Property/Method Overrides.
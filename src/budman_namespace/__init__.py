@@ -90,6 +90,7 @@ __all__ = [
     "VALID_BDM_PROPERTIES",
     "BSM_PERSISTED_PROPERTIES",
     "VALID_BSM_BDM_STORE_FILETYPES",
+    "BSM_WORKBOOK_PREFETCH",
     # Well-known column names for banking transactions workbooks.
     "BUDGET_CATEGORY_COL",
     # BDM_OPTIONS Budget Model Options (BMO)Constants
@@ -125,6 +126,10 @@ __all__ = [
     "WF_PREFIX_WORKING",
     "WF_PREFIX_OUT",
     "WF_PURPOSE_FOLDER_MAP",
+    "WF_WORKING_FORMAT",
+    "WF_FORMAT_XLSX",
+    "WF_FORMAT_COLUMNAR",
+    "VALID_WF_FORMATS",
     "VALID_WF_OBJECT_ATTR_KEYS",
     "WF_FOLDER_PATH_ELEMENTS",
     "WF_FOLDER",
@@ -150,8 +155,10 @@ __all__ = [
     "WB_FILETYPE_JSON",
     "WB_FILETYPE_JSONC",
     "WB_FILETYPE_TEXT",
+    "WB_FILETYPE_WORKING",
     "WB_FILETYPE_MAP",
     "VALID_WB_FILETYPES",
+    "WB_SUMMARY_FILE_SUFFIX",
     # BDM_WORKING_DATA
     "BDMWD_INITIALIZED",
     "BDMWD_FI_KEY",
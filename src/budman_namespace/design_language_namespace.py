@@ -61,6 +61,8 @@ BDM_WORKING_DATA_OBJECT = DATA_OBJECT
 # ---------------------------------------------------------------------------- +
 # Valid data store file types for the Budget Storage Model (BSM).
 VALID_BSM_BDM_STORE_FILETYPES = (".json", ".jsonc")
+# Number of workbooks bsm_FI_WF_WORKBOOKS_prefetch() loads ahead of the caller.
+BSM_WORKBOOK_PREFETCH = 2
 BSM_DATA_COLLECTION_CSV_STORE_FILETYPES = (".csv",".txt")
 # ---------------------------------------------------------------------------- +
 # Budget Model Filesystem Path default constants 
@@ -171,10 +173,16 @@ WF_PREFIX_IN = "wf_prefix_in"
 WF_PREFIX_WORKING = "wf_prefix_working"
 WF_PREFIX_OUT = "wf_prefix_out"
 WF_PURPOSE_FOLDER_MAP = "wf_purpose_folder_map" # map of workbook names to paths
+WF_WORKING_FORMAT = "wf_working_format" # file format of WF_WORKING workbooks
+# WF_WORKING_FORMAT values, WF_FORMAT_XLSX when the key is absent.
+WF_FORMAT_XLSX = "xlsx"
+WF_FORMAT_COLUMNAR = "columnar"  # WB_FILETYPE_WORKING files, see the BSM
+VALID_WF_FORMATS = (WF_FORMAT_XLSX, WF_FORMAT_COLUMNAR)
 # Additional WF_OBJECT-related constants
 VALID_WF_OBJECT_ATTR_KEYS = (WF_KEY, WF_NAME, 
                         WF_INPUT_FOLDER, WF_WORKING_FOLDER, WF_OUTPUT_FOLDER,
-                        WF_PREFIX_IN, WF_PREFIX_OUT, WF_PURPOSE_FOLDER_MAP)
+                        WF_PREFIX_IN, WF_PREFIX_OUT, WF_PURPOSE_FOLDER_MAP,
+                        WF_WORKING_FORMAT)
 WF_FOLDER_PATH_ELEMENTS = (WF_INPUT_FOLDER, WF_WORKING_FOLDER, WF_OUTPUT_FOLDER)
 WF_FOLDER = "wf_folder"
 WF_FOLDER_ID = "wf_folder_id"
@@ -228,6 +236,7 @@ WB_FILETYPE_XLSX = ".xlsx"
 WB_FILETYPE_JSON = ".json"
 WB_FILETYPE_JSONC = ".jsonc"
 WB_FILETYPE_TEXT = ".txt"
+WB_FILETYPE_WORKING = ".bmwd"  # BudMan columnar working data, not for humans
 # Valid filetypes for workbook types
 WB_FILETYPE_MAP = {
     WB_TYPE_BDM_STORE: WB_FILETYPE_JSONC,
@@ -238,8 +247,11 @@ WB_FILETYPE_MAP = {
 }
 VALID_WB_FILETYPES = (
     WB_FILETYPE_CSV, WB_FILETYPE_XLSX,
-    WB_FILETYPE_JSON, WB_FILETYPE_JSONC, WB_FILETYPE_TEXT
+    WB_FILETYPE_JSON, WB_FILETYPE_JSONC, WB_FILETYPE_TEXT,
+    WB_FILETYPE_WORKING
 )
+# Category summary file kept next to a categorized workbook, not a workbook.
+WB_SUMMARY_FILE_SUFFIX = ".summary.csv"
 # ---------------------------------------------------------------------------- +
 # The BDM_WORKING_DATA (BDMWD_OBJECT) is designed to be a simple abstraction
 # of the BudgetModel useful to View Models, Views, and other types of 
@@ -201,7 +201,11 @@ from budman_workflows import (
     ORIGINAL_DESCRIPTION_COL_NAME,
     category_map_count, check_sheet_columns,
     map_budget_category, check_sheet_schema,
-    apply_check_register
+    apply_check_register,
+    WorkbookSchemaCache, validate_workbook_schemas, check_workbook_file_schema,
+    SC_VALID, SC_ERRORS,
+    WORKSHEET_digest, BUDMAN_MAPPED_COLUMNS,
+    CategoryAggregator, summary_path, watch_workflow_categorization
     )
 from budman_workflows import budget_category_mapping
 
@@ -232,6 +236,9 @@ CMD_CHECK_REGISTER = "check_register"
 CMD_WF_TASK = "wf_task"
 CMD_TASK_ARGS = "task_args"
 CMD_TASK_NAME = "task_name"
+CMD_DURATION = "duration"
+CMD_SETTLE_SECS = "settle_secs"
+CMD_POLL_SECS = "poll_secs"
 BUDMAN_VALID_CMD_ARGS = (CMD_PARSE_ONLY, CMD_VALIDATE_ONLY,
                         CMD_WHAT_IF, CMD_FI_KEY, CMD_WF_KEY,CMD_WF_PURPOSE,
                         CMD_WB_TYPE, CMD_WB_NAME, CMD_WB_REF,CMD_WB_INFO,
@@ -424,6 +431,7 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 "workflow_cmd_apply": self.WORKFLOW_apply_cmd,
                 "workflow_cmd_check": self.WORKFLOW_check_cmd,
                 "workflow_cmd_task": self.WORKFLOW_task_cmd,
+                "workflow_cmd_watch": self.WORKFLOW_watch_cmd,
             }
         except Exception as e:
             logger.error(p3u.exc_err_msg(e))
@@ -941,7 +949,7 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
     #endregion FI_init_cmd() command method
     # ------------------------------------------------------------------------ +
     #region FI_LOADED_WORKBOOKS_save_cmd() command > save wb 3
-    def FI_LOADED_WORKBOOKS_save_cmd(self, cmd : Dict = None) -> None: 
+    def FI_LOADED_WORKBOOKS_save_cmd(self, cmd : Dict = None) -> Tuple[bool, str]: 
         """Execute FI_save command for one fi_key or 'all'.
         
         This command saves the Data Context aspects of the View Model to
@@ -953,7 +961,12 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
         series of named workflows. A given FD is either of type input or output 
         with respect to the workflow (wb_type). Also, FDs are individually 
         named (wb_name). Specifying a wb_name is optional, but will indicate
-        the command applies to just the named workbook.
+        the command applies to just the named workbook. The LOADED_WORKBOOKS
+        are saved concurrently, see bsm_FI_WF_WORKBOOKS_save().
+
+        Returns:
+            Tuple[bool, str]: True if all workbooks saved, and a message
+            naming any that failed.
 
         Raises:
             RuntimeError: For exceptions.
@@ -1000,13 +1013,19 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 raise RuntimeError(f"{pfx}{m}")
             # Get the LOADED_WORKBOOK_COLLECTION from the BDM_WORKING_DATA.
             lwbl = self.dc_LOADED_WORKBOOKS
-            # For each loaded workbook, save it to its the path .
-            for wb_name, wb in lwbl:
-                self.budget_domain_model.bsm_FI_WF_WORKBOOK_save(wb, wb_name,
-                                                          fi_key, wf_key, wb_type)
+            if not lwbl:
+                m = f"No LOADED_WORKBOOKS found, no action taken."
+                logger.error(m)
+                return False, m
             # Save the workbooks for the specified FI, WF, and WB-type.
+            results = self.budget_domain_model.bsm_FI_WF_WORKBOOKS_save(
+                lwbl, fi_key, wf_key, wb_type)
+            failed = {n: r["error"] for n, r in results.items() if not r["success"]}
+            r = f"Saved {len(results) - len(failed)} of {len(results)} workbooks."
+            for n, error in failed.items():
+                r += f"\n{P2}Failed to save '{n}': {error}"
             logger.info(f"Complete Command: 'Save' {p3u.stop_timer(st)}")   
-            return None
+            return len(failed) == 0, r
         except Exception as e:
             logger.error(p3u.exc_err_msg(e))
             raise
@@ -1170,7 +1189,8 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 if not success:
                     return False, f"Error getting workbook '{wb_ref}': {wb}"
                 l = "Yes" if wb.wb_loaded else "No "
-                result += f"{P2}{wb_index:>2} {l} {wb.wb_name} '{wb.wb_url}'\n"
+                result += f"{P2}{wb_index:>2} {l} {wb.wb_name} '{wb.wb_url}'"
+                result += f"{self.workbook_manifest_str(wb, {})}\n"
             return True, result
         except Exception as e:
             m = p3u.exc_err_msg(e)
@@ -1399,6 +1419,8 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 wf_wb_list = {wb_name: wb}
 
             for wb_name, wb in wf_wb_list.items():
+                # A queued save of this wb must finish before changing it.
+                bsm_WORKBOOK_save_pending_wait(wb)
                 ws = wb.active
                 wb_url = ""
                 if check_register:
@@ -1409,21 +1431,81 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 else:
                     # Check for budget category column, add it if not present.
                     # check_budget_category(ws)
+                    before = WORKSHEET_digest(ws, BUDMAN_MAPPED_COLUMNS)
                     check_sheet_columns(ws)
                     # Map the 'Original Description' column to the 'Budget Category' column.
-                    map_budget_category(ws,ORIGINAL_DESCRIPTION_COL_NAME, BUDGET_CATEGORY_COL)
-                    # TODO: Fix the _save dependence on the DC fi_key, wf_key, wb_type.
-                    # move tot he BDMWorkingData class.
-                    self.model.bdmwd_WORKBOOK_save(wb_name, wb)
+                    aggregator = CategoryAggregator()
+                    map_budget_category(ws,ORIGINAL_DESCRIPTION_COL_NAME, 
+                                        BUDGET_CATEGORY_COL, aggregator)
+                    # Saving is expensive, skip it when the mapping changed nothing.
+                    changed = before != WORKSHEET_digest(ws, BUDMAN_MAPPED_COLUMNS)
+                    wb_sum_path = summary_path(
+                        self.model.bdmwd_WORKBOOK_abs_path_str(wb_name))
+                    if changed:
+                        # TODO: Fix the _save dependence on the DC fi_key, wf_key, wb_type.
+                        # move tot he BDMWorkingData class.
+                        # Saved in the background, the cmd returns at once.
+                        self.model.bdmwd_WORKBOOK_save(wb_name, wb, wait=False)
+                    if changed or not wb_sum_path.exists():
+                        aggregator.save(wb_sum_path)
                     wb_index = self.DC.dc_WORKBOOK_index(wb_name)
                     r += f"{P2}Task: map_budget_category applied to " 
-                    r += f"wb_index: {wb_index:>2} wb_name: '{wb_name:<40}', wb saved. \n"
+                    r += f"wb_index: {wb_index:>2} wb_name: '{wb_name:<40}', "
+                    r += f"wb save queued. \n" if changed else f"unchanged, not saved. \n"
             return True, r
         except Exception as e:
             logger.error(p3u.exc_err_msg(e))
             raise
     #endregion WORKFLOW_categorization_cmd() method
     # ------------------------------------------------------------------------ +
+    #region WORKFLOW_watch_cmd() command > wf watch
+    def WORKFLOW_watch_cmd(self, cmd : Dict) -> Tuple[bool, str]:
+        """Watch the WF_INPUT folder and categorize workbooks as they arrive.
+
+        Runs until the duration in the cmd passes, or Ctrl-C. New workbooks
+        are categorized into the WF_OUTPUT folder, see 
+        watch_workflow_categorization().
+
+        Arguments:
+            cmd (Dict): A valid BudMan View Model Command object. For this
+            command, must contain workflow_cmd = 'watch' resulting in
+            a full command key of 'workflow_cmd_watch'.
+
+        Returns:
+            Tuple[success : bool, result : Any]: The outcome of the command 
+            execution. If success is True, result contains result of the 
+            command, if False, a description of the error.
+        """
+        try:
+            logger.info(f"Start: ...")
+            fi_key = self.cp_cmd_arg_get(cmd, CMD_FI_KEY, self.dc_FI_KEY)
+            wf_key = self.cp_cmd_arg_get(cmd, CMD_WF_KEY, self.dc_WF_KEY)
+            duration = self.cp_cmd_arg_get(cmd, CMD_DURATION, None)
+            settle_secs = self.cp_cmd_arg_get(cmd, CMD_SETTLE_SECS, 
+                                              BSM_WATCH_SETTLE_SECS)
+            poll_secs = self.cp_cmd_arg_get(cmd, CMD_POLL_SECS, 
+                                            BSM_WATCH_POLL_SECS)
+            if fi_key is None or fi_key == ALL_KEY:
+                m = f"watch needs one fi_key, not '{fi_key}', no action taken."
+                logger.error(m)
+                return False, m
+            results = watch_workflow_categorization(
+                self.model, fi_key, wf_key, duration=duration,
+                settle_secs=settle_secs, poll_secs=poll_secs)
+            r = f"Budget Manager Watch: FI('{fi_key}') workflow '{wf_key}'\n"
+            for wb_name, result in results.items():
+                if not result["success"]:
+                    r += f"{P2}wb_name: '{wb_name:<40}' failed: {result['error']}\n"
+                    continue
+                r += f"{P2}wb_name: '{wb_name:<40}' categorized, "
+                r += f"saved. \n" if result["saved"] else f"unchanged, not saved. \n"
+            r += f"{P2}{len(results)} workbooks processed.\n"
+            return True, r
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+    #endregion WORKFLOW_watch_cmd() method
+    # ------------------------------------------------------------------------ +
     #region WORKFLOW_apply_cmd() command > wf cat 2
     def WORKFLOW_apply_cmd(self, cmd : Dict) -> BUDMAN_RESULT:
         """Apply workflow tasks to WORKBOOKS.
@@ -1457,7 +1539,8 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
             wf_purpose = self.cp_cmd_arg_get(cmd, CMD_WF_PURPOSE, None)
             cr_wb_ref = self.cp_cmd_arg_get(cmd, CMD_CHECK_REGISTER, None)
             # Needs a check_register (cr) and a transaction workbook (wb).
-            success, cr_wb, cr_content = self.get_workbook(cr_wb_ref)
+            # The check register is only read.
+            success, cr_wb, cr_content = self.get_workbook(cr_wb_ref, read_only=True)
             if not success:
                 m = f"Failed to load check register '{cr_wb_ref}' - {cr_content}"
                 logger.error(m)
@@ -1469,8 +1552,11 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 return False, m
             logger.debug(f"cr_wb_name: {cr_wb.wb_name}, wb_name: {wb.wb_name}, ")
             # Ready to apply the check register to the workbook.
-            apply_check_register(cr_content, wb_content)
-            return True, ""
+            summary = apply_check_register(cr_content, wb_content)
+            return True, (f"Applied check register '{cr_wb.wb_name}' to "
+                          f"'{wb.wb_name}': matched({summary['matched']}) "
+                          f"unmatched({summary['unmatched']}) "
+                          f"unparsed({summary['unparsed']})")
         except Exception as e:
             logger.error(p3u.exc_err_msg(e))
             raise
@@ -1548,29 +1634,58 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
                 m = f"wb_ref is None, no action taken."
                 logger.error(m)
                 raise RuntimeError(f"{pfx}{m}")
-            wb_name = self.dc_WB_NAME
             all_wbs : bool = False
             r = f"Budget Manager Categorization Workflow:\n"
-            all_wbs, wb_index = self.dc_WB_REF_resolve(wb_ref)
+            all_wbs, wb_index, wb_name = self.dc_WB_REF_resolve(wb_ref)
+            wb_name = wb_name or self.dc_WB_NAME
             # TODO: what_if arg stops here. Build a list of LOADED_WORKBOOKS to process.
-            # Check cmd needs loaded workbooks to check
             lwbl = self.dc_LOADED_WORKBOOKS
-            lwbl_count = len(lwbl) if lwbl else 0
-            if lwbl_count == 0:
-                m = f"No LOADED_WORKBOOKS found, check_cmd requires loaded workbook."
-                logger.warning(m)
-                return False, m
-            if not self.DC.dc_WORKBOOK_loaded(wb_name):
-                m = f"wb_name '{wb_name}' not found in LOADED_WORKBOOKS."
+            bdm = self.budget_domain_model
+            # Schema check results are cached by workbook file fingerprint.
+            cache = WorkbookSchemaCache.load(bdm.bsm_BDM_FOLDER_abs_path())
+            if all_wbs:
+                # Header-only check of all the workbook files, read-only.
+                wb_paths = [Path(wb_ap) for _, wb_ap in bdm.bdmwd_WORKBOOKS_get()]
+                results = validate_workbook_schemas(wb_paths, cache)
+                for wb_ap, result in results.items():
+                    status = "valid" if result[SC_VALID] else "INVALID"
+                    r += f"  {status}: '{wb_ap}' {'; '.join(result[SC_ERRORS])}\n"
+                return True, r
+
+            if wb_name is None:
+                m = f"wb_ref '{wb_ref}' does not name a workbook, no action taken."
                 logger.error(m)
                 return False, m
-            if all_wbs:
-                return False, f"Checking all loaded workbooks is not implemented yet."
-
+            wb_path = Path(bdm.bdmwd_WORKBOOK_abs_path_str(wb_name))
+            if lwbl is None or not self.DC.dc_WORKBOOK_loaded(wb_name):
+                # Not loaded, the file on disk is the workbook.
+                cached = cache.get(wb_path)
+                if cached is not None and cached[SC_VALID]:
+                    # Unchanged since it was last checked valid, skip validation.
+                    cache.save()
+                    r += (f"Checked workbook: Workbook({wb_ref}) '{wb_name}' "
+                          f"(unchanged)\n")
+                    return True, r
+                # Check the file read-only, no corrections.
+                result = cache.put(wb_path, check_workbook_file_schema(wb_path))
+                cache.save()
+                status = "valid" if result[SC_VALID] else "INVALID"
+                r += (f"Checked workbook: Workbook({wb_ref}) '{wb_name}' {status} "
+                      f"{'; '.join(result[SC_ERRORS])}\n")
+                return True, r
             # wb = self.budget_domain_model.bdmwd_WORKBOOK_load(wb_name)
+            # Loaded, the in-memory wb may differ from the file, always check
+            # it. The cache only describes the file, so it is updated only
+            # when the wb is saved.
             wb = lwbl[wb_name]
-            check_sheet_schema(wb)
-            self.budget_domain_model.bdmwd_WORKBOOK_save(wb_name, wb)
+            # A queued save of this wb must finish before changing it.
+            bsm_WORKBOOK_save_pending_wait(wb)
+            sheet_names = list(wb.sheetnames)
+            if check_sheet_schema(wb) and sheet_names != wb.sheetnames:
+                # check_sheet_schema() corrected the sheet title.
+                bdm.bdmwd_WORKBOOK_save(wb_name, wb)
+                cache.put(wb_path, check_workbook_file_schema(wb_path))
+                cache.save()
             r += f"Checked workbook: Workbook({wb_ref}) '{wb_name}'\n"
             return True, r
         except Exception as e:
@@ -1635,7 +1750,11 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
     # ------------------------------------------------------------------------ +
     #region get_workbook_data_collection_info_str() method
     def get_workbook_data_collection_info_str(self) -> Tuple[bool, BDMWorkbook, WORKBOOK_CONTENT]: 
-        """Construct an outout string with information about the WORKBOOKS."""
+        """Construct an outout string with information about the WORKBOOKS.
+
+        The rows, date range and categorized columns come from the folder
+        manifests, see bsm_WB_FOLDER_manifest(), no workbook is loaded.
+        """
         try:
             logger.debug(f"Start: ...")
             # Be workbook-centric is this view of the DC
@@ -1647,11 +1766,14 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
             # Prepare the output result
             result = f"{P2}{FI_WORKBOOK_DATA_COLLECTION}: {wdc_count}\n"
             result += f"{P4}{WB_REF:6}{P2}{WB_TYPE:15}{P2}{WB_NAME:35}{P2}{WF_KEY:15}"
-            result += f"{P2}{WF_PURPOSE:10}{P2}{WF_FOLDER_ID:20}{P2}{WF_FOLDER:18}\n"
+            result += f"{P2}{WF_PURPOSE:10}{P2}{WF_FOLDER_ID:20}{P2}{WF_FOLDER:18}"
+            result += f"{P2}{'rows':>6}{P2}{'dates':22}{P2}categorized\n"
             # result += f"{P2}{WB_URL:150}\n"
             if wdc_count > 0:
+                manifests = {}
                 for i, wb in enumerate(wdc.values()):
-                    result += f"{wb.display_str(i)}\n"
+                    result += f"{wb.display_str(i)}"
+                    result += f"{self.workbook_manifest_str(wb, manifests)}\n"
             if lwbc_count > 0:
                 result += f"{P2}{DC_LOADED_WORKBOOKS}: {lwbc_count}\n"
                 wdcl = list(wdc.keys())
@@ -1667,9 +1789,49 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
             return False, m
     #endregion get_workbook_data_collection_info_str() method
     # ------------------------------------------------------------------------ +
+    #region workbook_manifest_str() method
+    def workbook_manifest_str(self, wb : BDMWorkbook,
+                              manifests : Dict[Path, Dict]) -> str:
+        """Return the rows, date range and categorized flag of a workbook.
+
+        Read from the manifest of the workbook's folder, as last updated,
+        empty if the workbook has no manifest entry.
+
+        Args:
+            wb (BDMWorkbook): The workbook.
+            manifests (Dict[Path, Dict]): The folder manifests already read,
+                by folder, the manifest read here is added.
+        """
+        if not wb.wb_url:
+            return ""
+        try:
+            wb_path = bsm_WB_URL_verify_file_scheme(wb.wb_url, test=False)
+            if wb_path.parent not in manifests:
+                manifests[wb_path.parent] = bsm_WB_FOLDER_manifest(
+                    wb_path.parent, refresh=False)
+            entry = manifests[wb_path.parent].get(wb_path.name)
+        except Exception as e:
+            logger.debug(f"No manifest for '{wb.wb_name}': {p3u.exc_err_msg(e)}")
+            return ""
+        if not entry or "rows" not in entry:
+            return ""
+        dates = (f"{entry['min_date']}..{entry['max_date']}"
+                 if entry["min_date"] else "")
+        categorized = "Yes" if entry["categorized"] else "No"
+        return f"{P2}{entry['rows']:>6}{P2}{dates:22}{P2}{categorized}"
+    #endregion workbook_manifest_str() method
+    # ------------------------------------------------------------------------ +
     #region get_workbook_content() method
-    def get_workbook(self, wb_ref:str, load : bool = True) -> Tuple[bool, BDMWorkbook, WORKBOOK_CONTENT]: 
-        """From the wb_ref, validate and return the loaded content of the workbook."""
+    def get_workbook(self, wb_ref:str, load : bool = True,
+                     read_only : bool = False) -> Tuple[bool, BDMWorkbook, WORKBOOK_CONTENT]: 
+        """From the wb_ref, validate and return the loaded content of the workbook.
+
+        With read_only, a workbook not in LOADED_WORKBOOKS is read with the
+        fast values-only load path and is not added to LOADED_WORKBOOKS.
+        Commands that never change the workbook should use read_only.
+        Otherwise, a workbook with a queued save is returned when the save
+        is done, so the caller may change it.
+        """
         try:
             all_wbs, wb_index, wb_name = self.DC.dc_WB_REF_resolve(wb_ref)
             if self.wb_ref_not_valid(all_wbs, wb_index, wb_name):
@@ -1685,12 +1847,19 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
             wb = result
             wb_content = None
             wb.wb_loaded = wb.wb_id in self.dc_LOADED_WORKBOOKS
-            if not wb.wb_loaded and load:
-                wb_content = self.dc_WORKBOOK_load(wb_index)
-                if wb_index not in self.dc_LOADED_WORKBOOKS:
+            if wb.wb_loaded:
+                wb_content = self.dc_LOADED_WORKBOOKS[wb.wb_id]
+            elif load and read_only:
+                wb_content = self.dc_WORKBOOK_values_get(wb_index)
+            elif load:
+                success, result = self.dc_WORKBOOK_load(wb_index)
+                if not success or wb.wb_id not in self.dc_LOADED_WORKBOOKS:
                     m = f"Failed trying to load wb_ref '{wb_index}':'{wb_name}'."
                     logger.error(m)
                     return False, m, None
+                wb_content = self.dc_LOADED_WORKBOOKS[wb.wb_id]
+            if not read_only and isinstance(wb_content, Workbook):
+                bsm_WORKBOOK_save_pending_wait(wb_content)
             return True, wb, wb_content
         except Exception as e:
             m = p3u.exc_err_msg(e)
@@ -1980,6 +2149,10 @@ class BudManViewModel(Model_Binding): # future ABC for DC, CP, VM interfaces
         """Load a workbook by its wb_index."""
         return self.DC.dc_WORKBOOK_file_load(wb_index)
 
+    def dc_WORKBOOK_values_get(self, wb_index: str) -> WORKBOOK_CONTENT:
+        """Get workbook content by its wb_index for reading, read-only."""
+        return self.DC.dc_WORKBOOK_values_get(wb_index)
+
     def dc_CHECK_REGISTER_name(self, wb_index: int) -> str:
         """DC-Only: Return wb_name for wb_index or None if does not exist."""
         return self.DC.dc_CHECK_REGISTER_name(wb_index)
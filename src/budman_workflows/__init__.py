@@ -23,7 +23,24 @@ from .budget_category_mapping import (
 )
 from .budget_categorization import (
     check_budget_category, check_sheet_columns, map_budget_category,
-    check_sheet_schema,ORIGINAL_DESCRIPTION_COL_NAME, apply_check_register
+    check_sheet_schema,ORIGINAL_DESCRIPTION_COL_NAME, apply_check_register,
+    execute_worklow_categorization, categorize_workbook_file,
+    WORKSHEET_digest, WORKBOOK_file_digest, BUDMAN_MAPPED_COLUMNS,
+    CategoryAggregator, summary_path, categorize_csv_file, categorize_csv_rows,
+    categorize_transaction_values, csv_transactions_xlsx_export,
+    categorization_duplicates, categorization_processed,
+    categorization_output_folder
+)
+from .budget_transactions import generate_hash_key, csv_date, csv_amount
+from .budget_watch import watch_workflow_categorization
+from .budget_ledger import (
+    ledger_db_path, ledger_rows, ledger_file_rows, ledger_update_categorized,
+    ledger_query
+)
+from .workbook_schema_cache import (
+    WorkbookSchemaCache, check_workbook_file_schema,
+    validate_workbook_schemas, validate_folder_schemas,
+    SC_VALID, SC_SHEET_NAMES, SC_MISSING_COLUMNS, SC_ERRORS
 )
 
 # symbols for "from budman_model import *"
@@ -37,5 +54,36 @@ __all__ = [
     "map_category",
     "category_map",
     "category_map_count",
-    "apply_check_register"
+    "apply_check_register",
+    "execute_worklow_categorization",
+    "categorize_workbook_file",
+    "WORKSHEET_digest",
+    "WORKBOOK_file_digest",
+    "BUDMAN_MAPPED_COLUMNS",
+    "CategoryAggregator",
+    "summary_path",
+    "categorize_csv_file",
+    "categorize_csv_rows",
+    "categorize_transaction_values",
+    "csv_transactions_xlsx_export",
+    "categorization_duplicates",
+    "categorization_processed",
+    "categorization_output_folder",
+    "generate_hash_key",
+    "csv_date",
+    "csv_amount",
+    "watch_workflow_categorization",
+    "ledger_db_path",
+    "ledger_rows",
+    "ledger_file_rows",
+    "ledger_update_categorized",
+    "ledger_query",
+    "WorkbookSchemaCache",
+    "check_workbook_file_schema",
+    "validate_workbook_schemas",
+    "validate_folder_schemas",
+    "SC_VALID",
+    "SC_SHEET_NAMES",
+    "SC_MISSING_COLUMNS",
+    "SC_ERRORS"
 ]
\ No newline at end of file
@@ -5,7 +5,9 @@
     Workflow: categorization
     Input Folder: Financial Institution (FI) Incoming Folder (IF)
     Output Folder: Financial Institution (FI) Categorized Folder (CF)
-    FI transaction workbooks are typically excel files. 
+    FI transaction workbooks are typically excel files. BOA .csv downloads
+    are categorized as csv, without openpyxl, see categorize_csv_file().
+    An xlsx workbook is then only an optional export.
 
     Workflow Pattern: Apply a workflow_process (function) to each item in the 
     input folder, placing items in the output folder as appropriate to the 
@@ -18,20 +20,39 @@
 # ---------------------------------------------------------------------------- +
 #region Imports
 # python standard library modules and packages
-import re, pathlib as Path, logging, time, hashlib, datetime
+import re, os, csv, logging, time, hashlib, datetime, itertools
+from pathlib import Path
 from dataclasses import dataclass
+from typing import Iterator, Iterable
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
 
 # third-party modules and packages
 import p3logging as p3l, p3_utils as p3u
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.cell.cell import Cell
+from openpyxl.utils import get_column_letter
 
 # local modules and packages
 from budman_namespace.design_language_namespace import *
 from .budget_category_mapping import (
     map_category, category_map_count, check_register_map)
+from .budget_transactions import (
+    generate_hash_key, csv_date, csv_amount, BOA_WB_COLUMNS,
+    BOA_ORIGINAL_DESCRIPTION_COL_NAME, BOA_DATE_COL_NAME,
+    BOA_CURRENCY_COL_NAME, BOA_AMOUNT_COL_NAME, BOA_ACCOUNT_NAME_COL_NAME,
+    BUDGET_CATEGORY_COL_NAME, ACCOUNT_CODE_COL_NAME, LEVEL_1_COL_NAME,
+    LEVEL_2_COL_NAME, LEVEL_3_COL_NAME, DEBIT_CREDIT_COL_NAME,
+    YEAR_MONTH_COL_NAME, DATE_COL_NAME, ORIGINAL_DESCRIPTION_COL_NAME,
+    CURRENCY_COL_NAME, AMOUNT_COL_NAME, ACCOUNT_NAME_COL_NAME)
+from .budget_ledger import ledger_update_categorized
 from budget_domain_model import (BudgetDomainModel)
+from budget_storage_model import (
+    bsm_WORKBOOK_file_save, csv_DATA_COLLECTION_file_save,
+    bsm_CSV_file_chunk_spans, bsm_CSV_file_chunk_rows,
+    bsm_CSV_file_chunks, bsm_RAW_STORE_ingest, bsm_RAW_STORE_processed,
+    bsm_RAW_STORE_processed_set, bsm_file_fingerprint_match)
 #endregion Imports
 # ---------------------------------------------------------------------------- +
 #region Globals and Constants
@@ -42,45 +63,7 @@ logger = logging.getLogger(__name__)
 # A list of cells from a worksheet row is 0-based, with cell(0) being the value
 # from column 1, or column 'A'.
 
-# Symbols for BOA .csv files.
-BOA_ORIGINAL_DESCRIPTION_COL_NAME = "Original Description"
-BOA_DATE_COL_NAME = "Date"
-BOA_CURRENCY_COL_NAME = "Currency"
-BOA_AMOUNT_COL_NAME = "Amount"
-BOA_ACCOUNT_NAME_COL_NAME = "Account Name"
-
-# BOA csv files originals contain these columns, beginning with "Status".
-BOA_WB_COLUMNS = [
-    "Status", 
-    BOA_DATE_COL_NAME, 
-    BOA_ORIGINAL_DESCRIPTION_COL_NAME,
-    "Split Type", 
-    "Category", 
-    BOA_CURRENCY_COL_NAME, 
-    BOA_AMOUNT_COL_NAME, 
-    "User Description", 
-    "Memo", 
-    "Classification", 
-    BOA_ACCOUNT_NAME_COL_NAME,
-    "Simple Description"
-    ]
-
-# BudMan adds additional columns prior to processing transactions. These
-# columns are filled by BudMan workflows, such as categorization.
-BUDGET_CATEGORY_COL_NAME = "Budget Category"  
-ACCOUNT_CODE_COL_NAME = "Account Code" 
-LEVEL_1_COL_NAME = "Level1" 
-LEVEL_2_COL_NAME = "Level2" 
-LEVEL_3_COL_NAME = "Level3" 
-DEBIT_CREDIT_COL_NAME = "DebitOrCredit"  
-YEAR_MONTH_COL_NAME = "YearMonth"  
-
-# BudMan utilizes the following columns from the BOA side:
-DATE_COL_NAME = BOA_DATE_COL_NAME 
-ORIGINAL_DESCRIPTION_COL_NAME = BOA_ORIGINAL_DESCRIPTION_COL_NAME
-CURRENCY_COL_NAME = BOA_CURRENCY_COL_NAME
-AMOUNT_COL_NAME = BOA_AMOUNT_COL_NAME 
-ACCOUNT_NAME_COL_NAME = BOA_ACCOUNT_NAME_COL_NAME  
+# The BOA and BudMan column names are defined in budget_transactions.py.
 
 # BudMan processes the original .csv file from BOA to product an excel
 # workbook will then have the following columns:
@@ -129,6 +112,16 @@ BOA_WB_COL_DIMENSIONS = {
 }
 BUDMAN_SHEET_NAME = "TransactionData"
 
+# Check register application: transactions in this category with a check
+# number in the description are re-categorized from the check register.
+CHECK_TARGET_CATEGORY = 'Banking.Checks to Categorize'
+CHECK_NUMBER_PATTERN = re.compile(r'^.*Check\s*x*(\d{1,6})\b.*$')
+
+# Parallel categorization: process pool size limit. None means os.cpu_count().
+CATEGORIZATION_MAX_WORKERS = None
+# The size of one chunk of a csv file categorized by categorize_csv_file().
+CATEGORIZATION_CSV_CHUNK_BYTES = 8 * 1024 * 1024
+
 BUDMAN_REQUIRED_COLUMNS = [
     DATE_COL_NAME, 
     ORIGINAL_DESCRIPTION_COL_NAME, 
@@ -143,6 +136,28 @@ BUDMAN_REQUIRED_COLUMNS = [
     YEAR_MONTH_COL_NAME
 ]
 
+# The columns map_budget_category() writes values to.
+BUDMAN_MAPPED_COLUMNS = [
+    BUDGET_CATEGORY_COL_NAME,
+    ACCOUNT_CODE_COL_NAME, 
+    LEVEL_1_COL_NAME, 
+    LEVEL_2_COL_NAME, 
+    LEVEL_3_COL_NAME,
+    DEBIT_CREDIT_COL_NAME,
+    YEAR_MONTH_COL_NAME
+]
+
+# CategoryAggregator summary columns.
+AGGREGATION_KEY_COLUMNS = [
+    YEAR_MONTH_COL_NAME,
+    LEVEL_1_COL_NAME, 
+    LEVEL_2_COL_NAME, 
+    LEVEL_3_COL_NAME,
+    ACCOUNT_CODE_COL_NAME, 
+    DEBIT_CREDIT_COL_NAME
+]
+AGGREGATION_VALUE_COLUMNS = ["Count", "Total"]
+
 #endregion Globals and Constants
 #region dataclasses
 TRANS_PARAMETERS = ["tid", "date", "description", "currency",
@@ -176,33 +191,68 @@ class TransactionData:
     
 #endregion dataclasses
 # ---------------------------------------------------------------------------- +
-#region generate_hash_key(text:str) -> str
-def generate_hash_key(text: str, length:int=12) -> str:
-    """Generate a hash key for the given text.
-    
-    The hash key is generated by removing all non-alphanumeric characters 
-    from the text, converting it to lowercase, and then hashing it using 
-    SHA-256. The resulting hash is then converted to a hexadecimal string.
+#region CategoryAggregator class
+class CategoryAggregator:
+    """Streaming totals of transactions by category and month.
 
-    Args:
-        text (str): The input text to generate a hash key for.
-
-    Returns:
-        str: The generated hash key.
+    map_budget_category() feeds each row to add() as it is categorized, so 
+    the totals are ready when the mapping finishes, without a second read.
+    Sums and counts are kept per AGGREGATION_KEY_COLUMNS key, i.e., 
+    (YearMonth, Level1, Level2, Level3, Account Code, DebitOrCredit).
     """
-    try:
-        if not isinstance(text, str):
-            raise TypeError(f"Expected 'text' arg to be a str, got {type(text)}")
-        # Remove non-alphanumeric characters and convert to lowercase.
-        # cleaned_text = re.sub(r'\W+', '', text).lower()
-        # Generate the SHA-256 hash of the cleaned text.
-        hash_object = hashlib.sha256(text.encode())
-        # Convert the hash to a hexadecimal string.
-        return hash_object.hexdigest()[:length]  #.[:HASH_KEY_LENGTH]
-    except Exception as e:
-        logger.error(p3u.exc_err_msg(e))
-        raise
-#endregion generate_hash_key(text:str) -> str
+    def __init__(self) -> None:
+        self.totals : Dict[Tuple, List] = {}
+        self.row_count : int = 0
+
+    def add(self, year_month:str, l1:str, l2:str, l3:str, 
+            acct_code:str, dORc:str, amount:Any) -> None:
+        """Add one transaction to the totals. Non-numeric amounts count as 0."""
+        key = (year_month, l1, l2, l3, acct_code, dORc)
+        t = self.totals.get(key)
+        if t is None:
+            t = self.totals[key] = [0, 0.0]
+        t[0] += 1
+        if isinstance(amount, (int, float)):
+            t[1] += amount
+        self.row_count += 1
+
+    def merge(self, other : "CategoryAggregator") -> None:
+        """Add the totals of other, e.g., of a chunk categorized elsewhere."""
+        for key, (count, total) in other.totals.items():
+            t = self.totals.get(key)
+            if t is None:
+                t = self.totals[key] = [0, 0.0]
+            t[0] += count
+            t[1] += total
+        self.row_count += other.row_count
+
+    def rows(self) -> List[Tuple]:
+        """Return the totals as sorted (*key, count, total) tuples."""
+        return [(*key, count, round(total, 2)) for key, (count, total) 
+                in sorted(self.totals.items(), 
+                          key=lambda kv: tuple(v or "" for v in kv[0]))]
+
+    def save(self, summary_path:Path) -> None:
+        """Write the totals to a csv file, replacing it atomically."""
+        try:
+            tmp_path = summary_path.with_name(summary_path.name + ".tmp")
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(AGGREGATION_KEY_COLUMNS + AGGREGATION_VALUE_COLUMNS)
+                writer.writerows(self.rows())
+            os.replace(tmp_path, summary_path)
+            logger.info(f"BizEVENT: Saved summary '{summary_path.name}' "
+                        f"{len(self.totals)} totals of {self.row_count} rows.")
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+#endregion CategoryAggregator class
+# ---------------------------------------------------------------------------- +
+#region summary_path(wb_path:Path) -> Path
+def summary_path(wb_path:Path) -> Path:
+    """Return the path of the summary file kept next to a workbook."""
+    return Path(wb_path).with_name(f"{Path(wb_path).stem}{WB_SUMMARY_FILE_SUFFIX}")
+#endregion summary_path(wb_path:Path) -> Path
 # ---------------------------------------------------------------------------- +
 #region check_sheet_columns() function
 def check_sheet_columns(sheet: Worksheet, add_columns: bool = True) -> bool:
@@ -460,6 +510,69 @@ def WORKSHEET_row_data(row:tuple,hdr:list=BUDMAN_WB_COLUMNS) -> TransactionData:
         raise
 #endregion WORKSHEET_row_data(row:list) -> TransactionData
 # ---------------------------------------------------------------------------- +
+#region WORKSHEET_digest(ws:Worksheet, col_names:List[str]) -> str
+def WORKSHEET_digest(ws:Worksheet, col_names:List[str]=None) -> str:
+    """Return a content digest of a worksheet, or of some of its columns.
+
+    The digest covers the header row and the values of the named columns, 
+    or all columns when col_names is None. Empty strs and trailing empty 
+    cells are ignored, so an in-memory sheet and the same sheet read back 
+    from a file agree.
+    Compare digests taken before and after a change to detect whether 
+    anything actually changed.
+
+    Args:
+        ws (Worksheet): The worksheet, normal or read-only.
+        col_names (List[str]): The column names to include, None for all.
+
+    Returns:
+        str: The sha256 hex digest.
+    """
+    try:
+        h = hashlib.sha256()
+        rows = ws.iter_rows(values_only=True)
+        hdr = list(next(rows, ()))
+        col_idx = None
+        if col_names is not None:
+            col_idx = [hdr.index(c) for c in col_names if c in hdr]
+        for values in itertools.chain([tuple(hdr)], rows):
+            if col_idx is not None:
+                values = tuple(values[i] if i < len(values) else None 
+                               for i in col_idx)
+            # An empty str is saved as an empty cell, so it reads back as None.
+            values = tuple(None if v == "" else v for v in values)
+            # Drop trailing empty cells, read-only rows may be padded.
+            n = len(values)
+            while n > 0 and values[n - 1] is None:
+                n -= 1
+            h.update(repr(values[:n]).encode("utf-8"))
+            h.update(b"\n")
+        return h.hexdigest()
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion WORKSHEET_digest(ws:Worksheet, col_names:List[str]) -> str
+# ---------------------------------------------------------------------------- +
+#region WORKBOOK_file_digest(wb_path:Path, col_names:List[str]) -> str
+def WORKBOOK_file_digest(wb_path:Path, col_names:List[str]=None) -> str:
+    """Return WORKSHEET_digest() of the active sheet of a workbook file.
+
+    The workbook is opened read-only, which is much cheaper than a full
+    load or a save. Returns None if the file does not exist.
+    """
+    try:
+        if not Path(wb_path).exists():
+            return None
+        wb = load_workbook(filename=wb_path, read_only=True)
+        try:
+            return WORKSHEET_digest(wb.active, col_names)
+        finally:
+            wb.close()
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion WORKBOOK_file_digest(wb_path:Path, col_names:List[str]) -> str
+# ---------------------------------------------------------------------------- +
 #region split_budget_category() -> tuple function
 def split_budget_category(budget_category: str) -> tuple[str, str, str]:
     """Split a budget category string into three levels.
@@ -537,7 +650,8 @@ def year_month_str(date:object) -> str:
 #endregion year_month_str() function
 # ---------------------------------------------------------------------------- +
 #region map_budget_category() function
-def map_budget_category(sheet:Worksheet,src,dst) -> None:
+def map_budget_category(sheet:Worksheet,src,dst,
+                        aggregator:CategoryAggregator=None) -> None:
     """Map a src column to budget category putting result in dst column.
     
     The sheet has banking transaction data in rows and columns. 
@@ -550,6 +664,8 @@ def map_budget_category(sheet:Worksheet,src,dst) -> None:
         sheet (openpyxl.worksheet): The worksheet to map.
         src (str): The source column to map from.
         dst (str): The destination column to map to. 
+        aggregator (CategoryAggregator): Optional, each mapped row is added 
+            to its totals as it is written.
     """
     try:
         # Validate the input parameters.
@@ -579,21 +695,13 @@ def map_budget_category(sheet:Worksheet,src,dst) -> None:
             logger.error(f"Destination column '{dst}' not found in header row.")
             return
         
-        # TODO: need to refactor this to do replacements by col_name or something.
-        # This is specific to the Budget Category mapping, which now is to be
-        # split into 3 levels: Level1, Level2, Level3.
-
-        # These are values to set in the rows.
+        # The mapped values, in BUDMAN_MAPPED_COLUMNS order, are set in the 
+        # rows by categorize_transaction_values(), dst gets the category.
         date_i = col_i(DATE_COL_NAME,hdr)
-        l1_i = col_i(LEVEL_1_COL_NAME,hdr)
-        l2_i = col_i(LEVEL_2_COL_NAME,hdr)
-        l3_i = col_i(LEVEL_3_COL_NAME,hdr)
         amt_i = col_i(AMOUNT_COL_NAME,hdr)
-        dORc_i = col_i(DEBIT_CREDIT_COL_NAME,hdr)
-        year_month_i = col_i(YEAR_MONTH_COL_NAME,hdr)
         acct_name_i = col_i(ACCOUNT_NAME_COL_NAME,hdr)
-        acct_code_i = col_i(ACCOUNT_CODE_COL_NAME,hdr)
-        acct_cell : Cell = sheet.cell(row=1, column=acct_name_i + 1)
+        mapped_i = [col_i(col, hdr) for col in BUDMAN_MAPPED_COLUMNS]
+        mapped_i[0] = dst_col_index
 
         logger.info(f"Mapping '{src}'({src_col_index}) to "
                     f"'{dst}'({dst_col_index})")
@@ -603,23 +711,18 @@ def map_budget_category(sheet:Worksheet,src,dst) -> None:
             # row is a 'tuple' of Cell objects, 0-based index
             row_idx = row[0].row  # Get the row index, the row number, 1-based.
             # Do the mapping from src to dst.
-            dst_cell = row[dst_col_index]
-            src_value = row[src_col_index].value 
-            dst_value = map_category(src_value)
-            dst_cell.value = dst_value 
-            # row[dst_col_index].value = dst_value 
-            # Set the additional values for BudMan in the row
-            date_val = row[date_i].value
-            year_month = year_month_str(date_val) if date_val else None
-            row[year_month_i].value = year_month
-            l1, l2, l3 = split_budget_category(dst_value)
-            row[l1_i].value = l1 if l1_i != -1 else None
-            row[l2_i].value = l2 if l2_i != -1 else None
-            row[l3_i].value = l3 if l3_i != -1 else None
-            row[dORc_i].value = 'C' if row[amt_i].value > 0 else 'D'
-            acct_value = row[acct_name_i].value
-            t_acct_code = acct_value.split('-')[-1].strip()
-            row[acct_code_i].value = t_acct_code if acct_code_i != -1 else None
+            amount = row[amt_i].value
+            mapped = categorize_transaction_values(
+                row[src_col_index].value, row[date_i].value, amount, 
+                row[acct_name_i].value)
+            for i, value in zip(mapped_i, mapped):
+                row[i].value = value
+            dst_value = mapped[0]
+            if aggregator is not None:
+                # The aggregator key is (YearMonth, Level1, Level2, Level3, 
+                # Account Code, DebitOrCredit).
+                aggregator.add(mapped[6], mapped[2], mapped[3], mapped[4], 
+                               mapped[1], mapped[5], amount)
 
             transaction = WORKSHEET_row_data(row,hdr) 
             trans_str = transaction.data_str()
@@ -636,72 +739,401 @@ def map_budget_category(sheet:Worksheet,src,dst) -> None:
 #endregion map_budget_category() function
 # ---------------------------------------------------------------------------- +
 #region apply_check_register() function
-def apply_check_register(cr_wb_content:BDM_CHECK_REGISTER, trans_wb_ref:BDM_TRANSACTION_WORKBOOK) -> None:
+def apply_check_register(cr_wb_content:BDM_CHECK_REGISTER, trans_wb_ref:BDM_TRANSACTION_WORKBOOK) -> Dict[str, Any]:
     """Apply the check transactions to the worksheet.
     
     The sheet has banking transaction data in rows and columns. 
-    The check_reg has a collection of checks. Scan and match the checks
-    with the content in the worksheet. If found, modify the transactions.
+    The check_reg has a collection of checks, keyed by check number. 
+    
+    The work is done in three steps:
+      1: Index: one pass over the Budget Category and Original Description
+         columns builds a check number -> row index for the rows with the
+         'Banking.Checks to Categorize' category.
+      2: Join: the index is hash-joined with the check register keys.
+      3: Apply: the new category and description are written to the 
+         matched rows in one batch.
 
     Args:
-        sheet (openpyxl.worksheet): The worksheet to process.
-        check_reg (dict): A dictionary of check transactions to apply.
+        cr_wb_content (dict): A dictionary of check transactions to apply,
+            as returned by csv_DATA_COLLECTION_file_load().
+        trans_wb_ref (Workbook): The transaction workbook to modify.
+
+    Returns:
+        Dict[str, Any]: A summary of the work done, with keys:
+            'sheet', 'candidates', 'unparsed', 'matched', 'unmatched',
+            'modified' (list of (row, check_key, new_cat, new_desc)) and
+            'missing' (list of candidate check numbers not in the register).
     """
     try:
         # Validate the input parameters.
         p3u.is_not_obj_of_type("cr_wb_content", cr_wb_content, dict, raise_error=True)
         p3u.is_not_obj_of_type("trans_wb_ref",trans_wb_ref, Workbook, raise_error=True)
-        # Validate the input parameters.
+        st = p3u.start_timer()
         cr = cr_wb_content
         sh = trans_wb_ref.active  # Get the active worksheet.
+        summary = {
+            "sheet": sh.title,
+            "candidates": 0,
+            "unparsed": 0,
+            "matched": 0,
+            "unmatched": 0,
+            "modified": [],
+            "missing": []
+        }
         if not check_sheet_columns(sh, add_columns=False):
             logger.error(f"Sheet '{sh.title}' cannot be mapped due to "
                          f"missing required columns.")
-            return
-        logger.info(f"Applying checks from check register to sheet: '{sh.title}' ")
-        # transactions = WORKSHEET_data(sheet)
-        # A row is a tuple of the Cell objects in the row. Tuples are 0-based
-        # hdr is a list, also 0-based. So, using the index(name) will 
-        # give the cell from a row tuple matching the column name in hdr.
+            return summary
+        # hdr is a list, 0-based. The worksheet columns are 1-based.
         hdr = [cell.value for cell in sh[1]] 
         budget_cat = hdr.index(BUDGET_CATEGORY_COL_NAME)
         orig_desc = hdr.index(ORIGINAL_DESCRIPTION_COL_NAME)
+        # Only read the span of columns holding the two values of interest.
+        min_col = min(budget_cat, orig_desc) + 1
+        max_col = max(budget_cat, orig_desc) + 1
+        bc_i = budget_cat + 1 - min_col
+        od_i = orig_desc + 1 - min_col
 
-        # For each check, with the check number and the Budget Category
-        # 'Banking.Checks to Categorize', find the row in the worksheet to modify.
-        target_cat = 'Banking.Checks to Categorize'
-        check_pat = re.compile(r'^.*Check\s*x*(\d{1,6})\b.*$')  
+        # 1: Index: check_key -> [row numbers], single pass, values only.
+        check_index : Dict[str, List[int]] = {}
+        rows = sh.iter_rows(min_row=2, min_col=min_col, max_col=max_col,
+                            values_only=True)
+        for row_num, values in enumerate(rows, start=2):
+            cat = values[bc_i]
+            if not cat or CHECK_TARGET_CATEGORY not in str(cat):
+                continue
+            summary["candidates"] += 1
+            m = CHECK_NUMBER_PATTERN.match(str(values[od_i] or ""))
+            if m is None:
+                summary["unparsed"] += 1
+                continue
+            check_index.setdefault(m.group(1), []).append(row_num)
 
-        trans_match = []
-        for row in sh.iter_rows(min_row=2):
-            # row is a 'tuple' of Cell objects, 0-based index
-            budget_cat_cell = row[budget_cat]
-            if budget_cat_cell.value and target_cat in budget_cat_cell.value:
-                orig_desc_cell = row[orig_desc]
-                desc = row[orig_desc].value if orig_desc != -1 else ""
-                m = check_pat.match(desc)
-                if m:
-                    check_key = m.group(1)
-                    if check_key in cr:
-                        # Modify the transaction with the check number.
-                        pay_to = cr[check_key]['Pay-To']
-                        new_cat = check_register_map[pay_to] if pay_to in check_register_map else 'Unknown'
-                        new_desc = f"{pay_to} Check: {check_key}"
-                        row[budget_cat].value = new_cat
-                        row[orig_desc].value = new_desc
-                        logger.info(f"Modified transaction for check: '{check_key}' "
-                                    f"new_desc: '{new_desc}' new_cat: '{new_cat}'")
-                logger.info(f"'{sh.title}' Match '{target_cat}' desc={desc}")
-        logger.info(f"Found {len(trans_match)} transactions in sheet "
-                    f"'{sh.title}' with category '{target_cat}' to modify.")
-        return None
+        # 2: Join: hash join of the check index with the check register.
+        trans_match = [(row_num, check_key)
+                       for check_key in check_index.keys() & cr.keys()
+                       for row_num in check_index[check_key]]
+        trans_match.sort()
+        summary["missing"] = sorted(check_index.keys() - cr.keys())
+        summary["matched"] = len(trans_match)
+        summary["unmatched"] = sum(len(check_index[k]) 
+                                   for k in summary["missing"])
+
+        # 3: Apply: batch update of the matched rows.
+        for row_num, check_key in trans_match:
+            pay_to = cr[check_key]['Pay-To']
+            new_cat = check_register_map.get(pay_to, 'Unknown')
+            new_desc = f"{pay_to} Check: {check_key}"
+            sh.cell(row=row_num, column=budget_cat + 1).value = new_cat
+            sh.cell(row=row_num, column=orig_desc + 1).value = new_desc
+            summary["modified"].append((row_num, check_key, new_cat, new_desc))
+        logger.info(f"Applied check register to sheet '{sh.title}': "
+                    f"candidates({summary['candidates']}) "
+                    f"matched({summary['matched']}) "
+                    f"unmatched({summary['unmatched']}) "
+                    f"unparsed({summary['unparsed']}) "
+                    f"{p3u.stop_timer(st)}")
+        if summary["missing"]:
+            logger.debug(f"Check numbers not in check register: "
+                         f"{summary['missing']}")
+        return summary
     except Exception as e:
         logger.error(p3u.exc_err_msg(e))
         raise    
 #endregion apply_check_register() function
 # ---------------------------------------------------------------------------- +
+#region categorize_transaction_values() function
+def categorize_transaction_values(description : str, date : datetime.date,
+                                  amount : float,
+                                  account_name : str) -> Tuple[Any, ...]:
+    """Return the BUDMAN_MAPPED_COLUMNS values of one transaction.
+
+    The budget category mapping rules for one transaction, used by
+    map_budget_category() for worksheet rows and by categorize_csv_rows()
+    for csv rows.
+
+    Args:
+        description (str): The original description of the transaction.
+        date (datetime.date): The transaction date, or None.
+        amount (float): The transaction amount, or None if it has none.
+        account_name (str): The account name, the code is after the last '-'.
+
+    Returns:
+        Tuple[Any, ...]: (budget_category, account_code, level1, level2,
+        level3, debit_or_credit, year_month). debit_or_credit is None
+        when amount is None.
+    """
+    budget_category = map_category(description)
+    l1, l2, l3 = split_budget_category(budget_category)
+    year_month = year_month_str(date) if date else None
+    dORc = None if amount is None else ('C' if amount > 0 else 'D')
+    acct_code = (account_name or "").split('-')[-1].strip()
+    return budget_category, acct_code, l1, l2, l3, dORc, year_month
+#endregion categorize_transaction_values() function
+# ---------------------------------------------------------------------------- +
+#region _csv_columns() function
+def _csv_columns(hdr : List[str]) -> Tuple[List[str], Tuple[int, ...]]:
+    """Return the output header and the input column indices of a csv file.
+
+    The output header is hdr with the BUDMAN_REQUIRED_COLUMNS missing from
+    it appended, as check_sheet_columns() appends them to a worksheet. The
+    indices are of the date, description, amount and account name columns.
+    """
+    hdr = [c.strip() for c in hdr]
+    in_cols = (DATE_COL_NAME, ORIGINAL_DESCRIPTION_COL_NAME, AMOUNT_COL_NAME,
+               ACCOUNT_NAME_COL_NAME)
+    missing = [col for col in in_cols if col not in hdr]
+    if missing:
+        raise ValueError(f"missing required columns: {', '.join(missing)}")
+    out_hdr = hdr + [col for col in BUDMAN_REQUIRED_COLUMNS if col not in hdr]
+    return out_hdr, tuple(hdr.index(col) for col in in_cols)
+#endregion _csv_columns() function
+# ---------------------------------------------------------------------------- +
+#region categorize_csv_rows() function
+def categorize_csv_rows(hdr : List[str], rows : Iterable[List[str]],
+                        aggregator : CategoryAggregator) -> Iterator[List[Any]]:
+    """Categorize csv transaction rows, yield the output rows.
+
+    Only the mapped columns are parsed, the other values are kept as read.
+    Each row is added to the aggregator totals as it is categorized.
+
+    Args:
+        hdr (List[str]): The csv header row.
+        rows (Iterable[List[str]]): The csv data rows.
+        aggregator (CategoryAggregator): Gets the totals of the rows.
+
+    Yields:
+        List[Any]: The rows, in the order of the _csv_columns() header.
+    """
+    out_hdr, (date_i, desc_i, amt_i, acct_name_i) = _csv_columns(hdr)
+    mapped_i = [out_hdr.index(col) for col in BUDMAN_MAPPED_COLUMNS]
+    for row in rows:
+        if not any(row):
+            continue
+        row = row + [""] * (len(out_hdr) - len(row))
+        amount = csv_amount(row[amt_i])
+        mapped = categorize_transaction_values(
+            row[desc_i], csv_date(row[date_i]), amount, row[acct_name_i])
+        for i, value in zip(mapped_i, mapped):
+            row[i] = value
+        # mapped is in BUDMAN_MAPPED_COLUMNS order, the aggregator key is
+        # (YearMonth, Level1, Level2, Level3, Account Code, DebitOrCredit).
+        aggregator.add(mapped[6], mapped[2], mapped[3], mapped[4], 
+                       mapped[1], mapped[5], amount)
+        yield row
+#endregion categorize_csv_rows() function
+# ---------------------------------------------------------------------------- +
+#region _categorize_csv_chunk() function
+def _categorize_csv_chunk(in_path : Path, hdr : List[str], 
+                          span : Tuple[int, int]
+                          ) -> Tuple[List[List[Any]], CategoryAggregator]:
+    """Categorize one chunk span of a csv file, in a worker process."""
+    aggregator = CategoryAggregator()
+    rows = list(categorize_csv_rows(
+        hdr, bsm_CSV_file_chunk_rows(in_path, span), aggregator))
+    return rows, aggregator
+#endregion _categorize_csv_chunk() function
+# ---------------------------------------------------------------------------- +
+#region categorize_csv_file() function
+def categorize_csv_file(wb_name : str, in_path : Path, out_path : Path,
+                        xlsx_path : Path = None, parallel : bool = False,
+                        max_workers : int = None) -> Dict[str, Any]:
+    """Categorize one BOA .csv transaction file, without openpyxl.
+
+    The file is read in chunks of about CATEGORIZATION_CSV_CHUNK_BYTES from
+    a memory map, see bsm_CSV_file_chunks(), and the categorized rows are
+    streamed to out_path as csv. Memory is bounded by the chunks in flight,
+    not the file size. With parallel=True, a file of more than one chunk
+    is categorized in a process pool, a chunk per task. The rows are 
+    written in file order and the chunk totals merged into the summary.
+
+    Args:
+        wb_name (str): The name of the workbook, used in results and logs.
+        in_path (Path): The path of the input .csv file.
+        out_path (Path): The path to save the categorized .csv file to.
+        xlsx_path (Path): Optional, also export the result to this .xlsx
+            file, see csv_transactions_xlsx_export().
+        parallel (bool): Categorize the chunks in a process pool.
+        max_workers (int): The process pool size limit, defaults to 
+            CATEGORIZATION_MAX_WORKERS, or the cpu count when that is None.
+
+    Returns:
+        Dict[str, Any]: The same result as categorize_workbook_file().
+    """
+    st = p3u.start_timer()
+    result = {"wb_name": wb_name, "success": False, "saved": False, 
+              "out_path": str(out_path), "rows": 0, "error": None, 
+              "elapsed": None}
+    try:
+        in_path = Path(in_path)
+        hdr, spans = bsm_CSV_file_chunk_spans(in_path,
+                                              CATEGORIZATION_CSV_CHUNK_BYTES)
+        out_hdr, _ = _csv_columns(hdr)
+        aggregator = CategoryAggregator()
+        if parallel and len(spans) > 1:
+            max_workers = max_workers or CATEGORIZATION_MAX_WORKERS or os.cpu_count()
+            max_workers = max(1, min(max_workers, len(spans)))
+            logger.info(f"Categorize csv '{wb_name}': {len(spans)} chunks, "
+                        f"max_workers({max_workers})")
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                out_rows = _categorize_csv_chunks_parallel(
+                    pool, max_workers, in_path, hdr, spans, aggregator)
+                result["rows"] = csv_DATA_COLLECTION_file_save(
+                    out_rows, out_path, fieldnames=out_hdr)
+        else:
+            out_rows = categorize_csv_rows(
+                hdr, itertools.chain.from_iterable(
+                    rows for _, rows in bsm_CSV_file_chunks(
+                        in_path, CATEGORIZATION_CSV_CHUNK_BYTES)),
+                aggregator)
+            result["rows"] = csv_DATA_COLLECTION_file_save(
+                out_rows, out_path, fieldnames=out_hdr)
+        result["saved"] = True
+        aggregator.save(summary_path(out_path))
+        logger.info(f"Completed csv budget category mapping for "
+                    f"'{result['rows']}' rows.")
+        if xlsx_path is not None:
+            csv_transactions_xlsx_export(out_path, xlsx_path)
+        result["success"] = True
+    except Exception as e:
+        result["error"] = p3u.exc_err_msg(e)
+        logger.error(f"Error categorizing csv file: {wb_name}: {result['error']}")
+    result["elapsed"] = p3u.stop_timer(st)
+    return result
+#endregion categorize_csv_file() function
+# ---------------------------------------------------------------------------- +
+#region _categorize_csv_chunks_parallel() function
+def _categorize_csv_chunks_parallel(pool : ProcessPoolExecutor, 
+                                    max_workers : int, in_path : Path,
+                                    hdr : List[str], 
+                                    spans : List[Tuple[int, int]],
+                                    aggregator : CategoryAggregator
+                                    ) -> Iterator[List[Any]]:
+    """Yield the categorized rows of the chunks in file order.
+
+    At most 2 * max_workers chunks are in flight, so finished chunks 
+    waiting to be written do not pile up in memory.
+    """
+    pending = deque()
+    spans_iter = iter(spans)
+    for span in itertools.islice(spans_iter, 2 * max_workers):
+        pending.append(pool.submit(_categorize_csv_chunk, in_path, hdr, span))
+    while pending:
+        rows, chunk_totals = pending.popleft().result()
+        span = next(spans_iter, None)
+        if span is not None:
+            pending.append(pool.submit(_categorize_csv_chunk, in_path, hdr, span))
+        aggregator.merge(chunk_totals)
+        yield from rows
+#endregion _categorize_csv_chunks_parallel() function
+# ---------------------------------------------------------------------------- +
+#region csv_transactions_xlsx_export() function
+def csv_transactions_xlsx_export(csv_path : Path, xlsx_path : Path) -> int:
+    """Export a categorized transaction .csv file to an .xlsx workbook.
+
+    A write-only workbook is streamed row by row. Dates and amounts are
+    written as typed cells, the column widths are BOA_WB_COL_DIMENSIONS.
+
+    Args:
+        csv_path (Path): The categorized .csv file.
+        xlsx_path (Path): The .xlsx file to write.
+
+    Returns:
+        int: The number of transaction rows exported.
+    """
+    try:
+        st = p3u.start_timer()
+        xlsx_path = Path(xlsx_path)
+        tmp_path = xlsx_path.with_name(f".{xlsx_path.name}.{os.getpid()}.tmp")
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(BUDMAN_SHEET_NAME)
+        count = 0
+        with open(csv_path, "r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            hdr = next(reader, [])
+            for i, col_name in enumerate(hdr, start=1):
+                width = BOA_WB_COL_DIMENSIONS.get(col_name)
+                if width is not None:
+                    ws.column_dimensions[get_column_letter(i)].width = width
+            date_i = col_i(DATE_COL_NAME, hdr)
+            amt_i = col_i(AMOUNT_COL_NAME, hdr)
+            ws.append(hdr)
+            for row in reader:
+                values = [v if v != "" else None for v in row]
+                if date_i != -1 and values[date_i] is not None:
+                    values[date_i] = csv_date(values[date_i])
+                if amt_i != -1 and values[amt_i] is not None:
+                    values[amt_i] = csv_amount(values[amt_i])
+                ws.append(values)
+                count += 1
+        try:
+            wb.save(tmp_path)
+            os.replace(tmp_path, xlsx_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        logger.info(f"BizEVENT: Exported '{count}' rows from '{csv_path.name}' "
+                    f"to '{xlsx_path}' {p3u.stop_timer(st)}")
+        return count
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion csv_transactions_xlsx_export() function
+# ---------------------------------------------------------------------------- +
+#region categorize_workbook_file() function
+def categorize_workbook_file(wb_name : str, in_path : Path, 
+                             out_path : Path) -> Dict[str, Any]:
+    """Load, categorize and save one transaction workbook file.
+
+    This is the unit of work for one workbook in the categorization 
+    workflow. It depends only on file paths, not on the BudgetDomainModel,
+    so it can run in a worker process.
+
+    Args:
+        wb_name (str): The name of the workbook, used in results and logs.
+        in_path (Path): The path of the input workbook file.
+        out_path (Path): The path to save the categorized workbook to.
+
+    Returns:
+        Dict[str, Any]: A result with keys 'wb_name', 'success', 'saved', 
+        'out_path', 'rows', 'error' and 'elapsed'. Errors are captured in the
+        result rather than raised, so one bad workbook does not stop a batch.
+        'saved' is False when out_path already had the same content.
+        A .csv in_path is categorized by categorize_csv_file().
+    """
+    if Path(in_path).suffix.lower() == WB_FILETYPE_CSV:
+        return categorize_csv_file(wb_name, in_path, out_path)
+    st = p3u.start_timer()
+    result = {"wb_name": wb_name, "success": False, "saved": False, 
+              "out_path": str(out_path), "rows": 0, "error": None, 
+              "elapsed": None}
+    try:
+        wb = load_workbook(filename=in_path)
+        sheet = wb.active
+        # Check for the required columns, add them if not present.
+        check_sheet_columns(sheet)
+        # Map the 'Original Description' column to the 'Budget Category' column.
+        aggregator = CategoryAggregator()
+        map_budget_category(sheet, ORIGINAL_DESCRIPTION_COL_NAME, 
+                            BUDGET_CATEGORY_COL_NAME, aggregator)
+        result["rows"] = max(sheet.max_row - 1, 0)
+        # Skip the save if the output already has this content.
+        if WORKBOOK_file_digest(out_path) != WORKSHEET_digest(sheet):
+            bsm_WORKBOOK_file_save(wb, out_path)
+            result["saved"] = True
+        if result["saved"] or not summary_path(out_path).exists():
+            aggregator.save(summary_path(out_path))
+        result["success"] = True
+    except Exception as e:
+        result["error"] = p3u.exc_err_msg(e)
+        logger.error(f"Error categorizing workbook: {wb_name}: {result['error']}")
+    result["elapsed"] = p3u.stop_timer(st)
+    return result
+#endregion categorize_workbook_file() function
+# ---------------------------------------------------------------------------- +
 #region def execute_worklow_categorization(bm : BudgetModel, fi_key: str) -> None:
-def execute_worklow_categorization(bm : BudgetDomainModel, fi_key: str, wf_key:str) -> None:
+def execute_worklow_categorization(bm : BudgetDomainModel, fi_key: str, 
+                                   wf_key:str, parallel : bool = False,
+                                   max_workers : int = None) -> Dict[str, Dict]:
     """Process categorization wf_key for Financial Institution's 
     transaction workbooks.
 
@@ -711,15 +1143,31 @@ def execute_worklow_categorization(bm : BudgetDomainModel, fi_key: str, wf_key:s
     transactions are categorized and saved to the CF (Categorized Folder) 
     for the indicated FI.
 
+    Workbooks are independent, so with parallel=True each workbook's 
+    load, categorize and save unit is sent to a process pool.
+
+    An input file with the same content as one already categorized under
+    another name is skipped, see categorization_duplicates(). The rows of
+    the categorized workbooks are added to the transaction ledger, see
+    ledger_update_categorized().
+
     Args:
         bm (BudgetModel): The BudgetModel instance to use for processing.
         fi_key (str): The key for the financial institution.
+        wf_key (str): The key for the workflow.
+        parallel (bool): Run workbooks in a process pool when True.
+        max_workers (int): The process pool size limit, defaults to 
+            CATEGORIZATION_MAX_WORKERS, or the cpu count when that is None.
+
+    Returns:
+        Dict[str, Dict]: The per-workbook results, keyed by wb_name. See
+        categorize_workbook_file() for the result keys, a skipped duplicate
+        also has 'duplicate_of'.
     """
     # TODO: add logs directory to the budget folder.
     st = p3u.start_timer()
-    wb_name = "BOAChecking2025.xlsx"
     cp = "Budget Model Categorization:"
-    loaded_workbooks = {}
+    results = {}
     # Execute a workflow for a specific financial institution (fi_key).
     #   The pattern is to apply a function based on wf_key to each item in 
     #   the input folder based on fi_key and wf_key.
@@ -734,36 +1182,277 @@ def execute_worklow_categorization(bm : BudgetDomainModel, fi_key: str, wf_key:s
         # if workbooks_dict is None or len(workbooks_dict) == 0:
         if wb_c is None or wb_c == 0:
             logger.info(f"{cp}    No workbooks for input.")
-            return
+            return results
         logger.info(f"{cp}    {wb_c} workbooks for input.")
-        # Now process each input workbook.
-        # for wb_name, wb_ap in reversed(workbooks_dict.items()):
-        # Step 1: Load the workbooks sequentially.
-        for wb_name, wb in bm.bsm_FI_WF_WORKBOOKS_generate(fi_key, wf_key, wb_type):
-            logger.info(f"{cp}    Workbook({wb_name})")
-                
-            # Step 2: Process the workbooks applying the workflow function
-            try: 
-                logger.info(f"{cp}    Workbook({wb_name})")
-                sheet = wb.active
-                # Check for budget category column, add it if not present.
-                check_budget_category(sheet)
-                # Map the 'Original Description' column to the 'Budget Category' column.
-                map_budget_category(sheet, "Original Description", BUDGET_CATEGORY_COL_NAME)
-            except Exception as e:
-                logger.error(f"{cp}    Error processing workbook: {wb_name}: {e}")
-                continue
-
-            # Step 3: Save the output items to output storage.
-            try:
-                bm.bsm_FI_WF_WORKBOOK_save(wb, wb_name, fi_key, wf_key, WF_OUTPUT)
-            except Exception as e:
-                logger.error(f"{cp}    Error saving workbook: {wb_name}: {e}")
-                continue
-        logger.info(f"{cp} Complete: wf_key: '{wf_key}' {p3u.stop_timer(st)}")
+        in_paths = {wb_name: Path(wb_path) for wb_name, wb_path in 
+                    bm.bdm_WORKBOOK_DATA_LIST(fi_key, wf_key, WF_INPUT) or []}
+        skipped, shas = categorization_duplicates(bm, fi_key, wf_key, in_paths)
+        if parallel:
+            results = _execute_categorization_parallel(bm, fi_key, wf_key, 
+                                                       max_workers, skipped)
+        else:
+            results = _execute_categorization_sequential(bm, fi_key, wf_key,
+                                                         skipped, parallel,
+                                                         max_workers)
+        categorization_processed(bm, fi_key, wf_key, results, shas)
+        ledger_update_categorized(bm, fi_key, results)
+        results.update(skipped)
+        failed = [r["wb_name"] for r in results.values() if not r["success"]]
+        saved = sum(1 for r in results.values() if r["saved"])
+        logger.info(f"{cp} Complete: wf_key: '{wf_key}' "
+                    f"workbooks({len(results)}) saved({saved}) "
+                    f"failed({len(failed)}) "
+                    f"{p3u.stop_timer(st)}")
+        if failed:
+            logger.error(f"{cp}    Failed workbooks: {failed}")
+        return results
     except Exception as e:
         m = p3u.exc_err_msg(e)
         logger.error(m)
         raise
 #endregion execute_worklow_categorization() function
+# ---------------------------------------------------------------------------- +
+#region categorization_duplicates() function
+def categorization_duplicates(bm : BudgetDomainModel, fi_key : str, 
+                              wf_key : str, in_paths : Dict[str, Path]
+                              ) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Find the input files already categorized under another name.
+
+    The input files are ingested into the raw store of the FI, see
+    raw_store.py. A file is a duplicate if wf_key already processed its
+    content under another name and that output is unchanged, by its
+    fingerprint, or if an earlier file in in_paths has the same content.
+    The raw store is an optimization, if it fails no file is a duplicate.
+
+    Args:
+        bm (BudgetDomainModel): The BudgetDomainModel instance to use.
+        fi_key (str): The key for the financial institution.
+        wf_key (str): The key for the workflow.
+        in_paths (Dict[str, Path]): The input files, by wb_name.
+
+    Returns:
+        Tuple[Dict[str, Dict], Dict[str, str]]: The results of the skipped
+        duplicates, and the sha256 of each input file, by wb_name.
+    """
+    cp = "Budget Model Categorization:"
+    skipped, shas = {}, {}
+    try:
+        raw_root = bm.bsm_FI_RAW_STORE_abs_path(fi_key)
+        by_path = bsm_RAW_STORE_ingest(raw_root, list(in_paths.values()))
+        out_folder, out_prefix = categorization_output_folder(bm, fi_key, wf_key)
+        firsts : Dict[str, str] = {}
+        for wb_name, in_path in in_paths.items():
+            sha = shas[wb_name] = by_path[str(in_path)]
+            entry = bsm_RAW_STORE_processed(raw_root, sha, wf_key)
+            if entry is None or not bsm_file_fingerprint_match(
+                    Path(entry["out_path"]), entry.get("out_fp")):
+                entry = None
+                if sha in firsts:
+                    first = firsts[sha]
+                    entry = {"name": first, 
+                             "out_path": str(out_folder / f"{out_prefix}{first}")}
+            if entry is None or entry["name"] == wb_name:
+                firsts.setdefault(sha, wb_name)
+                continue
+            skipped[wb_name] = {"wb_name": wb_name, "success": True,
+                                "saved": False, "out_path": entry["out_path"],
+                                "rows": 0, "error": None, "elapsed": None,
+                                "duplicate_of": entry["name"]}
+            logger.info(f"BizEVENT: {cp} Skipped workbook '{wb_name}', the "
+                        f"same content as '{entry['name']}'.")
+    except Exception as e:
+        logger.warning(f"{cp} Raw store not used: {p3u.exc_err_msg(e)}")
+        return {}, {}
+    return skipped, shas
+#endregion categorization_duplicates() function
+# ---------------------------------------------------------------------------- +
+#region categorization_processed() function
+def categorization_processed(bm : BudgetDomainModel, fi_key : str, 
+                             wf_key : str, results : Dict[str, Dict],
+                             shas : Dict[str, str]) -> None:
+    """Record the input files categorized successfully in the raw store."""
+    processed = {shas[wb_name]: {"name": wb_name, "out_path": r["out_path"]}
+                 for wb_name, r in results.items()
+                 if r["success"] and wb_name in shas and 
+                 "duplicate_of" not in r and Path(r["out_path"]).exists()}
+    try:
+        bsm_RAW_STORE_processed_set(bm.bsm_FI_RAW_STORE_abs_path(fi_key),
+                                    wf_key, processed)
+    except Exception as e:
+        logger.warning(f"Budget Model Categorization: Raw store not updated: "
+                       f"{p3u.exc_err_msg(e)}")
+#endregion categorization_processed() function
+# ---------------------------------------------------------------------------- +
+#region categorization_output_folder() function
+def categorization_output_folder(bm : BudgetDomainModel, fi_key: str,
+                                 wf_key:str) -> Tuple[Path, str]:
+    """Return the (output folder, output name prefix) for the workflow."""
+    f_id = bm.bdm_WF_PURPOSE_FOLDER_MAP(wf_key, WF_OUTPUT)
+    if f_id is None:
+        m = f"Invalid folder_id '{f_id}' for FI_KEY('{fi_key}') "
+        m += f"and WF_KEY('{wf_key}')"
+        logger.error(m)
+        raise ValueError(m)
+    out_folder = bm.bsm_WF_FOLDER_abs_path(fi_key, wf_key, f_id)
+    out_prefix = bm.bdm_WF_PREFIX_OUT(wf_key) or ""
+    return out_folder, out_prefix
+#endregion categorization_output_folder() function
+# ---------------------------------------------------------------------------- +
+#region _execute_categorization_sequential() function
+def _execute_categorization_sequential(bm : BudgetDomainModel, fi_key: str,
+                                       wf_key:str, 
+                                       skip : Dict[str, Dict] = None,
+                                       parallel : bool = False,
+                                       max_workers : int = None) -> Dict[str, Dict]:
+    """Categorize the input workbooks one after another in this process.
+    
+    Workbooks are loaded ahead by bsm_FI_WF_WORKBOOKS_prefetch() and saved
+    by the BDM background saver, so storage I/O overlaps the categorization.
+    The .csv input files are categorized first, by categorize_csv_file(),
+    with the parallel and max_workers given. The wb_names in skip are not
+    categorized.
+    """
+    cp = "Budget Model Categorization:"
+    results = {}
+    out_folder, out_prefix = categorization_output_folder(bm, fi_key, wf_key)
+    in_paths = dict(bm.bdm_WORKBOOK_DATA_LIST(fi_key, wf_key, WF_INPUT) or [])
+    skip = skip or {}
+    saves : Dict[str, Future] = {}
+    for wb_name, in_path in in_paths.items():
+        if Path(in_path).suffix.lower() != WB_FILETYPE_CSV or wb_name in skip:
+            continue
+        logger.info(f"{cp}    CSV({wb_name})")
+        results[wb_name] = categorize_csv_file(
+            wb_name, Path(in_path), out_folder / f"{out_prefix}{wb_name}",
+            parallel=parallel, max_workers=max_workers)
+    try:
+        _categorize_workbooks(bm, fi_key, wf_key, out_folder, out_prefix, 
+                              skip, results, saves)
+    finally:
+        # Wait for this run's queued saves, record any save errors.
+        save_errors = bm.bsm_FI_WF_WORKBOOK_save_wait(saves)
+    for wb_name, error in save_errors.items():
+        results[wb_name]["success"] = False
+        results[wb_name]["saved"] = False
+        results[wb_name]["error"] = error
+        logger.error(f"{cp}    Error saving workbook: {wb_name}: {error}")
+    return results
+#endregion _execute_categorization_sequential() function
+# ---------------------------------------------------------------------------- +
+#region _categorize_workbooks() function
+def _categorize_workbooks(bm : BudgetDomainModel, fi_key: str, wf_key:str,
+                          out_folder : Path, out_prefix : str, 
+                          skip : Dict[str, Dict],
+                          results : Dict[str, Dict], 
+                          saves : Dict[str, Future]) -> None:
+    """Categorize the prefetched .xlsx input workbooks, queueing the saves.
+    
+    A result is added to results for each workbook, and the save future of
+    each queued save is added to saves, both by wb_name.
+    """
+    cp = "Budget Model Categorization:"
+    run_st = p3u.start_timer()
+    load_errors : Dict[str, str] = {}
+    for wb_name, wb in bm.bsm_FI_WF_WORKBOOKS_prefetch(
+            fi_key, wf_key, WF_INPUT, filetypes=(WB_FILETYPE_XLSX,),
+            exclude=set(skip), errors=load_errors):
+        st = p3u.start_timer()
+        out_path = out_folder / f"{out_prefix}{wb_name}"
+        result = {"wb_name": wb_name, "success": False, "saved": False,
+                  "out_path": str(out_path), "rows": 0, "error": None, 
+                  "elapsed": None}
+        results[wb_name] = result
+        # Step 2: Process the workbooks applying the workflow function
+        try: 
+            logger.info(f"{cp}    Workbook({wb_name})")
+            sheet = wb.active
+            # Check for the required columns, add them if not present.
+            check_sheet_columns(sheet)
+            # Map the 'Original Description' column to the 'Budget Category' column.
+            aggregator = CategoryAggregator()
+            map_budget_category(sheet, ORIGINAL_DESCRIPTION_COL_NAME, 
+                                BUDGET_CATEGORY_COL_NAME, aggregator)
+            result["rows"] = max(sheet.max_row - 1, 0)
+        except Exception as e:
+            result["error"] = p3u.exc_err_msg(e)
+            result["elapsed"] = p3u.stop_timer(st)
+            logger.error(f"{cp}    Error processing workbook: {wb_name}: {e}")
+            continue
+        # Step 3: Hand the output item to the background saver, unless the 
+        # output already has this content.
+        try:
+            if WORKBOOK_file_digest(out_path) != WORKSHEET_digest(sheet):
+                saves[wb_name] = bm.bsm_FI_WF_WORKBOOK_save_submit(
+                    wb, wb_name, fi_key, wf_key, WF_OUTPUT)
+                result["saved"] = True
+            else:
+                logger.info(f"{cp}    Workbook({wb_name}) unchanged, not saved.")
+            if result["saved"] or not summary_path(out_path).exists():
+                aggregator.save(summary_path(out_path))
+        except Exception as e:
+            result["error"] = p3u.exc_err_msg(e)
+            result["elapsed"] = p3u.stop_timer(st)
+            logger.error(f"{cp}    Error saving workbook: {wb_name}: {e}")
+            continue
+        result["success"] = True
+        result["elapsed"] = p3u.stop_timer(st)
+    for wb_name, error in load_errors.items():
+        results[wb_name] = {"wb_name": wb_name, "success": False, 
+                            "saved": False, 
+                            "out_path": str(out_folder / f"{out_prefix}{wb_name}"),
+                            "rows": 0, "error": error, 
+                            "elapsed": p3u.stop_timer(run_st)}
+#endregion _categorize_workbooks() function
+# ---------------------------------------------------------------------------- +
+#region _execute_categorization_parallel() function
+def _execute_categorization_parallel(bm : BudgetDomainModel, fi_key: str,
+                                     wf_key:str, 
+                                     max_workers : int = None,
+                                     skip : Dict[str, Dict] = None) -> Dict[str, Dict]:
+    """Categorize the input workbooks in a process pool.
+
+    The BudgetDomainModel stays in this process. Only the input and output
+    paths are sent to the workers, which run categorize_workbook_file().
+    The wb_names in skip are not categorized.
+    """
+    cp = "Budget Model Categorization:"
+    results = {}
+    skip = skip or {}
+    wbl = [(wb_name, wb_path) for wb_name, wb_path in 
+           bm.bdm_WORKBOOK_DATA_LIST(fi_key, wf_key, WF_INPUT) or []
+           if wb_name not in skip]
+    if wbl is None or len(wbl) == 0:
+        return results
+    # Resolve the output folder and name prefix once, in this process.
+    out_folder, out_prefix = categorization_output_folder(bm, fi_key, wf_key)
+    max_workers = max_workers or CATEGORIZATION_MAX_WORKERS or os.cpu_count()
+    max_workers = max(1, min(max_workers, len(wbl)))
+    logger.info(f"{cp}    Parallel: {len(wbl)} workbooks, "
+                f"max_workers({max_workers})")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for wb_name, wb_path in wbl:
+            out_path = out_folder / f"{out_prefix}{wb_name}"
+            st = p3u.start_timer()
+            f = pool.submit(categorize_workbook_file, wb_name, wb_path, out_path)
+            futures[f] = (wb_name, out_path, st)
+        for f in as_completed(futures):
+            wb_name, out_path, st = futures[f]
+            try:
+                result = f.result()
+            except Exception as e:
+                # The worker process itself failed, e.g., BrokenProcessPool.
+                result = {"wb_name": wb_name, "success": False, 
+                          "saved": False, "out_path": str(out_path), "rows": 0,
+                          "error": p3u.exc_err_msg(e), 
+                          "elapsed": p3u.stop_timer(st)}
+                logger.error(f"{cp}    Error in worker for workbook: "
+                             f"{wb_name}: {result['error']}")
+            results[wb_name] = result
+            if result["saved"]:
+                logger.info(f"BizEVENT: Saved workbook "
+                            f"'{Path(result['out_path']).name}' to "
+                            f"'{str(out_folder)}'")
+    return results
+#endregion _execute_categorization_parallel() function
 # ---------------------------------------------------------------------------- +
\ No newline at end of file
@@ -0,0 +1,192 @@
+# ---------------------------------------------------------------------------- +
+#region budget_ledger.py module
+""" Financial Budget Workflow: the transaction ledger of categorized workbooks.
+
+    At the end of each categorization run, the rows of the categorized
+    workbooks are upserted into the SQLite transaction ledger in the budget
+    folder, see transaction_ledger.py in the BSM. Only the output files
+    new or changed since the last update are read.
+
+    Each row is keyed by its TID, the same hash of date, description,
+    currency, amount and account name as WORKSHEET_row_data(). Identical
+    transactions in one file, e.g., two equal purchases on one day, share
+    a TID, so the second gets the TID suffix ':2', and so on.
+
+    Use ledger_query() for ad-hoc queries, e.g.,
+
+        ledger_query(bm, "SELECT year_month, SUM(amount) FROM ledger "
+                         "WHERE level1 = ? GROUP BY year_month", ("Food",))
+"""
+#endregion budget_ledger.py module
+# ---------------------------------------------------------------------------- +
+#region Imports
+# python standard library modules and packages
+import logging, sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budman_namespace.design_language_namespace import *
+from budget_domain_model import BudgetDomainModel
+from budget_storage_model import (
+    bsm_WORKBOOK_file_load_values, bsm_CSV_file_chunks,
+    bsm_LEDGER_source_current, bsm_LEDGER_source_upsert, bsm_LEDGER_query,
+    BSM_LEDGER_FILENAME)
+from .budget_transactions import (
+    generate_hash_key, csv_date, csv_amount,
+    DATE_COL_NAME, ORIGINAL_DESCRIPTION_COL_NAME, CURRENCY_COL_NAME,
+    AMOUNT_COL_NAME, ACCOUNT_NAME_COL_NAME, YEAR_MONTH_COL_NAME,
+    ACCOUNT_CODE_COL_NAME, BUDGET_CATEGORY_COL_NAME, LEVEL_1_COL_NAME,
+    LEVEL_2_COL_NAME, LEVEL_3_COL_NAME, DEBIT_CREDIT_COL_NAME)
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region Globals and Constants
+logger = logging.getLogger(__name__)
+# The workbook columns of a ledger row after the tid, date and amount, in
+# BSM_LEDGER_ROW_COLUMNS order.
+LEDGER_TEXT_COLUMNS = {
+    "year_month": YEAR_MONTH_COL_NAME,
+    "description": ORIGINAL_DESCRIPTION_COL_NAME,
+    "currency": CURRENCY_COL_NAME,
+    "account_name": ACCOUNT_NAME_COL_NAME,
+    "account_code": ACCOUNT_CODE_COL_NAME,
+    "category": BUDGET_CATEGORY_COL_NAME,
+    "level1": LEVEL_1_COL_NAME,
+    "level2": LEVEL_2_COL_NAME,
+    "level3": LEVEL_3_COL_NAME,
+    "debit_credit": DEBIT_CREDIT_COL_NAME,
+}
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region ledger_db_path() function
+def ledger_db_path(bm : BudgetDomainModel) -> Path:
+    """Return the path of the transaction ledger in the budget folder."""
+    return bm.bsm_BDM_FOLDER_abs_path() / BSM_LEDGER_FILENAME
+#endregion ledger_db_path() function
+# ---------------------------------------------------------------------------- +
+#region ledger_rows() function
+def ledger_rows(hdr : Sequence[str],
+                rows : Iterator[Sequence[Any]]) -> Iterator[Tuple[Any, ...]]:
+    """Yield the ledger rows of categorized workbook rows.
+
+    Cell values may be typed, from an xlsx, or text, from a csv file.
+    Rows without a date are skipped.
+
+    Args:
+        hdr (Sequence[str]): The header row of the workbook.
+        rows (Iterator[Sequence[Any]]): The data rows.
+
+    Yields:
+        Tuple[Any, ...]: One row in BSM_LEDGER_ROW_COLUMNS order.
+    """
+    hdr = [str(c).strip() if c is not None else "" for c in hdr]
+    date_i, amount_i = hdr.index(DATE_COL_NAME), hdr.index(AMOUNT_COL_NAME)
+    text_i = [hdr.index(col) if col in hdr else None
+              for col in LEDGER_TEXT_COLUMNS.values()]
+    seen : Dict[str, int] = {}
+    for row in rows:
+        date = row[date_i] if date_i < len(row) else None
+        if isinstance(date, str):
+            date = csv_date(date)
+        if date is None:
+            continue
+        amount = row[amount_i] if amount_i < len(row) else None
+        if not isinstance(amount, (int, float)):
+            amount = csv_amount(amount)
+        # Whole amounts are ints, as openpyxl loads them, for the same TID.
+        if isinstance(amount, float) and amount.is_integer():
+            amount = int(amount)
+        # Empty csv cells are '', empty xlsx cells None, store None.
+        text = dict(zip(LEDGER_TEXT_COLUMNS, (
+            row[i] if i is not None and i < len(row) and row[i] != "" else None
+            for i in text_i)))
+        date_str = p3u.iso_date_only_string(date)
+        tid = generate_hash_key(date_str + (text["description"] or "") +
+                                (text["currency"] or "") + str(amount) +
+                                (text["account_name"] or ""))
+        n = seen[tid] = seen.get(tid, 0) + 1
+        if n > 1:
+            tid = f"{tid}:{n}"
+        yield (tid, date_str, text["year_month"], text["description"],
+               text["currency"], amount, text["account_name"],
+               text["account_code"], text["category"], text["level1"],
+               text["level2"], text["level3"], text["debit_credit"])
+#endregion ledger_rows() function
+# ---------------------------------------------------------------------------- +
+#region ledger_file_rows() function
+def ledger_file_rows(wb_path : Path) -> Iterator[Tuple[Any, ...]]:
+    """Yield the ledger rows of a categorized workbook or csv file."""
+    wb_path = Path(wb_path)
+    if wb_path.suffix.lower() == WB_FILETYPE_CSV:
+        chunks = bsm_CSV_file_chunks(wb_path)
+        first = next(chunks, None)
+        if first is None:
+            return
+        hdr = first[0]
+        def csv_rows() -> Iterator[List[str]]:
+            yield from first[1]
+            for _, rows in chunks:
+                yield from rows
+        yield from ledger_rows(hdr, csv_rows())
+        return
+    sheet = bsm_WORKBOOK_file_load_values(wb_path).active
+    if sheet is None or sheet.max_row == 0:
+        return
+    yield from ledger_rows(sheet.header, sheet.iter_rows(min_row=2))
+#endregion ledger_file_rows() function
+# ---------------------------------------------------------------------------- +
+#region ledger_update_categorized() function
+def ledger_update_categorized(bm : BudgetDomainModel, fi_key : str,
+                              results : Dict[str, Dict]) -> Dict[str, int]:
+    """Upsert the rows of the categorized workbooks into the ledger.
+
+    Only the successful results are used, and only their output files not
+    already in the ledger unchanged. The ledger is an index, if it fails
+    the categorization results still stand, the error is only logged.
+
+    Args:
+        bm (BudgetDomainModel): The BudgetDomainModel instance to use.
+        fi_key (str): The key for the financial institution.
+        results (Dict[str, Dict]): The categorization results, by wb_name,
+            see categorize_workbook_file().
+
+    Returns:
+        Dict[str, int]: The number of rows stored, by wb_name, for the
+        output files read.
+    """
+    cp = "Budget Model Ledger:"
+    stored = {}
+    try:
+        st = p3u.start_timer()
+        db_path = ledger_db_path(bm)
+        for wb_name, r in results.items():
+            if not r["success"] or "duplicate_of" in r:
+                continue
+            out_path = Path(r["out_path"])
+            if not out_path.exists() or bsm_LEDGER_source_current(db_path, out_path):
+                continue
+            try:
+                stored[wb_name] = bsm_LEDGER_source_upsert(
+                    db_path, fi_key, out_path, ledger_file_rows(out_path))
+            except Exception as e:
+                logger.warning(f"{cp} Workbook '{wb_name}' not added: "
+                               f"{p3u.exc_err_msg(e)}")
+        if stored:
+            logger.info(f"BizEVENT: {cp} Stored {sum(stored.values())} rows of "
+                        f"{len(stored)} workbooks for FI('{fi_key}') in "
+                        f"'{db_path.name}' {p3u.stop_timer(st)}")
+    except Exception as e:
+        logger.warning(f"{cp} Ledger not updated: {p3u.exc_err_msg(e)}")
+    return stored
+#endregion ledger_update_categorized() function
+# ---------------------------------------------------------------------------- +
+#region ledger_query() function
+def ledger_query(bm : BudgetDomainModel, sql : str,
+                 params : Sequence[Any] = ()) -> List[sqlite3.Row]:
+    """Run a read-only query on the transaction ledger of the budget folder."""
+    return bsm_LEDGER_query(ledger_db_path(bm), sql, params)
+#endregion ledger_query() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,120 @@
+# ---------------------------------------------------------------------------- +
+#region budget_transactions.py module
+""" Financial Budget Workflow: transaction columns and csv value parsers.
+
+    The column names of BOA transaction files and the columns BudMan adds,
+    with the parsers for csv date and amount values and the hash used for
+    transaction ids. Shared by the categorization workflow and the
+    transaction ledger, see budget_categorization.py and budget_ledger.py.
+"""
+#endregion budget_transactions.py module
+# ---------------------------------------------------------------------------- +
+#region Imports
+# python standard library modules and packages
+import logging, hashlib, datetime
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budget_storage_model import CSV_DATE_FORMATS
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region Globals and Constants
+logger = logging.getLogger(__name__)
+
+# Symbols for BOA .csv files.
+BOA_ORIGINAL_DESCRIPTION_COL_NAME = "Original Description"
+BOA_DATE_COL_NAME = "Date"
+BOA_CURRENCY_COL_NAME = "Currency"
+BOA_AMOUNT_COL_NAME = "Amount"
+BOA_ACCOUNT_NAME_COL_NAME = "Account Name"
+
+# BOA csv files originals contain these columns, beginning with "Status".
+BOA_WB_COLUMNS = [
+    "Status",
+    BOA_DATE_COL_NAME,
+    BOA_ORIGINAL_DESCRIPTION_COL_NAME,
+    "Split Type",
+    "Category",
+    BOA_CURRENCY_COL_NAME,
+    BOA_AMOUNT_COL_NAME,
+    "User Description",
+    "Memo",
+    "Classification",
+    BOA_ACCOUNT_NAME_COL_NAME,
+    "Simple Description"
+    ]
+
+# BudMan adds additional columns prior to processing transactions. These
+# columns are filled by BudMan workflows, such as categorization.
+BUDGET_CATEGORY_COL_NAME = "Budget Category"
+ACCOUNT_CODE_COL_NAME = "Account Code"
+LEVEL_1_COL_NAME = "Level1"
+LEVEL_2_COL_NAME = "Level2"
+LEVEL_3_COL_NAME = "Level3"
+DEBIT_CREDIT_COL_NAME = "DebitOrCredit"
+YEAR_MONTH_COL_NAME = "YearMonth"
+
+# BudMan utilizes the following columns from the BOA side:
+DATE_COL_NAME = BOA_DATE_COL_NAME
+ORIGINAL_DESCRIPTION_COL_NAME = BOA_ORIGINAL_DESCRIPTION_COL_NAME
+CURRENCY_COL_NAME = BOA_CURRENCY_COL_NAME
+AMOUNT_COL_NAME = BOA_AMOUNT_COL_NAME
+ACCOUNT_NAME_COL_NAME = BOA_ACCOUNT_NAME_COL_NAME
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region generate_hash_key(text:str) -> str
+def generate_hash_key(text: str, length:int=12) -> str:
+    """Generate a hash key for the given text.
+
+    The hash key is generated by removing all non-alphanumeric characters
+    from the text, converting it to lowercase, and then hashing it using
+    SHA-256. The resulting hash is then converted to a hexadecimal string.
+
+    Args:
+        text (str): The input text to generate a hash key for.
+
+    Returns:
+        str: The generated hash key.
+    """
+    try:
+        if not isinstance(text, str):
+            raise TypeError(f"Expected 'text' arg to be a str, got {type(text)}")
+        # Remove non-alphanumeric characters and convert to lowercase.
+        # cleaned_text = re.sub(r'\W+', '', text).lower()
+        # Generate the SHA-256 hash of the cleaned text.
+        hash_object = hashlib.sha256(text.encode())
+        # Convert the hash to a hexadecimal string.
+        return hash_object.hexdigest()[:length]  #.[:HASH_KEY_LENGTH]
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion generate_hash_key(text:str) -> str
+# ---------------------------------------------------------------------------- +
+#region csv_date() function
+def csv_date(value : str) -> datetime.date:
+    """Parse a csv date string, None if empty."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unsupported date format: '{value}'")
+#endregion csv_date() function
+# ---------------------------------------------------------------------------- +
+#region csv_amount() function
+def csv_amount(value : str) -> float:
+    """Parse a csv amount string, e.g., '-1,234.50', as a float.
+
+    An empty amount is None, not 0, so it is not taken as a debit.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    return float(value.replace("$", "").replace(",", ""))
+#endregion csv_amount() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,158 @@
+# ---------------------------------------------------------------------------- +
+#region budget_watch.py module
+""" Financial Budget Workflow: watch mode for the "categorization" workflow.
+
+    Workflow: categorization, run when files arrive.
+    Input Folder: the WF_INPUT folder of the workflow for the FI.
+    Output Folder: the WF_OUTPUT folder of the workflow for the FI.
+
+    Rather than running 'init' and 'workflow categorization' by hand after
+    new transaction files are dropped into the input folder, watch mode
+    waits for them. Each new workbook is categorized into the output folder
+    once it settles, see FolderWatcher in the BSM. Only the new arrivals
+    are processed, the workbooks present at the start are not. A new
+    arrival with the same content as a workbook already categorized under
+    another name is skipped. After each batch, the categorized rows are
+    added to the transaction ledger, and the FI workbooks are discovered
+    again, which rescans only the folders that changed.
+
+    Each step is logged as a BizEVENT.
+"""
+#endregion budget_watch.py module
+# ---------------------------------------------------------------------------- +
+#region Imports
+# python standard library modules and packages
+import logging, time, threading
+from pathlib import Path
+from typing import Dict
+
+# third-party modules and packages
+import p3_utils as p3u
+
+# local modules and packages
+from budman_namespace.design_language_namespace import *
+from budget_domain_model import BudgetDomainModel
+from budget_storage_model import (
+    FolderWatcher, BSM_WATCH_SETTLE_SECS, BSM_WATCH_POLL_SECS,
+    bsm_verify_folder)
+from .budget_categorization import (
+    categorize_workbook_file, categorization_duplicates,
+    categorization_processed, categorization_output_folder)
+from .budget_ledger import ledger_update_categorized
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region Globals and Constants
+logger = logging.getLogger(__name__)
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region watch_workflow_categorization() function
+def watch_workflow_categorization(bm : BudgetDomainModel, fi_key : str,
+                                  wf_key : str,
+                                  stop : threading.Event = None,
+                                  duration : float = None,
+                                  max_batches : int = None,
+                                  settle_secs : float = BSM_WATCH_SETTLE_SECS,
+                                  poll_secs : float = BSM_WATCH_POLL_SECS
+                                  ) -> Dict[str, Dict]:
+    """Categorize new workbooks as they arrive in the WF_INPUT folder.
+
+    Runs until stop is set, duration seconds pass, max_batches batches of
+    new workbooks are processed, or KeyboardInterrupt (Ctrl-C).
+
+    Args:
+        bm (BudgetDomainModel): The BudgetDomainModel instance to use.
+        fi_key (str): The key for the financial institution.
+        wf_key (str): The key for the workflow.
+        stop (threading.Event): Set it to stop watching.
+        duration (float): Seconds to watch, None for no limit.
+        max_batches (int): Batches to process, None for no limit.
+        settle_secs (float): Seconds a new file is unchanged to be processed.
+        poll_secs (float): Seconds between polls of the folder.
+
+    Returns:
+        Dict[str, Dict]: The per-workbook results, keyed by wb_name. See
+        categorize_workbook_file() for the result keys.
+    """
+    cp = "Budget Model Watch:"
+    results = {}
+    try:
+        f_id = bm.bdm_WF_PURPOSE_FOLDER_MAP(wf_key, WF_INPUT)
+        if f_id is None:
+            m = f"WF_KEY('{wf_key}') has no '{WF_INPUT}' folder to watch."
+            logger.error(m)
+            raise ValueError(m)
+        in_folder = bm.bsm_WF_FOLDER_abs_path(fi_key, wf_key, f_id)
+        if in_folder is None:
+            m = f"FI_KEY('{fi_key}') WF_KEY('{wf_key}') has no '{WF_INPUT}' folder."
+            logger.error(m)
+            raise ValueError(m)
+        out_folder, out_prefix = categorization_output_folder(bm, fi_key, wf_key)
+        bsm_verify_folder(in_folder)
+        bsm_verify_folder(out_folder)
+        deadline = None if duration is None else time.monotonic() + duration
+        batches = 0
+        with FolderWatcher([in_folder], settle_secs, poll_secs) as watcher:
+            logger.info(f"BizEVENT: {cp} Watching folder '{in_folder}' for "
+                        f"FI('{fi_key}') workflow '{wf_key}', "
+                        f"mode: {watcher.mode}")
+            try:
+                while stop is None or not stop.is_set():
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                    new_paths = watcher.poll()
+                    if not new_paths:
+                        watcher.wait(remaining)
+                        continue
+                    logger.info(f"BizEVENT: {cp} {len(new_paths)} new workbooks "
+                                f"arrived in '{in_folder}': "
+                                f"{[p.name for p in new_paths]}")
+                    _categorize_arrivals(bm, fi_key, wf_key, new_paths,
+                                         out_folder, out_prefix, results)
+                    batches += 1
+                    if max_batches is not None and batches >= max_batches:
+                        break
+            except KeyboardInterrupt:
+                logger.info(f"BizEVENT: {cp} Interrupted.")
+        logger.info(f"BizEVENT: {cp} Stopped watching '{in_folder}', "
+                    f"batches({batches}) workbooks({len(results)})")
+        return results
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion watch_workflow_categorization() function
+# ---------------------------------------------------------------------------- +
+#region _categorize_arrivals() function
+def _categorize_arrivals(bm : BudgetDomainModel, fi_key : str, wf_key : str,
+                         new_paths : list, out_folder : Path, out_prefix : str,
+                         results : Dict[str, Dict]) -> None:
+    """Categorize a batch of new input workbooks, then discover them."""
+    cp = "Budget Model Watch:"
+    in_paths = {p.name: p for p in new_paths}
+    skipped, shas = categorization_duplicates(bm, fi_key, wf_key, in_paths)
+    results.update(skipped)
+    batch = {}
+    for wb_name, in_path in in_paths.items():
+        if wb_name in skipped:
+            continue
+        out_path = out_folder / f"{out_prefix}{wb_name}"
+        result = categorize_workbook_file(wb_name, in_path, out_path)
+        results[wb_name] = batch[wb_name] = result
+        if not result["success"]:
+            logger.error(f"{cp} Failed to categorize workbook '{wb_name}': "
+                         f"{result['error']}")
+            continue
+        state = "saved to" if result["saved"] else "unchanged in"
+        logger.info(f"BizEVENT: {cp} Categorized workbook '{wb_name}' "
+                    f"rows({result['rows']}) {state} '{out_path}' "
+                    f"{result['elapsed']}")
+    categorization_processed(bm, fi_key, wf_key, batch, shas)
+    ledger_update_categorized(bm, fi_key, batch)
+    # Only the folders changed by the batch are rescanned.
+    wbc = bm.bsm_FI_WORKFLOW_DATA_COLLECTION_discover(fi_key)
+    logger.info(f"BizEVENT: {cp} Discovered {len(wbc or {})} workbooks "
+                f"for FI('{fi_key}')")
+#endregion _categorize_arrivals() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,294 @@
+# ---------------------------------------------------------------------------- +
+#region workbook_schema_cache.py module
+""" Fingerprint-cached schema validation for transaction workbooks.
+
+    Checking a workbook's schema means loading it, which is the expensive
+    part, and most workbooks have not changed since they were last checked.
+    A WorkbookSchemaCache remembers the check result for each workbook file,
+    keyed by the file path and its fingerprint (size, mtime and sha256
+    content hash). An unchanged workbook skips validation entirely.
+
+    The cache is a small json file kept in the budget folder. It also records
+    the BUDMAN_REQUIRED_COLUMNS it was built with, a change to the required
+    columns drops the cached results.
+
+    The batch validator checks every workbook in a folder by reading only
+    the sheet names and the header row, with the workbook opened read-only.
+"""
+#endregion workbook_schema_cache.py module
+# ---------------------------------------------------------------------------- +
+#region Imports
+# python standard library modules and packages
+import logging, json, os, hashlib
+from pathlib import Path
+from typing import Dict, List
+
+# third-party modules and packages
+import p3_utils as p3u
+from openpyxl import load_workbook
+
+# local modules and packages
+from budman_namespace.design_language_namespace import (
+    DATA_OBJECT, WB_FILETYPE_XLSX
+)
+from budget_storage_model import (
+    bsm_get_workbook_names2, bsm_file_fingerprint, bsm_file_fingerprint_match
+)
+from .budget_categorization import (
+    BUDMAN_REQUIRED_COLUMNS, BUDMAN_SHEET_NAME
+)
+#endregion Imports
+# ---------------------------------------------------------------------------- +
+#region Globals and Constants
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_FILENAME = ".budman_schema_cache.json"
+SCHEMA_CACHE_VERSION = 1
+# Result keys for a workbook schema check.
+SC_VALID = "valid"
+SC_SHEET_NAMES = "sheet_names"
+SC_MISSING_COLUMNS = "missing_columns"
+SC_ERRORS = "errors"
+SC_FINGERPRINT = "fingerprint"
+SC_CHECKED_DATE = "checked_date"
+#endregion Globals and Constants
+# ---------------------------------------------------------------------------- +
+#region schema_id() function
+def schema_id() -> str:
+    """Return an id for the current schema rules, the required columns."""
+    s = "|".join([BUDMAN_SHEET_NAME] + list(BUDMAN_REQUIRED_COLUMNS))
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()[:16]
+#endregion schema_id() function
+# ---------------------------------------------------------------------------- +
+#region check_workbook_file_schema() function
+def check_workbook_file_schema(wb_path : Path) -> DATA_OBJECT:
+    """Check a workbook file's schema reading only its header row.
+
+    Applies the same rules as check_sheet_schema(), without corrections:
+    1. Should be just 1 worksheet.
+    2. A sheet titled BUDMAN_SHEET_NAME, else the active sheet is checked.
+    3. The header row has all of the BUDMAN_REQUIRED_COLUMNS.
+    The workbook is opened read-only, so only row 1 is parsed.
+
+    Args:
+        wb_path (Path): The workbook file to check.
+
+    Returns:
+        DATA_OBJECT: The check result with keys SC_VALID, SC_SHEET_NAMES,
+        SC_MISSING_COLUMNS and SC_ERRORS.
+    """
+    try:
+        p3u.is_obj_of_type("wb_path", wb_path, Path, raise_error=True)
+        errors = []
+        wb = load_workbook(filename=wb_path, read_only=True)
+        try:
+            sheet_names = wb.sheetnames
+            if len(sheet_names) > 1:
+                errors.append(f"Workbook has {len(sheet_names)} sheets, expected 1.")
+            if BUDMAN_SHEET_NAME in sheet_names:
+                ws = wb[BUDMAN_SHEET_NAME]
+            else:
+                errors.append(f"Workbook does not have a sheet named "
+                              f"'{BUDMAN_SHEET_NAME}'.")
+                ws = wb.active
+            hdr = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        missing_columns = [col for col in BUDMAN_REQUIRED_COLUMNS if col not in hdr]
+        if len(missing_columns) > 0:
+            errors.append(f"Missing required columns: {', '.join(missing_columns)}")
+        return {
+            SC_VALID: len(errors) == 0,
+            SC_SHEET_NAMES: sheet_names,
+            SC_MISSING_COLUMNS: missing_columns,
+            SC_ERRORS: errors
+        }
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion check_workbook_file_schema() function
+# ---------------------------------------------------------------------------- +
+#region WorkbookSchemaCache class
+class WorkbookSchemaCache:
+    """Workbook schema check results, keyed by resolved file path.
+
+    Each entry holds the check result and the SC_FINGERPRINT of the file
+    at the time of the check. Use load() to read the cache from the
+    budget folder and save() to write it back when dirty.
+    """
+    # ------------------------------------------------------------------------ +
+    #region WorkbookSchemaCache class intrinsics
+    def __init__(self, cache_path : Path = None) -> None:
+        self.cache_path : Path = cache_path
+        self.entries : Dict[str, DATA_OBJECT] = {}
+        self.dirty : bool = False
+        self.hits : int = 0
+        self.misses : int = 0
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}('{self.cache_path}', "
+                f"entries={len(self.entries)}, hits={self.hits}, "
+                f"misses={self.misses})")
+    #endregion WorkbookSchemaCache class intrinsics
+    # ------------------------------------------------------------------------ +
+    #region load() / save() methods
+    @classmethod
+    def load(cls, budget_folder : Path) -> "WorkbookSchemaCache":
+        """Load the cache from the budget folder, empty if absent or stale."""
+        try:
+            p3u.is_obj_of_type("budget_folder", budget_folder, Path, raise_error=True)
+            cache = cls(budget_folder / SCHEMA_CACHE_FILENAME)
+            if not cache.cache_path.exists():
+                return cache
+            try:
+                with open(cache.cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable schema cache "
+                               f"'{cache.cache_path}': {p3u.exc_err_msg(e)}")
+                return cache
+            if (data.get("version") != SCHEMA_CACHE_VERSION or
+                data.get("schema_id") != schema_id()):
+                logger.info(f"Schema cache '{cache.cache_path}' is out of date, reset.")
+                return cache
+            cache.entries = data.get("entries", {})
+            return cache
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+
+    def save(self) -> None:
+        """Write the cache file if it changed, replacing it atomically."""
+        try:
+            if not self.dirty or self.cache_path is None:
+                return
+            data = {
+                "version": SCHEMA_CACHE_VERSION,
+                "schema_id": schema_id(),
+                "entries": self.entries
+            }
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+    #endregion load() / save() methods
+    # ------------------------------------------------------------------------ +
+    #region get() / put() / invalidate() methods
+    def get(self, wb_path : Path) -> DATA_OBJECT:
+        """Return the cached check result for an unchanged file, else None."""
+        try:
+            key = str(wb_path.resolve())
+            entry = self.entries.get(key)
+            if entry is not None:
+                mtime_ns = entry[SC_FINGERPRINT].get("mtime_ns")
+                if bsm_file_fingerprint_match(wb_path, entry[SC_FINGERPRINT]):
+                    self.hits += 1
+                    # A content match with a new mtime updates the fingerprint.
+                    self.dirty |= mtime_ns != entry[SC_FINGERPRINT]["mtime_ns"]
+                    return entry
+                del self.entries[key]
+                self.dirty = True
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+
+    def put(self, wb_path : Path, result : DATA_OBJECT) -> DATA_OBJECT:
+        """Record a check result with the file's current fingerprint."""
+        try:
+            fingerprint = bsm_file_fingerprint(wb_path)
+            entry = dict(result)
+            entry[SC_FINGERPRINT] = fingerprint
+            entry[SC_CHECKED_DATE] = p3u.now_iso_date_string()
+            self.entries[fingerprint["path"]] = entry
+            self.dirty = True
+            return entry
+        except Exception as e:
+            logger.error(p3u.exc_err_msg(e))
+            raise
+
+    def invalidate(self, wb_path : Path) -> None:
+        """Forget the cached result for a file."""
+        key = str(wb_path.resolve())
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+    #endregion get() / put() / invalidate() methods
+    # ------------------------------------------------------------------------ +
+#endregion WorkbookSchemaCache class
+# ---------------------------------------------------------------------------- +
+#region validate_workbook_schemas() function
+def validate_workbook_schemas(wb_paths : List[Path],
+                              cache : WorkbookSchemaCache = None) -> Dict[str, DATA_OBJECT]:
+    """Check the schema of a batch of workbook files.
+
+    Files with a cached result and an unchanged fingerprint are not opened.
+    Other files are checked with check_workbook_file_schema() and the
+    results are added to the cache. The cache is saved when it changed.
+
+    Args:
+        wb_paths (List[Path]): The workbook files to check.
+        cache (WorkbookSchemaCache): The cache to use, None for no cache.
+
+    Returns:
+        Dict[str, DATA_OBJECT]: The check results keyed by resolved file 
+        path, so same-named files in different folders do not collide.
+    """
+    try:
+        st = p3u.start_timer()
+        results = {}
+        checked = 0
+        for wb_path in wb_paths:
+            key = str(wb_path.resolve())
+            result = cache.get(wb_path) if cache is not None else None
+            if result is None:
+                try:
+                    result = check_workbook_file_schema(wb_path)
+                except Exception as e:
+                    results[key] = {
+                        SC_VALID: False, SC_SHEET_NAMES: [],
+                        SC_MISSING_COLUMNS: [], SC_ERRORS: [p3u.exc_err_msg(e)]}
+                    continue
+                checked += 1
+                if cache is not None:
+                    result = cache.put(wb_path, result)
+            results[key] = result
+        if cache is not None:
+            cache.save()
+        invalid = sum(1 for r in results.values() if not r[SC_VALID])
+        logger.info(f"Validated {len(results)} workbooks, checked({checked}) "
+                    f"cached({len(results) - checked}) invalid({invalid}) "
+                    f"{p3u.stop_timer(st)}")
+        return results
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion validate_workbook_schemas() function
+# ---------------------------------------------------------------------------- +
+#region validate_folder_schemas() function
+def validate_folder_schemas(folder : Path,
+                            cache : WorkbookSchemaCache = None) -> Dict[str, DATA_OBJECT]:
+    """Check the schema of every .xlsx workbook in a folder.
+
+    Args:
+        folder (Path): The folder to scan for workbooks, e.g., an FI
+            workflow folder.
+        cache (WorkbookSchemaCache): The cache to use, None for no cache.
+
+    Returns:
+        Dict[str, DATA_OBJECT]: The check results keyed by resolved file path.
+    """
+    try:
+        p3u.is_obj_of_type("folder", folder, Path, raise_error=True)
+        # Only excel workbooks have a sheet schema to check.
+        wb_paths = [p for p in bsm_get_workbook_names2(folder)
+                    if p.suffix.lower() == WB_FILETYPE_XLSX]
+        return validate_workbook_schemas(wb_paths, cache)
+    except Exception as e:
+        logger.error(p3u.exc_err_msg(e))
+        raise
+#endregion validate_folder_schemas() function
+# ---------------------------------------------------------------------------- +
@@ -0,0 +1,72 @@
+# ---------------------------------------------------------------------------- +
+# test_bdm_store_journal.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, json
+from pathlib import Path
+# third-party libraries
+import logging
+# local libraries
+import budget_storage_model.bdm_store_journal as bsj
+from budget_storage_model import (
+    bsm_BDM_STORE_file_save, bsm_BDM_STORE_file_load, 
+    bsm_BDM_STORE_journal_path)
+from budman_namespace import BDM_ID, BDM_OPTIONS
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+class Crash(BaseException):
+    """The process stopped, not an error the code under test handles."""
+
+def new_process() -> None:
+    """Forget the journal states, as a restarted process would."""
+    bsj._journal_states.clear()
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_journal_compact_crash(tmp_path : Path, monkeypatch) -> None:
+    """A crash between the snapshot replace and the journal removal."""
+    bdms_path = tmp_path / "store.jsonc"
+    journal_path = bsm_BDM_STORE_journal_path(bdms_path)
+    store = {BDM_ID: "test", BDM_OPTIONS: {"a": 1}}
+    bsm_BDM_STORE_file_save(store, bdms_path)
+    store[BDM_OPTIONS]["a"] = 2
+    bsm_BDM_STORE_file_save(store, bdms_path)
+    assert journal_path.exists()
+    # Compact, crashing before the old journal is removed.
+    store[BDM_OPTIONS]["a"] = 3
+    unlink = Path.unlink
+    def crash_unlink(self, *args, **kwargs):
+        if self == journal_path:
+            raise Crash()
+        return unlink(self, *args, **kwargs)
+    monkeypatch.setattr(Path, "unlink", crash_unlink)
+    with pytest.raises(Crash):
+        bsm_BDM_STORE_file_save(store, bdms_path, compact=True)
+    monkeypatch.undo()
+    assert journal_path.exists()
+    new_process()
+    # The journal of the old snapshot is not replayed onto the new one.
+    assert bsm_BDM_STORE_file_load(bdms_path)[BDM_OPTIONS] == {"a": 3}
+    # The next save removes it and journals from the new snapshot.
+    store[BDM_OPTIONS]["b"] = 4
+    bsm_BDM_STORE_file_save(store, bdms_path)
+    assert not journal_path.exists()
+    store[BDM_OPTIONS]["b"] = 5
+    bsm_BDM_STORE_file_save(store, bdms_path)
+    new_process()
+    assert bsm_BDM_STORE_file_load(bdms_path)[BDM_OPTIONS] == {"a": 3, "b": 5}
+
+def test_journal_without_base_record(tmp_path : Path) -> None:
+    """A journal written before base records is still replayed."""
+    bdms_path = tmp_path / "store.jsonc"
+    store = {BDM_ID: "test", BDM_OPTIONS: {"a": 1}}
+    bsm_BDM_STORE_file_save(store, bdms_path)
+    op = {"op": "set", "path": [BDM_OPTIONS, "a"], "value": 7}
+    bsm_BDM_STORE_journal_path(bdms_path).write_text(json.dumps(op) + "\n")
+    new_process()
+    assert bsm_BDM_STORE_file_load(bdms_path)[BDM_OPTIONS] == {"a": 7}
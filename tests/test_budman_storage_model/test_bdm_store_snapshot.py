@@ -0,0 +1,39 @@
+# ---------------------------------------------------------------------------- +
+# test_bdm_store_snapshot.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest
+from pathlib import Path
+# third-party libraries
+import logging
+# local libraries
+import budget_storage_model.bdm_store_snapshot as bss
+from budget_storage_model import (
+    bsm_BDM_STORE_file_save, bsm_BDM_STORE_file_load, 
+    bsm_BDM_STORE_snapshot_path)
+from budman_namespace import BDM_ID, BDM_OPTIONS
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+def test_snapshot_rebuilt_on_schema_change(tmp_path : Path, monkeypatch) -> None:
+    """A snapshot pickled with other BDMWorkbook fields is rebuilt."""
+    calls = []
+    def rehydrate(bdm_store : dict) -> None:
+        calls.append(1)
+    bdms_path = tmp_path / "store.jsonc"
+    bsm_BDM_STORE_file_save({BDM_ID: "test", BDM_OPTIONS: {"a": 1}}, bdms_path)
+    loaded = bsm_BDM_STORE_file_load(bdms_path, rehydrate)
+    assert bsm_BDM_STORE_snapshot_path(bdms_path, rehydrate).exists()
+    assert bsm_BDM_STORE_file_load(bdms_path, rehydrate) == loaded
+    assert len(calls) == 1
+    # The BDMWorkbook class changed, e.g., a field was added.
+    monkeypatch.setattr(bss, "_schema_hash", lambda: "other fields")
+    assert bsm_BDM_STORE_file_load(bdms_path, rehydrate) == loaded
+    assert len(calls) == 2
+    # The rebuilt snapshot has the new schema hash.
+    assert bsm_BDM_STORE_file_load(bdms_path, rehydrate) == loaded
+    assert len(calls) == 2
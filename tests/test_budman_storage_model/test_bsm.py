@@ -44,3 +44,544 @@ class TestBSM:
             logger.error(m)
             pytest.fail(m)
 
+    def test_bsm_WB_FOLDER_scan(self, tmp_path : Path) -> None:
+        """Test folder scans classify by suffix and are cached by folder mtime."""
+        try:
+            logger.info(self.test_bsm_WB_FOLDER_scan.__doc__)
+            for name in ("b.xlsx", "a.XLSX", "c.csv", "notes.md", "~$b.xlsx"):
+                (tmp_path / name).write_text("x")
+            (tmp_path / "sub.xlsx").mkdir()
+            old_ns = os.stat(tmp_path).st_mtime_ns - 10**10
+            os.utime(tmp_path, ns=(old_ns, old_ns))
+            scan = bsm_WB_FOLDER_scan(tmp_path)
+            assert [p.name for p in scan[".xlsx"]] == ["a.XLSX", "b.xlsx", "~$b.xlsx"]
+            assert [p.name for p in scan[".csv"]] == ["c.csv"]
+            names = [p.name for p in bsm_get_workbook_names2(tmp_path)]
+            assert "~$b.xlsx" not in names and "notes.md" not in names
+            # An unchanged folder mtime returns the cached scan.
+            (tmp_path / "d.csv").write_text("x")
+            os.utime(tmp_path, ns=(old_ns, old_ns))
+            assert ".json" not in bsm_WB_FOLDER_scan(tmp_path)
+            assert len(bsm_WB_FOLDER_scan(tmp_path)[".csv"]) == 1
+            os.utime(tmp_path, ns=(old_ns + 10**9, old_ns + 10**9))
+            assert len(bsm_WB_FOLDER_scan(tmp_path)[".csv"]) == 2
+            assert bsm_WB_FOLDER_scan(tmp_path / "missing") == {}
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_FolderWatcher(self, tmp_path : Path) -> None:
+        """Test the FolderWatcher reports only new files, once they settle."""
+        try:
+            logger.info(self.test_bsm_FolderWatcher.__doc__)
+            import time
+            (tmp_path / "old.xlsx").write_text("x")
+            with FolderWatcher([tmp_path], settle_secs=0.2, poll_secs=0.05) as w:
+                assert w.poll() == []
+                new_path = tmp_path / "new.xlsx"
+                new_path.write_text("x")
+                w.wait(0.5)
+                assert w.poll() == [], "A new file is not reported until settled."
+                new_path.write_text("xx")  # Still being written.
+                time.sleep(0.25)
+                assert w.poll() == []
+                time.sleep(0.25)
+                assert w.poll() == [new_path]
+                assert w.poll() == [], "A file is reported once."
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_file_fingerprint(self, tmp_path : Path) -> None:
+        """Test file fingerprint detects content changes, not just touches."""
+        try:
+            logger.info(self.test_bsm_file_fingerprint.__doc__)
+            f = tmp_path / "fp_test.csv"
+            f.write_text("Number,Pay-To\n1001,Alice\n")
+            fp = bsm_file_fingerprint(f)
+            assert fp["size"] == f.stat().st_size
+            assert fp["sha256"] == bsm_file_sha256(f)
+            assert bsm_file_fingerprint_match(f, fp), "Unchanged file should match."
+            # Touch: new mtime, same content, still matches.
+            st = f.stat()
+            os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            assert bsm_file_fingerprint_match(f, fp), "Touched file should match."
+            assert fp["mtime_ns"] == f.stat().st_mtime_ns
+            # Same size, different content, does not match.
+            f.write_text("Number,Pay-To\n1001,Alicf\n")
+            os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+            assert not bsm_file_fingerprint_match(f, fp), "Changed file should not match."
+            assert not bsm_file_fingerprint_match(tmp_path / "missing.csv", fp)
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_bsm_WORKBOOK_url_get_read_only(self, tmp_path : Path) -> None:
+        """Test the read-only load path returns a values view of the workbook."""
+        try:
+            logger.info(self.test_bsm_WORKBOOK_url_get_read_only.__doc__)
+            from openpyxl import Workbook
+            wb_path = tmp_path / "values_test.xlsx"
+            wb = Workbook()
+            wb.active.title = "TransactionData"
+            wb.active.append(["Date", "Amount"])
+            wb.active.append(["2025-01-01", 1.5])
+            wb.save(wb_path)
+            wbv = bsm_WORKBOOK_url_get(wb_path.as_uri(), read_only=True)
+            assert isinstance(wbv, WorkbookValues)
+            assert wbv.sheetnames == ["TransactionData"]
+            ws = wbv["TransactionData"]
+            assert ws is wbv.active
+            assert ws.header == ("Date", "Amount")
+            assert list(ws.iter_rows(min_row=2)) == [("2025-01-01", 1.5)]
+            assert ws.max_row == 2 and ws.max_column == 2
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_STORAGE_backends(self, tmp_path : Path) -> None:
+        """Test the mem:// and sqlite:// storage backends and partial reads."""
+        try:
+            logger.info(self.test_bsm_STORAGE_backends.__doc__)
+            import datetime
+            from openpyxl import Workbook
+            from budman_namespace import BDM_ID, BDM_OPTIONS
+            assert {"file", "mem", "sqlite"} <= set(bsm_STORAGE_schemes())
+            store = {BDM_ID: "test", BDM_OPTIONS: {"a": 1}, "not_persisted": 0}
+            wb = Workbook()
+            wb.active.title = "TransactionData"
+            wb.active.append(["Date", "Amount"])
+            for i in range(1, 6):
+                wb.active.append([datetime.datetime(2025, 1, i), i * 1.5])
+            db_uri = (tmp_path / "budman.db").as_uri().replace("file:", "sqlite:", 1)
+            for bdms_url, wb_url in (("mem://test/store", "mem://test/wb.xlsx"),
+                                     (db_uri + "?key=store", db_uri + "?key=wb")):
+                bsm_BDM_STORE_url_put(store, bdms_url)
+                loaded = bsm_BDM_STORE_url_get(bdms_url)
+                assert loaded == {BDM_ID: "test", BDM_OPTIONS: {"a": 1}}
+                assert bsm_BDM_STORE_url_property_get(bdms_url, BDM_OPTIONS) == {"a": 1}
+                bsm_WORKBOOK_url_put(wb, wb_url)
+                rows = bsm_WORKBOOK_url_rows_get(wb_url, "TransactionData", 3, 4)
+                assert rows == [(datetime.datetime(2025, 1, 2), 3.0),
+                                (datetime.datetime(2025, 1, 3), 4.5)]
+            wbv = bsm_WORKBOOK_url_get(db_uri + "?key=wb", read_only=True)
+            assert wbv.active.header == ("Date", "Amount") and wbv.active.max_row == 6
+            with pytest.raises(ValueError):
+                bsm_BDM_STORE_url_get("ftp://host/store.jsonc")
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_WORKBOOKS_file_save(self, tmp_path : Path) -> None:
+        """Test a batch of workbooks saves concurrently, with per-file results."""
+        try:
+            logger.info(self.test_bsm_WORKBOOKS_file_save.__doc__)
+            from openpyxl import Workbook, load_workbook
+            workbooks, wb_paths = {}, {}
+            for month in range(1, 4):
+                wb_name = f"month_{month:02d}.xlsx"
+                wb = Workbook()
+                wb.active.append(["Month", month])
+                workbooks[wb_name] = wb
+                wb_paths[wb_name] = tmp_path / wb_name
+            workbooks["no_path.xlsx"] = Workbook()
+            results = bsm_WORKBOOKS_file_save(workbooks, wb_paths, max_workers=2)
+            assert set(results) == set(workbooks)
+            for wb_name, wb_path in wb_paths.items():
+                assert results[wb_name]["success"], results[wb_name]["error"]
+                assert results[wb_name]["elapsed"] is not None
+                assert load_workbook(wb_path).active["B1"].value == \
+                    int(wb_name[6:8])
+            # No fall-through to another workbook's path.
+            assert not results["no_path.xlsx"]["success"]
+            assert not (tmp_path / "no_path.xlsx").exists()
+            assert not list(tmp_path.glob(".*.tmp")), "No temp files left."
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_WORKING_file(self, tmp_path : Path) -> None:
+        """Test working data files save, load and export by their filetype."""
+        try:
+            logger.info(self.test_bsm_WORKING_file.__doc__)
+            import datetime
+            from openpyxl import Workbook, load_workbook
+            from budman_namespace import WB_FILETYPE_WORKING
+            wb = Workbook()
+            wb.active.title = "Transactions"
+            wb.active.append(["TID", "Date", "Description", "Amount"])
+            wb.active.append(["t1", datetime.datetime(2025, 1, 2), "Coffee", -4.5])
+            wb.active.append(["t2", datetime.datetime(2025, 1, 3), None, 20])
+            wb.create_sheet("Notes").append(["note"])
+            wb_path = tmp_path / f"working{WB_FILETYPE_WORKING}"
+            bsm_WORKBOOK_file_save(wb, wb_path)
+            with open(wb_path, "rb") as f:
+                assert f.read(6) == b"BMWD1\n", "Working data, not an xlsx."
+            loaded = bsm_WORKBOOK_file_load(wb_path)
+            assert loaded.sheetnames == wb.sheetnames
+            assert list(loaded.active.iter_rows(values_only=True)) == \
+                list(wb.active.iter_rows(values_only=True))
+            wb_values = bsm_WORKBOOK_file_load_values(wb_path)
+            assert wb_values.active.rows[2] == ("t2", datetime.datetime(2025, 1, 3),
+                                                None, 20)
+            xlsx_path = bsm_WORKING_file_export(wb_path)
+            assert xlsx_path.suffix == ".xlsx"
+            exported = load_workbook(xlsx_path)
+            assert exported.active.title == "Transactions"
+            assert exported.active["A3"].value == "t2"
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_WORKING_file_time_values(self, tmp_path : Path) -> None:
+        """Test working data files keep time, date and duration cells."""
+        try:
+            logger.info(self.test_bsm_WORKING_file_time_values.__doc__)
+            import datetime
+            from openpyxl import Workbook
+            from budman_namespace import (WB_FILETYPE_WORKING, WF_WORKING_FORMAT,
+                                          VALID_WF_OBJECT_ATTR_KEYS)
+            assert WF_WORKING_FORMAT in VALID_WF_OBJECT_ATTR_KEYS
+            wb = Workbook()
+            wb.active.append(["TID", "Posted", "Date", "Hold", "Mixed"])
+            wb.active.append(["t1", datetime.time(9, 30), datetime.date(2025, 1, 2),
+                              datetime.timedelta(hours=2), datetime.time(8)])
+            wb.active.append(["t2", None, None, None, "none"])
+            wb_path = tmp_path / f"working{WB_FILETYPE_WORKING}"
+            bsm_WORKBOOK_file_save(wb, wb_path)
+            wb_values = bsm_WORKBOOK_file_load_values(wb_path)
+            assert wb_values.active.rows == \
+                list(wb.active.iter_rows(values_only=True))
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_WORKBOOK_sidecar(self, tmp_path : Path) -> None:
+        """Test values-only loads read the columnar sidecar of unchanged files."""
+        try:
+            logger.info(self.test_bsm_WORKBOOK_sidecar.__doc__)
+            import datetime
+            from openpyxl import Workbook
+            wb_path = tmp_path / "sidecar_test.xlsx"
+            wb = Workbook()
+            wb.active.append(["Date", "Description", "Amount", "Number"])
+            wb.active.append([datetime.datetime(2025, 1, 2), "Coffee", -4.5, 101])
+            wb.active.append([datetime.datetime(2025, 1, 3), None, 20, "ACH"])
+            wb.save(wb_path)
+            assert bsm_WORKBOOK_sidecar_load(wb_path) is None, "No sidecar yet."
+            parsed = bsm_WORKBOOK_file_load_values(wb_path)
+            cached = bsm_WORKBOOK_sidecar_load(wb_path)
+            assert cached is not None, "First load should write the sidecar."
+            assert cached.sheetnames == parsed.sheetnames
+            for row_p, row_c in zip(parsed.active.rows, cached.active.rows):
+                assert row_p == row_c
+                assert [type(v) for v in row_p] == [type(v) for v in row_c]
+            # A changed file makes the sidecar stale.
+            wb.active.append([datetime.datetime(2025, 1, 4), "Tea", 3, 102])
+            wb.save(wb_path)
+            st = wb_path.stat()
+            os.utime(wb_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            assert bsm_WORKBOOK_sidecar_load(wb_path) is None
+            assert bsm_WORKBOOK_file_load_values(wb_path).active.max_row == 4
+            # A packed buffer written with the public sidecar writer.
+            parsed = WorkbookValues.load(wb_path)
+            sc_path = bsm_WORKBOOK_sidecar_write(
+                wb_path, bsm_file_fingerprint(wb_path),
+                bsm_WORKBOOK_values_pack(parsed))
+            assert sc_path.exists()
+            assert bsm_WORKBOOK_sidecar_load(wb_path).active.rows \
+                == parsed.active.rows
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_WORKBOOK_sidecar_changed_while_parsing(self, tmp_path : Path,
+                                                        monkeypatch) -> None:
+        """Test a file replaced while parsing does not get a fresh sidecar."""
+        try:
+            logger.info(self.test_bsm_WORKBOOK_sidecar_changed_while_parsing.__doc__)
+            import budget_storage_model.budget_storage_model as bsm
+            from openpyxl import Workbook
+            wb_path = tmp_path / "sidecar_race.xlsx"
+            wb = Workbook()
+            wb.active.append(["Description", "Amount"])
+            wb.active.append(["Coffee", -4.5])
+            wb.save(wb_path)
+            parse = bsm.bsm_XLSX_file_load_values
+            def parse_then_replace(path):
+                wb_values = parse(path)
+                wb.active.append(["Tea", 3])
+                wb.save(wb_path)
+                st = wb_path.stat()
+                os.utime(wb_path, ns=(st.st_atime_ns, 
+                                      st.st_mtime_ns + 1_000_000_000))
+                return wb_values
+            monkeypatch.setattr(bsm, "bsm_XLSX_file_load_values", 
+                                parse_then_replace)
+            assert bsm_WORKBOOK_file_load_values(wb_path).active.max_row == 2
+            monkeypatch.undo()
+            assert bsm_WORKBOOK_sidecar_load(wb_path) is None
+            assert bsm_WORKBOOK_file_load_values(wb_path).active.max_row == 3
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_WORKBOOKS_file_load_values(self, tmp_path : Path) -> None:
+        """Test a list of workbooks loads in parallel, as packed columns."""
+        try:
+            logger.info(self.test_bsm_WORKBOOKS_file_load_values.__doc__)
+            import datetime
+            from openpyxl import Workbook
+            wb_paths = []
+            for month in range(1, 4):
+                wb_path = tmp_path / f"month_{month:02d}.xlsx"
+                wb = Workbook()
+                wb.active.append(["Date", "Description", "Amount"])
+                wb.active.append([datetime.datetime(2025, month, 2), "Rent", -1200])
+                wb.active.append([datetime.datetime(2025, month, 9), None, 45.25])
+                wb.save(wb_path)
+                wb_paths.append(wb_path)
+            loaded = bsm_WORKBOOKS_file_load_values(wb_paths, max_workers=2)
+            assert [v.wb_path for v in loaded] == wb_paths
+            for wb_path, wb_values in zip(wb_paths, loaded):
+                parsed = WorkbookValues.load(wb_path)
+                assert wb_values.active.rows == parsed.active.rows
+                # The parent wrote the sidecars from the packed buffers.
+                assert bsm_WORKBOOK_sidecar_load(wb_path) is not None
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+
+    def test_bsm_BDM_STORE_journal(self, tmp_path : Path) -> None:
+        """Test BDM_STORE saves append changes to a journal replayed on load."""
+        try:
+            logger.info(self.test_bsm_BDM_STORE_journal.__doc__)
+            from budman_namespace import BDM_ID, BDM_FI_COLLECTION, BDM_OPTIONS
+            bdms_path = tmp_path / "store.jsonc"
+            journal_path = bsm_BDM_STORE_journal_path(bdms_path)
+            store = {BDM_ID: "test", BDM_OPTIONS: {"a": 1, "b": 2},
+                     BDM_FI_COLLECTION: {"boa": {"name": "BOA", "wbs": [1, 2]}}}
+            bsm_BDM_STORE_file_save(store, bdms_path)
+            assert bdms_path.exists() and not journal_path.exists()
+            snapshot = bdms_path.read_text()
+            store[BDM_FI_COLLECTION]["boa"]["name"] = "Bank of America"
+            del store[BDM_OPTIONS]["b"]
+            store[BDM_OPTIONS]["c"] = [3]
+            bsm_BDM_STORE_file_save(store, bdms_path)
+            assert bdms_path.read_text() == snapshot, "Snapshot not rewritten."
+            # The base record and the 3 changes.
+            assert len(journal_path.read_text().splitlines()) == 4
+            assert bsm_BDM_STORE_file_load(bdms_path) == store
+            bsm_BDM_STORE_file_save(store, bdms_path, compact=True)
+            assert not journal_path.exists()
+            assert bsm_BDM_STORE_file_load(bdms_path) == store
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    # ------------------------------------------------------------------------ +
+    def test_bsm_BDM_STORE_snapshot(self, tmp_path : Path) -> None:
+        """Test BDM_STORE loads use the binary snapshot until the file changes."""
+        try:
+            logger.info(self.test_bsm_BDM_STORE_snapshot.__doc__)
+            from budman_namespace import BDM_ID, BDM_OPTIONS
+            calls = []
+            def rehydrate(bdm_store : dict) -> None:
+                calls.append(1)
+                bdm_store[BDM_OPTIONS]["wbs"] = tuple(bdm_store[BDM_OPTIONS]["wbs"])
+            bdms_path = tmp_path / "store.jsonc"
+            store = {BDM_ID: "test", BDM_OPTIONS: {"a": 1, "wbs": [1, 2]}}
+            bsm_BDM_STORE_file_save(store, bdms_path)
+            snap_path = bsm_BDM_STORE_snapshot_path(bdms_path, rehydrate)
+            loaded = bsm_BDM_STORE_file_load(bdms_path, rehydrate)
+            assert snap_path.exists() and len(calls) == 1
+            assert loaded[BDM_OPTIONS]["wbs"] == (1, 2)
+            assert bsm_BDM_STORE_file_load(bdms_path, rehydrate) == loaded
+            assert len(calls) == 1, "Snapshot load should not rehydrate."
+            # A save journals the change, the snapshot is then stale.
+            loaded[BDM_OPTIONS]["a"] = 2
+            bsm_BDM_STORE_file_save(loaded, bdms_path)
+            reloaded = bsm_BDM_STORE_file_load(bdms_path, rehydrate)
+            assert len(calls) == 2 and reloaded[BDM_OPTIONS]["a"] == 2
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_csv_DATA_COLLECTION(self, tmp_path : Path) -> None:
+        """Test csv DATA_COLLECTION save and typed, chunked loads."""
+        try:
+            logger.info(self.test_csv_DATA_COLLECTION.__doc__)
+            import datetime
+            from decimal import Decimal
+            csv_path = tmp_path / "CheckRegister.csv"
+            csv_path.write_text("Number,Date,Pay-To,Amount\n"
+                                "101,06/01/2025,Acme,-12.50\n"
+                                "102,06/02/2025,Bob,(3.00)\n"
+                                "101,06/03/2025,Dup,1.00\n")
+            cr = csv_DATA_COLLECTION_file_load(csv_path)
+            assert list(cr) == ["101", "102"] and cr["101"]["Amount"] == "-12.50"
+            cr = csv_DATA_COLLECTION_file_load(csv_path, typed=True)
+            assert cr["101"]["Date"] == datetime.date(2025, 6, 1)
+            assert cr["102"]["Amount"] == Decimal("-3.00")
+            cents = csv_DATA_COLLECTION_file_load(csv_path, typed=True,
+                                                  money=CSV_MONEY_CENTS)
+            assert cents["101"]["Amount"] == -1250
+            chunks = list(csv_DATA_COLLECTION_file_chunks(csv_path, chunk_rows=1))
+            assert [list(c) for c in chunks] == [["101"], ["102"]]
+            # Typed values round trip, a save replaces the file.
+            out_url = (tmp_path / "out.csv").as_uri()
+            assert csv_DATA_COLLECTION_url_put(
+                cents, out_url, col_types={"Amount": CSV_TYPE_MONEY},
+                money=CSV_MONEY_CENTS) == 2
+            assert csv_DATA_COLLECTION_url_get(out_url, typed=True) == cr
+            assert not list(tmp_path.glob(".*.tmp"))
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_bsm_CSV_file_chunks(self, tmp_path : Path) -> None:
+        """Test csv chunk spans end at record boundaries, not in quotes."""
+        try:
+            logger.info(self.test_bsm_CSV_file_chunks.__doc__)
+            import csv
+            csv_path = tmp_path / "export.csv"
+            rows = [[str(i), f"line {i}\nmore" if i % 3 == 0 else f"d{i}"]
+                    for i in range(200)]
+            with open(csv_path, "w", newline="") as f:
+                csv.writer(f).writerows([["Number", "Memo"]] + rows)
+            hdr, spans = bsm_CSV_file_chunk_spans(csv_path, chunk_bytes=50)
+            assert hdr == ["Number", "Memo"] and len(spans) > 1
+            assert [r for s in spans 
+                    for r in bsm_CSV_file_chunk_rows(csv_path, s)] == rows
+            assert [r for _, chunk in bsm_CSV_file_chunks(csv_path, 50) 
+                    for r in chunk] == rows
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_bsm_RAW_STORE(self, tmp_path : Path) -> None:
+        """Test the raw store keeps one object per content, by name."""
+        try:
+            logger.info(self.test_bsm_RAW_STORE.__doc__)
+            raw_root = tmp_path / BSM_RAW_STORE_FOLDER
+            a, b, c = (tmp_path / n for n in ("May.csv", "May (1).csv", "Jun.csv"))
+            a.write_text("Date,Amount\n06/01/2025,1.00\n")
+            b.write_bytes(a.read_bytes())
+            c.write_text("Date,Amount\n07/01/2025,2.00\n")
+            shas = bsm_RAW_STORE_ingest(raw_root, [a, b, c])
+            assert shas[str(a)] == shas[str(b)] != shas[str(c)]
+            obj_path = bsm_RAW_STORE_object_path(raw_root, shas[str(a)])
+            assert obj_path.read_bytes() == a.read_bytes()
+            assert len(list((obj_path.parent).iterdir())) == 2
+            assert bsm_RAW_STORE_processed(raw_root, shas[str(a)], "wf") is None
+            out = tmp_path / "cat_May.csv"
+            out.write_text("Date,Amount\n")
+            bsm_RAW_STORE_processed_set(raw_root, "wf", {
+                shas[str(a)]: {"name": a.name, "out_path": str(out)}})
+            entry = bsm_RAW_STORE_processed(raw_root, shas[str(b)], "wf")
+            assert entry["name"] == a.name
+            assert entry["out_fp"]["size"] == out.stat().st_size
+            assert bsm_RAW_STORE_ingest(raw_root, [b]) == {str(b): shas[str(b)]}
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_bsm_LEDGER(self, tmp_path : Path) -> None:
+        """Test the ledger replaces the rows of a source file, by TID."""
+        try:
+            logger.info(self.test_bsm_LEDGER.__doc__)
+            db_path = tmp_path / BSM_LEDGER_FILENAME
+            src = tmp_path / "cat_May.csv"
+            src.write_text("placeholder\n")
+            def row(tid, ym, amount):
+                return (tid, f"{ym}-01", ym, "desc", "USD", amount, "acct",
+                        "1234", "Food.Groceries", "Food", "Groceries", None, "D")
+            assert not bsm_LEDGER_source_current(db_path, src)
+            n = bsm_LEDGER_source_upsert(db_path, "boa", src, [
+                row("t1", "2025-05", -10), row("t2", "2025-05", -5),
+                row("t3", "2025-06", 20)])
+            assert n == 3 and bsm_LEDGER_source_current(db_path, src)
+            q = "SELECT SUM(amount) AS total FROM ledger WHERE year_month = ?"
+            assert bsm_LEDGER_query(db_path, q, ("2025-05",))[0]["total"] == -15
+            src.write_text("placeholder, changed\n")
+            assert not bsm_LEDGER_source_current(db_path, src)
+            bsm_LEDGER_source_upsert(db_path, "boa", src, [row("t1", "2025-05", -7)])
+            rows = bsm_LEDGER_query(db_path, "SELECT tid, amount FROM ledger")
+            assert [tuple(r) for r in rows] == [("t1", -7)]
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_bsm_WB_FOLDER_manifest(self, tmp_path : Path) -> None:
+        """Test the folder manifest summarizes new and changed workbooks."""
+        try:
+            logger.info(self.test_bsm_WB_FOLDER_manifest.__doc__)
+            import datetime
+            from openpyxl import Workbook
+            wb = Workbook()
+            wb.active.append(["Date", "Original Description", "Amount"])
+            for day in (30, 15, 1):
+                wb.active.append([datetime.datetime(2025, 6, day), "x", 1.5])
+            wb.save(tmp_path / "June.xlsx")
+            (tmp_path / "July.csv").write_text(
+                "Date,Amount,Budget Category\n07/01/2025,1.00,Food\n")
+            entries = bsm_WB_FOLDER_manifest(tmp_path)
+            june, july = entries["June.xlsx"], entries["July.csv"]
+            assert june["rows"] == 3 and june["sheets"] == ["Sheet"]
+            assert (june["min_date"], june["max_date"]) == ("2025-06-01", "2025-06-30")
+            assert not june["categorized"] and july["categorized"]
+            assert june["sha256"] is None, "Hashed only when asked for."
+            june_sha = bsm_WB_FILES_manifest_sha256([tmp_path / "June.xlsx"])
+            assert june_sha == {str(tmp_path / "June.xlsx"): 
+                                bsm_file_sha256(tmp_path / "June.xlsx")}
+            wb.active.append([datetime.datetime(2025, 5, 31), "y", 2])
+            bsm_WORKBOOK_file_save(wb, tmp_path / "June.xlsx")
+            entries = bsm_WB_FOLDER_manifest(tmp_path, refresh=False)
+            assert entries["June.xlsx"]["rows"] == 4
+            assert entries["June.xlsx"]["min_date"] == "2025-05-31"
+            assert bsm_WB_FOLDER_manifest(tmp_path) == entries
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
+    def test_bsm_XLSX_file_load_values(self, tmp_path : Path) -> None:
+        """Test the streaming xlsx reader loads the values openpyxl does."""
+        try:
+            logger.info(self.test_bsm_XLSX_file_load_values.__doc__)
+            import datetime
+            from openpyxl import Workbook
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Transactions"
+            ws.append(["Date", "Original Description", "Amount", "Cleared"])
+            for i in range(50):
+                ws.append([datetime.datetime(2025, 6, 1 + i % 28), f"d & {i}",
+                           -1.25 * i if i % 2 else i, i % 3 == 0])
+            ws["F60"] = "sparse"
+            wb.create_sheet("Notes")["B2"] = "note"
+            wb_path = tmp_path / "June.xlsx"
+            wb.save(wb_path)
+            streamed = bsm_XLSX_file_load_values(wb_path)
+            loaded = WorkbookValues.load(wb_path)
+            assert streamed.sheetnames == loaded.sheetnames
+            assert streamed.active.title == "Transactions"
+            for a, b in zip(streamed.worksheets, loaded.worksheets):
+                assert a.rows == b.rows
+            columns = bsm_XLSX_file_columns(wb_path, ["Date", "Amount"])
+            assert list(columns) == ["Date", "Amount"]
+            assert columns["Amount"] == [r[2] for r in loaded.active.rows[1:]]
+            assert columns["Date"][0] == datetime.datetime(2025, 6, 1)
+        except Exception as e:
+            m = f"{p3u.exc_err_msg(e)}"
+            logger.error(m)
+            pytest.fail(m)
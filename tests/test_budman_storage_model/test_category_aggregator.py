@@ -0,0 +1,77 @@
+# ---------------------------------------------------------------------------- +
+# test_category_aggregator.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, csv, datetime
+from pathlib import Path
+# third-party libraries
+import logging
+from openpyxl import Workbook
+# local libraries
+from budman_workflows.budget_categorization import (
+    CategoryAggregator, summary_path, categorize_workbook_file, 
+    BOA_WB_COLUMNS, AGGREGATION_KEY_COLUMNS, AGGREGATION_VALUE_COLUMNS)
+from budget_storage_model import bsm_filter_workbook_names
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+def test_CategoryAggregator_add_merge() -> None:
+    """Totals are counted and summed per key, merged totals add up."""
+    a = CategoryAggregator()
+    a.add("2025-01", "Food", "Grocery", "", "1234", "D", -10.5)
+    a.add("2025-01", "Food", "Grocery", "", "1234", "D", -4.5)
+    a.add("2025-02", "Food", "Grocery", "", "1234", "D", "n/a")
+    b = CategoryAggregator()
+    b.add("2025-01", "Food", "Grocery", "", "1234", "D", -1)
+    b.add("2025-01", "Income", "", "", "1234", "C", 100)
+    a.merge(b)
+    assert a.row_count == 5
+    assert a.rows() == [
+        ("2025-01", "Food", "Grocery", "", "1234", "D", 3, -16.0),
+        ("2025-01", "Income", "", "", "1234", "C", 1, 100.0),
+        ("2025-02", "Food", "Grocery", "", "1234", "D", 1, 0.0)]
+
+def test_CategoryAggregator_save(tmp_path : Path) -> None:
+    """The totals are saved as a csv file with a header row."""
+    a = CategoryAggregator()
+    a.add("2025-01", "Food", None, None, "1234", "D", -10.25)
+    s_path = summary_path(tmp_path / "cat_wb.xlsx")
+    assert s_path.name == "cat_wb.summary.csv"
+    a.save(s_path)
+    with open(s_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == AGGREGATION_KEY_COLUMNS + AGGREGATION_VALUE_COLUMNS
+    assert rows[1] == ["2025-01", "Food", "", "", "1234", "D", "1", "-10.25"]
+    assert [p.name for p in tmp_path.iterdir()] == [s_path.name]
+
+def test_categorize_workbook_file_summary(tmp_path : Path) -> None:
+    """Categorizing a workbook writes the summary next to the output."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(BOA_WB_COLUMNS)
+    for day, amount in ((1, -12.5), (2, -7.5), (3, 100.0)):
+        r = ["x"] * len(BOA_WB_COLUMNS)
+        r[1] = datetime.datetime(2025, 1, day)
+        r[2] = "AMAZON MKTPLACE PMTS"
+        r[6] = amount
+        r[10] = "BOA checking 1234"
+        ws.append(r)
+    wb.save(tmp_path / "in.xlsx")
+    out_path = tmp_path / "cat_in.xlsx"
+    result = categorize_workbook_file("in.xlsx", tmp_path / "in.xlsx", out_path)
+    assert result["success"]
+    with open(summary_path(out_path), newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sum(int(r["Count"]) for r in rows) == 3
+    assert sum(float(r["Total"]) for r in rows) == pytest.approx(80.0)
+
+def test_bsm_filter_workbook_names_summary(tmp_path : Path) -> None:
+    """Summary files are not workbooks."""
+    wb_paths = [tmp_path / "cat_in.xlsx", tmp_path / "cat_in.summary.csv",
+                tmp_path / "in.csv"]
+    names = [p.name for p in bsm_filter_workbook_names(wb_paths)]
+    assert names == ["cat_in.xlsx", "in.csv"]
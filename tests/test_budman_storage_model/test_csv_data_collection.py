@@ -0,0 +1,61 @@
+# ---------------------------------------------------------------------------- +
+# test_csv_data_collection.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, datetime
+from decimal import Decimal
+from pathlib import Path
+# third-party libraries
+import logging
+# local libraries
+from budget_storage_model.csv_data_collection import (
+    csv_DATA_COLLECTION_file_rows, csv_column_types_infer,
+    CSV_TYPE_STR, CSV_TYPE_INT, CSV_TYPE_DATE, CSV_TYPE_MONEY,
+    CSV_MONEY_CENTS)
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+def register_csv(path : Path) -> Path:
+    """Save a check register csv whose Amount starts with a whole number."""
+    path.write_text("Number,Date,Amount,Memo,Payee\n"
+                    "101,01/02/2025,5,rent,\n"
+                    "102,01/03/2025,12.34,12,Acme\n"
+                    "103,01/04/2025,,gas,\n")
+    return path
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_column_types_infer(tmp_path : Path) -> None:
+    """Whole numbers and money infer money, other mixes infer str."""
+    types = csv_column_types_infer(register_csv(tmp_path / "r.csv"))
+    assert types == {"Number": CSV_TYPE_INT, "Date": CSV_TYPE_DATE,
+                     "Amount": CSV_TYPE_MONEY, "Memo": CSV_TYPE_STR,
+                     "Payee": CSV_TYPE_STR}
+    types = csv_column_types_infer(tmp_path / "r.csv", infer_rows=1,
+                                   skip_cols=("Number",))
+    assert types["Amount"] == CSV_TYPE_INT and "Number" not in types
+
+def test_file_rows_no_mixed_column_types(tmp_path : Path) -> None:
+    """A column never mixes types, e.g., Amount 5 then 12.34."""
+    rows = list(csv_DATA_COLLECTION_file_rows(register_csv(tmp_path / "r.csv"),
+                                              str_cols=("Number",)))
+    assert [r["Amount"] for r in rows] == [Decimal("5"), Decimal("12.34"), None]
+    assert [r["Memo"] for r in rows] == ["rent", "12", "gas"]
+    assert [r["Number"] for r in rows] == ["101", "102", "103"]
+    assert rows[0]["Date"] == datetime.date(2025, 1, 2)
+    rows = list(csv_DATA_COLLECTION_file_rows(tmp_path / "r.csv",
+                                              money=CSV_MONEY_CENTS))
+    assert [r["Amount"] for r in rows] == [500, 1234, None]
+
+def test_file_rows_col_types_and_sample(tmp_path : Path) -> None:
+    """col_types override inference, a sample too small raises."""
+    path = register_csv(tmp_path / "r.csv")
+    rows = list(csv_DATA_COLLECTION_file_rows(
+        path, col_types={"Amount": CSV_TYPE_STR}))
+    assert [r["Amount"] for r in rows] == ["5", "12.34", None]
+    with pytest.raises(ValueError, match="Amount"):
+        list(csv_DATA_COLLECTION_file_rows(path, infer_rows=1))
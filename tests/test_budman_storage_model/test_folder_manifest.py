@@ -0,0 +1,73 @@
+# ---------------------------------------------------------------------------- +
+# test_folder_manifest.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, os, datetime
+from pathlib import Path
+# third-party libraries
+import logging
+from openpyxl import Workbook
+# local libraries
+import budget_storage_model.budget_storage_model as bsm
+from budget_storage_model.folder_manifest import (
+    bsm_WB_FOLDER_manifest, bsm_WB_FILES_manifest_sha256)
+from budget_storage_model.raw_store import bsm_RAW_STORE_ingest
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+def transactions_workbook() -> Workbook:
+    wb = Workbook()
+    wb.active.append(["Date", "Original Description", "Amount"])
+    wb.active.append([datetime.datetime(2025, 1, 2), "Coffee", -4.5])
+    return wb
+
+@pytest.fixture
+def sha_calls(monkeypatch) -> list:
+    """Record the files hashed by bsm_file_sha256()."""
+    calls = []
+    sha256 = bsm.bsm_file_sha256
+    def record_sha256(file_path, *args, **kwargs):
+        calls.append(Path(file_path).name)
+        return sha256(file_path, *args, **kwargs)
+    monkeypatch.setattr(bsm, "bsm_file_sha256", record_sha256)
+    return calls
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_manifest_no_hash_on_refresh_or_save(tmp_path : Path,
+                                             sha_calls : list) -> None:
+    """A folder refresh and a save do not hash the workbook files."""
+    wb_path = tmp_path / "May.xlsx"
+    bsm.bsm_WORKBOOK_file_save(transactions_workbook(), wb_path)
+    entries = bsm_WB_FOLDER_manifest(tmp_path)
+    assert entries["May.xlsx"]["rows"] == 1
+    assert entries["May.xlsx"]["sha256"] is None
+    assert sha_calls == []
+
+def test_manifest_sha256_lazy(tmp_path : Path, sha_calls : list) -> None:
+    """The sha256 is computed once, kept while size and mtime_ns match."""
+    wb_path = tmp_path / "May.xlsx"
+    transactions_workbook().save(wb_path)
+    csv_path = tmp_path / "May.csv"
+    csv_path.write_text("Date,Amount\n06/01/2025,1.00\n")
+    shas = bsm_WB_FILES_manifest_sha256([wb_path, csv_path])
+    assert shas[str(wb_path)] == bsm.bsm_file_sha256(wb_path)
+    assert sorted(sha_calls) == ["May.csv", "May.xlsx", "May.xlsx"]
+    sha_calls.clear()
+    entries = bsm_WB_FOLDER_manifest(tmp_path)
+    assert entries["May.xlsx"]["sha256"] == shas[str(wb_path)]
+    assert bsm_WB_FILES_manifest_sha256([wb_path, csv_path]) == shas
+    # The raw store reuses the manifest sha256.
+    assert bsm_RAW_STORE_ingest(tmp_path / "raw", [wb_path, csv_path]) == shas
+    assert sha_calls == []
+    # A changed file is hashed again.
+    csv_path.write_text("Date,Amount\n06/01/2025,2.00\n")
+    st = csv_path.stat()
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    new = bsm_WB_FILES_manifest_sha256([csv_path])
+    assert new[str(csv_path)] != shas[str(csv_path)]
+    assert sha_calls == ["May.csv"]
@@ -0,0 +1,45 @@
+# ---------------------------------------------------------------------------- +
+# test_storage_backends.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest
+from pathlib import Path
+# third-party libraries
+import logging
+from openpyxl import Workbook
+# local libraries
+from budget_storage_model import (
+    bsm_BDM_STORE_url_property_get, bsm_WORKBOOK_url_get, 
+    bsm_WORKBOOK_url_put, bsm_WORKBOOK_url_rows_get, WorkbookValues)
+from budman_namespace import BDM_OPTIONS
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+def test_sqlite_partial_reads_missing_db(tmp_path : Path) -> None:
+    """Partial reads of a missing database raise, and do not create it."""
+    db_path = tmp_path / "missing.db"
+    db_uri = db_path.as_uri().replace("file:", "sqlite:", 1)
+    with pytest.raises(FileNotFoundError):
+        bsm_BDM_STORE_url_property_get(db_uri + "?key=store", BDM_OPTIONS)
+    with pytest.raises(FileNotFoundError):
+        bsm_WORKBOOK_url_rows_get(db_uri + "?key=wb", "Sheet", 1, 2)
+    assert not db_path.exists()
+
+def test_mem_read_only_values_copy() -> None:
+    """A mem:// read_only get is a values copy, not the stored Workbook."""
+    wb = Workbook()
+    wb.active.title = "TransactionData"
+    wb.active.append(["Date", "Amount"])
+    wb.active.append(["2025-01-01", 1.0])
+    bsm_WORKBOOK_url_put(wb, "mem://test/read_only.xlsx")
+    wbv = bsm_WORKBOOK_url_get("mem://test/read_only.xlsx", read_only=True)
+    assert isinstance(wbv, WorkbookValues)
+    assert wbv.sheetnames == ["TransactionData"]
+    assert list(wbv.active.iter_rows(min_row=2)) == [("2025-01-01", 1.0)]
+    wb.active["B2"] = 2.0
+    assert list(wbv.active.iter_rows(min_row=2)) == [("2025-01-01", 1.0)]
+    assert bsm_WORKBOOK_url_get("mem://test/read_only.xlsx") is wb
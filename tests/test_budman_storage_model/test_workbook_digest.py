@@ -0,0 +1,85 @@
+# ---------------------------------------------------------------------------- +
+# test_workbook_digest.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, os, datetime
+from pathlib import Path
+# third-party libraries
+import logging
+from openpyxl import Workbook, load_workbook
+# local libraries
+from budman_workflows.budget_categorization import (
+    WORKSHEET_digest, WORKBOOK_file_digest, categorize_workbook_file, 
+    BOA_WB_COLUMNS, BUDGET_CATEGORY_COL_NAME)
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+def boa_workbook(path : Path, rows : int = 5) -> Path:
+    """Save a small BOA transaction workbook to path."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(BOA_WB_COLUMNS)
+    for i in range(rows):
+        r = [f"x{i}"] * len(BOA_WB_COLUMNS)
+        r[1] = datetime.datetime(2025, 1, i + 1)
+        r[2] = "AMAZON MKTPLACE PMTS"
+        r[6] = -12.5
+        r[10] = "BOA checking 1234"
+        ws.append(r)
+    wb.save(path)
+    return path
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_WORKSHEET_digest_file_round_trip(tmp_path : Path) -> None:
+    """A sheet and the same sheet read back from its file have one digest."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["A", "B", "C"])
+    ws.append([1, "", datetime.datetime(2025, 3, 4)])
+    ws.append(["x", None, None])
+    wb_path = tmp_path / "wb.xlsx"
+    wb.save(wb_path)
+    assert WORKBOOK_file_digest(wb_path) == WORKSHEET_digest(ws)
+    assert WORKBOOK_file_digest(wb_path, ["B"]) == WORKSHEET_digest(ws, ["B"])
+
+def test_WORKSHEET_digest_columns(tmp_path : Path) -> None:
+    """Only changes to the digested columns change the digest."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["A", "B"])
+    ws.append([1, 2])
+    all_digest, b_digest = WORKSHEET_digest(ws), WORKSHEET_digest(ws, ["B"])
+    ws["A2"] = 10
+    assert WORKSHEET_digest(ws, ["B"]) == b_digest
+    assert WORKSHEET_digest(ws) != all_digest
+    ws["B2"] = 20
+    assert WORKSHEET_digest(ws, ["B"]) != b_digest
+
+def test_WORKBOOK_file_digest_missing(tmp_path : Path) -> None:
+    """A missing file has no digest."""
+    assert WORKBOOK_file_digest(tmp_path / "missing.xlsx") is None
+
+def test_categorize_workbook_file_unchanged(tmp_path : Path) -> None:
+    """Categorizing an unchanged input again does not save the output."""
+    in_path = boa_workbook(tmp_path / "in.xlsx")
+    out_path = tmp_path / "cat_in.xlsx"
+    first = categorize_workbook_file("in.xlsx", in_path, out_path)
+    assert first["success"] and first["saved"] and first["rows"] == 5
+    old_ns = out_path.stat().st_mtime_ns - 10**9
+    os.utime(out_path, ns=(old_ns, old_ns))
+    second = categorize_workbook_file("in.xlsx", in_path, out_path)
+    assert second["success"] and not second["saved"]
+    assert out_path.stat().st_mtime_ns == old_ns
+    # A changed output is saved again.
+    wb = load_workbook(out_path)
+    hdr = [c.value for c in wb.active[1]]
+    wb.active.cell(row=2, column=hdr.index(BUDGET_CATEGORY_COL_NAME) + 1, 
+                   value="Other.Changed")
+    wb.save(out_path)
+    third = categorize_workbook_file("in.xlsx", in_path, out_path)
+    assert third["success"] and third["saved"]
@@ -0,0 +1,127 @@
+# ---------------------------------------------------------------------------- +
+# test_workbook_save_queue.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+# third-party libraries
+import logging
+from openpyxl import Workbook, load_workbook
+# local libraries
+import budget_storage_model.workbook_save_queue as wsq
+from budget_storage_model.workbook_save_queue import WorkbookSaveQueue
+from budget_storage_model import bsm_WORKBOOK_file_save
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+class SaveRecorder:
+    """Stands in for bsm_WORKBOOK_file_save(), records the saves in order.
+    
+    The first save waits for release(), so the later submits queue up 
+    behind it. A wb_path named 'fail*' raises an OSError.
+    """
+    def __init__(self):
+        self.saves = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+    def __call__(self, wb, wb_path):
+        self.started.set()
+        self.gate.wait(timeout=10)
+        if wb_path.name.startswith("fail"):
+            raise OSError(f"disk full: {wb_path.name}")
+        self.saves.append((wb_path.name, wb.active["A1"].value))
+    def release(self):
+        self.gate.set()
+
+@pytest.fixture
+def recorder(monkeypatch) -> SaveRecorder:
+    recorder = SaveRecorder()
+    monkeypatch.setattr(wsq, "bsm_WORKBOOK_file_save", recorder)
+    return recorder
+
+def workbook(value : str) -> Workbook:
+    wb = Workbook()
+    wb.active["A1"] = value
+    return wb
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_save_queue_order(tmp_path : Path, recorder : SaveRecorder) -> None:
+    """Saves run one at a time in the order submitted."""
+    q = WorkbookSaveQueue()
+    q.submit(workbook("a"), tmp_path / "a.xlsx")
+    assert recorder.started.wait(timeout=10)
+    for name in ("c", "b", "d"):
+        q.submit(workbook(name), tmp_path / f"{name}.xlsx")
+    recorder.release()
+    assert q.flush(timeout=10) == {}
+    assert [name for name, _ in recorder.saves] == [
+        "a.xlsx", "c.xlsx", "b.xlsx", "d.xlsx"]
+    assert q.stats()["saved"] == 4
+
+def test_save_queue_coalesce(tmp_path : Path, recorder : SaveRecorder) -> None:
+    """A save of a file waiting to start replaces the earlier one."""
+    q = WorkbookSaveQueue()
+    first = q.submit(workbook("a1"), tmp_path / "a.xlsx")
+    assert recorder.started.wait(timeout=10)
+    # a.xlsx is running, so these queue behind it and coalesce.
+    f1 = q.submit(workbook("a2"), tmp_path / "a.xlsx")
+    f2 = q.submit(workbook("a3"), tmp_path / "a.xlsx")
+    assert f1 is f2 and f1 is not first
+    recorder.release()
+    assert q.flush(timeout=10) == {}
+    assert recorder.saves == [("a.xlsx", "a1"), ("a.xlsx", "a3")]
+    assert q.stats()["coalesced"] == 1
+
+def test_save_queue_errors(tmp_path : Path, recorder : SaveRecorder) -> None:
+    """A failed save is raised by its Future and reported by flush()."""
+    q = WorkbookSaveQueue()
+    recorder.release()
+    f = q.submit(workbook("x"), tmp_path / "fail.xlsx")
+    ok = q.submit(workbook("y"), tmp_path / "ok.xlsx")
+    with pytest.raises(OSError, match="disk full"):
+        f.result(timeout=10)
+    assert ok.result(timeout=10) == tmp_path / "ok.xlsx"
+    errors = q.flush(timeout=10)
+    assert list(errors) == [str((tmp_path / "fail.xlsx").resolve())]
+    assert "disk full" in errors[str((tmp_path / "fail.xlsx").resolve())]
+    assert q.stats()["failed"] == 1
+    # Reported errors are not reported again.
+    assert q.flush(timeout=10) == {}
+
+def test_save_queue_pending_wait(tmp_path : Path, 
+                                 recorder : SaveRecorder) -> None:
+    """wait_for() returns when the queued saves of the workbook are done."""
+    q = WorkbookSaveQueue()
+    wb = workbook("a")
+    f = q.submit(wb, tmp_path / "a.xlsx")
+    assert recorder.started.wait(timeout=10)
+    threading.Timer(0.2, recorder.release).start()
+    q.wait_for(wb, timeout=10)
+    assert f.done()
+    q.wait_for(workbook("other"))
+
+def test_save_queue_atexit_drain(tmp_path : Path) -> None:
+    """The atexit handler writes the queued saves to their files."""
+    wb_paths = [tmp_path / f"wb{i}.xlsx" for i in range(3)]
+    for i, wb_path in enumerate(wb_paths):
+        wsq.bsm_WORKBOOK_file_save_async(workbook(f"v{i}"), wb_path)
+    wsq._save_queue_atexit()
+    assert wsq.bsm_WORKBOOK_save_queue().stats()["pending"] == 0
+    for i, wb_path in enumerate(wb_paths):
+        assert load_workbook(wb_path).active["A1"].value == f"v{i}"
+
+def test_file_save_concurrent(tmp_path : Path) -> None:
+    """Saves of one file from several threads use their own temp files."""
+    wb_path = tmp_path / "wb.xlsx"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for f in [pool.submit(bsm_WORKBOOK_file_save, workbook(f"v{i}"), wb_path)
+                  for i in range(8)]:
+            f.result()
+    assert load_workbook(wb_path).active["A1"].value.startswith("v")
+    assert [p.name for p in tmp_path.iterdir() if p.is_file()] == ["wb.xlsx"]
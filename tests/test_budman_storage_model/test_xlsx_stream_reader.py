@@ -0,0 +1,122 @@
+# ---------------------------------------------------------------------------- +
+# test_xlsx_stream_reader.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, datetime, re, zipfile
+from pathlib import Path
+from typing import Callable
+# third-party libraries
+import logging
+from openpyxl import Workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+# local libraries
+import budget_storage_model.xlsx_stream_reader as xsr
+from budget_storage_model.xlsx_stream_reader import (
+    bsm_XLSX_file_load_values, bsm_XLSX_file_columns)
+from budget_storage_model.workbook_values import WorkbookValues
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+INLINE_SHEET_XML = (
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<dimension ref="A1:C5"/><sheetData>'
+    '<row r="1"><c r="A1" t="inlineStr"><is><t>Name</t></is></c>'
+    '<c r="B1" t="inlineStr"><is><t>Amount</t></is></c>'
+    '<c r="C1" t="inlineStr"><is><r><t>Rich </t></r>'
+    '<r><rPr><b/></rPr><t>note</t></r></is></c></row>'
+    '<row r="3"><c r="A3" t="inlineStr"><is><t>Coffee &amp; tea</t></is></c>'
+    '<c r="B3"><v>-4.5</v></c></row>'
+    '<row r="4"><c r="B4"><v>20</v></c>'
+    '<c r="C4" t="inlineStr"><is><t xml:space="preserve"> padded </t></is></c></row>'
+    '</sheetData></worksheet>')
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+def zip_member_rewrite(wb_path : Path, member : str, 
+                       rewrite : Callable[[str], str]) -> None:
+    """Rewrite one part of an xlsx file."""
+    with zipfile.ZipFile(wb_path) as zf:
+        parts = {i.filename: zf.read(i) for i in zf.infolist()}
+    parts[member] = rewrite(parts[member].decode("utf-8")).encode("utf-8")
+    with zipfile.ZipFile(wb_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+def june_workbook(wb_path : Path, epoch = None) -> Path:
+    """Save a workbook of dates, sparse rows and an inline string sheet."""
+    wb = Workbook()
+    if epoch is not None:
+        wb.epoch = epoch
+    ws = wb.active
+    ws.title = "Transactions"
+    ws.append(["Date", "Posted", "Time", "Hold", "Description", "Amount"])
+    for i in range(12):
+        ws.append([datetime.datetime(2024, 2, 1 + i * 2, 9, 30),
+                   datetime.date(2024, 3, 1 + i), datetime.time(8, i),
+                   datetime.timedelta(hours=i, minutes=15),
+                   f"d & <{i}>", -1.25 * i if i % 2 else i])
+    ws["H30"] = "sparse"
+    ws["B25"] = datetime.datetime(1904, 3, 1)
+    wb.create_sheet("Inline")["A1"] = "placeholder"
+    wb.active = 1
+    wb.save(wb_path)
+    zip_member_rewrite(wb_path, "xl/worksheets/sheet2.xml",
+                       lambda _: INLINE_SHEET_XML)
+    return wb_path
+
+def assert_same_values(streamed : WorkbookValues, 
+                       loaded : WorkbookValues) -> None:
+    assert streamed.sheetnames == loaded.sheetnames
+    assert streamed.active.title == loaded.active.title
+    for a, b in zip(streamed.worksheets, loaded.worksheets):
+        assert a.rows == b.rows
+        for row_a, row_b in zip(a.rows, b.rows):
+            assert [type(v) for v in row_a] == [type(v) for v in row_b]
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+@pytest.mark.parametrize("epoch", [None, CALENDAR_MAC_1904])
+def test_load_values_same_as_openpyxl(tmp_path : Path, epoch) -> None:
+    """Dates, either epoch, inline strings and sparse rows load as openpyxl."""
+    wb_path = june_workbook(tmp_path / "June.xlsx", epoch)
+    streamed = bsm_XLSX_file_load_values(wb_path)
+    loaded = WorkbookValues.load(wb_path)
+    assert_same_values(streamed, loaded)
+    assert streamed.active.title == "Inline"
+    inline = streamed["Inline"].rows
+    assert inline[0] == ("Name", "Amount", "Rich note")
+    assert inline[1] == (None, None, None)
+    assert inline[3] == (None, 20, " padded ")
+    rows = streamed["Transactions"].rows
+    assert rows[1][0] == datetime.datetime(2024, 2, 1, 9, 30)
+    assert rows[24][1] == datetime.datetime(1904, 3, 1)
+    assert len(rows) == 30 and rows[29][7] == "sparse"
+
+def test_load_values_fallback(tmp_path : Path, monkeypatch, caplog) -> None:
+    """A sheet without a <dimension> and BSM_XLSX_STREAM_READER False load
+    with openpyxl."""
+    wb_path = june_workbook(tmp_path / "June.xlsx")
+    zip_member_rewrite(wb_path, "xl/worksheets/sheet1.xml",
+                       lambda xml: re.sub(r"<dimension [^>]*/>", "", xml))
+    with caplog.at_level(logging.DEBUG, logger=xsr.__name__):
+        streamed = bsm_XLSX_file_load_values(wb_path)
+    assert "with openpyxl" in caplog.text
+    assert_same_values(streamed, WorkbookValues.load(wb_path))
+    monkeypatch.setattr(xsr, "BSM_XLSX_STREAM_READER", False)
+    assert_same_values(bsm_XLSX_file_load_values(wb_path),
+                       WorkbookValues.load(wb_path))
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_file_columns_missing_header(tmp_path : Path, monkeypatch,
+                                     stream : bool) -> None:
+    """A column name not in the header row is left out of the result."""
+    monkeypatch.setattr(xsr, "BSM_XLSX_STREAM_READER", stream)
+    wb_path = june_workbook(tmp_path / "June.xlsx")
+    columns = bsm_XLSX_file_columns(wb_path, ["Amount", "Budget Category",
+                                              "Date"], "Transactions")
+    assert list(columns) == ["Date", "Amount"]
+    rows = WorkbookValues.load(wb_path)["Transactions"].rows
+    assert columns["Amount"] == [r[5] for r in rows[1:]]
+    assert columns["Date"] == [r[0] for r in rows[1:]]
+    assert bsm_XLSX_file_columns(wb_path, ["Budget Category"]) == {}
@@ -0,0 +1,234 @@
+# ---------------------------------------------------------------------------- +
+# test_budget_categorization.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, datetime
+from pathlib import Path
+from concurrent.futures import Future
+# third-party libraries
+import logging
+from openpyxl import Workbook, load_workbook
+# local libraries
+import budman_workflows.budget_categorization as bc
+from budman_workflows.budget_transactions import csv_amount
+from budget_domain_model.budget_domain_model import BudgetDomainModel
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+def boa_workbook(path : Path, rows : int = 10) -> Path:
+    """Save a small BOA transaction workbook to path."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(bc.BOA_WB_COLUMNS)
+    for i in range(rows):
+        r = [f"x{i}"] * len(bc.BOA_WB_COLUMNS)
+        r[1] = datetime.datetime(2025, 1, i % 28 + 1)
+        r[2] = "AMAZON MKTPLACE PMTS"
+        r[6] = -12.5
+        r[10] = "BOA checking 1234"
+        ws.append(r)
+    wb.save(path)
+    return path
+
+class FakeBM:
+    """The BudgetDomainModel methods used by the categorization workflow."""
+    def __init__(self, root : Path, in_paths : list):
+        self.root = root
+        self.in_paths = [(p.name, p) for p in in_paths]
+        (root / "out").mkdir(exist_ok=True)
+    def bdm_FI_WF_WORKBOOK_DATA_LIST_count(self, *args): 
+        return len(self.in_paths)
+    def bdm_WORKBOOK_DATA_LIST(self, *args): return self.in_paths
+    def bdm_WF_PURPOSE_FOLDER_MAP(self, *args): return "out"
+    def bsm_WF_FOLDER_abs_path(self, *args): return self.root / "out"
+    def bdm_WF_PREFIX_OUT(self, *args): return "cat_"
+
+class FakeBDM(FakeBM):
+    """FakeBM with the BudgetDomainModel prefetch and save queue methods."""
+    bsm_FI_WF_WORKBOOKS_prefetch = BudgetDomainModel.bsm_FI_WF_WORKBOOKS_prefetch
+    bsm_FI_WF_WORKBOOK_save_submit = BudgetDomainModel.bsm_FI_WF_WORKBOOK_save_submit
+    bsm_FI_WF_WORKBOOK_save_wait = BudgetDomainModel.bsm_FI_WF_WORKBOOK_save_wait
+    bsm_FI_WF_WORKBOOK_path = BudgetDomainModel.bsm_FI_WF_WORKBOOK_path
+    def __init__(self, root : Path, in_paths : list):
+        super().__init__(root, in_paths)
+        self._wb_save_futures = []
+        self.loaded = {}
+    def bdmwd_LOADED_WORKBOOKS_add(self, wb_name, wb): 
+        self.loaded[wb_name] = wb
+
+class RawStoreBDM(FakeBDM):
+    """FakeBDM with a raw store folder."""
+    def bsm_FI_RAW_STORE_abs_path(self, fi_key): 
+        return self.root / ".budman_raw_store"
+
+def _worker_fails(wb_name, wb_path, out_path):
+    raise RuntimeError(f"worker failed for {wb_name}")
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_categorization_parallel(tmp_path : Path) -> None:
+    """The parallel path categorizes each workbook and times every result."""
+    (tmp_path / "in").mkdir()
+    good = boa_workbook(tmp_path / "in" / "good.xlsx")
+    bad = tmp_path / "in" / "bad.xlsx"
+    bad.write_bytes(b"not a workbook")
+    results = bc.execute_worklow_categorization(
+        FakeBM(tmp_path, [good, bad]), "boa", "categorization",
+        parallel=True, max_workers=2)
+    assert results["good.xlsx"]["success"]
+    assert results["good.xlsx"]["rows"] == 10
+    assert (tmp_path / "out" / "cat_good.xlsx").exists()
+    assert not results["bad.xlsx"]["success"]
+    assert results["bad.xlsx"]["error"]
+    assert all(r["elapsed"] is not None for r in results.values())
+
+def test_categorization_parallel_worker_error(tmp_path : Path, 
+                                              monkeypatch) -> None:
+    """A failed worker gives an error result with elapsed and out_path set."""
+    (tmp_path / "in").mkdir()
+    good = boa_workbook(tmp_path / "in" / "good.xlsx")
+    monkeypatch.setattr(bc, "categorize_workbook_file", _worker_fails)
+    results = bc.execute_worklow_categorization(
+        FakeBM(tmp_path, [good]), "boa", "categorization",
+        parallel=True, max_workers=1)
+    r = results["good.xlsx"]
+    assert not r["success"] and "worker failed" in r["error"]
+    assert r["elapsed"] is not None
+    assert r["out_path"] == str(tmp_path / "out" / "cat_good.xlsx")
+
+def test_categorization_sequential_load_error(tmp_path : Path) -> None:
+    """A workbook that fails to load is a failed result, the run goes on."""
+    (tmp_path / "in").mkdir()
+    bad = tmp_path / "in" / "bad.xlsx"
+    bad.write_bytes(b"not a workbook")
+    good = boa_workbook(tmp_path / "in" / "good.xlsx")
+    bm = FakeBDM(tmp_path, [bad, good])
+    results = bc.execute_worklow_categorization(bm, "boa", "categorization")
+    assert results["good.xlsx"]["success"] and results["good.xlsx"]["saved"]
+    assert (tmp_path / "out" / "cat_good.xlsx").exists()
+    assert not results["bad.xlsx"]["success"]
+    assert "BadZipFile" in results["bad.xlsx"]["error"]
+    assert results["bad.xlsx"]["elapsed"] is not None
+    assert bm._wb_save_futures == []
+
+def test_categorization_sequential_save_scope(tmp_path : Path) -> None:
+    """Saves queued before the run are not waited for or reported by it."""
+    (tmp_path / "in").mkdir()
+    good = boa_workbook(tmp_path / "in" / "good.xlsx")
+    bm = FakeBDM(tmp_path, [good])
+    stale = Future()
+    stale.set_exception(OSError("aborted run save"))
+    bm._wb_save_futures.append(("aborted.xlsx", stale))
+    results = bc.execute_worklow_categorization(bm, "boa", "categorization")
+    assert list(results) == ["good.xlsx"]
+    assert results["good.xlsx"]["success"]
+    assert bm._wb_save_futures == [("aborted.xlsx", stale)]
+    assert "aborted run save" in bm.bsm_FI_WF_WORKBOOK_save_wait()["aborted.xlsx"]
+    assert bm._wb_save_futures == []
+
+def test_categorization_output_folder(tmp_path : Path) -> None:
+    """The public output folder helper gives the WF folder and out prefix."""
+    bm = FakeBM(tmp_path, [])
+    out_folder, out_prefix = bc.categorization_output_folder(
+        bm, "boa", "categorization")
+    assert out_folder == tmp_path / "out"
+    assert out_prefix == "cat_"
+
+def test_categorize_workbook_file_saves_via_bsm(tmp_path : Path,
+                                                monkeypatch) -> None:
+    """categorize_workbook_file saves through bsm_WORKBOOK_file_save."""
+    (tmp_path / "in").mkdir()
+    good = boa_workbook(tmp_path / "in" / "good.xlsx")
+    out_path = tmp_path / "cat_good.xlsx"
+    saved = []
+    bsm_save = bc.bsm_WORKBOOK_file_save
+    def record_save(wb, wb_path, *args, **kwargs):
+        saved.append(Path(wb_path))
+        return bsm_save(wb, wb_path, *args, **kwargs)
+    monkeypatch.setattr(bc, "bsm_WORKBOOK_file_save", record_save)
+    r = bc.categorize_workbook_file("good.xlsx", good, out_path)
+    assert r["success"] and r["saved"]
+    assert saved == [out_path]
+    assert out_path.exists()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+def test_map_budget_category_uses_transaction_values(tmp_path : Path,
+                                                     monkeypatch) -> None:
+    """Worksheet rows get the categorize_transaction_values() mapping."""
+    wb = load_workbook(boa_workbook(tmp_path / "boa.xlsx", rows=3))
+    sheet = wb.active
+    bc.check_sheet_columns(sheet)
+    calls = []
+    values = bc.categorize_transaction_values
+    def record_values(*args):
+        calls.append(args)
+        return values(*args)
+    monkeypatch.setattr(bc, "categorize_transaction_values", record_values)
+    bc.map_budget_category(sheet, bc.ORIGINAL_DESCRIPTION_COL_NAME,
+                           bc.BUDGET_CATEGORY_COL_NAME)
+    assert len(calls) == 3
+    hdr = [c.value for c in sheet[1]]
+    row = [c.value for c in sheet[2]]
+    mapped = values(*calls[0])
+    assert mapped[5] == "D" and mapped[1] == "BOA checking 1234"
+    assert [row[hdr.index(col)] for col in bc.BUDMAN_MAPPED_COLUMNS] \
+        == list(mapped)
+
+def test_csv_empty_amount(tmp_path : Path) -> None:
+    """An empty csv amount is None, with no debit or credit."""
+    assert csv_amount("") is None
+    assert csv_amount(" $1,234.50 ") == 1234.5
+    hdr = list(bc.BOA_WB_COLUMNS)
+    row = [""] * len(hdr)
+    row[hdr.index(bc.DATE_COL_NAME)] = "01/02/2025"
+    row[hdr.index(bc.ORIGINAL_DESCRIPTION_COL_NAME)] = "AMAZON MKTPLACE PMTS"
+    row[hdr.index(bc.ACCOUNT_NAME_COL_NAME)] = "BOA checking 1234"
+    aggregator = bc.CategoryAggregator()
+    out = list(bc.categorize_csv_rows(hdr, [row], aggregator))
+    out_hdr, _ = bc._csv_columns(hdr)
+    assert out[0][out_hdr.index(bc.DEBIT_CREDIT_COL_NAME)] is None
+    assert out[0][out_hdr.index(bc.AMOUNT_COL_NAME)] == ""
+    assert aggregator.row_count == 1
+
+def test_categorization_duplicates_output_changed(tmp_path : Path) -> None:
+    """A duplicate is skipped only while the first output is unchanged."""
+    (tmp_path / "in").mkdir()
+    good = boa_workbook(tmp_path / "in" / "good.xlsx")
+    dup = tmp_path / "in" / "good (1).xlsx"
+    dup.write_bytes(good.read_bytes())
+    bm = RawStoreBDM(tmp_path, [good, dup])
+    results = bc.execute_worklow_categorization(bm, "boa", "categorization")
+    assert results["good.xlsx"]["saved"]
+    assert results["good (1).xlsx"]["duplicate_of"] == "good.xlsx"
+    skipped, _ = bc.categorization_duplicates(bm, "boa", "categorization",
+                                              {dup.name: dup})
+    assert skipped[dup.name]["duplicate_of"] == "good.xlsx"
+    out = tmp_path / "out" / "cat_good.xlsx"
+    out.write_bytes(out.read_bytes() + b"changed")
+    skipped, shas = bc.categorization_duplicates(bm, "boa", "categorization",
+                                                 {dup.name: dup})
+    assert skipped == {} and dup.name in shas
+    assert not (tmp_path / "in" / "manifest.json").exists()
+
+def test_categorization_sequential_csv_parallel(tmp_path : Path,
+                                                monkeypatch) -> None:
+    """A sequential run categorizes its csv files with parallel=False."""
+    (tmp_path / "in").mkdir()
+    csv_path = tmp_path / "in" / "boa.csv"
+    csv_path.write_text(",".join(bc.BOA_WB_COLUMNS) + "\n")
+    calls = []
+    def record_csv(wb_name, in_path, out_path, **kwargs):
+        calls.append(kwargs)
+        return {"wb_name": wb_name, "success": True, "saved": True,
+                "out_path": str(out_path), "rows": 0, "error": None,
+                "elapsed": None}
+    monkeypatch.setattr(bc, "categorize_csv_file", record_csv)
+    results = bc.execute_worklow_categorization(
+        FakeBDM(tmp_path, [csv_path]), "boa", "categorization",
+        max_workers=3)
+    assert results["boa.csv"]["success"]
+    assert calls == [{"parallel": False, "max_workers": 3}]
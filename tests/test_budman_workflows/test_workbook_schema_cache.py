@@ -0,0 +1,77 @@
+# ---------------------------------------------------------------------------- +
+# test_workbook_schema_cache.py
+# ---------------------------------------------------------------------------- +
+#region imports
+# python standard libraries
+import pytest, json
+from pathlib import Path
+# third-party libraries
+import logging
+from openpyxl import Workbook
+# local libraries
+from budman_workflows.workbook_schema_cache import (
+    WorkbookSchemaCache, validate_workbook_schemas, SCHEMA_CACHE_FILENAME, 
+    SC_VALID, SC_MISSING_COLUMNS)
+from budman_workflows.budget_categorization import (
+    BUDMAN_REQUIRED_COLUMNS, BUDMAN_SHEET_NAME)
+#endregion imports
+# ---------------------------------------------------------------------------- +
+#region Globals
+logger = logging.getLogger(__name__)
+#endregion Globals
+# ---------------------------------------------------------------------------- +
+#region Helpers
+def schema_workbook(path : Path, columns : list) -> Path:
+    """Save a workbook with one BUDMAN_SHEET_NAME sheet and header columns."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = BUDMAN_SHEET_NAME
+    ws.append(columns)
+    ws.append(["x"] * len(columns))
+    wb.save(path)
+    return path
+#endregion Helpers
+# ---------------------------------------------------------------------------- +
+def test_validate_workbook_schemas_same_name(tmp_path : Path) -> None:
+    """Same-named workbooks in different folders each get a result."""
+    good = schema_workbook(tmp_path / "a" / "wb.xlsx", 
+                           list(BUDMAN_REQUIRED_COLUMNS))
+    bad = schema_workbook(tmp_path / "b" / "wb.xlsx", 
+                          list(BUDMAN_REQUIRED_COLUMNS)[1:])
+    results = validate_workbook_schemas([good, bad])
+    assert len(results) == 2
+    assert results[str(good.resolve())][SC_VALID]
+    assert not results[str(bad.resolve())][SC_VALID]
+    assert (results[str(bad.resolve())][SC_MISSING_COLUMNS] == 
+            [BUDMAN_REQUIRED_COLUMNS[0]])
+
+def test_validate_workbook_schemas_cached(tmp_path : Path) -> None:
+    """An unchanged workbook is a cache hit, a changed one is checked again."""
+    wb_path = schema_workbook(tmp_path / "wb.xlsx", list(BUDMAN_REQUIRED_COLUMNS))
+    cache = WorkbookSchemaCache.load(tmp_path)
+    validate_workbook_schemas([wb_path], cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert (tmp_path / SCHEMA_CACHE_FILENAME).exists()
+    # A new cache loaded from the budget folder has the result.
+    cache = WorkbookSchemaCache.load(tmp_path)
+    results = validate_workbook_schemas([wb_path], cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert results[str(wb_path.resolve())][SC_VALID]
+    # Changing the workbook drops the cached result.
+    schema_workbook(wb_path, list(BUDMAN_REQUIRED_COLUMNS)[1:])
+    results = validate_workbook_schemas([wb_path], cache)
+    assert cache.misses == 1
+    assert not results[str(wb_path.resolve())][SC_VALID]
+
+def test_WorkbookSchemaCache_stale(tmp_path : Path) -> None:
+    """A cache file built with other schema rules is reset on load."""
+    wb_path = schema_workbook(tmp_path / "wb.xlsx", list(BUDMAN_REQUIRED_COLUMNS))
+    validate_workbook_schemas([wb_path], WorkbookSchemaCache.load(tmp_path))
+    cache_path = tmp_path / SCHEMA_CACHE_FILENAME
+    data = json.loads(cache_path.read_text())
+    data["schema_id"] = "other"
+    cache_path.write_text(json.dumps(data))
+    assert WorkbookSchemaCache.load(tmp_path).entries == {}
+    cache_path.write_text("{not json")
+    assert WorkbookSchemaCache.load(tmp_path).entries == {}